@@ -0,0 +1,445 @@
+import os
+import json
+import time
+import logging
+from typing import Optional, List, Dict, Callable
+
+import requests
+
+import O_Utils_GPT as GPT
+import O_Utils_Ollama as Ollama
+import O_Utils_Modelos as Modelos
+import O_Utils_Esquemas as Esq
+import Z_Utils_Articulos as Art
+
+# =============================================================================
+# MODO BATCH (OpenAI Batch API) PARA REPROCESAMIENTOS MASIVOS
+# =============================================================================
+# Para reclasificaciones nocturnas y backfills del store histórico no hace falta la API
+# en tiempo real: se arma un JSONL con los mismos requests que usan los clasificadores
+# (armar_request_* de O_Utils_GPT), se sube como un batch job, se espera a que termine y
+# los resultados se combinan por custom_id ("<n>|<subtarea>"). El batch usa la cuota y el
+# precio de Batch API, sin tocar la cuota interactiva.
+#
+# Cada batch deja un manifiesto en BATCH_DIR/<batch_id>.json con el artículo de cada
+# custom_id, para poder combinar los resultados (o reintentar los fallidos) más tarde.
+#
+# ClienteLocal es un reemplazo basado en archivos que resuelve los requests con una
+# función (para tests o para correr contra Ollama sin OpenAI).
+
+OPENAI_API_BASE = "https://api.openai.com/v1"
+BATCH_DIR = "Data_Results/batches"
+BATCH_MODELO = "gpt-4o"
+BATCH_VENTANA = "24h"
+BATCH_INTERVALO_SEG = 60
+BATCH_TIMEOUT_SEG = 26 * 60 * 60
+
+TAREAS_BATCH = ['valoracion', 'tema', 'tipo']
+# El tipo se resuelve con tres preguntas SI/NO, en el mismo orden de prioridad que clasificar_tipo_publicacion_con_gpt
+SUBTAREAS_TIPO = [('declaracion', 'Declaración'), ('agenda', 'Agenda'), ('entrevista', 'Entrevista')]
+
+ESTADOS_FINALES = {'completed', 'failed', 'expired', 'cancelled'}
+
+
+def _custom_id(n, subtarea):
+    return f"{n}|{subtarea}"
+
+
+def armar_lineas(
+    articulos: List[dict],
+    tareas: Optional[List[str]] = None,
+    lista_temas: Optional[List[str]] = None,
+    tema_default: Optional[str] = None,
+    ministro_key_words=None,
+    ministerios_key_words=None,
+    modelo: str = BATCH_MODELO,
+):
+    """
+    Arma las líneas del JSONL de batch para los artículos.
+
+    Args:
+        articulos (list): Registros con 'LINK' y 'TEXTO_PLANO'
+        tareas (list, optional): Subconjunto de TAREAS_BATCH (default todas)
+
+    Returns:
+        tuple: (lineas, manifiesto) donde manifiesto = {custom_id: {"link", "subtarea"}}
+    """
+    tareas = TAREAS_BATCH if tareas is None else tareas
+    actores = GPT.listar_actores(ministro_key_words, ministerios_key_words)
+
+    lineas, manifiesto = [], {}
+    for n, articulo in enumerate(articulos):
+        texto = articulo.get('TEXTO_PLANO')
+        if not texto:
+            continue
+        bodies = {}
+        if 'valoracion' in tareas:
+            bodies['valoracion'] = GPT.armar_request_valoracion(texto, modelo, actores)
+        if 'tema' in tareas and lista_temas:
+            bodies['tema'] = GPT.armar_request_tema(texto, lista_temas, tema_default, modelo)
+        if 'tipo' in tareas:
+            if actores:
+                bodies['declaracion'] = GPT.armar_request_declaracion(texto, actores, modelo)
+            bodies['agenda'] = GPT.armar_request_agenda(texto, modelo)
+            bodies['entrevista'] = GPT.armar_request_entrevista(texto, modelo)
+
+        for subtarea, body in bodies.items():
+            custom_id = _custom_id(n, subtarea)
+            lineas.append({"custom_id": custom_id, "method": "POST", "url": "/v1/chat/completions", "body": body})
+            manifiesto[custom_id] = {"link": articulo.get('LINK'), "subtarea": subtarea}
+    return lineas, manifiesto
+
+
+# -----------------------------------------------------------------------------
+# Clientes: OpenAI Batch API y reemplazo local basado en archivos
+# -----------------------------------------------------------------------------
+
+class ClienteOpenAI:
+    """Cliente mínimo de la Batch API (files + batches)."""
+
+    def __init__(self, api_key: Optional[str] = None, base_url: str = OPENAI_API_BASE):
+        self.api_key = api_key or GPT.leer_api_key_desde_env()
+        self.base_url = base_url
+
+    def _headers(self):
+        return {"Authorization": f"Bearer {self.api_key}"}
+
+    def enviar(self, contenido_jsonl: str, descripcion: str = "") -> str:
+        archivo = requests.post(
+            f"{self.base_url}/files", headers=self._headers(), timeout=120,
+            data={"purpose": "batch"}, files={"file": ("lote.jsonl", contenido_jsonl.encode('utf-8'))},
+        )
+        archivo.raise_for_status()
+        batch = requests.post(
+            f"{self.base_url}/batches", headers=self._headers(), timeout=60,
+            json={"input_file_id": archivo.json()["id"], "endpoint": "/v1/chat/completions",
+                  "completion_window": BATCH_VENTANA, "metadata": {"descripcion": descripcion}},
+        )
+        batch.raise_for_status()
+        return batch.json()["id"]
+
+    def estado(self, batch_id: str) -> dict:
+        response = requests.get(f"{self.base_url}/batches/{batch_id}", headers=self._headers(), timeout=60)
+        response.raise_for_status()
+        return response.json()
+
+    def descargar(self, file_id: Optional[str]) -> str:
+        if not file_id:
+            return ""
+        response = requests.get(f"{self.base_url}/files/{file_id}/content", headers=self._headers(), timeout=300)
+        response.raise_for_status()
+        return response.text
+
+
+class ClienteLocal:
+    """
+    Reemplazo de la Batch API basado en archivos. Cada request se resuelve con responder(body),
+    que devuelve el contenido del mensaje; si lanza una excepción, esa línea queda como error.
+    """
+
+    def __init__(self, directorio: str, responder: Callable[[dict], str]):
+        self.directorio = directorio
+        self.responder = responder
+        os.makedirs(directorio, exist_ok=True)
+
+    def enviar(self, contenido_jsonl: str, descripcion: str = "") -> str:
+        batch_id = f"batch_local_{time.time_ns()}"
+        salida, errores = [], []
+        for linea in contenido_jsonl.splitlines():
+            request = json.loads(linea)
+            try:
+                contenido = self.responder(request["body"])
+                salida.append({"custom_id": request["custom_id"], "response": {
+                    "status_code": 200, "body": {"choices": [{"message": {"content": contenido}}]}}, "error": None})
+            except Exception as e:
+                errores.append({"custom_id": request["custom_id"], "response": None,
+                                "error": {"code": "local_error", "message": str(e)}})
+        for sufijo, filas in (("output", salida), ("error", errores)):
+            with open(os.path.join(self.directorio, f"{batch_id}_{sufijo}.jsonl"), 'w', encoding='utf-8') as f:
+                f.write("".join(json.dumps(fila, ensure_ascii=False) + "\n" for fila in filas))
+        with open(os.path.join(self.directorio, f"{batch_id}_estado.json"), 'w', encoding='utf-8') as f:
+            json.dump({"id": batch_id, "status": "completed", "descripcion": descripcion,
+                       "output_file_id": f"{batch_id}_output", "error_file_id": f"{batch_id}_error",
+                       "request_counts": {"total": len(salida) + len(errores), "completed": len(salida), "failed": len(errores)}}, f)
+        return batch_id
+
+    def estado(self, batch_id: str) -> dict:
+        with open(os.path.join(self.directorio, f"{batch_id}_estado.json"), encoding='utf-8') as f:
+            return json.load(f)
+
+    def descargar(self, file_id: Optional[str]) -> str:
+        path = os.path.join(self.directorio, f"{file_id}.jsonl")
+        if not file_id or not os.path.exists(path):
+            return ""
+        with open(path, encoding='utf-8') as f:
+            return f.read()
+
+
+# -----------------------------------------------------------------------------
+# Ciclo del batch: enviar → esperar → leer → combinar
+# -----------------------------------------------------------------------------
+
+def _ruta_manifiesto(batch_id, batch_dir=None):
+    return os.path.join(batch_dir or BATCH_DIR, f"{batch_id}.json")
+
+
+def enviar_lote(lineas: List[dict], manifiesto: Dict[str, dict], cliente, config: Optional[dict] = None,
+                descripcion: str = "", batch_dir: Optional[str] = None) -> str:
+    """
+    Sube el JSONL y guarda el manifiesto del batch (custom_id → artículo, más la config usada para combinar).
+
+    Returns:
+        str: Id del batch
+    """
+    contenido = "".join(json.dumps(linea, ensure_ascii=False) + "\n" for linea in lineas)
+    batch_id = cliente.enviar(contenido, descripcion)
+    path = _ruta_manifiesto(batch_id, batch_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({"batch_id": batch_id, "creado": time.time(), "config": config or {},
+                   "lineas": {linea["custom_id"]: linea for linea in lineas}, "manifiesto": manifiesto},
+                  f, ensure_ascii=False)
+    logging.info(f"📦 Batch {batch_id} enviado: {len(lineas)} requests")
+    return batch_id
+
+
+def cargar_manifiesto(batch_id: str, batch_dir: Optional[str] = None) -> dict:
+    with open(_ruta_manifiesto(batch_id, batch_dir), encoding='utf-8') as f:
+        return json.load(f)
+
+
+def esperar_lote(batch_id: str, cliente, intervalo_seg: float = BATCH_INTERVALO_SEG,
+                 timeout_seg: float = BATCH_TIMEOUT_SEG) -> dict:
+    """
+    Consulta el estado del batch hasta que llegue a un estado final o se agote el timeout.
+
+    Returns:
+        dict: Último estado informado por el cliente
+    """
+    limite = time.monotonic() + timeout_seg
+    while True:
+        estado = cliente.estado(batch_id)
+        if estado.get("status") in ESTADOS_FINALES:
+            logging.info(f"📦 Batch {batch_id}: {estado.get('status')} {estado.get('request_counts', {})}")
+            return estado
+        if time.monotonic() >= limite:
+            logging.warning(f"⚠️ Batch {batch_id} sigue en '{estado.get('status')}' al agotar la espera")
+            return estado
+        time.sleep(intervalo_seg)
+
+
+def leer_resultados(batch_id: str, cliente, batch_dir: Optional[str] = None):
+    """
+    Descarga salida y errores del batch y valida cada respuesta contra el esquema de su subtarea.
+
+    Returns:
+        tuple: (respuestas {custom_id: etiqueta}, errores {custom_id: motivo})
+               Los custom_id del manifiesto que no aparecen en ningún archivo cuentan como error.
+    """
+    datos = cargar_manifiesto(batch_id, batch_dir)
+    estado = cliente.estado(batch_id)
+    respuestas, errores = {}, {}
+
+    for linea in cliente.descargar(estado.get("output_file_id")).splitlines():
+        if not linea.strip():
+            continue
+        fila = json.loads(linea)
+        custom_id = fila.get("custom_id")
+        request = datos["lineas"].get(custom_id)
+        response = fila.get("response") or {}
+        if request is None:
+            continue
+        if response.get("status_code") != 200:
+            errores[custom_id] = f"HTTP {response.get('status_code')}"
+            continue
+        try:
+            contenido = response["body"]["choices"][0]["message"]["content"]
+        except (KeyError, IndexError, TypeError):
+            errores[custom_id] = "respuesta sin contenido"
+            continue
+        esquema = request["body"]["response_format"].get("json_schema", {}).get("schema")
+        etiqueta = Esq.leer_respuesta(contenido, esquema) if esquema else None
+        if etiqueta is None:
+            errores[custom_id] = "respuesta fuera del esquema"
+        else:
+            respuestas[custom_id] = etiqueta
+
+    for linea in cliente.descargar(estado.get("error_file_id")).splitlines():
+        if linea.strip():
+            fila = json.loads(linea)
+            errores[fila.get("custom_id")] = (fila.get("error") or {}).get("message", "error")
+
+    for custom_id in datos["lineas"]:
+        if custom_id not in respuestas and custom_id not in errores:
+            errores[custom_id] = f"sin resultado (batch {estado.get('status')})"
+    if errores:
+        logging.warning(f"⚠️ Batch {batch_id}: {len(errores)} requests fallidos de {len(datos['lineas'])}")
+    return respuestas, errores
+
+
+def combinar_resultados(manifiesto: Dict[str, dict], respuestas: Dict[str, str], config: Optional[dict] = None) -> Dict[str, dict]:
+    """
+    Combina las respuestas por artículo (link). Un campo queda en None si alguna de sus
+    subtareas falló, y el link se marca con '_PENDIENTES' para reintentarlo.
+
+    Returns:
+        dict: {link: {'VALORACION', 'TEMA', 'TIPO PUBLICACION', '_PENDIENTES'}} (solo los campos pedidos)
+    """
+    config = config or {}
+    por_link = {}
+    for custom_id, info in manifiesto.items():
+        por_link.setdefault(info["link"], {})[info["subtarea"]] = respuestas.get(custom_id)
+
+    resultados = {}
+    for link, subtareas in por_link.items():
+        registro, pendientes = {}, [s for s, v in subtareas.items() if v is None]
+
+        if 'valoracion' in subtareas and subtareas['valoracion'] is not None:
+            registro['VALORACION'] = subtareas['valoracion']
+        elif 'valoracion' in subtareas:
+            registro['VALORACION'] = None
+
+        if any(s in subtareas for s, _ in SUBTAREAS_TIPO):
+            tipo = None
+            for subtarea, etiqueta in SUBTAREAS_TIPO:
+                if subtarea not in subtareas:
+                    continue
+                if subtareas[subtarea] is None:
+                    break  # No se puede decidir sin las subtareas de mayor prioridad
+                if subtareas[subtarea] == "SI":
+                    tipo = etiqueta
+                    break
+            else:
+                tipo = "Nota"
+            registro['TIPO PUBLICACION'] = tipo
+
+        if 'tema' in subtareas:
+            tema = subtareas['tema']
+            if registro.get('TIPO PUBLICACION') == "Agenda" and config.get('tema_default'):
+                tema = config['tema_default']
+            registro['TEMA'] = tema
+
+        registro['_PENDIENTES'] = pendientes
+        resultados[link] = registro
+    return resultados
+
+
+def reintentar_fallidos(batch_id: str, errores: Dict[str, str], cliente, batch_dir: Optional[str] = None) -> Optional[str]:
+    """
+    Reenvía en un batch nuevo solo los requests que fallaron. Devuelve el id del batch nuevo o None.
+    """
+    if not errores:
+        return None
+    datos = cargar_manifiesto(batch_id, batch_dir)
+    lineas = [datos["lineas"][c] for c in errores if c in datos["lineas"]]
+    manifiesto = {c: datos["manifiesto"][c] for c in errores if c in datos["manifiesto"]}
+    return enviar_lote(lineas, manifiesto, cliente, datos.get("config"),
+                       descripcion=f"reintento de {batch_id}", batch_dir=batch_dir)
+
+
+def _valoracion_final(valoracion_base, texto, ministro_key_words, ministerios_key_words):
+    """Misma regla que valorar_con_ia: NO_NEGATIVA pasa por la heurística de key words (o NEUTRA)"""
+    if valoracion_base != "NO_NEGATIVA":
+        return valoracion_base
+    if ministro_key_words or ministerios_key_words:
+        from Z_Utils import aplicar_heuristica_valoracion
+        return aplicar_heuristica_valoracion(valoracion_base, texto, ministro_key_words, ministerios_key_words)
+    return "NEUTRA"
+
+
+def reprocesar_store(
+    cliente,
+    tareas: Optional[List[str]] = None,
+    lista_temas: Optional[List[str]] = None,
+    tema_default: Optional[str] = None,
+    ministro_key_words=None,
+    ministerios_key_words=None,
+    modelo: str = BATCH_MODELO,
+    db_path: Optional[str] = None,
+    batch_dir: Optional[str] = None,
+    intervalo_seg: float = BATCH_INTERVALO_SEG,
+    timeout_seg: float = BATCH_TIMEOUT_SEG,
+    huella_config: Optional[str] = None,
+) -> dict:
+    """
+    Reclasifica en batch los artículos del store y guarda los campos actualizados.
+
+    Los resultados corresponden a los temas y key words pasados, no a la configuración con la que
+    se guardó cada registro: se guardan con la huella de esta configuración para que un request
+    con otra configuración no los reutilice. Si se indica huella_config (la huella con la que la API
+    guarda esa misma configuración), solo se reprocesan los registros guardados con esa huella.
+    Los artículos con alguna subtarea fallida no se guardan: conservan su registro anterior
+    (modelo, versión de prompts y fecha incluidos).
+
+    Returns:
+        dict: Resumen con batch_id, estado, actualizados, pendientes y fallidos
+    """
+    articulos = Art.listar_articulos(db_path)
+    if huella_config:
+        articulos = [a for a in articulos if a.get('_HUELLA') == huella_config]
+    else:
+        huella_config = Art.huella_configuracion(
+            temas=lista_temas, tema_default=tema_default,
+            ministro_key_words=ministro_key_words, ministerios_key_words=ministerios_key_words,
+            tareas=tareas or TAREAS_BATCH, origen="batch",
+        )
+    lineas, manifiesto = armar_lineas(articulos, tareas, lista_temas, tema_default,
+                                      ministro_key_words, ministerios_key_words, modelo)
+    if not lineas:
+        return {"batch_id": None, "estado": None, "actualizados": 0, "pendientes": 0, "fallidos": 0}
+
+    config = {"tema_default": tema_default}
+    batch_id = enviar_lote(lineas, manifiesto, cliente, config, descripcion="reproceso store", batch_dir=batch_dir)
+    estado = esperar_lote(batch_id, cliente, intervalo_seg, timeout_seg)
+    respuestas, errores = leer_resultados(batch_id, cliente, batch_dir)
+    resultados = combinar_resultados(manifiesto, respuestas, config)
+
+    registros, pendientes = [], 0
+    for articulo in articulos:
+        resultado = resultados.get(articulo.get('LINK'))
+        if not resultado:
+            continue
+        if resultado.get('_PENDIENTES'):
+            pendientes += 1
+            continue
+        campos = {k: v for k, v in resultado.items() if not k.startswith('_') and v is not None}
+        actualizado = {k: v for k, v in articulo.items() if not k.startswith('_')}
+        actualizado.update(campos)
+        actualizado['_FUENTES'] = {**(articulo.get('_FUENTES') or {}), **{campo: Modelos.FUENTE_LLM for campo in campos}}
+        if resultado.get('VALORACION'):
+            actualizado['VALORACION'] = _valoracion_final(resultado['VALORACION'], articulo.get('TEXTO_PLANO'),
+                                                          ministro_key_words, ministerios_key_words)
+        registros.append(actualizado)
+
+    guardados = Art.guardar_articulos(registros, f"GPT:{modelo}", f"{GPT.VERSION_PROMPTS}/{Ollama.VERSION_PROMPTS}",
+                                      huella_config, db_path) if registros else 0
+    if pendientes:
+        logging.warning(f"⚠️ Reproceso del store: {pendientes} artículos con subtareas fallidas conservan su registro anterior")
+    return {
+        "batch_id": batch_id,
+        "estado": estado.get("status"),
+        "actualizados": guardados,
+        "pendientes": pendientes,
+        "fallidos": len(errores),
+    }
+
+
+if __name__ == "__main__":
+    # Reproceso nocturno del store: python O_Utils_Batch.py config.json
+    # config.json: {"temas": [...], "tema_default": "...", "ministro_key_words": [...], "ministerios_key_words": [...],
+    #               "huella_config": "..." (opcional: solo los registros guardados con esa huella)}
+    import sys
+    logging.basicConfig(level=logging.INFO)
+    config_batch = {}
+    if len(sys.argv) > 1:
+        with open(sys.argv[1], encoding='utf-8') as f:
+            config_batch = json.load(f)
+    resumen = reprocesar_store(
+        ClienteOpenAI(),
+        lista_temas=config_batch.get('temas'),
+        tema_default=config_batch.get('tema_default'),
+        ministro_key_words=config_batch.get('ministro_key_words'),
+        ministerios_key_words=config_batch.get('ministerios_key_words'),
+        huella_config=config_batch.get('huella_config'),
+    )
+    print(f"📦 {json.dumps(resumen, ensure_ascii=False)}")
@@ -0,0 +1,166 @@
+import random
+import logging
+import threading
+from typing import Optional, Callable, List, Iterable
+
+import O_Utils_Modelos as Modelos
+import Z_Utils_Breaker as Breaker
+
+# =============================================================================
+# CASCADA DE MODELOS (Ollama primero, gpt-4o solo si hay dudas)
+# =============================================================================
+# Con la política 'cascada' una tarea se resuelve primero con el modelo barato (Ollama).
+# La respuesta se acepta si es válida y coincide con todas las señales de confianza
+# disponibles (modelo local entrenado, clasificador TF-IDF de temas, etc.); si alguna
+# señal discrepa, la respuesta no es válida o no hay señales, se escala al modelo caro.
+# Si el modelo barato falla (excepción, backend caído o su etiqueta por defecto ante un
+# error) no hay respuesta que aceptar: se escala.
+# Una fracción AUDITORIA de los casos aceptados también se consulta al modelo caro para
+# estimar la precisión de lo que no se escala.
+#
+# Política 'switch' (default): comportamiento previo, gpt_active decide GPT u Ollama.
+
+POLITICA_SWITCH = "switch"
+POLITICA_CASCADA = "cascada"
+POLITICAS_VALIDAS = {POLITICA_SWITCH, POLITICA_CASCADA}
+
+# Política por tarea (configurable en runtime)
+POLITICAS = {
+    'valoracion': POLITICA_SWITCH,
+    'tipo': POLITICA_SWITCH,
+    'tema': POLITICA_SWITCH,
+}
+
+AUDITORIA = 0.05            # Fracción de respuestas aceptadas que igual se verifican con el modelo caro
+UMBRAL_SENAL = 0.6          # Probabilidad mínima del modelo local para contar como señal
+# Sin ninguna señal para un texto se escala (prioriza calidad). El costo: si la tarea no tiene
+# señales (valoración y tipo sin modelo local entrenado), cada llamada consulta a Ollama y a
+# GPT-4o, más caro que 'switch'; por eso la cascada solo se activa si senal_disponible(tarea).
+ESCALAR_SIN_SENAL = True
+
+_lock = threading.Lock()
+_estadisticas = {}
+
+
+def senal_disponible(tarea: str) -> bool:
+    """
+    True si la tarea tiene alguna señal de confianza: el clasificador de temas siempre está;
+    valoración y tipo dependen de un modelo local entrenado (O_Utils_Modelos).
+    """
+    if tarea == 'tema':
+        return True
+    return Modelos.cargar_modelo(tarea) is not None
+
+
+def activa(tarea: str) -> bool:
+    """
+    True si la tarea está configurada con la política de cascada y tiene señales (sin señales,
+    con ESCALAR_SIN_SENAL, se usa 'switch': la cascada consultaría siempre a los dos modelos).
+    """
+    if POLITICAS.get(tarea) != POLITICA_CASCADA:
+        return False
+    if ESCALAR_SIN_SENAL and not senal_disponible(tarea):
+        logging.debug(f"🪜 {tarea}: sin modelo local que sirva de señal, se usa la política 'switch'")
+        return False
+    return True
+
+
+def _registrar(tarea, **incrementos):
+    with _lock:
+        estadistica = _estadisticas.setdefault(tarea, {
+            "total": 0, "escaladas": 0, "sin_senal": 0,
+            "acuerdo_escaladas": 0, "auditadas": 0, "acuerdo_auditadas": 0,
+        })
+        for campo, valor in incrementos.items():
+            estadistica[campo] += valor
+
+
+def ejecutar(
+    tarea: str,
+    texto: str,
+    barato: Callable[[str], Optional[str]],
+    caro: Callable[[str], Optional[str]],
+    senales: Iterable[Callable[[str], Optional[str]]] = (),
+    validas: Optional[List[str]] = None,
+) -> Optional[str]:
+    """
+    Resuelve una tarea con la cascada barato → caro.
+
+    Args:
+        tarea (str): Nombre de la tarea (para estadísticas)
+        texto (str): Texto de la noticia
+        barato (callable): Modelo barato (Ollama); si falla se escala
+        caro (callable): Modelo caro (gpt-4o); si devuelve None se conserva la respuesta barata
+        senales (iterable): Funciones que devuelven una etiqueta estimada o None si no opinan
+        validas (list, optional): Respuestas válidas; una respuesta fuera de la lista se escala
+
+    Returns:
+        str: Respuesta final
+    """
+    # El origen de la respuesta barata (LLM o fallback) solo cuenta si es la que se devuelve
+    caido = None
+    with Modelos.medir_fuente() as fuente_barata:
+        try:
+            respuesta = barato(texto)
+        except Breaker.CircuitoAbierto as e:
+            # Ollama caído: se escala; si el modelo caro tampoco responde, se propaga
+            caido, respuesta = e, None
+        except Exception as e:
+            logging.warning(f"⚠️ {tarea}: el modelo barato falló ({e}), se escala")
+            respuesta = None
+    # La etiqueta por defecto que devuelve Ollama ante un error no es una respuesta
+    fallo_barato = respuesta is None or fuente_barata['fuente'] == Modelos.FUENTE_FALLBACK
+    opiniones = []
+    for senal in senales:
+        try:
+            opinion = senal(texto)
+        except Exception as e:
+            logging.warning(f"⚠️ Señal de confianza de '{tarea}' falló: {e}")
+            opinion = None
+        if opinion is not None:
+            opiniones.append(opinion)
+
+    valida = not fallo_barato and (validas is None or respuesta in validas)
+    if not opiniones:
+        confiable = valida and not ESCALAR_SIN_SENAL
+    else:
+        confiable = valida and all(opinion == respuesta for opinion in opiniones)
+
+    if confiable:
+        _registrar(tarea, total=1)
+        if random.random() < AUDITORIA:
+            verificada = caro(texto)
+            if verificada is not None:
+                _registrar(tarea, auditadas=1, acuerdo_auditadas=int(verificada == respuesta))
+        logging.info(f"🪜 {tarea}: Ollama -> {respuesta} (aceptada, señales: {opiniones})")
+        Modelos.marcar_fuente(fuente_barata['fuente'])
+        return respuesta
+
+    escalada = caro(texto)
+    _registrar(tarea, total=1, escaladas=1, sin_senal=int(not opiniones),
+               acuerdo_escaladas=int(escalada is not None and not fallo_barato and escalada == respuesta))
+    logging.info(f"🪜 {tarea}: Ollama -> {respuesta}, señales {opiniones} -> escalada a GPT-4o -> {escalada}")
+    if escalada is None and caido is not None:
+        raise caido
+    if escalada is None:
+        Modelos.marcar_fuente(fuente_barata['fuente'])
+    return escalada if escalada is not None else respuesta
+
+
+def estadisticas() -> dict:
+    """
+    Estadísticas por tarea: tasa de escalamiento, acuerdo Ollama/GPT en lo escalado y
+    precisión estimada (por auditoría) de las respuestas de Ollama aceptadas sin escalar.
+    """
+    with _lock:
+        copia = {tarea: dict(valores) for tarea, valores in _estadisticas.items()}
+    for valores in copia.values():
+        valores["tasa_escalada"] = round(valores["escaladas"] / valores["total"], 4) if valores["total"] else None
+        valores["acuerdo_en_escaladas"] = round(valores["acuerdo_escaladas"] / valores["escaladas"], 4) if valores["escaladas"] else None
+        valores["precision_estimada_aceptadas"] = round(valores["acuerdo_auditadas"] / valores["auditadas"], 4) if valores["auditadas"] else None
+    return copia
+
+
+def reiniciar_estadisticas():
+    with _lock:
+        _estadisticas.clear()
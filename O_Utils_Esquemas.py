@@ -0,0 +1,130 @@
+import re
+import json
+import logging
+from typing import Optional, List
+
+# =============================================================================
+# ESQUEMAS DE SALIDA (structured outputs / decodificación restringida)
+# =============================================================================
+# Cada clasificador define su respuesta como un objeto JSON {"respuesta": <etiqueta>} con la
+# etiqueta restringida a un enum. El esquema se manda a OpenAI en 'response_format'
+# (json_schema estricto) y a Ollama en 'format', así el modelo solo puede generar una
+# etiqueta válida: no hace falta normalizar texto libre ni reintentar con otro modelo
+# cuando la respuesta es inesperada.
+
+CAMPO_RESPUESTA = "respuesta"
+
+ETIQUETAS_SI_NO = ["SI", "NO"]
+ETIQUETAS_VALORACION = ["NEGATIVA", "NO_NEGATIVA"]
+
+# Tokens del envoltorio JSON ({"respuesta": "..."}) más margen; el resto depende de la etiqueta más larga
+TOKENS_ENVOLTORIO = 10
+
+# Instrucción que se agrega al system prompt (OpenAI exige mencionar JSON en modo json_object)
+INSTRUCCION_JSON = f'Respondé solo en JSON con la forma {{"{CAMPO_RESPUESTA}": "<opción>"}}.'
+
+_RE_RESPUESTA_PARCIAL = re.compile(r'"' + CAMPO_RESPUESTA + r'"\s*:\s*"([^"]*)(")?')
+
+# Modelos de OpenAI sin soporte de json_schema (se usa json_object y se valida el enum localmente)
+MODELOS_SIN_JSON_SCHEMA = ("gpt-3.5",)
+
+
+def esquema_enum(etiquetas: List[str]) -> dict:
+    """
+    Esquema JSON de un objeto con un único campo 'respuesta' restringido a las etiquetas dadas.
+    """
+    return {
+        "type": "object",
+        "properties": {CAMPO_RESPUESTA: {"type": "string", "enum": list(etiquetas)}},
+        "required": [CAMPO_RESPUESTA],
+        "additionalProperties": False,
+    }
+
+
+ESQUEMA_SI_NO = esquema_enum(ETIQUETAS_SI_NO)
+ESQUEMA_VALORACION = esquema_enum(ETIQUETAS_VALORACION)
+
+
+def esquema_tema(lista_temas: List[str], tema_default: Optional[str] = None) -> dict:
+    """
+    Esquema con el enum de temas armado desde lista_temas (más tema_default si no está).
+    """
+    temas = list(dict.fromkeys([t for t in lista_temas if t] + ([tema_default] if tema_default else [])))
+    return esquema_enum(temas)
+
+
+def etiquetas(esquema: dict) -> List[str]:
+    """Etiquetas válidas de un esquema"""
+    return esquema["properties"][CAMPO_RESPUESTA]["enum"]
+
+
+def max_tokens(esquema: dict) -> int:
+    """
+    Tope de tokens de la respuesta: alcanza para la etiqueta más larga del enum dentro del JSON.
+    Se cuenta un token por byte de la etiqueta escapada en JSON (cota que ningún tokenizador
+    supera, incluso con tildes o nombres raros): un tope corto trunca el JSON y la respuesta se pierde.
+    """
+    mas_larga = max((len(json.dumps(e)) for e in etiquetas(esquema)), default=0)
+    return TOKENS_ENVOLTORIO + mas_larga
+
+
+def instruccion_opciones(opciones: List[str]) -> str:
+    """Forma de la respuesta para los prompts: 'un JSON {"respuesta": "SI"} o {"respuesta": "NO"}'"""
+    return "un JSON " + " o ".join(json.dumps({CAMPO_RESPUESTA: o}, ensure_ascii=False) for o in opciones)
+
+
+def response_format_openai(nombre: str, esquema: dict, modelo: Optional[str] = None) -> dict:
+    """
+    Parámetro 'response_format' de la API de OpenAI para el esquema.
+
+    Args:
+        nombre (str): Nombre del esquema (ej: 'valoracion', 'tema')
+        esquema (dict): Esquema JSON
+        modelo (str, optional): Modelo destino; los que no soportan json_schema usan json_object
+    """
+    if modelo and modelo.startswith(MODELOS_SIN_JSON_SCHEMA):
+        return {"type": "json_object"}
+    return {
+        "type": "json_schema",
+        "json_schema": {"name": nombre, "strict": True, "schema": esquema},
+    }
+
+
+def leer_respuesta(contenido, esquema: dict) -> Optional[str]:
+    """
+    Extrae la etiqueta de una respuesta JSON y la valida contra el enum del esquema.
+
+    Args:
+        contenido (str or dict): Texto JSON devuelto por el modelo (o el objeto ya parseado)
+        esquema (dict): Esquema usado en el request
+
+    Returns:
+        str: Etiqueta válida, o None si la respuesta no respeta el esquema
+    """
+    try:
+        objeto = json.loads(contenido) if isinstance(contenido, str) else contenido
+        valor = objeto.get(CAMPO_RESPUESTA) if isinstance(objeto, dict) else None
+    except (ValueError, TypeError):
+        valor = None
+    if valor in etiquetas(esquema):
+        return valor
+    logging.warning(f"⚠️ Respuesta fuera del esquema: {str(contenido)[:120]}")
+    return None
+
+
+def decidir_parcial(texto_parcial: str, esquema: dict) -> Optional[str]:
+    """
+    Decide la etiqueta con una respuesta JSON todavía incompleta (lectura en streaming).
+    Devuelve la etiqueta apenas el prefijo generado es compatible con una sola opción del enum
+    (ej: '{"respuesta": "S' → 'SI'), o None si todavía es ambiguo.
+    """
+    m = _RE_RESPUESTA_PARCIAL.search(texto_parcial)
+    if not m:
+        return None
+    prefijo, cerrado = m.group(1), m.group(2)
+    if cerrado:
+        return prefijo if prefijo in etiquetas(esquema) else None
+    if not prefijo:
+        return None
+    candidatas = [e for e in etiquetas(esquema) if e.startswith(prefijo)]
+    return candidatas[0] if len(candidatas) == 1 else None
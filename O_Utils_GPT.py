@@ -1,13 +1,18 @@
 import requests
 import logging
 import os
-import time
 from typing import Optional, Dict, List
-import pandas as pd
 from dotenv import load_dotenv
 
-# Importar la función de Ollama para fallback
-from O_Utils_Ollama import valorar_noticia_con_ollama
+import O_Utils_Temas as Temas
+import O_Utils_Modelos as Modelos
+import O_Utils_Cascada as Cascada
+import O_Utils_Esquemas as Esq
+import Z_Utils_Deadline as Plazos
+import Z_Utils_Breaker as Breaker
+import Z_Utils_Http as Http
+import Z_Utils_Menciones as Menciones
+import Z_Utils_Pasajes as Pasajes
 
 # Cargar variables de entorno desde .env
 load_dotenv()
@@ -16,6 +21,13 @@ load_dotenv()
 GPT_API_URL = "https://api.openai.com/v1/chat/completions"
 GPT_MODEL = "gpt-3.5-turbo" # Modelo por defecto, en funciones especiales cambia a 4o 
 
+# Versión de los prompts de este módulo: incrementarla al modificar cualquier prompt
+# (invalida los artículos ya clasificados en el store persistente)
+VERSION_PROMPTS = "gpt-2025.4"
+
+# Margen mínimo del clasificador local de temas para no consultar al LLM (None = siempre LLM)
+MARGEN_TEMA_LOCAL = Temas.MARGEN_MINIMO
+
 def switch_4o(gpt_active: bool) -> str:
     """
     Función auxiliar para decidir qué modelo GPT usar internamente.
@@ -38,20 +50,34 @@ def _gpt_request_with_retry(headers: Dict, data: Dict, max_retries: int = 3, tim
     Returns:
         requests.Response: Response exitosa o None si falló definitivamente
     """
+    breaker = Breaker.get('openai')
     for intento in range(max_retries):
+        # Respetar el plazo del request: sin tiempo no se inicia otro intento
+        if Plazos.vencido():
+            logging.warning(f"⏱️ Plazo vencido, se cancela el request a GPT (intento {intento + 1})")
+            return None
+        # Con OpenAI marcado como caído se falla al instante (el llamador pasa a su fallback)
+        if not breaker.permitir():
+            logging.warning(f"🔌 OpenAI no disponible (breaker abierto), se omite el request (intento {intento + 1})")
+            return None
         try:
-            response = requests.post(GPT_API_URL, headers=headers, json=data, timeout=timeout)
+            response = Http.sesion('openai').post(GPT_API_URL, headers=headers, json=data, timeout=Plazos.timeout(timeout))
+            
+            # RETRY: Solo para códigos específicos que indican problemas temporales
+            if response.status_code in [429, 500, 502, 503, 504]:
+                breaker.registrar_falla(f"HTTP {response.status_code}")
+            else:
+                breaker.registrar_exito()
             
             # Si la request fue exitosa, devolver la respuesta
             if response.status_code == 200:
                 return response
             
-            # RETRY: Solo para códigos específicos que indican problemas temporales
             if response.status_code in [429, 500, 502, 503, 504]:
                 if intento < max_retries - 1:
                     delay = (2 ** intento) * 2  # 2s, 4s, 8s
                     logging.warning(f"GPT error {response.status_code}, reintento {intento + 1} en {delay}s...")
-                    time.sleep(delay)
+                    Plazos.dormir(delay)
                     continue
                 else:
                     logging.error(f"GPT error {response.status_code} después de {max_retries} intentos")
@@ -62,11 +88,12 @@ def _gpt_request_with_retry(headers: Dict, data: Dict, max_retries: int = 3, tim
             return None
             
         except (requests.Timeout, requests.ConnectionError) as e:
+            breaker.registrar_falla(type(e).__name__)
             # RETRY: Solo para errores de red/conexión
             if intento < max_retries - 1:
                 delay = (2 ** intento) * 2
                 logging.warning(f"GPT timeout/conexión, reintento {intento + 1} en {delay}s... Error: {e}")
-                time.sleep(delay)
+                Plazos.dormir(delay)
                 continue
             else:
                 logging.error(f"GPT timeout/conexión después de {max_retries} intentos: {e}")
@@ -98,31 +125,26 @@ def leer_api_key_desde_env() -> Optional[str]:
 # VALORACIÓN  (GPT con fallback a Ollama)
 # =============================================================================
 
-def valorar_noticia_con_gpt(texto: str, api_key: Optional[str] = None) -> Optional[str]:
+def armar_request_valoracion(texto: str, modelo: Optional[str] = None, actores: Optional[List[str]] = None) -> Dict:
     """
-    Valora una noticia usando la API de GPT.
-    
-    Args:
-        texto (str): Texto de la noticia a valorar
-        api_key (str, optional): API key de OpenAI. Si no se proporciona, busca en variables de entorno.
-    
-    Returns:
-        str: "NEGATIVO", "NO_NEGATIVO", "OTRO" o None si falla
+    Body del request de chat completions para valorar una noticia (NEGATIVA / NO_NEGATIVA).
+    Con actores, si la nota es larga se envía el comienzo más los pasajes que los mencionan (Z_Utils_Pasajes).
     """
-    # Obtener API key
-    if not api_key:
-        api_key = leer_api_key_desde_env()
-    
-    if not api_key:
-        logging.warning("No se encontró API key de OpenAI en .env. Usando fallback a Ollama.")
-        return None
-    
+    comienzo, destacados = Pasajes.para_valoracion(texto, actores)
+    if destacados:
+        texto_prompt = (
+            f"{comienzo}\n\n"
+            f"    PASAJES QUE MENCIONAN AL MINISTRO O AL MINISTERIO (su tono es el que más pesa):\n{destacados}"
+        )
+    else:
+        texto_prompt = comienzo
+
     # Prompt para GPT
     prompt = f"""
     TAREA: Clasificar la siguiente noticia como NEGATIVA o NO NEGATIVA.
 
     TEXTO DE LA NOTICIA:
-    {texto}
+    {texto_prompt}
 
     INSTRUCCIONES:
     1. Analiza el contenido de la noticia
@@ -137,36 +159,57 @@ def valorar_noticia_con_gpt(texto: str, api_key: Optional[str] = None) -> Option
     Responde ÚNICAMENTE con: NEGATIVA o NO_NEGATIVA
     """
     
-    # Preparar request para GPT
-    headers = {
-        "Authorization": f"Bearer {api_key}",
-        "Content-Type": "application/json"
-    }
-    
+    modelo = modelo or GPT_MODEL
     data = {
-        "model": GPT_MODEL,
+        "model": modelo,
         "messages": [
-            {"role": "system", "content": "Eres un clasificador de noticias especializado en identificar contenido negativo."},
+            {"role": "system", "content": "Eres un clasificador de noticias especializado en identificar contenido negativo. " + Esq.INSTRUCCION_JSON},
             {"role": "user", "content": prompt}
         ],
         "temperature": 0.0,  # Baja temperatura para respuestas más consistentes
-        "max_tokens": 10
+        "max_tokens": Esq.max_tokens(Esq.ESQUEMA_VALORACION),
+        "response_format": Esq.response_format_openai("valoracion", Esq.ESQUEMA_VALORACION, modelo),
+    }
+    return data
+
+
+def valorar_noticia_con_gpt(texto: str, api_key: Optional[str] = None, modelo: Optional[str] = None, actores: Optional[List[str]] = None) -> Optional[str]:
+    """
+    Valora una noticia usando la API de GPT.
+    
+    Args:
+        texto (str): Texto de la noticia a valorar
+        api_key (str, optional): API key de OpenAI. Si no se proporciona, busca en variables de entorno.
+        modelo (str, optional): Modelo GPT a usar (default GPT_MODEL; la cascada usa gpt-4o)
+        actores (list, optional): Ministros y ministerios cuyos pasajes se priorizan en el prompt
+    
+    Returns:
+        str: "NEGATIVO", "NO_NEGATIVO", "OTRO" o None si falla
+    """
+    # Obtener API key
+    if not api_key:
+        api_key = leer_api_key_desde_env()
+    
+    if not api_key:
+        logging.warning("No se encontró API key de OpenAI en .env. Usando fallback a Ollama.")
+        return None
+    
+    # Preparar request para GPT
+    headers = {
+        "Authorization": f"Bearer {api_key}",
+        "Content-Type": "application/json"
     }
     
+    data = armar_request_valoracion(texto, modelo, actores)
+    
     response = _gpt_request_with_retry(headers, data)
     
     if response:
         result = response.json()
-        content = result['choices'][0]['message']['content'].strip().upper()
+        content = result['choices'][0]['message']['content']
         
-        # Normalizar respuesta
-        if content in ['NEGATIVO', 'NEGATIVA']:
-            return "NEGATIVA"
-        elif content in ['NO_NEGATIVO', 'NO NEGATIVO', 'NO_NEGATIVA', 'POSITIVO', 'POSITIVA', 'NEUTRAL']:
-            return "NO_NEGATIVA"
-        else:
-            # Si no reconoce la respuesta, asumir NO_NEGATIVA (más conservador)
-            return "NO_NEGATIVA"
+        # La respuesta está restringida al enum; si igual no lo respeta, NO_NEGATIVA (más conservador)
+        return Esq.leer_respuesta(content, Esq.ESQUEMA_VALORACION) or "NO_NEGATIVA"
     else:
         logging.warning("GPT falló al valorar noticia. Usando fallback a Ollama.")
         return None
@@ -187,13 +230,28 @@ def valorar_con_ia(texto: str, api_key: Optional[str] = None, ministro_key_words
     Returns:
         str: "POSITIVA", "NEGATIVA", "NEUTRA", o "REVISAR MANUAL"
     """
-    # Obtener valoración base (sin heurística)
-    valoracion_base = None
-    modelo_usado = None
+    actores = listar_actores(ministro_key_words, ministerios_key_words)
+
+    # Obtener valoración base (sin heurística): primero el modelo local si tiene confianza suficiente
+    valoracion_base = Modelos.predecir('valoracion', texto)
+    modelo_usado = "Local" if valoracion_base is not None else None
+    if valoracion_base is not None:
+        Modelos.marcar_fuente(Modelos.FUENTE_LOCAL)
     
-    if gpt_active:
+    if gpt_active and valoracion_base is None and Cascada.activa('valoracion'):
+        # Cascada: Ollama primero, GPT-4o solo si el modelo local discrepa o no hay señal
+        from O_Utils_Ollama import valorar_noticia_con_ollama_base
+        valoracion_base = Cascada.ejecutar(
+            'valoracion', texto,
+            barato=lambda t: valorar_noticia_con_ollama_base(t, actores),
+            caro=lambda t: valorar_noticia_con_gpt(t, api_key, modelo=switch_4o(True), actores=actores),
+            senales=[lambda t: Modelos.predecir('valoracion', t, umbral=Cascada.UMBRAL_SENAL)],
+            validas=["NEGATIVA", "NO_NEGATIVA"],
+        )
+        modelo_usado = "Cascada"
+    elif gpt_active and valoracion_base is None:
         # Intentar con GPT primero
-        valoracion_base = valorar_noticia_con_gpt(texto, api_key)
+        valoracion_base = valorar_noticia_con_gpt(texto, api_key, actores=actores)
         if valoracion_base is not None:
             modelo_usado = f"GPT-{GPT_MODEL}"  # Mostrar modelo específico
         else:
@@ -203,7 +261,7 @@ def valorar_con_ia(texto: str, api_key: Optional[str] = None, ministro_key_words
     if valoracion_base is None:
         # Usar Ollama sin heurística (la función base)
         from O_Utils_Ollama import valorar_noticia_con_ollama_base
-        valoracion_base = valorar_noticia_con_ollama_base(texto)
+        valoracion_base = valorar_noticia_con_ollama_base(texto, actores)
         modelo_usado = "Ollama"
     
     # Determinar resultado final y loggear
@@ -224,6 +282,7 @@ def valorar_con_ia(texto: str, api_key: Optional[str] = None, ministro_key_words
     else:
         # Fallback conservador
         resultado_final = "NEUTRA"
+        Modelos.marcar_fuente(Modelos.FUENTE_FALLBACK)
         logging.info(f"Valoración: {modelo_usado} → {valoracion_base} → {resultado_final} (fallback)")
     
     return resultado_final
@@ -233,6 +292,50 @@ def valorar_con_ia(texto: str, api_key: Optional[str] = None, ministro_key_words
 # CLASIFICACIÓN DE TEMAS (GPT con fallback a Ollama)
 # =============================================================================
 
+def armar_request_tema(texto: str, lista_temas: List[str], tema_default: Optional[str], modelo: str) -> Dict:
+    """
+    Body del request de chat completions para asignar un tema de lista_temas (más tema_default).
+    """
+    # El enum de temas sale de la misma lista del prompt: GPT solo puede devolver un tema válido
+    esquema = Esq.esquema_tema(lista_temas, tema_default)
+    temas_disponibles = Esq.etiquetas(esquema)
+    temas_str = "\n".join([f"- {t}" for t in temas_disponibles])
+    
+    # PROMPT REFINADO CON PRIORIDADES CLARAS
+    system_msg = (
+        "Eres un editor periodístico experto en clasificar noticias por temas. "
+        "Tu tarea es asignar el tema MÁS ADECUADO de una lista predefinida, "
+        "priorizando temas específicos sobre temas genéricos."
+    )
+    
+    user_msg = (
+        f"ANALIZA esta noticia (título + cuerpo completo) y asígnale el tema MÁS ADECUADO de la lista disponible.\n\n"
+        f"IMPORTANTE: Solo puedes elegir de esta lista, NO inventes temas:\n{temas_str}\n\n"
+        f"CRITERIOS DE EVALUACIÓN (APLICAR EN ESTE ORDEN):\n"
+        f"1. PRIORIDAD ALTA: Si el nombre EXACTO de un tema aparece en el título o cuerpo → elegir ese tema\n"
+        f"2. PRIORIDAD MEDIA: Si hay palabras clave específicas de un tema (ej: 'BAFICI', 'Juventus Lyrica', 'Abasto') → elegir ese tema\n"
+        f"3. PRIORIDAD BAJA: Solo si NO hay evidencia específica clara → elegir un tema genérico como '{tema_default}'\n\n"
+        f"REGLAS IMPORTANTES:\n"
+        f"- NUNCA ignores un tema específico que está claramente mencionado en el texto\n"
+        f"- Los temas genéricos son SOLO para noticias que realmente no encajan con temas específicos\n"
+        f"- Si hay dudas entre temas similares, elige el MÁS ESPECÍFICO\n\n"
+        f"NOTICIA A ANALIZAR:\n{texto}\n\n"
+        f"RESPUESTA: Responde ÚNICAMENTE con el nombre exacto del tema elegido (sin comillas, sin puntos, sin texto adicional)."
+    )
+    
+    data = {
+        "model": modelo,
+        "messages": [
+            {"role": "system", "content": system_msg + " " + Esq.INSTRUCCION_JSON},
+            {"role": "user", "content": user_msg}
+        ],
+        "temperature": 0.0,  # Baja temperatura para respuestas consistentes
+        "max_tokens": Esq.max_tokens(esquema),
+        "response_format": Esq.response_format_openai("tema", esquema, modelo),
+    }
+    return data
+
+
 def clasificar_tema_con_gpt(
     texto: str,
     lista_temas: List[str],
@@ -282,46 +385,16 @@ def clasificar_tema_con_gpt(
         if tema_default and tema_default not in temas_disponibles:
             temas_disponibles.append(tema_default)
         
-        temas_str = "\n".join([f"- {t}" for t in temas_disponibles])
         logging.debug(f"📋 Temas disponibles: {temas_disponibles}")
         
-        # PROMPT REFINADO CON PRIORIDADES CLARAS
-        system_msg = (
-            "Eres un editor periodístico experto en clasificar noticias por temas. "
-            "Tu tarea es asignar el tema MÁS ADECUADO de una lista predefinida, "
-            "priorizando temas específicos sobre temas genéricos."
-        )
-        
-        user_msg = (
-            f"ANALIZA esta noticia (título + cuerpo completo) y asígnale el tema MÁS ADECUADO de la lista disponible.\n\n"
-            f"IMPORTANTE: Solo puedes elegir de esta lista, NO inventes temas:\n{temas_str}\n\n"
-            f"CRITERIOS DE EVALUACIÓN (APLICAR EN ESTE ORDEN):\n"
-            f"1. PRIORIDAD ALTA: Si el nombre EXACTO de un tema aparece en el título o cuerpo → elegir ese tema\n"
-            f"2. PRIORIDAD MEDIA: Si hay palabras clave específicas de un tema (ej: 'BAFICI', 'Juventus Lyrica', 'Abasto') → elegir ese tema\n"
-            f"3. PRIORIDAD BAJA: Solo si NO hay evidencia específica clara → elegir un tema genérico como '{tema_default}'\n\n"
-            f"REGLAS IMPORTANTES:\n"
-            f"- NUNCA ignores un tema específico que está claramente mencionado en el texto\n"
-            f"- Los temas genéricos son SOLO para noticias que realmente no encajan con temas específicos\n"
-            f"- Si hay dudas entre temas similares, elige el MÁS ESPECÍFICO\n\n"
-            f"NOTICIA A ANALIZAR:\n{texto}\n\n"
-            f"RESPUESTA: Responde ÚNICAMENTE con el nombre exacto del tema elegido (sin comillas, sin puntos, sin texto adicional)."
-        )
-        
         # Preparar request para GPT
         headers = {
             "Authorization": f"Bearer {api_key}",
             "Content-Type": "application/json"
         }
         
-        data = {
-            "model": GPT_MODEL,
-            "messages": [
-                {"role": "system", "content": system_msg},
-                {"role": "user", "content": user_msg}
-            ],
-            "temperature": 0.0,  # Baja temperatura para respuestas consistentes
-            "max_tokens": 30      # Suficiente para el nombre del tema
-        }
+        data = armar_request_tema(texto, temas_disponibles, tema_default, GPT_MODEL)
+        esquema = Esq.esquema_tema(temas_disponibles)
         
         # Hacer request a GPT con retry
         response = _gpt_request_with_retry(headers, data)
@@ -329,26 +402,13 @@ def clasificar_tema_con_gpt(
         if response and response.status_code == 200:
             try:
                 result = response.json()
-                content = result["choices"][0]["message"]["content"].strip()
-                
-                # Saneo básico de la respuesta
-                content = content.strip().strip('"').strip("'").rstrip(".").strip()
-                
-                # Validar que el tema esté en la lista
-                if content in temas_disponibles:
-                    modelo_display = GPT_MODEL.replace("gpt-", "GPT-").replace("-turbo", "").replace("-4o", "-4o")
-                    logging.info(f"Tema: {modelo_display} -> {content}")
-                    return content
-                
-                # Intento de match por casefold (sin sensibilidad a mayúsculas)
-                mapeo_lower = {t.casefold(): t for t in temas_disponibles}
-                if content.casefold() in mapeo_lower:
-                    tema_correcto = mapeo_lower[content.casefold()]
-                    logging.info(f"🔄 Aplicando casefold matching: '{content}' → '{tema_correcto}'")
-                    return tema_correcto
-                
-                # Si no es válido, loggear y usar fallback
-                logging.warning(f"⚠️ {GPT_MODEL} devolvió tema inválido: '{content}'. Usando fallback...")
+                tema = Esq.leer_respuesta(result["choices"][0]["message"]["content"], esquema)
+                modelo_display = GPT_MODEL.replace("gpt-", "GPT-").replace("-turbo", "")
+                if tema is None:
+                    logging.info(f"Tema: {modelo_display} -> respuesta fuera del esquema, se asigna {tema_default}")
+                    return tema_default
+                logging.info(f"Tema: {modelo_display} -> {tema}")
+                return tema
                 
             except Exception as e:
                 logging.error(f"❌ Error procesando respuesta de {GPT_MODEL}: {e}")
@@ -386,16 +446,39 @@ def clasificar_tema_con_ia(
     tipo_publicacion: Optional[str] = None,
     gpt_active: bool = True,
     tema_default: str = None,
+    margen_local: Optional[float] = MARGEN_TEMA_LOCAL,
 ) -> str:
     """
     Interfaz unificada para clasificación de temas:
+    - Primero el clasificador local (O_Utils_Temas); si su margen de confianza alcanza, no se llama al LLM
     - Si gpt_active y hay API key → intenta GPT (clasificar_tema_con_gpt)
     - Si falla o está desactivado → fallback a Ollama (clasificar_tema_ollama)
+    margen_local=None desactiva el clasificador local.
     """
     try:
         if not texto or not lista_temas:
             return tema_default
 
+        if margen_local is not None and tipo_publicacion != "Agenda":
+            tema_local = Temas.clasificar_tema_local(texto, lista_temas, tema_default, margen_local)
+            if tema_local:
+                Modelos.marcar_fuente(Modelos.FUENTE_LOCAL)
+                return tema_local
+
+        if gpt_active and tipo_publicacion != "Agenda" and Cascada.activa('tema'):
+            from O_Utils_Ollama import clasificar_tema_ollama
+            temas_validos = list(lista_temas) + ([tema_default] if tema_default else [])
+            resultado = Cascada.ejecutar(
+                'tema', texto,
+                barato=lambda t: clasificar_tema_ollama(t, lista_temas, tema_default, tipo_publicacion),
+                caro=lambda t: clasificar_tema_con_gpt(t, lista_temas, tipo_publicacion, True, tema_default),
+                senales=[lambda t: Temas.tema_mas_probable(t, lista_temas, tema_default)],
+                validas=temas_validos,
+            )
+            if not resultado:
+                Modelos.marcar_fuente(Modelos.FUENTE_FALLBACK)
+            return resultado or tema_default
+
         if gpt_active:
             resultado = clasificar_tema_con_gpt(
                 texto=texto,
@@ -415,8 +498,11 @@ def clasificar_tema_con_ia(
             tema_default=tema_default,
             tipo_publicacion=tipo_publicacion,
         )
+    except Breaker.CircuitoAbierto:
+        raise
     except Exception as e:
         logging.error(f"❌ clasificar_tema_con_ia error: {e}")
+        Modelos.marcar_fuente(Modelos.FUENTE_FALLBACK)
         return tema_default
 
 
@@ -424,6 +510,54 @@ def clasificar_tema_con_ia(
 # TIPO DE PUBLICACION (GPT con fallback a Ollama)
 # =============================================================================
 
+def armar_request_entrevista(texto: str, modelo: str) -> Dict:
+    """
+    Body del request de chat completions para detectar si la noticia es una ENTREVISTA.
+    """
+    # Prompt refinado y simplificado para entrevistas
+    prompt = f"""
+    Eres un experto en clasificar noticias periodísticas. Tu tarea es determinar si un texto es una ENTREVISTA o NO.
+
+    TEXTO DE LA NOTICIA:
+    {texto}
+
+    CRITERIOS PARA ENTREVISTA:
+    ✅ Formato pregunta-respuesta con guiones (–) seguidos de preguntas o respuestas extensas
+    ✅ Intercambio directo entre periodista y entrevistado
+    ✅ Preguntas del periodista seguidas de respuestas del entrevistado
+    ✅ Patrón repetitivo de guión + contenido conversacional
+
+    NO ES ENTREVISTA:
+    ❌ Solo citas entre comillas sin formato pregunta-respuesta
+    ❌ Solo declaraciones en primera persona sin intercambio
+    ❌ Solo texto narrativo sin estructura conversacional
+    ❌ Resúmenes periodísticos de lo que dijo alguien (aunque tengan "en diálogo con...")
+    ❌ Fragmentos de declaraciones recopiladas sin intercambio directo
+    ❌ Citas con contexto como "Consultado por..." pero sin guiones conversacionales
+    ❌ Notas que compilan respuestas a diferentes preguntas sin formato pregunta-respuesta
+
+    IMPORTANTE: 
+    - Analiza TODO el texto completo, no solo el inicio
+    - Las entrevistas reales tienen formato pregunta-respuesta con guiones (–)
+    - Solo citas extensas NO son suficientes para ser entrevista
+    - Debe haber intercambio conversacional real, no solo declaraciones
+
+    RESPONDE SOLO: "SI" si es entrevista, "NO" si no lo es.
+    """
+    
+    data = {
+        "model": modelo,
+        "messages": [
+            {"role": "system", "content": "Eres un clasificador especializado en identificar entrevistas periodísticas. " + Esq.INSTRUCCION_JSON},
+            {"role": "user", "content": prompt}
+        ],
+        "temperature": 0,  # Baja temperatura para respuestas más consistentes
+        "max_tokens": Esq.max_tokens(Esq.ESQUEMA_SI_NO),
+        "response_format": Esq.response_format_openai("entrevista", Esq.ESQUEMA_SI_NO, modelo),
+    }
+    return data
+
+
 def es_entrevista_con_gpt(texto: str, gpt_active: bool = True) -> bool:
     """
     Detecta si es una ENTREVISTA usando GPT: formato pregunta-respuesta entre periodista y entrevistado.
@@ -442,37 +576,6 @@ def es_entrevista_con_gpt(texto: str, gpt_active: bool = True) -> bool:
             logging.warning("No se encontró API key de OpenAI. Usando fallback a Ollama.")
             return _fallback_a_ollama_entrevista(texto)
         
-        # Prompt refinado y simplificado para entrevistas
-        prompt = f"""
-        Eres un experto en clasificar noticias periodísticas. Tu tarea es determinar si un texto es una ENTREVISTA o NO.
-
-        TEXTO DE LA NOTICIA:
-        {texto}
-
-        CRITERIOS PARA ENTREVISTA:
-        ✅ Formato pregunta-respuesta con guiones (–) seguidos de preguntas o respuestas extensas
-        ✅ Intercambio directo entre periodista y entrevistado
-        ✅ Preguntas del periodista seguidas de respuestas del entrevistado
-        ✅ Patrón repetitivo de guión + contenido conversacional
-
-        NO ES ENTREVISTA:
-        ❌ Solo citas entre comillas sin formato pregunta-respuesta
-        ❌ Solo declaraciones en primera persona sin intercambio
-        ❌ Solo texto narrativo sin estructura conversacional
-        ❌ Resúmenes periodísticos de lo que dijo alguien (aunque tengan "en diálogo con...")
-        ❌ Fragmentos de declaraciones recopiladas sin intercambio directo
-        ❌ Citas con contexto como "Consultado por..." pero sin guiones conversacionales
-        ❌ Notas que compilan respuestas a diferentes preguntas sin formato pregunta-respuesta
-
-        IMPORTANTE: 
-        - Analiza TODO el texto completo, no solo el inicio
-        - Las entrevistas reales tienen formato pregunta-respuesta con guiones (–)
-        - Solo citas extensas NO son suficientes para ser entrevista
-        - Debe haber intercambio conversacional real, no solo declaraciones
-
-        RESPONDE SOLO: "SI" si es entrevista, "NO" si no lo es.
-        """
-        
         # Preparar request para GPT con modelo seleccionado por switch_4o
         GPT_MODEL = switch_4o(gpt_active)  # Variable local para esta función
         
@@ -481,31 +584,14 @@ def es_entrevista_con_gpt(texto: str, gpt_active: bool = True) -> bool:
             "Content-Type": "application/json"
         }
         
-        data = {
-            "model": GPT_MODEL,  # Usar la variable local
-            "messages": [
-                {"role": "system", "content": "Eres un clasificador especializado en identificar entrevistas periodísticas. Responde solo con SI o NO."},
-                {"role": "user", "content": prompt}
-            ],
-            "temperature": 0,  # Baja temperatura para respuestas más consistentes
-            "max_tokens": 10
-        }
+        data = armar_request_entrevista(texto, GPT_MODEL)
         
         response = _gpt_request_with_retry(headers, data)
         
         if response:
             result = response.json()
-            content = result['choices'][0]['message']['content'].strip().upper()
-            
-            # Normalizar respuesta
-            if content in ['SI', 'SÍ', 'YES', 'TRUE', 'VERDADERO']:
-                return True
-            elif content in ['NO', 'FALSE', 'FALSO']:
-                return False
-            else:
-                # Si GPT devolvió algo inesperado, usar fallback
-                logging.warning(f"{GPT_MODEL} devolvió respuesta inesperada: '{content}'. Usando fallback a Ollama.")
-                return _fallback_a_ollama_entrevista(texto)
+            # Respuesta restringida a SI/NO; si igual no respeta el esquema, ante la duda NO
+            return Esq.leer_respuesta(result['choices'][0]['message']['content'], Esq.ESQUEMA_SI_NO) == "SI"
                 
         else:
             logging.warning(f"{GPT_MODEL} falló al clasificar entrevista.")
@@ -544,6 +630,50 @@ def _fallback_a_ollama_entrevista(texto: str) -> bool:
         return False
 
 
+def armar_request_agenda(texto: str, modelo: str) -> Dict:
+    """
+    Body del request de chat completions para detectar si la noticia es una AGENDA.
+    """
+    # Prompt para detectar agendas basado en análisis real de ejemplos
+    prompt = f"""
+    Eres un experto en clasificar noticias periodísticas. Tu tarea es determinar si un texto es una AGENDA o NO.
+
+    TEXTO DE LA NOTICIA:
+    {texto}
+
+    ✅ CRITERIOS PARA SER AGENDA (debe cumplir TODOS):
+    1. TÍTULO INDICATIVO: Palabras como "Recomendados", "Imperdibles", "Agenda", "Programación", "AGENDATE"
+    2. ESTRUCTURA PROGRAMÁTICA: Lista organizada de actividades por día, categoría o cronológicamente
+    3. PROPÓSITO: Invitar al lector a asistir a eventos (no solo informar)
+    4. INFORMACIÓN PRÁCTICA: Entradas, precios, lugares, inscripciones, cupos
+    5. FECHAS: Específicas O relativas (HOY, MAÑANA, DOMINGO, "sábado 15 de junio")
+    6. HORARIOS: Específicos O rangos ("a las 20:30 h", "de 18 a 21")
+
+    ❌ EXCLUIR si:
+    - Estructura narrativa descriptiva (no programática)
+    - Propósito de informar sobre eventos ya realizados o convenios
+    - Títulos que describen acciones pasadas o futuras lejanas
+
+    IMPORTANTE:
+    - Los títulos como "Recomendados", "Imperdibles", "Agenda" o titulos similares que hagan referencias a una agenda de actividades son indicadores FUERTES de agenda.
+    - Todos los criterios de inclusión son obligatorios.
+    - Si no cumple absolutamente todos, la respuesta es "NO".
+    - Responde solo "SI" o "NO".
+    """
+    
+    data = {
+        "model": modelo,
+        "messages": [
+            {"role": "system", "content": "Eres un clasificador especializado en identificar agendas periodísticas. " + Esq.INSTRUCCION_JSON},
+            {"role": "user", "content": prompt}
+        ],
+        "temperature": 0,  # Baja temperatura para respuestas más consistentes
+        "max_tokens": Esq.max_tokens(Esq.ESQUEMA_SI_NO),
+        "response_format": Esq.response_format_openai("agenda", Esq.ESQUEMA_SI_NO, modelo),
+    }
+    return data
+
+
 def es_agenda_con_gpt(texto: str, gpt_active: bool = True) -> bool:
     """
     Detecta si es una AGENDA usando GPT: noticia que enumera actividades/eventos culturales.
@@ -562,33 +692,6 @@ def es_agenda_con_gpt(texto: str, gpt_active: bool = True) -> bool:
             logging.warning("No se encontró API key de OpenAI. Usando fallback a Ollama.")
             return _fallback_a_ollama_agenda(texto)
         
-        # Prompt para detectar agendas basado en análisis real de ejemplos
-        prompt = f"""
-        Eres un experto en clasificar noticias periodísticas. Tu tarea es determinar si un texto es una AGENDA o NO.
-
-        TEXTO DE LA NOTICIA:
-        {texto}
-
-        ✅ CRITERIOS PARA SER AGENDA (debe cumplir TODOS):
-        1. TÍTULO INDICATIVO: Palabras como "Recomendados", "Imperdibles", "Agenda", "Programación", "AGENDATE"
-        2. ESTRUCTURA PROGRAMÁTICA: Lista organizada de actividades por día, categoría o cronológicamente
-        3. PROPÓSITO: Invitar al lector a asistir a eventos (no solo informar)
-        4. INFORMACIÓN PRÁCTICA: Entradas, precios, lugares, inscripciones, cupos
-        5. FECHAS: Específicas O relativas (HOY, MAÑANA, DOMINGO, "sábado 15 de junio")
-        6. HORARIOS: Específicos O rangos ("a las 20:30 h", "de 18 a 21")
-
-        ❌ EXCLUIR si:
-        - Estructura narrativa descriptiva (no programática)
-        - Propósito de informar sobre eventos ya realizados o convenios
-        - Títulos que describen acciones pasadas o futuras lejanas
-
-        IMPORTANTE:
-        - Los títulos como "Recomendados", "Imperdibles", "Agenda" o titulos similares que hagan referencias a una agenda de actividades son indicadores FUERTES de agenda.
-        - Todos los criterios de inclusión son obligatorios.
-        - Si no cumple absolutamente todos, la respuesta es "NO".
-        - Responde solo "SI" o "NO".
-        """
-        
         # Preparar request para GPT con modelo seleccionado por switch_4o
         GPT_MODEL = switch_4o(gpt_active)  # Variable local para esta función
         
@@ -597,31 +700,14 @@ def es_agenda_con_gpt(texto: str, gpt_active: bool = True) -> bool:
             "Content-Type": "application/json"
         }
         
-        data = {
-            "model": GPT_MODEL,  # Usar la variable local
-            "messages": [
-                {"role": "system", "content": "Eres un clasificador especializado en identificar agendas periodísticas. Responde solo con SI o NO."},
-                {"role": "user", "content": prompt}
-            ],
-            "temperature": 0,  # Baja temperatura para respuestas más consistentes
-            "max_tokens": 10
-        }
+        data = armar_request_agenda(texto, GPT_MODEL)
         
         response = _gpt_request_with_retry(headers, data)
         
         if response:
             result = response.json()
-            content = result['choices'][0]['message']['content'].strip().upper()
-            
-            # Normalizar respuesta
-            if content in ['SI', 'SÍ', 'YES', 'TRUE', 'VERDADERO']:
-                return True
-            elif content in ['NO', 'FALSE', 'FALSO']:
-                return False
-            else:
-                # Si GPT devolvió algo inesperado, usar fallback
-                logging.warning(f"{GPT_MODEL} devolvió respuesta inesperada: '{content}'. Usando fallback a Ollama.")
-                return _fallback_a_ollama_agenda(texto)
+            # Respuesta restringida a SI/NO; si igual no respeta el esquema, ante la duda NO
+            return Esq.leer_respuesta(result['choices'][0]['message']['content'], Esq.ESQUEMA_SI_NO) == "SI"
                 
         else:
             logging.warning(f"GPT falló al clasificar agenda.")
@@ -660,6 +746,85 @@ def _fallback_a_ollama_agenda(texto: str) -> bool:
         return False
 
 
+def listar_actores(ministro_key_words, ministerios_key_words=None) -> List[str]:
+    """
+    Lista plana de actores (ministros + ministerios) a buscar en las declaraciones.
+    """
+    actores = Menciones.aplanar(ministro_key_words) + Menciones.aplanar(ministerios_key_words)
+    logging.debug(f"Actores (ministros + ministerios): {actores}")
+    return actores
+
+
+def armar_request_declaracion(texto: str, actores: List[str], modelo: str) -> Dict:
+    """
+    Body del request de chat completions para detectar una DECLARACIÓN atribuida a los actores.
+    Incluye los fragmentos donde el motor de menciones encontró a cada actor (memoizados por request)
+    y, si la nota es larga, solo los pasajes con comillas o menciones (Z_Utils_Pasajes).
+    """
+    actores_str = ", ".join(actores)
+    menciones_str = Menciones.resumen_para_prompt(texto, actores) or "(ninguna mención directa; pueden estar referidos de forma indirecta)"
+    pasajes = Pasajes.para_declaracion(texto, actores)
+
+    # Prompt para detectar declaraciones
+    prompt = f"""
+    Eres un experto en clasificar noticias periodísticas. Tu tarea es determinar si un texto contiene AL MENOS UNA DECLARACIÓN (cita textual) atribuida a alguno de estos actores.
+
+    ACTORES A BUSCAR: {actores_str}
+
+    MENCIONES DE LOS ACTORES EN EL TEXTO:
+    {menciones_str}
+
+    TEXTO DE LA NOTICIA{" (pasajes con comillas o menciones; [...] marca lo omitido)" if pasajes is not texto else ""}:
+    {pasajes}
+
+    CRITERIOS FLEXIBLES PARA CONSIDERARLO DECLARACIÓN:
+    ✅ DEBE tener AL MENOS UNA CITA entre comillas ("..." o '...') atribuida a alguno de los actores
+    ✅ El actor puede ser referenciado de forma directa o indirecta (fuentes, cartera, ministerio, etc.)
+    ✅ Debe contener verbos de comunicación/acción (dijo, anunció, informó, explicaron, señaló, etc.)
+    ✅ Una noticia puede contener MÚLTIPLES declaraciones de diferentes actores
+    ✅ Las citas pueden ser extensas y detalladas
+    ✅ Solo importa que esté entre comillas y atribuida a un actor
+
+    EJEMPLOS CLAROS DE DECLARACIÓN:
+    - 'Estamos trabajando en el proyecto', dijo Gabriela Ricardes
+    - El Ministerio de Cultura anunció: 'Vamos a implementar nuevas políticas'
+    - La ministra expresó: 'Es fundamental apoyar la cultura'
+    - Desde la cartera cultural se informó que 'se realizarán inversiones'
+    - La funcionaria manifestó: 'Es importante preservar el patrimonio'
+    - 'Según explicaron fuentes del ministerio: 'la plataforma ya la creamos...''
+    - 'La ministra señaló: 'Es una muestra concreta de cómo...''
+    - 'Fuentes del área informaron que 'la aplicación funcionará como...''
+
+    EJEMPLOS CLAROS DE NO DECLARACIÓN:
+    - La ministra presentó el programa (sin cita textual)
+    - Se inauguró el teatro (sin cita ni actor)
+    - El programa incluye actividades culturales (sin cita)
+    - Se realizó una conferencia (sin cita ni actor)
+    - La funcionaria asistió al evento (sin cita)
+    - Se anunció la nueva política (sin cita textual)
+
+    IMPORTANTE: 
+    - Si hay AL MENOS UNA cita textual atribuida a un actor, es DECLARACIÓN
+    - Analiza TODO el texto recibido, no solo el inicio
+    - Las declaraciones tienen citas textuales entre comillas
+    - Debe haber atribución clara a alguno de los actores listados
+
+    RESPONDE SOLO: "SI" si es declaración, "NO" si no lo es.
+    """
+    
+    data = {
+        "model": modelo,
+        "messages": [
+            {"role": "system", "content": "Eres un clasificador especializado en identificar declaraciones periodísticas. " + Esq.INSTRUCCION_JSON},
+            {"role": "user", "content": prompt}
+        ],
+        "temperature": 0,  # Baja temperatura para respuestas más consistentes
+        "max_tokens": Esq.max_tokens(Esq.ESQUEMA_SI_NO),
+        "response_format": Esq.response_format_openai("declaracion", Esq.ESQUEMA_SI_NO, modelo),
+    }
+    return data
+
+
 def es_declaracion_con_gpt(texto: str, ministro_key_words, ministerios_key_words=None, gpt_active: bool = True) -> bool:
     """
     Detecta si es una DECLARACIÓN usando GPT: nota con cita textual atribuida al ministro o ministerio.
@@ -681,37 +846,7 @@ def es_declaracion_con_gpt(texto: str, ministro_key_words, ministerios_key_words
             return _fallback_a_ollama_declaracion(texto, ministro_key_words, ministerios_key_words)
         
         # Construir lista combinada de actores (ministros + ministerios)
-        actores = []
-        
-        # Agregar ministros
-        if ministro_key_words:
-            if isinstance(ministro_key_words, list):
-                # Aplanar listas anidadas y filtrar elementos None
-                for item in ministro_key_words:
-                    if isinstance(item, list):
-                        actores.extend([m for m in item if m])
-                    else:
-                        if item:
-                            actores.append(item)
-                logging.debug(f"Ministros agregados: {actores}")
-            else:
-                actores.append(ministro_key_words)
-                logging.debug(f"Ministro agregado: {ministro_key_words}")
-        
-        # Agregar ministerios si existen
-        if ministerios_key_words:
-            if isinstance(ministerios_key_words, list):
-                # Aplanar listas anidadas y filtrar elementos None
-                for item in ministerios_key_words:
-                    if isinstance(item, list):
-                        actores.extend([m for m in item if m])
-                    else:
-                        if item:
-                            actores.append(item)
-                logging.debug(f"Ministerios agregados: {actores}")
-            else:
-                actores.append(ministerios_key_words)
-                logging.debug(f"Ministerio agregado: {ministerios_key_words}")
+        actores = listar_actores(ministro_key_words, ministerios_key_words)
         
         # Verificar que tengamos actores válidos
         if not actores:
@@ -720,53 +855,6 @@ def es_declaracion_con_gpt(texto: str, ministro_key_words, ministerios_key_words
         
         logging.debug(f"Array final de actores: {actores}")
         
-        # Convertir a string legible
-        actores_str = ", ".join(actores)
-        
-        # Prompt para detectar declaraciones
-        prompt = f"""
-        Eres un experto en clasificar noticias periodísticas. Tu tarea es determinar si un texto contiene AL MENOS UNA DECLARACIÓN (cita textual) atribuida a alguno de estos actores.
-
-        ACTORES A BUSCAR: {actores_str}
-
-        TEXTO DE LA NOTICIA:
-        {texto}
-
-        CRITERIOS FLEXIBLES PARA CONSIDERARLO DECLARACIÓN:
-        ✅ DEBE tener AL MENOS UNA CITA entre comillas ("..." o '...') atribuida a alguno de los actores
-        ✅ El actor puede ser referenciado de forma directa o indirecta (fuentes, cartera, ministerio, etc.)
-        ✅ Debe contener verbos de comunicación/acción (dijo, anunció, informó, explicaron, señaló, etc.)
-        ✅ Una noticia puede contener MÚLTIPLES declaraciones de diferentes actores
-        ✅ Las citas pueden ser extensas y detalladas
-        ✅ Solo importa que esté entre comillas y atribuida a un actor
-
-        EJEMPLOS CLAROS DE DECLARACIÓN:
-        - 'Estamos trabajando en el proyecto', dijo Gabriela Ricardes
-        - El Ministerio de Cultura anunció: 'Vamos a implementar nuevas políticas'
-        - La ministra expresó: 'Es fundamental apoyar la cultura'
-        - Desde la cartera cultural se informó que 'se realizarán inversiones'
-        - La funcionaria manifestó: 'Es importante preservar el patrimonio'
-        - 'Según explicaron fuentes del ministerio: 'la plataforma ya la creamos...''
-        - 'La ministra señaló: 'Es una muestra concreta de cómo...''
-        - 'Fuentes del área informaron que 'la aplicación funcionará como...''
-
-        EJEMPLOS CLAROS DE NO DECLARACIÓN:
-        - La ministra presentó el programa (sin cita textual)
-        - Se inauguró el teatro (sin cita ni actor)
-        - El programa incluye actividades culturales (sin cita)
-        - Se realizó una conferencia (sin cita ni actor)
-        - La funcionaria asistió al evento (sin cita)
-        - Se anunció la nueva política (sin cita textual)
-
-        IMPORTANTE: 
-        - Si hay AL MENOS UNA cita textual atribuida a un actor, es DECLARACIÓN
-        - Analiza TODO el texto completo, no solo el inicio
-        - Las declaraciones tienen citas textuales entre comillas
-        - Debe haber atribución clara a alguno de los actores listados
-
-        RESPONDE SOLO: "SI" si es declaración, "NO" si no lo es.
-        """
-        
         # Preparar request para GPT con modelo seleccionado por switch_4o
         GPT_MODEL = switch_4o(gpt_active)  # Variable local para esta función
         
@@ -775,31 +863,14 @@ def es_declaracion_con_gpt(texto: str, ministro_key_words, ministerios_key_words
             "Content-Type": "application/json"
         }
         
-        data = {
-            "model": GPT_MODEL,  # Usar la variable local
-            "messages": [
-                {"role": "system", "content": "Eres un clasificador especializado en identificar declaraciones periodísticas. Responde solo con SI o NO."},
-                {"role": "user", "content": prompt}
-            ],
-            "temperature": 0,  # Baja temperatura para respuestas más consistentes
-            "max_tokens": 10
-        }
+        data = armar_request_declaracion(texto, actores, GPT_MODEL)
         
         response = _gpt_request_with_retry(headers, data)
         
         if response:
             result = response.json()
-            content = result['choices'][0]['message']['content'].strip().upper()
-            
-            # Normalizar respuesta
-            if content in ['SI', 'SÍ', 'YES', 'TRUE', 'VERDADERO']:
-                return True
-            elif content in ['NO', 'FALSE', 'FALSO']:
-                return False
-            else:
-                # Si GPT devolvió algo inesperado, usar fallback
-                logging.warning(f"{GPT_MODEL} devolvió respuesta inesperada: '{content}'. Usando fallback a Ollama.")
-                return _fallback_a_ollama_declaracion(texto, ministro_key_words, ministerios_key_words)
+            # Respuesta restringida a SI/NO; si igual no respeta el esquema, ante la duda NO
+            return Esq.leer_respuesta(result['choices'][0]['message']['content'], Esq.ESQUEMA_SI_NO) == "SI"
                 
         else:
             logging.warning(f"{GPT_MODEL} falló al clasificar declaración.")
@@ -866,24 +937,24 @@ def clasificar_tipo_publicacion_con_gpt(texto: str, ministro_key_words: str, min
         # 1. DECLARACIÓN (primera prioridad - más específica, evita falsos positivos)
         if es_declaracion_con_gpt(texto, ministro_key_words, ministerios_key_words, gpt_active=True):
             logging.info(f"Tipo Publicación: {modelo_display} -> Declaración")
-            time.sleep(1.5)  # Delay para evitar rate limiting
+            Plazos.dormir(1.5)  # Delay para evitar rate limiting
             return "Declaración"
         
         # 2. AGENDA (segunda prioridad - más frecuente, regla clara)
         if es_agenda_con_gpt(texto, gpt_active=True):
             logging.info(f"Tipo Publicación: {modelo_display} -> NO_Declaración -> Agenda")
-            time.sleep(1.5)  # Delay para evitar rate limiting
+            Plazos.dormir(1.5)  # Delay para evitar rate limiting
             return "Agenda"
         
         # 3. ENTREVISTA (tercera prioridad - formato distintivo)
         if es_entrevista_con_gpt(texto, gpt_active=True):
             logging.info(f"Tipo Publicación: {modelo_display} -> NO_Declaración -> NO_Agenda -> Entrevista")
-            time.sleep(1.5)  # Delay para evitar rate limiting
+            Plazos.dormir(1.5)  # Delay para evitar rate limiting
             return "Entrevista"
         
         # 4. NOTA (por defecto - lo que no cabe claramente en otras categorías)
         logging.info(f"Tipo Publicación: {modelo_display} -> NO_Declaración -> NO_Agenda -> NO_Entrevista -> Nota")
-        time.sleep(1.5)  # Delay para evitar rate limiting
+        Plazos.dormir(1.5)  # Delay para evitar rate limiting
         return "Nota"
         
     except Exception as e:
@@ -909,6 +980,21 @@ def clasificar_tipo_publicacion_con_ia(texto: str, ministro_key_words: str, mini
         # Importar aquí para evitar dependencias circulares
         from O_Utils_Ollama import clasificar_tipo_publicacion_unificado
         
+        # Modelo local entrenado (solo si su confianza supera el umbral de la tarea)
+        resultado_local = Modelos.predecir('tipo', texto)
+        if resultado_local is not None:
+            Modelos.marcar_fuente(Modelos.FUENTE_LOCAL)
+            return resultado_local
+        
+        if gpt_active and Cascada.activa('tipo'):
+            return Cascada.ejecutar(
+                'tipo', texto,
+                barato=lambda t: clasificar_tipo_publicacion_unificado(t, ministro_key_words, ministerios_key_words),
+                caro=lambda t: clasificar_tipo_publicacion_con_gpt(t, ministro_key_words, ministerios_key_words, True),
+                senales=[lambda t: Modelos.predecir('tipo', t, umbral=Cascada.UMBRAL_SENAL)],
+                validas=["Nota", "Declaración", "Entrevista", "Agenda"],
+            )
+        
         if gpt_active:
             resultado_gpt = clasificar_tipo_publicacion_con_gpt(texto, ministro_key_words, ministerios_key_words, gpt_active)
             
@@ -924,9 +1010,12 @@ def clasificar_tipo_publicacion_con_ia(texto: str, ministro_key_words: str, mini
         logging.info(f"Tipo Publicación: Ollama -> {resultado_ollama}")
         return resultado_ollama
         
+    except Breaker.CircuitoAbierto:
+        raise
     except Exception as e:
         logging.error(f"Error en clasificar_tipo_publicacion_con_ia: {e}")
         # Fallback seguro
+        Modelos.marcar_fuente(Modelos.FUENTE_FALLBACK)
         return "Nota"
 
 
@@ -0,0 +1,438 @@
+from __future__ import annotations
+
+import os
+import re
+import json
+import math
+import random
+import logging
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional, List, Tuple, Callable
+
+import Z_Utils_Lazy as Lazy
+import Z_Utils_Texto as Texto
+import O_Utils_Temas as Temas
+
+np = Lazy.modulo('numpy')
+
+# =============================================================================
+# CLASIFICADORES LOCALES ENTRENABLES (tipo, valoración, factor político)
+# =============================================================================
+# Regresión logística multinomial (numpy, sin sklearn) sobre TF-IDF de palabras y
+# n-gramas de caracteres, entrenada con las etiquetas cargadas a mano en las planillas
+# y con las clasificaciones del LLM guardadas en el store de artículos.
+# El router usa el modelo local solo si su probabilidad supera el umbral de la tarea;
+# si no hay modelo entrenado o la confianza es baja, se consulta a GPT/Ollama como siempre.
+#
+# Cada registro del store guarda en '_FUENTES' el origen de cada etiqueta ('llm', 'local' o
+# 'fallback'). Solo las del LLM (y las manuales de las planillas) se usan para entrenar y
+# evaluar: las predicciones del propio modelo local y los valores por defecto ante errores
+# ("NO_NEGATIVA", "NO", "Nota"...) realimentarían al modelo con sus propios sesgos.
+
+MODELOS_DIR = "Data_Results/modelos"
+# Mismas planillas que los ejemplos de temas (rutas relativas al módulo, ver O_Utils_Temas)
+PLANILLAS_ENTRENAMIENTO = [
+    Temas.IMPORT_LINKS_PATH,
+    Temas.HISTORICO_PATH,
+]
+
+# Columnas de etiqueta aceptadas (salida del pipeline y planillas cargadas a mano) y etiquetas válidas
+TAREAS = {
+    'tipo': {
+        'columnas': ['TIPO PUBLICACION', 'TIPO DE PUBLICACION'],
+        'etiquetas': ['Nota', 'Declaración', 'Entrevista', 'Agenda'],
+    },
+    'valoracion': {
+        # El modelo predice la valoración base (igual que el LLM); la heurística de key words se aplica después
+        'columnas': ['VALORACION', 'VALORACIÓN'],
+        'etiquetas': ['NEGATIVA', 'NO_NEGATIVA'],
+        'mapeo': {'NEGATIVO': 'NEGATIVA', 'NO_NEGATIVO': 'NO_NEGATIVA', 'POSITIVA': 'NO_NEGATIVA', 'NEUTRA': 'NO_NEGATIVA'},
+    },
+    'factor_politico': {
+        'columnas': ['FACTOR POLITICO', 'Factor POLÍTICO'],
+        'etiquetas': ['SI', 'NO'],
+        'mapeo': {'SÍ': 'SI'},
+    },
+}
+
+# Probabilidad mínima para usar la predicción local (configurable por tarea en runtime)
+UMBRALES = {
+    'tipo': 0.90,
+    'valoracion': 0.85,
+    'factor_politico': 0.90,
+}
+
+MAX_FEATURES = 50000
+ITERACIONES = 300
+TASA_APRENDIZAJE = 2.0
+REGULARIZACION_L2 = 1e-4
+
+_RE_PALABRA = re.compile(r"[a-z0-9]+")
+
+# Origen de una etiqueta
+FUENTE_LLM = 'llm'
+FUENTE_LOCAL = 'local'
+FUENTE_FALLBACK = 'fallback'
+
+_lock = threading.Lock()
+_modelos_cargados = {}
+_fuente_actual = ContextVar('fuente_etiqueta', default=None)
+
+
+@contextmanager
+def medir_fuente():
+    """
+    Mide el origen de la etiqueta calculada dentro del bloque: {'fuente': 'llm'} salvo que
+    se marque 'local' (predicción del modelo local) o 'fallback' (valor por defecto ante un error).
+    """
+    medicion = {'fuente': FUENTE_LLM}
+    token = _fuente_actual.set(medicion)
+    try:
+        yield medicion
+    finally:
+        _fuente_actual.reset(token)
+
+
+def marcar_fuente(fuente: str):
+    """Registra el origen de la etiqueta en la medición activa (un fallback no se pisa)"""
+    medicion = _fuente_actual.get()
+    if medicion is not None and medicion['fuente'] != FUENTE_FALLBACK:
+        medicion['fuente'] = fuente
+
+
+def _features(texto: str) -> Counter:
+    """
+    Palabras sin tildes más n-gramas de 4 caracteres de cada palabra (con bordes '<' '>').
+    """
+    cuenta = Counter()
+    for palabra in _RE_PALABRA.findall(Texto.normalizar(str(texto))):
+        cuenta[f"w:{palabra}"] += 1
+        borde = f"<{palabra}>"
+        for i in range(max(1, len(borde) - 3)):
+            cuenta[f"c:{borde[i:i + 4]}"] += 1
+    return cuenta
+
+
+def _vectorizar(textos: List[str], vocabulario: dict, idf: np.ndarray):
+    """
+    TF-IDF disperso (filas L2-normalizadas) como (filas, columnas, valores) de los no-ceros.
+    """
+    filas, columnas, valores = [], [], []
+    for fila, texto in enumerate(textos):
+        pares = [(vocabulario[f], (1 + math.log(c)) * idf[vocabulario[f]]) for f, c in _features(texto).items() if f in vocabulario]
+        if not pares:
+            continue
+        norma = math.sqrt(sum(v * v for _, v in pares))
+        for columna, valor in pares:
+            filas.append(fila)
+            columnas.append(columna)
+            valores.append(valor / norma)
+    return np.array(filas, dtype=np.int64), np.array(columnas, dtype=np.int64), np.array(valores)
+
+
+def _puntajes(X, n_filas, W, b):
+    filas, columnas, valores = X
+    puntajes = np.tile(b, (n_filas, 1))
+    for c in range(W.shape[1]):
+        puntajes[:, c] += np.bincount(filas, weights=valores * W[columnas, c], minlength=n_filas)
+    return puntajes
+
+
+def _softmax(puntajes):
+    puntajes = puntajes - puntajes.max(axis=1, keepdims=True)
+    exp = np.exp(puntajes)
+    return exp / exp.sum(axis=1, keepdims=True)
+
+
+def normalizar_etiqueta(tarea: str, valor) -> Optional[str]:
+    """
+    Lleva una etiqueta de planilla o del LLM a las etiquetas de la tarea (None si no es válida).
+    """
+    if valor is None or (isinstance(valor, float) and math.isnan(valor)):
+        return None
+    config = TAREAS[tarea]
+    valor = str(valor).strip()
+    valor = config.get('mapeo', {}).get(valor.upper(), valor)
+    por_clave = {Texto.normalizar(str(e)): e for e in config['etiquetas']}
+    return por_clave.get(Texto.normalizar(str(valor)))
+
+
+def cargar_datos_entrenamiento(tarea: str, planillas: Optional[List[str]] = None, db_path: Optional[str] = None) -> List[Tuple[str, str]]:
+    """
+    Arma los pares (texto, etiqueta) de una tarea:
+    1. Clasificaciones del LLM guardadas en el store de artículos (TEXTO_PLANO + etiqueta); las que
+       vienen del modelo local, de un fallback o de registros sin '_FUENTES' se descartan
+    2. Etiquetas de las planillas: si la fila trae TEXTO_PLANO se usa directo; si solo trae LINK,
+       se toma el texto del store y la etiqueta manual reemplaza a la del LLM
+    """
+    import pandas as pd
+    import Z_Utils_Articulos as Art
+
+    columnas = TAREAS[tarea]['columnas']
+    ejemplos = {}
+    textos_por_id = {}
+
+    try:
+        registros = Art.listar_articulos(db_path)
+    except Exception as e:
+        logging.warning(f"⚠️ No se pudo leer el store de artículos para entrenar: {e}")
+        registros = []
+    descartadas = Counter()
+    for registro in registros:
+        texto = registro.get('TEXTO_PLANO')
+        ejes_id = Art.extraer_id_ejes(registro.get('LINK'))
+        if not texto:
+            continue
+        if ejes_id:
+            textos_por_id[ejes_id] = texto
+        columna = next((c for c in columnas if registro.get(c) is not None), None)
+        etiqueta = normalizar_etiqueta(tarea, registro.get(columna)) if columna else None
+        if not etiqueta:
+            continue
+        fuente = (registro.get('_FUENTES') or {}).get(columna)
+        if fuente != FUENTE_LLM:
+            descartadas[fuente or 'desconocida'] += 1
+            continue
+        ejemplos[ejes_id or texto] = (texto, etiqueta)
+    if descartadas:
+        logging.info(f"ℹ️ Etiquetas de '{tarea}' del store descartadas por su origen: {dict(descartadas)}")
+
+    for path in (PLANILLAS_ENTRENAMIENTO if planillas is None else planillas):
+        if not os.path.exists(path):
+            logging.warning(f"⚠️ No existe la planilla de entrenamiento {path}, se omite")
+            continue
+        df = pd.read_excel(path)
+        columna = next((c for c in columnas if c in df.columns), None)
+        if columna is None:
+            logging.info(f"ℹ️ {path} no tiene etiquetas de '{tarea}', se omite")
+            continue
+        for _, fila in df.iterrows():
+            etiqueta = normalizar_etiqueta(tarea, fila[columna])
+            if not etiqueta:
+                continue
+            texto = fila.get('TEXTO_PLANO')
+            ejes_id = Art.extraer_id_ejes(fila.get('LINK'))
+            if not isinstance(texto, str) or not texto.strip():
+                texto = textos_por_id.get(ejes_id)
+            if texto:
+                ejemplos[ejes_id or texto] = (texto, etiqueta)
+
+    logging.info(f"📚 Datos de entrenamiento '{tarea}': {len(ejemplos)} ejemplos")
+    return list(ejemplos.values())
+
+
+def entrenar_modelo(textos: List[str], etiquetas: List[str], iteraciones: int = ITERACIONES) -> dict:
+    """
+    Ajusta una regresión logística multinomial (clases balanceadas, L2) sobre TF-IDF.
+
+    Returns:
+        dict: Modelo (vocabulario, idf, pesos, sesgos, etiquetas)
+    """
+    clases = sorted(set(etiquetas))
+    if len(clases) < 2:
+        raise ValueError(f"Se necesitan al menos 2 etiquetas distintas para entrenar (hay: {clases})")
+
+    # Vocabulario: features que aparecen en al menos 2 documentos (1 si hay pocos datos), las más frecuentes
+    df_features = Counter()
+    for texto in textos:
+        df_features.update(_features(texto).keys())
+    min_df = 2 if len(textos) >= 50 else 1
+    seleccion = [f for f, n in df_features.most_common(MAX_FEATURES) if n >= min_df]
+    vocabulario = {f: i for i, f in enumerate(seleccion)}
+    idf = np.array([math.log((1 + len(textos)) / (1 + df_features[f])) + 1.0 for f in seleccion])
+
+    X = _vectorizar(textos, vocabulario, idf)
+    n = len(textos)
+    y = np.array([clases.index(e) for e in etiquetas])
+    Y = np.eye(len(clases))[y]
+    pesos_clase = n / (len(clases) * np.bincount(y, minlength=len(clases)))
+    pesos_fila = pesos_clase[y][:, None] / n
+
+    W = np.zeros((len(vocabulario), len(clases)))
+    b = np.zeros(len(clases))
+    filas, columnas, valores = X
+    for _ in range(iteraciones):
+        G = (_softmax(_puntajes(X, n, W, b)) - Y) * pesos_fila
+        gradiente = np.column_stack([
+            np.bincount(columnas, weights=valores * G[filas, c], minlength=len(vocabulario))
+            for c in range(len(clases))
+        ]) + REGULARIZACION_L2 * W
+        W -= TASA_APRENDIZAJE * gradiente
+        b -= TASA_APRENDIZAJE * G.sum(axis=0)
+
+    return {"vocabulario": vocabulario, "idf": idf, "W": W, "b": b, "etiquetas": clases}
+
+
+def predecir_proba(modelo: dict, textos: List[str]) -> np.ndarray:
+    """Probabilidad de cada etiqueta (columnas en el orden de modelo['etiquetas'])"""
+    X = _vectorizar(textos, modelo["vocabulario"], modelo["idf"])
+    return _softmax(_puntajes(X, len(textos), modelo["W"], modelo["b"]))
+
+
+def evaluar_modelo(modelo: dict, textos: List[str], etiquetas: List[str], umbral: float) -> dict:
+    """
+    Acuerdo del modelo con la etiqueta de referencia (manual o del LLM, nunca local ni fallback), por etiqueta,
+    y cobertura/precisión de las predicciones que el router usaría con este umbral.
+    """
+    if not textos:
+        return {"n": 0}
+    proba = predecir_proba(modelo, textos)
+    predichas = [modelo["etiquetas"][i] for i in proba.argmax(axis=1)]
+    confiables = proba.max(axis=1) >= umbral
+
+    por_etiqueta = {}
+    for etiqueta in sorted(set(etiquetas)):
+        indices = [i for i, e in enumerate(etiquetas) if e == etiqueta]
+        aciertos = sum(predichas[i] == etiqueta for i in indices)
+        por_etiqueta[etiqueta] = {"n": len(indices), "accuracy": round(aciertos / len(indices), 4)}
+
+    aciertos = [p == e for p, e in zip(predichas, etiquetas)]
+    cubiertas = [a for a, c in zip(aciertos, confiables) if c]
+    return {
+        "n": len(textos),
+        "accuracy": round(sum(aciertos) / len(aciertos), 4),
+        "por_etiqueta": por_etiqueta,
+        "umbral": umbral,
+        "cobertura": round(len(cubiertas) / len(aciertos), 4),
+        "accuracy_cubiertas": round(sum(cubiertas) / len(cubiertas), 4) if cubiertas else None,
+    }
+
+
+def _ruta_modelo(tarea, modelos_dir=None):
+    return os.path.join(modelos_dir or MODELOS_DIR, f"{tarea}.npz")
+
+
+def guardar_modelo(tarea: str, modelo: dict, reporte: Optional[dict] = None, modelos_dir: Optional[str] = None) -> str:
+    """
+    Serializa el modelo en <MODELOS_DIR>/<tarea>.npz y el reporte de evaluación en <tarea>.json.
+    """
+    ruta = _ruta_modelo(tarea, modelos_dir)
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    features = sorted(modelo["vocabulario"], key=modelo["vocabulario"].get)
+    tmp = ruta + ".tmp.npz"
+    np.savez_compressed(
+        tmp, features=np.array(features), idf=modelo["idf"], W=modelo["W"], b=modelo["b"],
+        etiquetas=np.array(modelo["etiquetas"]),
+    )
+    os.replace(tmp, ruta)
+    if reporte is not None:
+        with open(ruta[:-4] + ".json", 'w', encoding='utf-8') as f:
+            json.dump(reporte, f, ensure_ascii=False, indent=2)
+    with _lock:
+        _modelos_cargados.pop(ruta, None)
+    return ruta
+
+
+def cargar_modelo(tarea: str, modelos_dir: Optional[str] = None) -> Optional[dict]:
+    """
+    Modelo serializado de la tarea (cacheado por fecha de modificación) o None si no hay.
+    """
+    ruta = _ruta_modelo(tarea, modelos_dir)
+    if not os.path.exists(ruta):
+        return None
+    mtime = os.path.getmtime(ruta)
+    with _lock:
+        cargado = _modelos_cargados.get(ruta)
+        if cargado and cargado[0] == mtime:
+            return cargado[1]
+    with np.load(ruta) as datos:
+        modelo = {
+            "vocabulario": {f: i for i, f in enumerate(datos["features"].tolist())},
+            "idf": datos["idf"], "W": datos["W"], "b": datos["b"],
+            "etiquetas": datos["etiquetas"].tolist(),
+        }
+    with _lock:
+        _modelos_cargados[ruta] = (mtime, modelo)
+    return modelo
+
+
+def identidad_modelos(modelos_dir: Optional[str] = None) -> dict:
+    """
+    {tarea: 'mtime:tamaño' del modelo entrenado o None}: cambia al reentrenar, para que el store
+    de artículos no sirva resultados del ruteo con el modelo anterior.
+    """
+    identidad = {}
+    for tarea in TAREAS:
+        try:
+            estado = os.stat(_ruta_modelo(tarea, modelos_dir))
+            identidad[tarea] = f"{estado.st_mtime_ns}:{estado.st_size}"
+        except OSError:
+            identidad[tarea] = None
+    return identidad
+
+
+def entrenar_y_evaluar(tarea: str, planillas: Optional[List[str]] = None, db_path: Optional[str] = None,
+                       proporcion_test: float = 0.2, modelos_dir: Optional[str] = None) -> dict:
+    """
+    Entrena el modelo de una tarea, lo evalúa sobre una partición de test contra las etiquetas
+    de referencia, lo reentrena con todos los datos y lo guarda junto con el reporte.
+
+    Returns:
+        dict: Reporte de evaluación
+    """
+    datos = cargar_datos_entrenamiento(tarea, planillas, db_path)
+    random.Random(42).shuffle(datos)
+    n_test = int(len(datos) * proporcion_test) if len(datos) >= 10 else 0
+    test, entrenamiento = datos[:n_test], datos[n_test:]
+    if not entrenamiento:
+        raise ValueError(f"No hay datos de entrenamiento para la tarea '{tarea}'")
+
+    modelo = entrenar_modelo([t for t, _ in entrenamiento], [e for _, e in entrenamiento])
+    reporte = {
+        "tarea": tarea,
+        "n_entrenamiento": len(entrenamiento),
+        "test": evaluar_modelo(modelo, [t for t, _ in test], [e for _, e in test], UMBRALES[tarea]),
+    }
+    if test:
+        modelo = entrenar_modelo([t for t, _ in datos], [e for _, e in datos])
+    reporte["ruta"] = guardar_modelo(tarea, modelo, reporte, modelos_dir)
+    logging.info(f"🧠 Modelo '{tarea}' entrenado: {json.dumps(reporte['test'], ensure_ascii=False)}")
+    return reporte
+
+
+def predecir(tarea: str, texto: str, umbral: Optional[float] = None, modelos_dir: Optional[str] = None) -> Optional[str]:
+    """
+    Router: etiqueta local si hay modelo y su probabilidad supera el umbral de la tarea; si no, None.
+    """
+    try:
+        if not texto:
+            return None
+        modelo = cargar_modelo(tarea, modelos_dir)
+        if modelo is None:
+            return None
+        umbral = UMBRALES[tarea] if umbral is None else umbral
+        proba = predecir_proba(modelo, [texto])[0]
+        mejor = int(proba.argmax())
+        if proba[mejor] >= umbral:
+            logging.info(f"🧠 {tarea}: Local -> {modelo['etiquetas'][mejor]} (p={proba[mejor]:.2f})")
+            return modelo["etiquetas"][mejor]
+        logging.debug(f"{tarea}: modelo local con baja confianza (p={proba[mejor]:.2f} < {umbral}), se consulta al LLM")
+        return None
+    except Exception as e:
+        logging.error(f"❌ Error en modelo local '{tarea}': {e}")
+        return None
+
+
+def rutear(tarea: str, texto: str, funcion_llm: Callable[[str], str]) -> str:
+    """
+    Usa el modelo local si tiene confianza suficiente; si no, llama a funcion_llm(texto).
+    """
+    local = predecir(tarea, texto)
+    if local is not None:
+        marcar_fuente(FUENTE_LOCAL)
+        return local
+    return funcion_llm(texto)
+
+
+if __name__ == "__main__":
+    # Entrenar y evaluar todas las tareas con las planillas y el store de artículos
+    logging.basicConfig(level=logging.INFO)
+    for nombre_tarea in TAREAS:
+        try:
+            resultado = entrenar_y_evaluar(nombre_tarea)
+            print(f"✅ {nombre_tarea}: {json.dumps(resultado['test'], ensure_ascii=False, indent=2)}")
+        except ValueError as e:
+            print(f"⚠️ {nombre_tarea}: {e}")
@@ -1,14 +1,46 @@
+import json
 import requests
 import logging
-import pandas as pd
 import Z_Utils as Z
+import O_Utils_Esquemas as Esq
+import Z_Utils_Deadline as Plazos
+import Z_Utils_Breaker as Breaker
+import Z_Utils_Http as Http
+import Z_Utils_Lazy as Lazy
+import Z_Utils_Texto as Texto
+import Z_Utils_Menciones as Menciones
+import Z_Utils_Pasajes as Pasajes
+import O_Utils_Modelos as Modelos
 import re
 from datetime import datetime
 
+pd = Lazy.modulo('pandas')
+
 # Modelo por defecto - Opciones disponibles: "llama3:8b", "llama3.1:8b"
 MODELO_OLLAMA = "llama3.1:8b"  
 OLLAMA_URL = "http://localhost:11434/api/generate"
 
+# Versión de los prompts de este módulo: incrementarla al modificar cualquier prompt
+# (invalida los artículos ya clasificados en el store persistente)
+VERSION_PROMPTS = "ollama-2025.5"
+
+# Tiempo que Ollama mantiene el modelo cargado en memoria después de cada request
+# (el warm-up de arranque lo precarga con precargar_modelo)
+OLLAMA_KEEP_ALIVE = "30m"
+
+# Lectura en streaming de las clasificaciones: se deja de leer (y se cancela la generación)
+# apenas el prefijo generado identifica una sola etiqueta del esquema
+OLLAMA_STREAMING = True
+
+# Tope de tokens generados por tarea; las que no figuran usan el mínimo del esquema (Esq.max_tokens)
+NUM_PREDICT_POR_TAREA = {
+    'valoracion': 16,
+    'agenda': 12,
+    'entrevista': 12,
+    'declaracion': 12,
+    'factor_politico': 12,
+}
+
 
 # Control para imprimir el estado del servicio solo una vez
 _ollama_estado_reportado = False
@@ -31,16 +63,92 @@ def _verificar_e_imprimir_estado_ollama(timeout_seconds: int = 2) -> bool:
             _ollama_estado_reportado = True
             return True
         else:
+            Breaker.get('ollama').registrar_falla(f"HTTP {resp.status_code} en /api/tags")
             print(f"[Ollama] No disponible (HTTP {resp.status_code})")
             logging.error(f"[Ollama] No disponible (HTTP {resp.status_code})")
             _ollama_estado_reportado = True
             return False
     except Exception as e:
+        Breaker.get('ollama').registrar_falla(type(e).__name__)
         print("[Ollama] No disponible (error de conexión)")
         logging.error(f"[Ollama] Error verificando servicio: {repr(e)}")
         _ollama_estado_reportado = True
         return False
 
+def _leer_stream(response, esquema):
+    """
+    Lee la respuesta de Ollama en streaming y corta apenas la etiqueta queda decidida
+    (cerrar la conexión cancela la generación en el servidor).
+    """
+    texto = ""
+    try:
+        for linea in response.iter_lines():
+            if not linea:
+                continue
+            # Con el plazo vencido se corta la lectura; cerrar la conexión (finally) cancela la generación
+            Plazos.verificar("lectura de Ollama")
+            fragmento = json.loads(linea)
+            texto += fragmento.get("response", "")
+            etiqueta = Esq.decidir_parcial(texto, esquema)
+            if etiqueta is not None:
+                logging.debug(f"[Ollama] Etiqueta decidida en streaming: {etiqueta} ({len(texto)} caracteres leídos)")
+                return etiqueta
+            if fragmento.get("done"):
+                break
+    finally:
+        response.close()
+    return Esq.leer_respuesta(texto, esquema)
+
+def _post_ollama(data, stream=False, timeout=60):
+    """
+    POST a Ollama (con el pool de conexiones y keep_alive del modelo) a través del circuit breaker:
+    con el servicio marcado como caído lanza Breaker.CircuitoAbierto al instante (los clasificadores
+    no devuelven su fallback: la excepción llega a Z.marcar_o_valorar_con_ia, que marca el artículo
+    como incompleto, sin esperar el timeout).
+    """
+    breaker = Breaker.get('ollama')
+    breaker.verificar()
+    data = {"keep_alive": OLLAMA_KEEP_ALIVE, **data}
+    try:
+        response = Http.sesion('ollama').post(OLLAMA_URL, json=data, timeout=Plazos.timeout(timeout), stream=stream)
+    except (requests.Timeout, requests.ConnectionError) as e:
+        breaker.registrar_falla(type(e).__name__)
+        raise
+    if response.status_code >= 500:
+        breaker.registrar_falla(f"HTTP {response.status_code}")
+    else:
+        breaker.registrar_exito()
+    return response
+
+def precargar_modelo(timeout=120) -> bool:
+    """
+    Carga MODELO_OLLAMA en memoria (request sin prompt) y lo deja residente OLLAMA_KEEP_ALIVE,
+    así la primera clasificación no paga el tiempo de carga del modelo.
+    """
+    t0 = datetime.now()
+    response = _post_ollama({"model": MODELO_OLLAMA}, timeout=timeout)
+    if response.status_code != 200:
+        logging.error(f"[Ollama] No se pudo precargar {MODELO_OLLAMA} (HTTP {response.status_code})")
+        return False
+    logging.info(f"[Ollama] Modelo {MODELO_OLLAMA} precargado en {(datetime.now() - t0).total_seconds():.1f}s (keep_alive {OLLAMA_KEEP_ALIVE})")
+    return True
+
+def _clasificar_con_esquema(prompt, esquema, tarea=None):
+    """
+    Request a Ollama con la salida restringida al esquema ('format') y tope de tokens por tarea
+    ('num_predict'). Devuelve la etiqueta elegida, o None si la respuesta no respeta el esquema.
+    """
+    Plazos.verificar("clasificación con Ollama")
+    streaming = OLLAMA_STREAMING
+    data = {
+        "model": MODELO_OLLAMA, "prompt": prompt, "stream": streaming, "format": esquema,
+        "options": {"temperature": 0, "num_predict": NUM_PREDICT_POR_TAREA.get(tarea) or Esq.max_tokens(esquema)},
+    }
+    response = _post_ollama(data, stream=streaming)
+    if streaming:
+        return _leer_stream(response, esquema)
+    return Esq.leer_respuesta(response.json().get("response", ""), esquema)
+
 def set_modelo_ollama(modelo):
     """
     Actualiza el modelo de Ollama globalmente.
@@ -65,11 +173,21 @@ def get_modelo_ollama():
 # FUNCIONES DE VALORACIÓN
 # ============================================================================
 
-def valorar_noticia_con_ollama_base(texto):
+def valorar_noticia_con_ollama_base(texto, actores=None):
     """
     Función base para valorar noticias con Ollama.
     Retorna "NEGATIVA" o "NO_NEGATIVA" (sin "OTRO").
+    Con actores, si la nota es larga se envía el comienzo más los pasajes que los mencionan.
     """
+    comienzo, destacados = Pasajes.para_valoracion(texto, actores)
+    if destacados:
+        texto_prompt = (
+            f"{comienzo}\n\n"
+            f"PASAJES QUE MENCIONAN AL MINISTRO O AL MINISTERIO (su tono es el que más pesa):\n{destacados}"
+        )
+    else:
+        texto_prompt = comienzo
+    
     prompt = (
         "Analizá el siguiente texto y determiná si la noticia es NEGATIVA o NO_NEGATIVA.\n\n"
         "CRITERIO PARA CONSIDERARLA NEGATIVA:\n"
@@ -86,22 +204,21 @@ def valorar_noticia_con_ollama_base(texto):
         "- Habla de proyectos, iniciativas, propuestas, actividades\n\n"
         "IMPORTANTE:\n"
         "- Si NO es claramente negativa, es NO_NEGATIVA\n"
-        "- Respondé únicamente con NEGATIVA o NO_NEGATIVA\n"
+        f"- Respondé únicamente con {Esq.instruccion_opciones(Esq.ETIQUETAS_VALORACION)}\n"
         "- NO agregues explicaciones ni texto adicional\n\n"
-        f"TEXTO A ANALIZAR:\n{texto}\n"
+        f"TEXTO A ANALIZAR:\n{texto_prompt}\n"
     )
     
-    data = {"model": MODELO_OLLAMA, "prompt": prompt, "stream": False, "options": {"temperature": 0}}
     try:
-        response = requests.post(OLLAMA_URL, json=data, timeout=60)
-        result = response.json()
-        salida = result.get("response", "").strip().upper()
-        if salida == "NEGATIVA":
-            return "NEGATIVA"
-        else:
-            return "NO_NEGATIVA"
+        valoracion = _clasificar_con_esquema(prompt, Esq.ESQUEMA_VALORACION, 'valoracion')
+        if valoracion is None:
+            Modelos.marcar_fuente(Modelos.FUENTE_FALLBACK)
+        return valoracion or "NO_NEGATIVA"
+    except Breaker.CircuitoAbierto:
+        raise
     except Exception as e:
         logging.error(f"[Ollama] Error valorando noticia: {repr(e)} | Texto: {texto[:120]}...")
+        Modelos.marcar_fuente(Modelos.FUENTE_FALLBACK)
         return "NO_NEGATIVA"  # Fallback conservador
 
 def valorar_noticia_con_ollama(texto, ministro_key_words=None, ministerios_key_words=None):
@@ -113,7 +230,8 @@ def valorar_noticia_con_ollama(texto, ministro_key_words=None, ministerios_key_w
         ministro_key_words (str or list, optional): Palabras clave para identificar al ministro
         ministerios_key_words (str or list, optional): Palabras clave para identificar al ministerio
     """
-    valoracion_base = valorar_noticia_con_ollama_base(texto)
+    actores = Menciones.aplanar(ministro_key_words) + Menciones.aplanar(ministerios_key_words)
+    valoracion_base = valorar_noticia_con_ollama_base(texto, actores)
     
     if valoracion_base == "NEGATIVA":
         return "NEGATIVA"
@@ -153,22 +271,20 @@ def es_agenda_ollama(texto):
         "- Noticia general sobre cultura\n"
         "- Información sin fechas específicas\n\n"
         f"TEXTO: {texto}\n\n"
-        "Respondé únicamente SI o NO:"
+        f"Respondé únicamente con {Esq.instruccion_opciones(Esq.ETIQUETAS_SI_NO)}:"
     )
     
-    data = {"model": MODELO_OLLAMA, "prompt": prompt, "stream": False, "options": {"temperature": 0}}
     try:
-        response = requests.post(OLLAMA_URL, json=data, timeout=60)
-        result = response.json()
-        salida = result.get("response", "").strip().upper()
-        
-        if salida.startswith("SI"):
-            return True
-        else:
-            return False
+        respuesta = _clasificar_con_esquema(prompt, Esq.ESQUEMA_SI_NO, 'agenda')
+        if respuesta is None:
+            Modelos.marcar_fuente(Modelos.FUENTE_FALLBACK)
+        return respuesta == "SI"
             
+    except Breaker.CircuitoAbierto:
+        raise
     except Exception as e:
         logging.error(f"[Ollama] Error detectando agenda: {repr(e)} | Texto: {texto[:120]}...")
+        Modelos.marcar_fuente(Modelos.FUENTE_FALLBACK)
         return False  # Fallback conservador
 
 def es_entrevista_ollama(texto):
@@ -195,22 +311,20 @@ def es_entrevista_ollama(texto):
         "- Comunicado o información general\n"
         "- Relato sin diálogo\n\n"
         f"TEXTO: {texto}\n\n"
-        "Respondé únicamente SI o NO:"
+        f"Respondé únicamente con {Esq.instruccion_opciones(Esq.ETIQUETAS_SI_NO)}:"
     )
     
-    data = {"model": MODELO_OLLAMA, "prompt": prompt, "stream": False, "options": {"temperature": 0}}
     try:
-        response = requests.post(OLLAMA_URL, json=data, timeout=60)
-        result = response.json()
-        salida = result.get("response", "").strip().upper()
-        
-        if salida.startswith("SI"):
-            return True
-        else:
-            return False
+        respuesta = _clasificar_con_esquema(prompt, Esq.ESQUEMA_SI_NO, 'entrevista')
+        if respuesta is None:
+            Modelos.marcar_fuente(Modelos.FUENTE_FALLBACK)
+        return respuesta == "SI"
             
+    except Breaker.CircuitoAbierto:
+        raise
     except Exception as e:
         logging.error(f"[Ollama] Error detectando entrevista: {repr(e)} | Texto: {texto[:120]}...")
+        Modelos.marcar_fuente(Modelos.FUENTE_FALLBACK)
         return False  # Fallback conservador
 
 def es_declaracion_ollama(texto, ministro_key_words, ministerios_key_words=None):
@@ -226,46 +340,25 @@ def es_declaracion_ollama(texto, ministro_key_words, ministerios_key_words=None)
         return False
     
     # Construir lista combinada de actores (ministros + ministerios)
-    actores = []
-    
-    # Agregar ministros
-    if ministro_key_words:
-        if isinstance(ministro_key_words, list):
-            # Aplanar listas anidadas y filtrar elementos None
-            for item in ministro_key_words:
-                if isinstance(item, list):
-                    actores.extend([m for m in item if m])
-                else:
-                    if item:
-                        actores.append(item)
-        else:
-            actores.append(ministro_key_words)
-    
-    # Agregar ministerios si existen
-    if ministerios_key_words:
-        if isinstance(ministerios_key_words, list):
-            # Aplanar listas anidadas y filtrar elementos None
-            for item in ministerios_key_words:
-                if isinstance(item, list):
-                    actores.extend([m for m in item if m])
-                else:
-                    if item:
-                        actores.append(item)
-        else:
-            actores.append(ministerios_key_words)
+    actores = Menciones.aplanar(ministro_key_words) + Menciones.aplanar(ministerios_key_words)
     
     # Verificar que tengamos actores válidos
     if not actores:
         logging.warning("No se encontraron actores válidos para buscar declaraciones en Ollama")
         return False
     
-    # Convertir a string legible
+    # Convertir a string legible (más los fragmentos donde aparece cada actor, memoizados por request)
     actores_str = ", ".join(actores)
+    menciones_str = Menciones.resumen_para_prompt(texto, actores) or "(ninguna mención directa; pueden estar referidos de forma indirecta)"
+    # En notas largas solo van los pasajes con comillas o menciones (menos tokens y latencia en CPU)
+    pasajes = Pasajes.para_declaracion(texto, actores)
+    aclaracion = " (pasajes con comillas o menciones; [...] marca lo omitido)" if pasajes is not texto else ""
     
     # Prompt unificado para buscar citas adjudicadas a actores
     prompt = (
         "¿El siguiente texto contiene AL MENOS UNA DECLARACIÓN (cita textual) atribuida a alguno de estos actores?\n\n"
         f"ACTORES A BUSCAR: {actores_str}\n\n"
+        f"MENCIONES DE LOS ACTORES EN EL TEXTO:\n{menciones_str}\n\n"
         "CRITERIOS FLEXIBLES PARA CONSIDERARLO DECLARACIÓN:\n"
         "✅ DEBE tener AL MENOS UNA CITA entre comillas (\"...\" o '...') atribuida a alguno de los actores\n"
         "✅ El actor puede ser referenciado de forma directa o indirecta (fuentes, cartera, ministerio, etc.)\n"
@@ -290,23 +383,21 @@ def es_declaracion_ollama(texto, ministro_key_words, ministerios_key_words=None)
         "- La funcionaria asistió al evento (sin cita)\n"
         "- Se anunció la nueva política (sin cita textual)\n\n"
         "IMPORTANTE: Si hay AL MENOS UNA cita textual atribuida a un actor, es DECLARACIÓN.\n"
-        f"TEXTO: {texto}\n\n"
-        "Respondé únicamente SI o NO:"
+        f"TEXTO{aclaracion}: {pasajes}\n\n"
+        f"Respondé únicamente con {Esq.instruccion_opciones(Esq.ETIQUETAS_SI_NO)}:"
     )
     
-    data = {"model": MODELO_OLLAMA, "prompt": prompt, "stream": False, "options": {"temperature": 0}}
     try:
-        response = requests.post(OLLAMA_URL, json=data, timeout=60)
-        result = response.json()
-        salida = result.get("response", "").strip().upper()
-        
-        if salida.startswith("SI"):
-            return True
-        else:
-            return False
+        respuesta = _clasificar_con_esquema(prompt, Esq.ESQUEMA_SI_NO, 'declaracion')
+        if respuesta is None:
+            Modelos.marcar_fuente(Modelos.FUENTE_FALLBACK)
+        return respuesta == "SI"
             
+    except Breaker.CircuitoAbierto:
+        raise
     except Exception as e:
         logging.error(f"[Ollama] Error detectando declaración: {repr(e)} | Texto: {texto[:120]}...")
+        Modelos.marcar_fuente(Modelos.FUENTE_FALLBACK)
         return False  # Fallback conservador
 
 def clasificar_tipo_publicacion_unificado(texto, ministro_key_words="Gabriela Ricardes", ministerios_key_words=None):
@@ -357,9 +448,12 @@ def clasificar_tipo_publicacion_unificado(texto, ministro_key_words="Gabriela Ri
         logging.debug(f"Clasificado como Nota (default)")
         return "Nota"
         
+    except Breaker.CircuitoAbierto:
+        raise
     except Exception as e:
         logging.error(f"Error al clasificar tipo de publicación: {e}")
         logging.error(f"Parámetros: texto={texto[:100]}..., ministro_key_words={ministro_key_words}, ministerios_key_words={ministerios_key_words}")
+        Modelos.marcar_fuente(Modelos.FUENTE_FALLBACK)
         return "Nota"  # Fallback seguro
 
 # ============================================================================
@@ -388,11 +482,11 @@ def clasificar_tema_ollama(texto, lista_temas, tema_default, tipo_publicacion=No
         logging.info(f"Tema: Ollama -> Heurística (Agenda) asignó tema {tema_default}")
         return tema_default
 
-    # 2. Heurísticas muy estrictas para coincidencias exactas
-    texto_lower = texto.lower()
+    # 2. Heurísticas muy estrictas para coincidencias exactas (sin distinguir mayúsculas ni tildes)
+    texto_lower = Texto.normalizar(texto)
     for tema in lista_temas:
-        tema_lower = tema.lower()
-        if tema_lower in texto_lower or texto_lower.count(tema_lower) > 0:
+        tema_lower = Texto.normalizar(tema)
+        if tema_lower in texto_lower:
             logging.info(f"Tema: Ollama -> Heurística (coincidencia exacta) asignó tema {tema}")
             return tema
 
@@ -425,26 +519,27 @@ def _promptear_clasificacion_tema_ollama(texto, lista_temas, tema_default):
         "- Los temas genéricos son SOLO para noticias que realmente no encajan con temas específicos\n"
         "- Si hay dudas entre temas similares, elige el MÁS ESPECÍFICO\n\n"
         f"NOTICIA A ANALIZAR:\n{texto}\n\n"
-        "RESPUESTA: Responde ÚNICAMENTE con el nombre exacto del tema elegido (sin comillas, sin puntos, sin texto adicional)."
+        f'RESPUESTA: Responde ÚNICAMENTE con un JSON {{"{Esq.CAMPO_RESPUESTA}": "<nombre exacto del tema elegido>"}}, sin texto adicional.'
     )
     
-    data = {"model": MODELO_OLLAMA, "prompt": prompt, "stream": False, "options": {"temperature": 0}}
     try:
-        response = requests.post(OLLAMA_URL, json=data, timeout=60)
-        result = response.json()
-        tema_asignado = result.get("response", "").strip()
+        # El enum de temas restringe la salida a la lista disponible
+        tema_asignado = _clasificar_con_esquema(prompt, Esq.esquema_tema(temas_disponibles), 'tema')
         
-        # Validar que el tema asignado esté en la lista
-        if tema_asignado in temas_disponibles:
+        if tema_asignado:
             logging.info(f"Tema: Ollama -> Ollama (IA) asignó tema {tema_asignado}")
             return tema_asignado
         else:
             logging.info(f"Tema: Ollama -> Ollama (fallback) asignó tema {tema_default}")
+            Modelos.marcar_fuente(Modelos.FUENTE_FALLBACK)
             return tema_default  # Fallback
             
+    except Breaker.CircuitoAbierto:
+        raise
     except Exception as e:
         logging.error(f"[Ollama] Error clasificando tema: {repr(e)} | Texto: {texto[:120]}...")
         logging.info(f"Tema: Ollama -> Ollama (excepción) asignó tema {tema_default}")
+        Modelos.marcar_fuente(Modelos.FUENTE_FALLBACK)
         return tema_default  # Fallback
 
 # ============================================================================
@@ -468,7 +563,7 @@ def extraer_entrevistado_con_ollama(texto):
     
     data = {"model": MODELO_OLLAMA, "prompt": prompt, "stream": False, "options": {"temperature": 0}}
     try:
-        response = requests.post(OLLAMA_URL, json=data, timeout=60)
+        response = _post_ollama(data)
         result = response.json()
         entrevistado = result.get("response", "").strip()
         
@@ -480,6 +575,8 @@ def extraer_entrevistado_con_ollama(texto):
             logging.info(f"Entrevistado: Ollama -> No identificado")
             return None
             
+    except Breaker.CircuitoAbierto:
+        raise
     except Exception as e:
         logging.error(f"[Ollama] Error extrayendo entrevistado: {repr(e)} | Texto: {texto[:120]}...")
         logging.info(f"Entrevistado: Ollama -> Error")
@@ -502,34 +599,26 @@ def detectar_factor_politico_con_ollama(texto):
         "- Contenido relacionado con campañas políticas o propaganda electoral\n\n"
         "IMPORTANTE:\n"
         "- Si NO menciona estos temas, es NO POLÍTICO\n"
-        "- Respondé únicamente con SI o NO\n"
+        f"- Respondé únicamente con {Esq.instruccion_opciones(Esq.ETIQUETAS_SI_NO)}\n"
         "- NO agregues explicaciones ni texto adicional\n\n"
         f"TEXTO A ANALIZAR:\n{texto}\n"
     )
     
-    data = {"model": MODELO_OLLAMA, "prompt": prompt, "stream": False, "options": {"temperature": 0}}
     try:
-        response = requests.post(OLLAMA_URL, json=data, timeout=60)
-        result = response.json()
-        salida = result.get("response", "").strip().upper()
-        
-        if salida in ["SI", "SÍ"]:
-            resultado = "SI"
-        elif salida in ["NO"]:
+        resultado = _clasificar_con_esquema(prompt, Esq.ESQUEMA_SI_NO, 'factor_politico')
+        if resultado is None:
+            Modelos.marcar_fuente(Modelos.FUENTE_FALLBACK)
             resultado = "NO"
-        else:
-            # Validación adicional por palabras clave
-            if any(palabra in salida for palabra in ["ELECCION", "CANDIDAT", "CAMPAÑA", "ENCUESTA", "VOTACION", "PARTIDO", "POLITIC"]):
-                resultado = "SI"
-            else:
-                resultado = "NO"
         
         # Loggear el resultado
         logging.info(f"Factor Político: Ollama -> {resultado}")
         return resultado
                 
+    except Breaker.CircuitoAbierto:
+        raise
     except Exception as e:
         logging.error(f"[Ollama] Error detectando factor político: {repr(e)} | Texto: {texto[:120]}...")
         logging.info(f"Factor Político: Ollama -> NO (error)")
+        Modelos.marcar_fuente(Modelos.FUENTE_FALLBACK)
         return "NO"
 
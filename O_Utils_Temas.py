@@ -0,0 +1,249 @@
+from __future__ import annotations
+
+import os
+import re
+import math
+import time
+import hashlib
+import logging
+import threading
+from collections import Counter, OrderedDict
+from typing import Optional, List, Tuple
+
+import Z_Utils_Lazy as Lazy
+import Z_Utils_Texto as Texto
+
+np = Lazy.modulo('numpy')
+
+# =============================================================================
+# CLASIFICADOR LOCAL DE TEMAS (TF-IDF + vecino más cercano)
+# =============================================================================
+# Antes de pedirle el tema a GPT/Ollama se compara la noticia contra un índice TF-IDF
+# armado con los nombres de los temas y con noticias históricas ya clasificadas.
+# El puntaje de cada tema es la similitud coseno con su ejemplo más cercano; si el mejor
+# tema supera SIMILITUD_MINIMA y le saca al segundo al menos el margen pedido, se asigna
+# localmente. Si no, devuelve None y la clasificación sigue por el LLM.
+
+# Planillas con ejemplos clasificados (columnas TEMA o 'EVENTO / TEMA', y TITULO y/o TEXTO_PLANO).
+# Rutas relativas al módulo (no al directorio de trabajo); O_Utils_Modelos usa las mismas para entrenar.
+_DIR_MODULO = os.path.dirname(os.path.abspath(__file__))
+HISTORICO_PATH = os.path.join(_DIR_MODULO, "Testing", "DataCollected", "noticias_historicas.xlsx")
+IMPORT_LINKS_PATH = os.path.join(_DIR_MODULO, "DataCollected", "Import_Links_Procesado_Completo.xlsx")
+TEMAS_EJEMPLOS_PATHS = [
+    HISTORICO_PATH,
+    IMPORT_LINKS_PATH,
+]
+SIMILITUD_MINIMA = 0.20
+MARGEN_MINIMO = 0.15
+PESO_NOMBRE_TEMA = 3         # Repeticiones del nombre del tema en su documento del índice
+MAX_INDICES_CACHE = 32       # Índices por lista de temas
+MAX_VECTORES_CACHE = 4096    # Vectores de noticias (por índice + hash del texto)
+
+STOPWORDS = {
+    "a", "al", "ante", "con", "de", "del", "desde", "el", "en", "entre", "es", "esta", "este",
+    "la", "las", "le", "les", "lo", "los", "mas", "no", "para", "pero", "por", "que", "se",
+    "sin", "sobre", "su", "sus", "un", "una", "uno", "y", "ya", "como", "fue", "son", "ser",
+    "muy", "ha", "han", "hay", "o", "u", "e", "ni", "tambien", "cuando", "donde", "todo",
+}
+
+_RE_TOKEN = re.compile(r"[a-z0-9]+")
+
+_lock = threading.Lock()
+_indices = OrderedDict()
+_vectores = OrderedDict()
+_ejemplos_cache = {}
+_faltantes_reportadas = set()
+
+
+def tokenizar(texto: str) -> List[str]:
+    """
+    Unigramas (sin tildes ni stopwords) más bigramas consecutivos.
+    """
+    palabras = [p for p in _RE_TOKEN.findall(Texto.normalizar(str(texto))) if p not in STOPWORDS and len(p) > 1]
+    return palabras + [f"{a}_{b}" for a, b in zip(palabras, palabras[1:])]
+
+
+def cargar_ejemplos(paths: Optional[List[str]] = None) -> List[Tuple[str, str]]:
+    """
+    Lee los ejemplos históricos (texto, tema) de las planillas que existan.
+    Se cachea por ruta y fecha de modificación.
+    """
+    import pandas as pd
+
+    ejemplos = []
+    for path in (TEMAS_EJEMPLOS_PATHS if paths is None else paths):
+        if not os.path.exists(path):
+            if path not in _faltantes_reportadas:
+                _faltantes_reportadas.add(path)
+                logging.warning(f"⚠️ No existe la planilla de ejemplos de temas {path}, se ignora")
+            continue
+        firma = (path, os.path.getmtime(path))
+        if firma not in _ejemplos_cache:
+            try:
+                df = pd.read_excel(path)
+                columna_tema = 'TEMA' if 'TEMA' in df.columns else 'EVENTO / TEMA'
+                columnas_texto = [c for c in ('TITULO', 'TEXTO_PLANO') if c in df.columns]
+                if columna_tema not in df.columns or not columnas_texto:
+                    logging.warning(f"⚠️ {path} no tiene columnas de tema y texto, se ignora como ejemplo de temas")
+                    _ejemplos_cache[firma] = []
+                    continue
+                df = df.dropna(subset=[columna_tema])
+                textos = df[columnas_texto].fillna('').astype(str).agg(' '.join, axis=1)
+                _ejemplos_cache[firma] = [
+                    (texto, str(tema).strip()) for texto, tema in zip(textos, df[columna_tema]) if texto.strip()
+                ]
+            except Exception as e:
+                logging.error(f"❌ Error leyendo ejemplos de temas de {path}: {e}")
+                _ejemplos_cache[firma] = []
+        ejemplos.extend(_ejemplos_cache[firma])
+    return ejemplos
+
+
+def _construir_indice(temas: List[str], ejemplos: List[Tuple[str, str]]) -> dict:
+    """
+    Matriz TF-IDF (filas normalizadas) con un documento por nombre de tema y uno por ejemplo.
+    """
+    docs, etiquetas = [], []
+    for i, tema in enumerate(temas):
+        docs.append(tokenizar(tema) * PESO_NOMBRE_TEMA)
+        etiquetas.append(i)
+    posicion = {tema: i for i, tema in enumerate(temas)}
+    for texto, tema in ejemplos:
+        if tema in posicion:
+            docs.append(tokenizar(texto))
+            etiquetas.append(posicion[tema])
+
+    vocabulario = {}
+    for doc in docs:
+        for token in doc:
+            vocabulario.setdefault(token, len(vocabulario))
+
+    df_tokens = np.zeros(len(vocabulario))
+    for doc in docs:
+        for token in set(doc):
+            df_tokens[vocabulario[token]] += 1
+    idf = np.log((1 + len(docs)) / (1 + df_tokens)) + 1.0
+
+    matriz = np.zeros((len(docs), len(vocabulario)))
+    for fila, doc in enumerate(docs):
+        for token, cantidad in Counter(doc).items():
+            matriz[fila, vocabulario[token]] = (1 + math.log(cantidad)) * idf[vocabulario[token]]
+    normas = np.linalg.norm(matriz, axis=1, keepdims=True)
+    matriz = matriz / np.where(normas == 0, 1, normas)
+
+    return {
+        "temas": temas,
+        "vocabulario": vocabulario,
+        "idf": idf,
+        "matriz": matriz,
+        "etiquetas": np.array(etiquetas),
+        "firma": hashlib.sha1(repr((temas, len(ejemplos))).encode('utf-8')).hexdigest(),
+    }
+
+
+def obtener_indice(lista_temas: List[str], tema_default: Optional[str] = None, paths: Optional[List[str]] = None) -> dict:
+    """
+    Índice para una lista de temas (más tema_default). Se cachea por lista de temas y ejemplos.
+    """
+    temas = list(dict.fromkeys(list(lista_temas) + ([tema_default] if tema_default else [])))
+    ejemplos = cargar_ejemplos(paths)
+    clave = (tuple(temas), tuple(paths) if paths is not None else None, len(ejemplos))
+    with _lock:
+        if clave in _indices:
+            _indices.move_to_end(clave)
+            return _indices[clave]
+    indice = _construir_indice(temas, ejemplos)
+    with _lock:
+        _indices[clave] = indice
+        while len(_indices) > MAX_INDICES_CACHE:
+            _indices.popitem(last=False)
+    logging.info(f"🧭 Índice de temas: {len(temas)} temas, {len(indice['etiquetas']) - len(temas)} ejemplos, {len(indice['vocabulario'])} términos")
+    return indice
+
+
+def vectorizar(indice: dict, texto: str) -> np.ndarray:
+    """
+    Vector TF-IDF normalizado de una noticia en el espacio del índice (cacheado por texto).
+    """
+    clave = (indice["firma"], hashlib.sha1(texto.encode('utf-8')).hexdigest())
+    with _lock:
+        if clave in _vectores:
+            _vectores.move_to_end(clave)
+            return _vectores[clave]
+
+    vector = np.zeros(len(indice["vocabulario"]))
+    for token, cantidad in Counter(tokenizar(texto)).items():
+        columna = indice["vocabulario"].get(token)
+        if columna is not None:
+            vector[columna] = (1 + math.log(cantidad)) * indice["idf"][columna]
+    norma = np.linalg.norm(vector)
+    if norma:
+        vector /= norma
+
+    with _lock:
+        _vectores[clave] = vector
+        while len(_vectores) > MAX_VECTORES_CACHE:
+            _vectores.popitem(last=False)
+    return vector
+
+
+def puntuar_temas(texto: str, lista_temas: List[str], tema_default: Optional[str] = None, paths: Optional[List[str]] = None) -> List[Tuple[str, float]]:
+    """
+    Puntaje de cada tema (similitud con su ejemplo más cercano), de mayor a menor.
+    """
+    indice = obtener_indice(lista_temas, tema_default, paths)
+    similitudes = indice["matriz"] @ vectorizar(indice, texto)
+    puntajes = np.zeros(len(indice["temas"]))
+    np.maximum.at(puntajes, indice["etiquetas"], similitudes)
+    orden = np.argsort(-puntajes)
+    return [(indice["temas"][i], float(puntajes[i])) for i in orden]
+
+
+def tema_mas_probable(texto: str, lista_temas: List[str], tema_default: Optional[str] = None) -> Optional[str]:
+    """
+    Tema con mayor similitud si supera SIMILITUD_MINIMA (sin exigir margen). Se usa como
+    señal de confianza en la cascada de modelos.
+    """
+    if not texto or not lista_temas:
+        return None
+    tema, puntaje = puntuar_temas(texto, lista_temas, tema_default)[0]
+    return tema if puntaje >= SIMILITUD_MINIMA else None
+
+
+def clasificar_tema_local(
+    texto: str,
+    lista_temas: List[str],
+    tema_default: Optional[str] = None,
+    margen_minimo: Optional[float] = None,
+    paths: Optional[List[str]] = None,
+) -> Optional[str]:
+    """
+    Asigna el tema por vecino más cercano si la confianza alcanza.
+
+    Args:
+        texto (str): Texto plano de la noticia
+        lista_temas (list): Temas disponibles
+        tema_default (str, optional): Tema genérico, también candidato
+        margen_minimo (float, optional): Diferencia mínima entre el mejor y el segundo tema (default MARGEN_MINIMO)
+
+    Returns:
+        str: Tema asignado, o None si la confianza es baja (hay que consultar al LLM)
+    """
+    try:
+        if not texto or not lista_temas:
+            return None
+        t0 = time.perf_counter()
+        margen_minimo = MARGEN_MINIMO if margen_minimo is None else margen_minimo
+        puntajes = puntuar_temas(texto, lista_temas, tema_default, paths)
+        mejor_tema, mejor = puntajes[0]
+        segundo = puntajes[1][1] if len(puntajes) > 1 else 0.0
+        ms = (time.perf_counter() - t0) * 1000
+
+        if mejor >= SIMILITUD_MINIMA and mejor - segundo >= margen_minimo:
+            logging.info(f"Tema: Local -> {mejor_tema} (similitud {mejor:.2f}, margen {mejor - segundo:.2f}, {ms:.1f} ms)")
+            return mejor_tema
+        logging.info(f"🧭 Tema local con baja confianza ({mejor_tema}: {mejor:.2f}, margen {mejor - segundo:.2f}), se consulta al LLM")
+        return None
+    except Exception as e:
+        logging.error(f"❌ Error en clasificador local de temas: {e}")
+        return None
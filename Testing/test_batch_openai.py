@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Test del modo batch: JSONL con los requests de los clasificadores, cliente local basado en
+archivos, fallas parciales, reintento de fallidos y reproceso del store
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+import tempfile
+
+import O_Utils_Batch as Batch
+import Z_Utils_Articulos as Art
+
+URL_BASE = "https://culturagcba.clientes.ejes.com/noticia_completa.cfm?id="
+TEMAS = ["Teatro", "Cine"]
+
+ARTICULOS = [
+    {'LINK': f"{URL_BASE}1", 'TEXTO_PLANO': "Denuncian el cierre del teatro por falta de fondos"},
+    {'LINK': f"{URL_BASE}2", 'TEXTO_PLANO': "Agenda: sábado cine, domingo teatro"},
+    {'LINK': f"{URL_BASE}3", 'TEXTO_PLANO': "Estreno de cine nacional"},
+]
+
+def _responder(fallar=()):
+    """Respuestas simuladas según el texto de cada request"""
+    def responder(body):
+        prompt = body["messages"][-1]["content"]
+        nombre = body["response_format"]["json_schema"]["name"]
+        if any(f in prompt for f in fallar) and nombre == "agenda":
+            raise RuntimeError("rate limit")
+        if nombre == "valoracion":
+            respuesta = "NEGATIVA" if "Denuncian" in prompt else "NO_NEGATIVA"
+        elif nombre == "tema":
+            respuesta = "Teatro" if "teatro" in prompt.split("NOTICIA A ANALIZAR")[-1] else "Cine"
+        elif nombre == "agenda":
+            respuesta = "SI" if "Agenda:" in prompt else "NO"
+        else:
+            respuesta = "NO"
+        return json.dumps({"respuesta": respuesta})
+    return responder
+
+def test_armar_lineas():
+    lineas, manifiesto = Batch.armar_lineas(ARTICULOS[:1], lista_temas=TEMAS, tema_default="Actividades",
+                                            ministro_key_words=["Ricardes"])
+    subtareas = sorted(m["subtarea"] for m in manifiesto.values())
+    assert subtareas == ["agenda", "declaracion", "entrevista", "tema", "valoracion"]
+    assert all(l["url"] == "/v1/chat/completions" and "response_format" in l["body"] for l in lineas)
+    assert len({l["custom_id"] for l in lineas}) == len(lineas)
+
+def test_batch_con_falla_parcial_y_reintento():
+    with tempfile.TemporaryDirectory() as tmp:
+        cliente = Batch.ClienteLocal(os.path.join(tmp, 'cliente'), _responder(fallar=["Estreno"]))
+        lineas, manifiesto = Batch.armar_lineas(ARTICULOS, lista_temas=TEMAS, tema_default="Actividades")
+        config = {"tema_default": "Actividades"}
+        batch_id = Batch.enviar_lote(lineas, manifiesto, cliente, config, batch_dir=tmp)
+        assert Batch.esperar_lote(batch_id, cliente, intervalo_seg=0)["status"] == "completed"
+
+        respuestas, errores = Batch.leer_resultados(batch_id, cliente, batch_dir=tmp)
+        assert list(errores) == ["2|agenda"]
+        resultados = Batch.combinar_resultados(manifiesto, respuestas, config)
+        assert resultados[f"{URL_BASE}1"] == {'VALORACION': 'NEGATIVA', 'TIPO PUBLICACION': 'Nota', 'TEMA': 'Teatro', '_PENDIENTES': []}
+        assert resultados[f"{URL_BASE}2"]['TIPO PUBLICACION'] == 'Agenda'
+        assert resultados[f"{URL_BASE}2"]['TEMA'] == 'Actividades'  # Agenda → tema_default
+        assert resultados[f"{URL_BASE}3"]['TIPO PUBLICACION'] is None
+        assert resultados[f"{URL_BASE}3"]['_PENDIENTES'] == ['agenda']
+
+        # Reintento solo de lo fallido, combinando con lo que ya había
+        cliente.responder = _responder()
+        nuevo_id = Batch.reintentar_fallidos(batch_id, errores, cliente, batch_dir=tmp)
+        respuestas_reintento, errores_reintento = Batch.leer_resultados(nuevo_id, cliente, batch_dir=tmp)
+        assert errores_reintento == {} and list(respuestas_reintento) == ["2|agenda"]
+        resultados = Batch.combinar_resultados(manifiesto, {**respuestas, **respuestas_reintento}, config)
+        assert resultados[f"{URL_BASE}3"]['TIPO PUBLICACION'] == 'Nota'
+
+def test_reprocesar_store():
+    with tempfile.TemporaryDirectory() as tmp:
+        db = os.path.join(tmp, 'articulos.db')
+        registros = [{**a, 'VALORACION': 'REVISAR MANUAL', 'TEMA': 'REVISAR MANUAL'} for a in ARTICULOS]
+        Art.guardar_articulos(registros, 'Ollama:llama3.1:8b', 'v1', 'huella-x', db)
+
+        cliente = Batch.ClienteLocal(os.path.join(tmp, 'cliente'), _responder())
+        resumen = Batch.reprocesar_store(cliente, tareas=['valoracion', 'tema'], lista_temas=TEMAS,
+                                         tema_default="Actividades", db_path=db, batch_dir=tmp, intervalo_seg=0)
+        assert resumen["actualizados"] == 3 and resumen["pendientes"] == 0 and resumen["fallidos"] == 0
+
+        por_link = {r['LINK']: r for r in Art.listar_articulos(db)}
+        assert por_link[f"{URL_BASE}1"]['VALORACION'] == 'NEGATIVA'
+        assert por_link[f"{URL_BASE}3"]['VALORACION'] == 'NEUTRA'  # NO_NEGATIVA sin key words
+        assert por_link[f"{URL_BASE}3"]['TEMA'] == 'Cine'
+        assert por_link[f"{URL_BASE}3"]['_MODELO'] == 'GPT:gpt-4o'
+        # Se guarda con la huella de la configuración del reproceso, no con la del registro
+        assert por_link[f"{URL_BASE}3"]['_HUELLA'] not in ('huella-x', None)
+
+def test_reprocesar_store_fallidos_y_huella():
+    with tempfile.TemporaryDirectory() as tmp:
+        db = os.path.join(tmp, 'articulos.db')
+        registros = [{**a, 'VALORACION': 'REVISAR MANUAL', 'TEMA': 'REVISAR MANUAL'} for a in ARTICULOS]
+        Art.guardar_articulos(registros[:2], 'Ollama:llama3.1:8b', 'v1', 'huella-x', db)
+        Art.guardar_articulos(registros[2:], 'Ollama:llama3.1:8b', 'v1', 'huella-y', db)
+
+        # Solo los registros con la huella indicada; el que falla conserva su registro anterior
+        cliente = Batch.ClienteLocal(os.path.join(tmp, 'cliente'), _responder(fallar=["Agenda:"]))
+        resumen = Batch.reprocesar_store(cliente, tareas=['valoracion', 'tipo'], lista_temas=TEMAS, db_path=db,
+                                         batch_dir=tmp, intervalo_seg=0, huella_config='huella-x')
+        assert resumen["actualizados"] == 1 and resumen["pendientes"] == 1 and resumen["fallidos"] == 1
+
+        por_link = {r['LINK']: r for r in Art.listar_articulos(db)}
+        assert por_link[f"{URL_BASE}1"]['VALORACION'] == 'NEGATIVA'
+        assert por_link[f"{URL_BASE}1"]['_MODELO'] == 'GPT:gpt-4o' and por_link[f"{URL_BASE}1"]['_HUELLA'] == 'huella-x'
+        assert por_link[f"{URL_BASE}2"]['VALORACION'] == 'REVISAR MANUAL'
+        assert por_link[f"{URL_BASE}2"]['_MODELO'] == 'Ollama:llama3.1:8b'
+        assert por_link[f"{URL_BASE}3"]['_HUELLA'] == 'huella-y' and por_link[f"{URL_BASE}3"]['TEMA'] == 'REVISAR MANUAL'
+
+if __name__ == "__main__":
+    print("🧪 Test de modo batch")
+    print("=" * 50)
+    test_armar_lineas()
+    test_batch_con_falla_parcial_y_reintento()
+    test_reprocesar_store()
+    test_reprocesar_store_fallidos_y_huella()
+    print("✅ Todos los tests pasaron")
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Test de la cascada de modelos (Ollama primero, GPT-4o solo con baja confianza) y sus estadísticas
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import O_Utils_Cascada as Cascada
+
+def _contador():
+    llamadas = []
+    def caro(texto):
+        llamadas.append(texto)
+        return "NEGATIVA"
+    return caro, llamadas
+
+def test_acepta_si_las_senales_coinciden():
+    Cascada.reiniciar_estadisticas()
+    Cascada.AUDITORIA = 0.0
+    caro, llamadas = _contador()
+    resultado = Cascada.ejecutar('valoracion', "texto", lambda t: "NO_NEGATIVA", caro,
+                                 senales=[lambda t: "NO_NEGATIVA", lambda t: None])
+    assert resultado == "NO_NEGATIVA" and llamadas == []
+
+def test_escala_si_hay_discrepancia_o_respuesta_invalida():
+    Cascada.reiniciar_estadisticas()
+    Cascada.AUDITORIA = 0.0
+    caro, llamadas = _contador()
+    assert Cascada.ejecutar('valoracion', "a", lambda t: "NO_NEGATIVA", caro, senales=[lambda t: "NEGATIVA"]) == "NEGATIVA"
+    assert Cascada.ejecutar('valoracion', "b", lambda t: "OTRO", caro, senales=[lambda t: "OTRO"],
+                            validas=["NEGATIVA", "NO_NEGATIVA"]) == "NEGATIVA"
+    assert Cascada.ejecutar('valoracion', "c", lambda t: "NEGATIVA", caro) == "NEGATIVA"  # sin señales
+    assert llamadas == ["a", "b", "c"]
+
+    # Si el modelo caro falla (None) se conserva la respuesta barata
+    assert Cascada.ejecutar('valoracion', "d", lambda t: "NO_NEGATIVA", lambda t: None, senales=[lambda t: "NEGATIVA"]) == "NO_NEGATIVA"
+
+    estadisticas = Cascada.estadisticas()['valoracion']
+    print(f"📊 {estadisticas}")
+    assert estadisticas['total'] == 4 and estadisticas['escaladas'] == 4 and estadisticas['sin_senal'] == 1
+    assert estadisticas['acuerdo_escaladas'] == 1  # solo 'c' coincidió con GPT
+
+def test_ollama_caido_escala():
+    import Z_Utils_Breaker as Breaker
+    def caido(texto):
+        raise Breaker.CircuitoAbierto("Backend ollama no disponible (circuit breaker abierto)")
+    caro, llamadas = _contador()
+    assert Cascada.ejecutar('valoracion', "e", caido, caro, senales=[lambda t: "NEGATIVA"]) == "NEGATIVA"
+    assert llamadas == ["e"]
+    # Si el modelo caro tampoco responde, el backend caído se propaga (no hay etiqueta que devolver)
+    try:
+        Cascada.ejecutar('valoracion', "f", caido, lambda t: None)
+        assert False, "debería lanzar CircuitoAbierto"
+    except Breaker.CircuitoAbierto:
+        pass
+
+def test_auditoria_estima_precision():
+    Cascada.reiniciar_estadisticas()
+    Cascada.AUDITORIA = 1.0
+    try:
+        caro, llamadas = _contador()
+        Cascada.ejecutar('tipo', "x", lambda t: "NEGATIVA", caro, senales=[lambda t: "NEGATIVA"])
+        Cascada.ejecutar('tipo', "y", lambda t: "NO_NEGATIVA", caro, senales=[lambda t: "NO_NEGATIVA"])
+        estadisticas = Cascada.estadisticas()['tipo']
+        assert estadisticas['tasa_escalada'] == 0 and estadisticas['auditadas'] == 2
+        assert estadisticas['precision_estimada_aceptadas'] == 0.5
+    finally:
+        Cascada.AUDITORIA = 0.05
+
+def test_valorar_con_ia_en_cascada():
+    """Con la política 'cascada' la valoración pasa primero por Ollama"""
+    import O_Utils_GPT as Gpt
+    import O_Utils_Ollama as Oll
+    originales = (Oll.valorar_noticia_con_ollama_base, Gpt.valorar_noticia_con_gpt, Cascada.POLITICAS['valoracion'])
+    modelos = []
+    Oll.valorar_noticia_con_ollama_base = lambda t, actores=None: modelos.append("ollama") or "NEGATIVA"
+    Gpt.valorar_noticia_con_gpt = lambda t, api_key=None, modelo=None, actores=None: modelos.append(modelo) or "NO_NEGATIVA"
+    senal_original = Cascada.senal_disponible
+    Cascada.POLITICAS['valoracion'] = Cascada.POLITICA_CASCADA
+    Cascada.AUDITORIA = 0.0
+    try:
+        # Sin modelo local entrenado no hay señal: se usa 'switch' (solo GPT) en lugar de consultar a los dos
+        Cascada.senal_disponible = lambda tarea: False
+        assert not Cascada.activa('valoracion')
+        assert Gpt.valorar_con_ia("Denuncian problemas", gpt_active=True) == "NEUTRA"
+        assert modelos == [None]
+
+        # Con señal disponible (pero sin opinión para este texto) se escala
+        modelos.clear()
+        Cascada.senal_disponible = lambda tarea: True
+        assert Gpt.valorar_con_ia("Denuncian problemas", gpt_active=True) == "NEUTRA"
+        assert modelos == ["ollama", "gpt-4o"]
+    finally:
+        Oll.valorar_noticia_con_ollama_base, Gpt.valorar_noticia_con_gpt, Cascada.POLITICAS['valoracion'] = originales
+        Cascada.senal_disponible = senal_original
+        Cascada.AUDITORIA = 0.05
+
+def test_fallback_de_ollama_escala():
+    """La etiqueta por defecto de Ollama ante un error no se acepta aunque coincida con la señal"""
+    import O_Utils_Ollama as Oll
+    Cascada.AUDITORIA = 0.0
+    original = Oll._clasificar_con_esquema
+    def timeout(*args, **kwargs):
+        raise TimeoutError("Ollama no respondió")
+    Oll._clasificar_con_esquema = timeout
+    try:
+        caro, llamadas = _contador()
+        resultado = Cascada.ejecutar('valoracion', "g", lambda t: Oll.valorar_noticia_con_ollama_base(t), caro,
+                                     senales=[lambda t: "NO_NEGATIVA"], validas=["NEGATIVA", "NO_NEGATIVA"])
+        assert resultado == "NEGATIVA" and llamadas == ["g"]
+    finally:
+        Oll._clasificar_con_esquema = original
+        Cascada.AUDITORIA = 0.05
+
+def test_config_rechaza_cascada_sin_senal():
+    import api_flask
+    cliente = api_flask.app.test_client()
+    headers = {"X-API-Key": api_flask.VALID_TOKENS[0]}
+    senal_original, politicas = Cascada.senal_disponible, dict(Cascada.POLITICAS)
+    Cascada.senal_disponible = lambda tarea: tarea == 'tema'
+    try:
+        respuesta = cliente.post('/config/cascada', json={"politicas": {"valoracion": "cascada"}}, headers=headers)
+        assert respuesta.status_code == 400 and "valoracion" in respuesta.get_json()["error"]
+        assert Cascada.POLITICAS['valoracion'] == politicas['valoracion']
+        respuesta = cliente.post('/config/cascada', json={"politicas": {"tema": "cascada"}}, headers=headers)
+        assert respuesta.status_code == 200 and Cascada.POLITICAS['tema'] == Cascada.POLITICA_CASCADA
+    finally:
+        Cascada.senal_disponible = senal_original
+        Cascada.POLITICAS.update(politicas)
+
+if __name__ == "__main__":
+    print("🧪 Test de cascada de modelos")
+    print("=" * 50)
+    test_acepta_si_las_senales_coinciden()
+    test_escala_si_hay_discrepancia_o_respuesta_invalida()
+    test_ollama_caido_escala()
+    test_auditoria_estima_precision()
+    test_valorar_con_ia_en_cascada()
+    test_fallback_de_ollama_escala()
+    test_config_rechaza_cascada_sin_senal()
+    print("✅ Todos los tests pasaron")
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Test de circuit breakers: apertura por tasa de fallas, falla rápida con el backend caído,
+llamada de prueba en semiabierto y REVISAR MANUAL sin backends disponibles
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import time
+import types
+
+import requests
+
+import Z_Utils as Z
+import Z_Utils_Breaker as Breaker
+import Z_Utils_Deadline as Plazos
+import O_Utils_Ollama as Ollama
+
+def test_apertura_y_semiabierto():
+    breaker = Breaker.Breaker('prueba', ventana=10, minimo_llamadas=4, tasa_fallas=0.5, espera_seg=0.05)
+    breaker.registrar_exito()
+    breaker.registrar_exito()
+    breaker.registrar_falla("timeout")
+    assert breaker.estado()["estado"] == Breaker.CERRADO  # Menos llamadas que el mínimo
+    breaker.registrar_falla("timeout")
+    assert breaker.estado()["estado"] == Breaker.ABIERTO
+    assert breaker.permitir() is False
+    # Pasada la espera se deja pasar una sola llamada de prueba
+    time.sleep(0.06)
+    assert breaker.permitir() is True
+    assert breaker.permitir() is False
+    breaker.registrar_falla("HTTP 503")
+    assert breaker.estado()["estado"] == Breaker.ABIERTO
+    time.sleep(0.06)
+    assert breaker.permitir() is True
+    breaker.registrar_exito()
+    assert breaker.estado()["estado"] == Breaker.CERRADO
+
+def test_ollama_falla_rapido():
+    original = Ollama.Http
+    llamadas = []
+    def post(url, **kwargs):
+        llamadas.append(url)
+        raise requests.ConnectionError("Connection refused")
+    Ollama.Http = types.SimpleNamespace(sesion=lambda nombre: types.SimpleNamespace(post=post))
+    Breaker.reiniciar()
+    try:
+        for _ in range(Breaker.MINIMO_LLAMADAS):
+            assert Ollama.es_agenda_ollama("Sábado teatro, domingo cine") is False
+        assert Breaker.get('ollama').abierto()
+        # Con el breaker abierto no se hacen más requests ni se devuelve la etiqueta por defecto
+        try:
+            Ollama.es_agenda_ollama("Sábado teatro, domingo cine")
+            assert False, "debería lanzar CircuitoAbierto"
+        except Breaker.CircuitoAbierto:
+            pass
+        assert len(llamadas) == Breaker.MINIMO_LLAMADAS
+        assert Breaker.estado()['ollama']['rechazadas'] == 1
+
+        # Sin backends disponibles: REVISAR MANUAL y el artículo queda como incompleto
+        url = "https://culturagcba.clientes.ejes.com/noticia_completa.cfm?id=1"
+        with Plazos.activar(Plazos.Plazo(60)) as plazo:
+            resultado = Z.marcar_o_valorar_con_ia("texto", lambda t: "NEGATIVA", 1000, url, ['ollama'])
+            assert resultado == "REVISAR MANUAL"
+            assert "ollama" in plazo.incompletos[url]
+
+        # El backend cae sin que se hayan listado sus breakers: tampoco queda una etiqueta por defecto
+        with Plazos.activar(Plazos.Plazo(60)) as plazo:
+            resultado = Z.marcar_o_valorar_con_ia("texto", Ollama.detectar_factor_politico_con_ollama, 1000, url)
+            assert resultado == "REVISAR MANUAL"
+            assert "ollama" in plazo.incompletos[url]
+    finally:
+        Ollama.Http = original
+        Breaker.reiniciar()
+
+if __name__ == "__main__":
+    print("🧪 Test de circuit breakers")
+    print("=" * 50)
+    test_apertura_y_semiabierto()
+    test_ollama_falla_rapido()
+    print("✅ Todos los tests pasaron")
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Test de la extracción del contenido principal: páginas sin span.detalleFull pierden menús,
+pie, scripts y bloques repetidos; las de ejes.com (con detalleFull) no cambian
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Z_Utils as Z
+import Z_Utils_Contenido as Contenido
+import Z_Utils_Paralelo as Paralelo
+
+MENU = "".join(f'<li><a href="/seccion/{i}">Sección {i}</a></li>' for i in range(40))
+PARRAFOS = "".join(
+    f"<p>La Ministra de Cultura, Gabriela Ricardes, presentó el programa número {i}, que incluye talleres, "
+    f"visitas guiadas y funciones gratuitas en los teatros de la ciudad durante todo el mes.</p>"
+    for i in range(6)
+)
+PAGINA = (
+    '<html><head><title>Nueva temporada en los teatros</title><style>.nota { color: red; }</style></head><body>'
+    f'<header><nav><ul>{MENU}</ul></nav></header>'
+    '<div class="compartir-redes"><a href="#">Compartir en Facebook</a> <a href="#">Compartir en X</a></div>'
+    f'<div id="contenido-nota"><h1>Nueva temporada en los teatros</h1>{PARRAFOS}'
+    '<p>Suscribite al newsletter para recibir la agenda.</p></div>'
+    '<div class="relacionadas"><p>Otra nota relacionada con un título bastante largo para confundir</p></div>'
+    '<script>var tracking = "no debería aparecer en el texto";</script>'
+    f'<footer><p>Todos los derechos reservados. Redacción: Av. Siempre Viva 123, Buenos Aires.</p>{MENU}</footer>'
+    '</body></html>'
+).encode('utf-8')
+
+
+def test_extrae_el_cuerpo_sin_boilerplate():
+    Contenido.reiniciar_estadisticas()
+    texto = Z.texto_plano_desde_html(PAGINA, 'utf-8')
+    assert texto.startswith("[TÍTULO]: Nueva temporada en los teatros\n[BODY]: Nueva temporada en los teatros\n")
+    assert "presentó el programa número 5" in texto
+    for boilerplate in ("Sección 12", "Compartir en Facebook", "derechos reservados", "tracking", "nota relacionada"):
+        assert boilerplate not in texto, boilerplate
+
+    estadisticas = Contenido.estadisticas()["extractor"]
+    assert estadisticas["textos"] == 1
+    assert estadisticas["chars_finales"] < estadisticas["chars_originales"]
+    assert estadisticas["reduccion"] > 0.3
+
+
+def test_bloques_repetidos_y_espacios():
+    parrafo = "<p>El Ministerio de Cultura   anunció\n\n la reapertura del museo, con entrada libre y gratuita.</p>"
+    pagina = f"<html><body><article>{parrafo * 3}<p>EL MINISTERIO DE CULTURA ANUNCIÓ la reapertura del museo, con entrada libre y gratuita.</p>" \
+             f"<p>Las visitas serán de martes a domingo, de 11 a 19, y habrá recorridos guiados por la colección.</p>" \
+             f"<p>La muestra reúne obras de artistas argentinos del siglo XX, con préstamos de colecciones privadas.</p></article></body></html>"
+    texto = Z.texto_plano_desde_html(pagina.encode('utf-8'), 'utf-8')
+    assert texto.count("reapertura del museo") == 1
+    assert "Cultura anunció la reapertura" in texto
+    assert "de martes a domingo" in texto
+
+
+def test_pagina_con_detalle_full_sin_cambios():
+    pagina = (
+        '<html><head><title>T</title></head><body><nav>Menú</nav><span class="titulo">Título</span>'
+        '<span class="detalleFull">La Ministra   inauguró\n la muestra.</span></body></html>'
+    ).encode('utf-8')
+    assert Z.texto_plano_desde_html(pagina, 'utf-8') == "[TÍTULO]: Título\n[BODY]: La Ministra inauguró la muestra."
+
+
+def test_pagina_sin_parrafos_usa_el_texto_completo():
+    pagina = b"<html><body><div>Solo un texto corto sin estructura</div></body></html>"
+    assert Z.texto_plano_desde_html(pagina, 'utf-8') == "Solo un texto corto sin estructura"
+
+
+def test_cuentas_de_los_workers():
+    Contenido.reiniciar_estadisticas()
+    anterior = dict(Paralelo.CONFIG)
+    Paralelo.configurar(2, 2)
+    try:
+        textos = Paralelo.extraer_textos([(PAGINA, 'utf-8')] * 3)
+        assert textos == [Z.texto_plano_desde_html(PAGINA, 'utf-8')] * 3
+    finally:
+        Paralelo.cerrar()
+        Paralelo.CONFIG.update(anterior)
+    # 3 páginas parseadas en los workers + 1 en este proceso (la comparación)
+    assert Contenido.estadisticas()["extractor"]["textos"] == 4
+
+
+if __name__ == "__main__":
+    print("🧪 Test de extracción del contenido principal")
+    print("=" * 50)
+    test_extrae_el_cuerpo_sin_boilerplate()
+    test_bloques_repetidos_y_espacios()
+    test_pagina_con_detalle_full_sin_cambios()
+    test_pagina_sin_parrafos_usa_el_texto_completo()
+    test_cuentas_de_los_workers()
+    print("✅ Todos los tests pasaron")
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Test de la detección de crisis incremental (contadores por tema y día en SQLite)
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tempfile
+import pandas as pd
+
+import Z_Utils_Crisis as Crisis
+
+HISTORICO_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "DataCollected", "noticias_historicas.xlsx")
+
+def _lote(links, tema, fecha, valoracion='NEGATIVA'):
+    return pd.DataFrame({
+        'LINK': links,
+        'TEMA': [tema] * len(links),
+        'FECHA': [fecha] * len(links),
+        'VALORACION': [valoracion] * len(links),
+    })
+
+def test_ventana_y_umbral():
+    """Un tema entra en crisis con 5 negativas dentro de la ventana y sale cuando quedan afuera"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = os.path.join(tmp, 'crisis.db')
+        Crisis.registrar_lote(_lote([f"https://ejes.com/a{i}" for i in range(3)], 'Mecenazgo', '2025-06-01'), db)
+        Crisis.registrar_lote(_lote([f"https://ejes.com/b{i}" for i in range(2)], 'Mecenazgo', '2025-06-05'), db)
+
+        assert Crisis.temas_en_crisis(dias=7, umbral=5, fecha_ref='2025-06-05', db_path=db) == ['Mecenazgo']
+        assert Crisis.temas_en_crisis(dias=3, umbral=5, fecha_ref='2025-06-05', db_path=db) == []
+        assert Crisis.conteo_negativas_por_tema(dias=3, fecha_ref='2025-06-05', db_path=db) == {'Mecenazgo': 2}
+
+def test_idempotencia_y_reclasificacion():
+    """Reenviar una noticia no duplica conteos; reclasificarla mueve su conteo"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = os.path.join(tmp, 'crisis.db')
+        lote = _lote(["https://ejes.com/x1", "https://ejes.com/x2"], 'BAFICI', '2025-06-01')
+        assert Crisis.registrar_lote(lote, db) == 2
+        assert Crisis.registrar_lote(lote, db) == 0
+
+        lote.loc[0, 'VALORACION'] = 'NEUTRA'
+        assert Crisis.registrar_lote(lote, db) == 1
+        assert Crisis.conteo_negativas_por_tema(dias=1, fecha_ref='2025-06-01', db_path=db) == {'BAFICI': 1}
+
+def test_temas_fijos_excluidos():
+    with tempfile.TemporaryDirectory() as tmp:
+        db = os.path.join(tmp, 'crisis.db')
+        Crisis.registrar_lote(_lote([f"l{i}" for i in range(6)], 'Actividades programadas', '2025-06-01'), db)
+        assert Crisis.temas_en_crisis(dias=1, umbral=5, fecha_ref='2025-06-01', db_path=db) == []
+
+def test_marcar_sin_registrar():
+    """marcar_crisis(registrar=False) marca con el store actual sin sumar el lote"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = os.path.join(tmp, 'crisis.db')
+        Crisis.registrar_lote(_lote([f"https://ejes.com/m{i}" for i in range(5)], 'Mecenazgo', '2025-06-05'), db)
+        lote = _lote(["https://ejes.com/m0", "https://ejes.com/n1"], 'Mecenazgo', '2025-06-05')
+        lote.loc[1, 'TEMA'] = 'BAFICI'
+        marcado = Crisis.marcar_crisis(lote, dias=3650, umbral=5, db_path=db, registrar=False)
+        assert marcado['CRISIS'].tolist() == ['SI', 'NO']
+        assert Crisis.conteo_negativas_por_tema(dias=3650, fecha_ref='2030-01-01', db_path=db) == {'Mecenazgo': 5}
+
+def test_importar_historico():
+    """El histórico de prueba se importa una vez y se consulta por ventana"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = os.path.join(tmp, 'crisis.db')
+        registradas = Crisis.importar_historico(HISTORICO_PATH, db)
+        assert registradas > 0
+        conteos = Crisis.conteo_negativas_por_tema(dias=3650, fecha_ref='2030-01-01', db_path=db)
+        print(f"📊 Negativas por tema en el histórico: {conteos}")
+        assert sum(conteos.values()) > 0
+
+def test_endpoint_fecha_invalida():
+    """GET /crisis valida la fecha de referencia (400 si no es YYYY-MM-DD), dias y umbral"""
+    import api_flask
+    cliente = api_flask.app.test_client()
+    db_original = Crisis.CRISIS_DB_PATH
+    with tempfile.TemporaryDirectory() as tmp:
+        Crisis.CRISIS_DB_PATH = os.path.join(tmp, 'crisis.db')
+        try:
+            Crisis.registrar_lote(_lote([f"https://ejes.com/c{i}" for i in range(5)], 'Mecenazgo', '2025-06-05'))
+            for fecha in ("05/06/2025", "2025-13-01", "ayer", "2025-06-05T00:00"):
+                respuesta = cliente.get(f"/crisis?fecha={fecha}")
+                assert respuesta.status_code == 400, fecha
+                assert "YYYY-MM-DD" in respuesta.get_json()["error"]
+
+            # dias y umbral inválidos no caen en silencio a los valores por defecto
+            for parametros in ("dias=siete", "umbral=5.5", "dias=0", "umbral=-1", "dias="):
+                respuesta = cliente.get(f"/crisis?{parametros}")
+                assert respuesta.status_code == 400, parametros
+                assert "enteros positivos" in respuesta.get_json()["error"]
+
+            respuesta = cliente.get("/crisis?fecha=2025-06-07&dias=7&umbral=5")
+            assert respuesta.status_code == 200
+            assert respuesta.get_json()["temas_en_crisis"] == ["Mecenazgo"]
+        finally:
+            Crisis.CRISIS_DB_PATH = db_original
+
+if __name__ == "__main__":
+    print("🧪 Test de crisis incremental")
+    print("=" * 50)
+    test_ventana_y_umbral()
+    test_idempotencia_y_reclasificacion()
+    test_temas_fijos_excluidos()
+    test_marcar_sin_registrar()
+    test_importar_historico()
+    test_endpoint_fecha_invalida()
+    print("✅ Todos los tests pasaron")
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Test de salidas estructuradas: los requests llevan el esquema (OpenAI response_format / Ollama format)
+y las respuestas se leen del JSON sin reintentos con otro modelo
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+import types
+
+import O_Utils_Esquemas as Esq
+import O_Utils_GPT as GPT
+import O_Utils_Ollama as Ollama
+
+class _Respuesta:
+    status_code = 200
+    def __init__(self, cuerpo):
+        self._cuerpo = cuerpo
+    def json(self):
+        return self._cuerpo
+    def iter_lines(self):
+        yield json.dumps({**self._cuerpo, "done": True})
+    def close(self):
+        pass
+
+def _fake_http(respuestas, enviados):
+    """Reemplazo de las sesiones HTTP que registra los payloads y devuelve las respuestas en orden"""
+    def post(url, json=None, **kwargs):
+        enviados.append((url, json))
+        return _Respuesta(respuestas.pop(0))
+    return types.SimpleNamespace(sesion=lambda nombre: types.SimpleNamespace(post=post, get=None))
+
+def _openai(etiqueta):
+    return {"choices": [{"message": {"content": json.dumps({"respuesta": etiqueta})}}]}
+
+def test_esquemas_y_lectura():
+    esquema = Esq.esquema_tema(["Teatro", "Cine"], "Actividades")
+    assert Esq.etiquetas(esquema) == ["Teatro", "Cine", "Actividades"]
+    assert Esq.leer_respuesta('{"respuesta": "Cine"}', esquema) == "Cine"
+    assert Esq.leer_respuesta('{"respuesta": "Danza"}', esquema) is None
+    assert Esq.leer_respuesta('Cine', esquema) is None
+    assert Esq.max_tokens(esquema) > Esq.max_tokens(Esq.ESQUEMA_SI_NO)
+    # Tildes y nombres raros no truncan el JSON: un token por byte de la etiqueta escapada
+    tema = "Música en el Colón – ñandú"
+    assert Esq.max_tokens(Esq.esquema_tema([tema], "Otros")) >= Esq.TOKENS_ENVOLTORIO + len(json.dumps(tema))
+    assert Esq.instruccion_opciones(["SI", "NO"]) == 'un JSON {"respuesta": "SI"} o {"respuesta": "NO"}'
+    assert Esq.response_format_openai("tema", esquema, "gpt-4o")["json_schema"]["strict"] is True
+    assert Esq.response_format_openai("tema", esquema, "gpt-3.5-turbo") == {"type": "json_object"}
+
+def test_gpt_envia_esquema_sin_fallback():
+    originales = (GPT.Http, GPT.leer_api_key_desde_env, GPT._fallback_a_ollama_entrevista)
+    enviados, fallbacks = [], []
+    GPT.Http = _fake_http([_openai("SI"), _openai("Cine"), _openai("QUIZAS")], enviados)
+    GPT.leer_api_key_desde_env = lambda: "sk-test"
+    GPT._fallback_a_ollama_entrevista = lambda texto: fallbacks.append(texto) or True
+    try:
+        assert GPT.es_entrevista_con_gpt("–¿Cómo empezó? –Hace años...") is True
+        formato = enviados[0][1]["response_format"]
+        assert formato["type"] == "json_schema" and formato["json_schema"]["schema"] == Esq.ESQUEMA_SI_NO
+
+        tema = GPT.clasificar_tema_con_gpt("Estreno en el cine", ["Teatro", "Cine"], tema_default="Actividades")
+        assert tema == "Cine"
+        assert enviados[1][1]["response_format"]["json_schema"]["schema"]["properties"]["respuesta"]["enum"] == ["Teatro", "Cine", "Actividades"]
+
+        # Una respuesta fuera del esquema no dispara una segunda llamada a Ollama
+        assert GPT.es_entrevista_con_gpt("texto") is False
+        assert fallbacks == [] and len(enviados) == 3
+    finally:
+        GPT.Http, GPT.leer_api_key_desde_env, GPT._fallback_a_ollama_entrevista = originales
+
+def test_ollama_envia_format():
+    original = Ollama.Http
+    enviados = []
+    Ollama.Http = _fake_http([
+        {"response": '{"respuesta": "NEGATIVA"}'},
+        {"response": '{"respuesta": "SI"}'},
+        {"response": '{"respuesta": "Cine"}'},
+    ], enviados)
+    try:
+        assert Ollama.valorar_noticia_con_ollama_base("Denuncian cierre del teatro") == "NEGATIVA"
+        assert Ollama.detectar_factor_politico_con_ollama("Campaña electoral") == "SI"
+        assert Ollama._promptear_clasificacion_tema_ollama("Estreno", ["Teatro", "Cine"], "Actividades") == "Cine"
+        for _, payload in enviados:
+            assert payload["format"]["required"] == ["respuesta"]
+            assert '{"respuesta": ' in payload["prompt"]
+            assert payload["options"]["num_predict"] <= 2 * Esq.max_tokens(payload["format"])
+    finally:
+        Ollama.Http = original
+
+if __name__ == "__main__":
+    print("🧪 Test de salidas estructuradas")
+    print("=" * 50)
+    test_esquemas_y_lectura()
+    test_gpt_envia_esquema_sin_fallback()
+    test_ollama_envia_format()
+    print("✅ Todos los tests pasaron")
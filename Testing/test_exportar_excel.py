@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Test del export a Excel en modo streaming (xlsxwriter constant_memory / openpyxl write_only)
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tempfile
+import time
+import pandas as pd
+from openpyxl import load_workbook
+
+import Z_Utils as Z
+
+def _df_de_prueba(filas=3):
+    return pd.DataFrame({
+        'TITULO': [f"Noticia {i}" for i in range(filas)],
+        'FECHA': pd.to_datetime(['2025-06-01'] * filas),
+        'MENCIONES': [['Gabriela Ricardes'] if i % 2 == 0 else [] for i in range(filas)],
+        'ALCANCE': [None if i % 3 == 0 else 1000 * i for i in range(filas)],
+        'TEXTO_PLANO': ["x" * (10 + i) for i in range(filas)],
+    })
+
+def test_exportar_excel_motores():
+    """Ambos motores generan el mismo contenido, con encabezado y anchos acotados"""
+    df = _df_de_prueba()
+    with tempfile.TemporaryDirectory() as tmp:
+        for motor in ['xlsxwriter', 'openpyxl']:
+            ruta = os.path.join(tmp, motor, 'export.xlsx')
+            assert Z.exportar_df_a_excel(df, ruta, motor=motor)
+
+            df_leido = pd.read_excel(ruta)
+            assert list(df_leido.columns) == list(df.columns)
+            assert df_leido['MENCIONES'].tolist() == ["['Gabriela Ricardes']", "[]", "['Gabriela Ricardes']"]
+            assert pd.isnull(df_leido.loc[0, 'ALCANCE'])
+            assert df_leido.loc[0, 'FECHA'] == pd.Timestamp('2025-06-01')
+
+            ws = load_workbook(ruta).active
+            assert ws.cell(row=1, column=1).font.bold
+            assert ws.cell(row=2, column=1).border.left.style == 'thin'
+            assert abs(ws.column_dimensions['A'].width - (len('Noticia 0') + 2)) < 1  # xlsxwriter agrega padding
+            print(f"✅ {motor}: OK")
+
+def test_exportar_excel_textos_literales():
+    """Links y textos que empiezan con "=" se exportan como texto, sin hipervínculos ni fórmulas"""
+    df = pd.DataFrame({
+        'LINK': ["https://www.buenosaires.gob.ar/noticias/nota-1"],
+        'TITULO': ["=1+1"],
+    })
+    with tempfile.TemporaryDirectory() as tmp:
+        for motor in ['xlsxwriter', 'openpyxl']:
+            ruta = os.path.join(tmp, f'{motor}.xlsx')
+            assert Z.exportar_df_a_excel(df, ruta, motor=motor)
+            ws = load_workbook(ruta).active
+            link, titulo = ws.cell(row=2, column=1), ws.cell(row=2, column=2)
+            assert link.value == "https://www.buenosaires.gob.ar/noticias/nota-1" and link.hyperlink is None
+            assert titulo.value == "=1+1" and titulo.data_type == 's'
+
+def test_exportar_excel_motor_invalido():
+    """Un motor desconocido no lanza excepción: loguea y devuelve False"""
+    with tempfile.TemporaryDirectory() as tmp:
+        assert not Z.exportar_df_a_excel(_df_de_prueba(), os.path.join(tmp, 'x.xlsx'), motor='csv')
+
+def main():
+    print("🧪 Test de export a Excel streaming")
+    print("=" * 50)
+    test_exportar_excel_motores()
+    test_exportar_excel_textos_literales()
+    test_exportar_excel_motor_invalido()
+
+    # Medición de tiempos con un lote grande
+    df = _df_de_prueba(5000)
+    df['TEXTO_PLANO'] = "Texto largo de la noticia " * 400
+    with tempfile.TemporaryDirectory() as tmp:
+        for motor in ['xlsxwriter', 'openpyxl']:
+            t0 = time.time()
+            Z.exportar_df_a_excel(df, os.path.join(tmp, f'{motor}.xlsx'), motor=motor)
+            print(f"⏱️ {motor}: {len(df)} filas en {time.time() - t0:.2f}s")
+
+if __name__ == "__main__":
+    main()
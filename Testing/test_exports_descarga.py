@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Test de exports por request: generación en segundo plano, descarga y política de retención
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import io
+import time
+import tempfile
+import pandas as pd
+
+import Z_Utils_Exports as Exp
+
+def _df_de_prueba():
+    return pd.DataFrame({'TITULO': ['Noticia 1', 'Noticia 2'], 'MENCIONES': [['Ricardes'], []]})
+
+def test_exports_no_se_pisan():
+    """Dos exports consecutivos generan archivos distintos y ambos quedan listos"""
+    with tempfile.TemporaryDirectory() as tmp:
+        Exp.EXPORTS_DIR = tmp
+        info_1 = Exp.programar_export_excel(_df_de_prueba(), "Noticias_Procesadas_Ollama")
+        info_2 = Exp.programar_export_excel(_df_de_prueba(), "Noticias_Procesadas_Ollama")
+        assert info_1['export_id'] != info_2['export_id']
+        assert info_1['ruta_completa'] != info_2['ruta_completa']
+
+        for info in (info_1, info_2):
+            estado = Exp.esperar_export(info['export_id'], timeout=30)
+            assert estado['estado'] == Exp.ESTADO_LISTO
+            assert os.path.exists(estado['ruta'])
+
+def test_exports_id_invalido():
+    """Ids con formato inválido (ej: path traversal) no se resuelven"""
+    assert Exp.obtener_export("../../etc/passwd") is None
+    assert Exp.obtener_export("0" * 32) is None
+
+def test_exports_retencion():
+    """La retención conserva solo los exports más nuevos"""
+    with tempfile.TemporaryDirectory() as tmp:
+        Exp.EXPORTS_DIR = tmp
+        ids = []
+        for i in range(3):
+            info = Exp.programar_export_excel(_df_de_prueba())
+            Exp.esperar_export(info['export_id'], timeout=30)
+            mtime = time.time() - 100 + i
+            os.utime(info['ruta_completa'], (mtime, mtime))
+            ids.append(info['export_id'])
+
+        eliminados = Exp.aplicar_politica_retencion(max_edad_seg=10 ** 12, max_archivos=1)
+        assert eliminados == 2
+        assert Exp.obtener_export(ids[0]) is None
+        assert Exp.obtener_export(ids[2])['estado'] == Exp.ESTADO_LISTO
+
+def test_registro_exports_con_error_vence():
+    """Los exports con error (sin archivo) salen del registro por antigüedad"""
+    import uuid
+    with tempfile.TemporaryDirectory() as tmp:
+        Exp.EXPORTS_DIR = tmp
+        viejo, nuevo = uuid.uuid4().hex, uuid.uuid4().hex
+        for export_id, creado in ((viejo, time.time() - 10 ** 6), (nuevo, time.time())):
+            with Exp._lock:
+                Exp._registro[export_id] = {
+                    "estado": Exp.ESTADO_ERROR, "ruta": Exp._ruta_export(export_id), "nombre": "x.xlsx",
+                    "creado": creado, "error": "No se pudo generar el archivo Excel", "future": None,
+                }
+        Exp.aplicar_politica_retencion(max_edad_seg=3600)
+        assert Exp.obtener_export(viejo) is None
+        assert Exp.obtener_export(nuevo)['estado'] == Exp.ESTADO_ERROR
+        with Exp._lock:
+            Exp._registro.pop(nuevo, None)
+
+def test_endpoint_descarga():
+    """GET /exports/<id> devuelve el archivo o 404"""
+    import api_flask
+    with tempfile.TemporaryDirectory() as tmp:
+        Exp.EXPORTS_DIR = tmp
+        info = Exp.programar_export_excel(_df_de_prueba())
+        Exp.esperar_export(info['export_id'], timeout=30)
+
+        client = api_flask.app.test_client()
+        resp = client.get(f"/exports/{info['export_id']}")
+        assert resp.status_code == 200
+        df = pd.read_excel(io.BytesIO(resp.data))
+        assert df['TITULO'].tolist() == ['Noticia 1', 'Noticia 2']
+        resp.close()
+
+        assert client.get("/exports/inexistente").status_code == 404
+
+if __name__ == "__main__":
+    print("🧪 Test de exports por request")
+    print("=" * 50)
+    test_exports_no_se_pisan()
+    test_exports_id_invalido()
+    test_exports_retencion()
+    test_registro_exports_con_error_vence()
+    test_endpoint_descarga()
+    print("✅ Todos los tests pasaron")
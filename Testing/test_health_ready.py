@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Test de readiness: sondeos de backends cacheados, /health/ready sin requests en el momento
+y 503 mientras falte un backend requerido
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import types
+import tempfile
+
+import Z_Utils_Health as Health
+import Z_Utils_Warmup as Warmup
+import api_flask
+
+class _Respuesta:
+    def __init__(self, status_code, cuerpo=None):
+        self.status_code = status_code
+        self._cuerpo = cuerpo or {}
+    def json(self):
+        return self._cuerpo
+
+def test_sondeos():
+    original = Health.requests
+    respuestas = {
+        "http://localhost:11434/api/tags": _Respuesta(200, {"models": [{"name": "llama3.1:8b"}]}),
+        "http://localhost:11434/api/ps": _Respuesta(200, {"models": []}),
+        Health.OPENAI_MODELS_URL: _Respuesta(401),
+    }
+    Health.requests = types.SimpleNamespace(get=lambda url, **kw: respuestas[url], RequestException=Exception)
+    try:
+        ollama = Health.sondear_ollama("http://localhost:11434/api/generate", "llama3.1:8b")
+        assert ollama["ok"] is True and ollama["modelo_cargado"] is False
+        assert Health.sondear_ollama("http://localhost:11434/api/generate", "mistral:7b")["ok"] is False
+        assert Health.sondear_openai(None) == {"ok": False, "detalle": "OPENAI_API_KEY no configurada", "api_key": False}
+        assert Health.sondear_openai("sk-test")["ok"] is False
+    finally:
+        Health.requests = original
+
+    with tempfile.TemporaryDirectory() as tmp:
+        assert Health.sondear_sqlite([os.path.join(tmp, 'nueva.db')])["ok"] is True
+
+def test_ready_lee_estado_cacheado():
+    originales = (dict(Health._sondas), Health.iniciar, Warmup.iniciar, Warmup.terminado)
+    Warmup.iniciar, Warmup.terminado = (lambda: False), (lambda: True)
+    llamadas = []
+    Health._sondas.clear()
+    Health._estado.clear()
+    Health.iniciar = lambda intervalo=None: False  # Sin hilo de fondo: el estado se carga a mano
+    for nombre in ('ollama', 'openai', 'ejes', 'store'):
+        Health.registrar(nombre, lambda nombre=nombre: llamadas.append(nombre) or {"ok": nombre != 'openai', "detalle": "-"})
+    cliente = api_flask.app.test_client()
+    try:
+        # Antes del primer sondeo no está listo
+        assert cliente.get('/health/ready').status_code == 503
+        Health.sondear_todo()
+        assert len(llamadas) == 4
+        respuesta = cliente.get('/health/ready')
+        assert respuesta.status_code == 200 and respuesta.get_json()["backends"]["openai"]["ok"] is False
+        assert len(llamadas) == 4  # /health/ready no sondea
+
+        Health._estado['ollama']["ok"] = False
+        assert cliente.get('/health/ready').status_code == 503
+    finally:
+        Health._sondas.clear()
+        Health._sondas.update(originales[0])
+        Health._estado.clear()
+        Health.iniciar, Warmup.iniciar, Warmup.terminado = originales[1:]
+
+if __name__ == "__main__":
+    print("🧪 Test de readiness")
+    print("=" * 50)
+    test_sondeos()
+    test_ready_lee_estado_cacheado()
+    print("✅ Todos los tests pasaron")
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Test del runner por lotes: lectura de listas de links, checkpoints en JSONL,
+reanudación de una corrida cortada y reintento de los links incompletos
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+import tempfile
+
+import Z_Utils_Lotes as Lotes
+
+LINKS = [f"https://culturagcba.clientes.ejes.com/noticia_completa.cfm?id={i}" for i in range(7)]
+CONFIG = {"temas": ["Cultura"], "tema_default": "Otros", "menciones": ["Ministro"]}
+
+
+class PipelineFalso:
+    """Imita procesar_noticias_con_ia: id=3 da error de extracción; los ids en 'incompletos' quedan incompletos"""
+
+    def __init__(self, cortar_en_lote=None, incompletos=()):
+        self.cortar_en_lote = cortar_en_lote
+        self.incompletos = set(incompletos)
+        self.procesados = []
+        self.lotes = 0
+
+    def __call__(self, urls, temas, tema_default, menciones, ministro_kw, ministerios_kw, plazo_seg=None, request_id=None):
+        if self.lotes == self.cortar_en_lote:
+            raise KeyboardInterrupt
+        self.lotes += 1
+        self.procesados.extend(urls)
+        data = [{"LINK": u, "TITULO": f"Nota {u[-1]}", "TEMA": "Cultura"} for u in urls if not u.endswith("id=3")]
+        errores = [{"url": u, "motivo": "Error al extraer contenido"} for u in urls if u.endswith("id=3")]
+        incompletas = [{"url": u, "motivo": "Plazo del request vencido"} for u in urls if u in self.incompletos]
+        return {"data": data, "errores": errores, "incompletas": incompletas, "request_id": request_id}, 200
+
+
+def test_leer_links():
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "links.csv")
+        with open(csv_path, "w", encoding="utf-8") as f:
+            f.write("link\n" + "\n".join(LINKS[:3] + [LINKS[0]]) + "\n")
+        assert Lotes.leer_links(csv_path) == LINKS[:3]
+
+        txt_path = os.path.join(tmp, "links.txt")
+        with open(txt_path, "w", encoding="utf-8") as f:
+            f.write(f"# corrida de prueba\n{LINKS[0]}\n\n  {LINKS[1]}  \n#{LINKS[2]}\n")
+        assert Lotes.leer_links(txt_path) == LINKS[:2]
+
+
+def test_corrida_interrumpida_se_reanuda():
+    with tempfile.TemporaryDirectory() as carpeta:
+        pipeline = PipelineFalso(cortar_en_lote=2)
+        resumen = Lotes.procesar_links(LINKS, carpeta, CONFIG, pipeline, tamano_lote=2, concurrencia=1)
+        assert resumen["interrumpida"] and resumen["terminados"] == 4 and resumen["pendientes"] == 3
+        with open(os.path.join(carpeta, Lotes.ARCHIVO_ESTADO), encoding="utf-8") as f:
+            assert json.load(f)["terminados"] == 4
+
+        # Una línea cortada al final del JSONL (proceso matado a mitad de escritura) se ignora
+        with open(os.path.join(carpeta, Lotes.ARCHIVO_RESULTADOS), "a", encoding="utf-8") as f:
+            f.write('{"LINK": "https://cultura')
+
+        pipeline = PipelineFalso()
+        resumen = Lotes.procesar_links(LINKS, carpeta, CONFIG, pipeline, tamano_lote=2, concurrencia=1)
+        assert pipeline.procesados == LINKS[4:]
+        assert not resumen["interrumpida"] and resumen["pendientes"] == 0 and resumen["errores"] == 1
+
+        # Con otra configuración la carpeta no se reutiliza
+        try:
+            Lotes.procesar_links(LINKS, carpeta, {**CONFIG, "tema_default": "Varios"}, PipelineFalso())
+            assert False, "Debió rechazar la carpeta con otra configuración"
+        except ValueError:
+            pass
+
+
+def test_otro_modelo_no_reutiliza_la_carpeta():
+    pipeline_config = {"modelo": "Ollama:llama3.1:8b", "version_prompts": "gpt-1/ollama-1/contenido-1", "limite_texto": 14900}
+    with tempfile.TemporaryDirectory() as carpeta:
+        Lotes.procesar_links(LINKS, carpeta, CONFIG, PipelineFalso(incompletos=LINKS[5:]), pipeline=pipeline_config)
+        resumen = Lotes.procesar_links(LINKS, carpeta, CONFIG, PipelineFalso(), pipeline=dict(pipeline_config))
+        assert resumen["pendientes"] == 0
+
+        for cambio in ({"modelo": "GPT:gpt-4o"}, {"version_prompts": "gpt-1/ollama-2/contenido-1"}, {"limite_texto": 5000}):
+            try:
+                Lotes.procesar_links(LINKS, carpeta, CONFIG, PipelineFalso(), pipeline={**pipeline_config, **cambio})
+                assert False, f"Debió rechazar la carpeta con {cambio}"
+            except ValueError:
+                pass
+
+
+def test_incompletos_se_reintentan():
+    with tempfile.TemporaryDirectory() as carpeta:
+        resumen = Lotes.procesar_links(LINKS, carpeta, CONFIG, PipelineFalso(incompletos=LINKS[5:]), tamano_lote=3)
+        assert resumen["pendientes"] == 2
+        registros = Lotes._leer_jsonl(os.path.join(carpeta, Lotes.ARCHIVO_RESULTADOS))
+        assert {r["LINK"] for r in registros} == {LINKS[i] for i in (0, 1, 2, 4)}
+
+        pipeline = PipelineFalso()
+        resumen = Lotes.procesar_links(LINKS, carpeta, CONFIG, pipeline, tamano_lote=3)
+        assert pipeline.procesados == LINKS[5:]
+        assert resumen["pendientes"] == 0
+
+
+if __name__ == "__main__":
+    print("🧪 Test del runner por lotes")
+    print("=" * 50)
+    test_leer_links()
+    test_corrida_interrumpida_se_reanuda()
+    test_otro_modelo_no_reutiliza_la_carpeta()
+    test_incompletos_se_reintentan()
+    print("✅ Todos los tests pasaron")
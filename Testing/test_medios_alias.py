@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Test del índice de alias de medios (medio crudo -> medio canónico + soporte)
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+import tempfile
+import pandas as pd
+
+import Z_Utils_Medios as Medios
+
+def test_alias_por_defecto():
+    """Web y gráfica del mismo medio resuelven al mismo nombre con distinto soporte"""
+    Medios.reiniciar_indice()
+    assert Medios.resolver_medio("pagina12.com.ar") == ("Página 12", "WEB")
+    assert Medios.resolver_medio("Página  12") == ("Página 12", "GRÁFICA")
+    assert Medios.resolver_medio("CLARIN") == ("Clarín", "GRÁFICA")
+    assert Medios.resolver_medio(None) == ("Medio Desconocido", None)
+
+def test_medios_sin_alias():
+    """Sin alias: normalización por reglas y soporte según si el crudo es un dominio"""
+    Medios.reiniciar_indice()
+    assert Medios.resolver_medio("MinutoUno.com") == ("Minuto Uno", "WEB")
+    assert Medios.resolver_medio("eldiarioar.net.ar") == ("Eldiarioar", "WEB")
+    assert Medios.resolver_medio("Diario Popular") == ("Diario Popular", "GRÁFICA")
+
+def test_agregar_y_persistir():
+    with tempfile.TemporaryDirectory() as tmp:
+        ruta = os.path.join(tmp, "alias.json")
+        Medios.reiniciar_indice()
+        Medios.agregar_alias({"DiarioPopular": {"medio": "Diario Popular", "soporte": "Grafica"}, "diariopopular.com.ar": "Diario Popular"}, ruta)
+        assert Medios.resolver_medio("diariopopular") == ("Diario Popular", "GRÁFICA")
+        assert Medios.resolver_medio("diariopopular.com.ar") == ("Diario Popular", "WEB")
+        with open(ruta, encoding='utf-8') as f:
+            assert json.load(f)["diariopopular.com.ar"] == {"medio": "Diario Popular", "soporte": "WEB"}
+
+        planilla = os.path.join(tmp, "alias.csv")
+        pd.DataFrame({'ALIAS': ['Tiempo Argentino'], 'MEDIO': ['TiempoAR'], 'SOPORTE': ['GRÁFICA']}).to_csv(planilla, index=False)
+        Medios.cargar_alias_desde_archivo(planilla)
+        assert Medios.resolver_medio("tiempo argentino") == ("TiempoAR", "GRÁFICA")
+
+        try:
+            Medios.agregar_alias({"x": {"medio": "X", "soporte": "RADIO"}})
+            assert False, "Debió rechazar un soporte inválido"
+        except ValueError:
+            pass
+    Medios.reiniciar_indice()
+
+def test_endpoint_medios_alias():
+    import api_flask
+    ruta_original = Medios.MEDIOS_ALIAS_PATH
+    with tempfile.TemporaryDirectory() as tmp:
+        Medios.MEDIOS_ALIAS_PATH = os.path.join(tmp, "alias.json")
+        try:
+            cliente = api_flask.app.test_client()
+            headers = {"X-API-Key": api_flask.VALID_TOKENS[0]}
+            r = cliente.post('/config/medios-alias', json={"alias": {"Radio Nacional": "Radio Nacional"}}, headers=headers)
+            assert r.status_code == 200, r.get_json()
+            assert cliente.post('/config/medios-alias', json={"alias": []}, headers=headers).status_code == 400
+            assert cliente.post('/config/medios-alias', json={"alias": {"a": "A"}}).status_code == 401
+            r = cliente.get('/config/medios-alias', headers=headers)
+            assert r.get_json()["alias"]["radio nacional"]["medio"] == "Radio Nacional"
+        finally:
+            Medios.MEDIOS_ALIAS_PATH = ruta_original
+            Medios.reiniciar_indice()
+
+if __name__ == "__main__":
+    print("🧪 Test de alias de medios")
+    print("=" * 50)
+    test_alias_por_defecto()
+    test_medios_sin_alias()
+    test_agregar_y_persistir()
+    test_endpoint_medios_alias()
+    print("✅ Todos los tests pasaron")
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Test de la extracción de metadatos en lote (extraer_metadatos_html):
+debe dar lo mismo que los get_*_from_html_obj aplicados fila por fila
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import time
+import pandas as pd
+from bs4 import BeautifulSoup
+
+import Z_Utils as Z
+
+PAGINAS = [
+    # Gráfica con sección y mediciones completas
+    """<span class="canal">04/04/2025 Clarín - Nota - Espectáculos - Pag. 12</span>
+       <span class="medicion">Audiencia: 250.000 = lectores</span>
+       <span class="medicion">Cotización: $ 97.500</span>""",
+    # Web sin sección en el canal: la sección sale del link
+    """<span class="canal">05/04/2025 infobae.com - Nota</span>
+       <a href="https://www.infobae.com/cultura/2025/04/05/nota/">link</a>
+       <span class="medicion">Cotizacion sin monto</span>
+       <span class="medicion">Cotización: $1.200,50</span>""",
+    # Sin canal ni mediciones
+    """<div>Página de error</div>""",
+    # Canal sin fecha
+    """<span class="canal">Página 12 - Nota - Cultura</span>""",
+]
+
+def _soups():
+    return pd.Series([BeautifulSoup(html, "html.parser") for html in PAGINAS] + [None], index=[10, 11, 12, 13, 14])
+
+def _por_fila(soups):
+    # Series.apply convierte los None en NaN cuando se mezclan con strings: se normaliza a None
+    return pd.DataFrame({
+        'FECHA': soups.apply(Z.get_fecha_from_html_obj),
+        'MEDIO': soups.apply(Z.get_medio_from_html_obj).apply(Z.normalizar_medio),
+        'SOPORTE': soups.apply(Z.get_soporte_from_html_obj),
+        'SECCION': soups.apply(Z.get_seccion_from_html_obj),
+        'COTIZACION': soups.apply(Z.get_cotizacion_from_html_obj),
+        'ALCANCE': soups.apply(Z.get_alcance_from_html_obj),
+    }).astype(object).where(lambda df: df.notna(), None)
+
+def test_equivalencia_con_getters():
+    soups = _soups()
+    esperado = _por_fila(soups)
+    obtenido = Z.extraer_metadatos_html(soups)
+    print(obtenido.to_string())
+    assert list(obtenido.index) == list(soups.index)
+    for campo in esperado.columns:
+        assert obtenido[campo].tolist() == esperado[campo].tolist(), campo
+    assert obtenido.loc[10, 'FECHA'] == '2025-04-04'
+    assert obtenido.loc[10, 'SOPORTE'] == 'GRÁFICA'
+    assert obtenido.loc[11, 'SECCION'] == 'Cultura'
+    assert obtenido.loc[11, 'COTIZACION'] == '$1.200,50'
+    assert obtenido.loc[12, 'FECHA'] is None
+
+def test_normalizar_medio_memoizado():
+    import Z_Utils_Medios as Medios
+    assert Z.normalizar_medio("LaNacion.com.ar") == "La Nación"
+    assert Z.normalizar_medio(None) == "Medio Desconocido"
+    assert Z.normalizar_medio("RadioMitre.com.ar") == "Radio Mitre"
+    Z.normalizar_medio("RadioMitre.com.ar")
+    assert Medios._resolver_sin_alias.cache_info().hits >= 1
+
+def test_rendimiento_lote():
+    soups = pd.concat([_soups()] * 200, ignore_index=True)
+    t0 = time.perf_counter()
+    _por_fila(soups)
+    t1 = time.perf_counter()
+    Z.extraer_metadatos_html(soups)
+    t2 = time.perf_counter()
+    print(f"⏱️ {len(soups)} páginas: por fila {t1 - t0:.3f}s, en lote {t2 - t1:.3f}s")
+
+if __name__ == "__main__":
+    print("🧪 Test de metadatos en lote")
+    print("=" * 50)
+    test_equivalencia_con_getters()
+    test_normalizar_medio_memoizado()
+    test_rendimiento_lote()
+    print("✅ Todos los tests pasaron")
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Test de los clasificadores locales entrenables (datos del store + planillas, reporte y router)
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import random
+import tempfile
+import pandas as pd
+
+import O_Utils_Modelos as Mod
+import Z_Utils_Articulos as Art
+
+URL_BASE = "https://culturagcba.clientes.ejes.com/noticia_completa.cfm?id="
+
+POLITICOS = ["elecciones", "candidato", "campaña electoral", "encuesta de votos", "partido político", "legisladores"]
+CULTURALES = ["muestra de fotografía", "obra de teatro", "festival de cine", "concierto gratuito", "biblioteca", "danza"]
+
+def _texto(palabras, rng):
+    return f"La nota habla de {rng.choice(palabras)} y de {rng.choice(palabras)} en la Ciudad. " * 3
+
+def _poblar_store(db, n=60):
+    rng = random.Random(1)
+    registros = []
+    for i in range(n):
+        politico = i % 3 == 0
+        registros.append({
+            'LINK': f"{URL_BASE}{1000 + i}",
+            'TEXTO_PLANO': _texto(POLITICOS if politico else CULTURALES, rng),
+            'FACTOR POLITICO': 'SI' if politico else 'NO',
+            'VALORACION': 'NEGATIVA' if politico else 'NEUTRA',
+            '_FUENTES': {'FACTOR POLITICO': 'llm', 'VALORACION': 'llm'},
+        })
+    Art.guardar_articulos(registros, 'Ollama:llama3.1:8b', 'v1', 'huella', db)
+    return registros
+
+def test_datos_de_store_y_planilla():
+    """La etiqueta manual de la planilla reemplaza a la del LLM para el mismo artículo"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = os.path.join(tmp, 'articulos.db')
+        _poblar_store(db, 6)
+        planilla = os.path.join(tmp, 'etiquetas.xlsx')
+        pd.DataFrame({'LINK': [f"{URL_BASE}1001", f"{URL_BASE}9999"], 'Factor POLÍTICO': ['SI', 'SI']}).to_excel(planilla, index=False)
+
+        datos = dict(Mod.cargar_datos_entrenamiento('factor_politico', [planilla], db))
+        assert len(datos) == 6  # el link 9999 no tiene texto en el store
+        assert list(datos.values()).count('SI') == 3
+
+        valoraciones = {e for _, e in Mod.cargar_datos_entrenamiento('valoracion', [], db)}
+        assert valoraciones == {'NEGATIVA', 'NO_NEGATIVA'}
+
+def test_descarta_etiquetas_locales_y_fallback():
+    """Solo las etiquetas del LLM del store entran al entrenamiento"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = os.path.join(tmp, 'articulos.db')
+        registros = _poblar_store(db, 4)
+        registros[1]['_FUENTES'] = {'FACTOR POLITICO': 'local', 'VALORACION': 'llm'}
+        registros[2]['_FUENTES'] = {'FACTOR POLITICO': 'fallback', 'VALORACION': 'fallback'}
+        del registros[3]['_FUENTES']  # registro anterior a '_FUENTES': origen desconocido
+        Art.guardar_articulos(registros, 'Ollama:llama3.1:8b', 'v1', 'huella', db)
+
+        textos = [r['TEXTO_PLANO'] for r in registros]
+        assert [t for t, _ in Mod.cargar_datos_entrenamiento('factor_politico', [], db)] == [textos[0]]
+        assert [t for t, _ in Mod.cargar_datos_entrenamiento('valoracion', [], db)] == textos[:2]
+
+def test_medir_fuente():
+    with Mod.medir_fuente() as medicion:
+        pass
+    assert medicion['fuente'] == Mod.FUENTE_LLM
+    with Mod.medir_fuente() as medicion:
+        Mod.marcar_fuente(Mod.FUENTE_FALLBACK)
+        Mod.marcar_fuente(Mod.FUENTE_LOCAL)  # un fallback no se pisa
+    assert medicion['fuente'] == Mod.FUENTE_FALLBACK
+    Mod.marcar_fuente(Mod.FUENTE_LOCAL)  # sin medición activa no hace nada
+
+    # El fallback de Ollama ante un error queda registrado
+    import O_Utils_Ollama as Ollama
+    original = Ollama._clasificar_con_esquema
+    def falla(*args, **kwargs):
+        raise RuntimeError("sin conexión")
+    Ollama._clasificar_con_esquema = falla
+    try:
+        with Mod.medir_fuente() as medicion:
+            Ollama.detectar_factor_politico_con_ollama("texto")
+        assert medicion['fuente'] == Mod.FUENTE_FALLBACK
+    finally:
+        Ollama._clasificar_con_esquema = original
+
+def test_planillas_por_defecto():
+    """Las etiquetas manuales de la planilla histórica (con TEXTO_PLANO) llegan al entrenamiento"""
+    assert all(os.path.exists(p) for p in Mod.PLANILLAS_ENTRENAMIENTO)
+    historico = pd.read_excel(Mod.Temas.HISTORICO_PATH)
+    with tempfile.TemporaryDirectory() as tmp:
+        datos = Mod.cargar_datos_entrenamiento('valoracion', db_path=os.path.join(tmp, 'vacio.db'))
+    textos = {texto for texto, _ in datos}
+    assert set(historico['TEXTO_PLANO']) <= textos
+    assert {e for _, e in datos} == {'NEGATIVA', 'NO_NEGATIVA'}
+
+def test_entrenar_evaluar_y_rutear():
+    with tempfile.TemporaryDirectory() as tmp:
+        db = os.path.join(tmp, 'articulos.db')
+        _poblar_store(db)
+        assert Mod.identidad_modelos(tmp) == {tarea: None for tarea in Mod.TAREAS}
+        reporte = Mod.entrenar_y_evaluar('factor_politico', planillas=[], db_path=db, modelos_dir=tmp)
+        identidad = Mod.identidad_modelos(tmp)
+        assert identidad['factor_politico'] is not None and identidad['tipo'] is None
+        print(f"📊 Reporte: {reporte['test']}")
+        assert os.path.exists(reporte['ruta']) and os.path.exists(reporte['ruta'][:-4] + '.json')
+        assert set(reporte['test']['por_etiqueta']) == {'SI', 'NO'}
+        assert reporte['test']['accuracy'] >= 0.9
+
+        texto = _texto(POLITICOS, random.Random(7))
+        assert Mod.predecir('factor_politico', texto, umbral=0.5, modelos_dir=tmp) == 'SI'
+        assert Mod.predecir('factor_politico', texto, umbral=1.01, modelos_dir=tmp) is None
+        assert Mod.predecir('tipo', texto, modelos_dir=tmp) is None  # sin modelo entrenado
+
+        dir_original = Mod.MODELOS_DIR
+        Mod.MODELOS_DIR = tmp
+        try:
+            with Mod.medir_fuente() as medicion:
+                assert Mod.rutear('factor_politico', texto, lambda t: 'NO') == 'SI'
+            assert medicion['fuente'] == Mod.FUENTE_LOCAL
+        finally:
+            Mod.MODELOS_DIR = dir_original
+
+def test_rutear_sin_modelo_usa_llm():
+    dir_original = Mod.MODELOS_DIR
+    with tempfile.TemporaryDirectory() as tmp:
+        Mod.MODELOS_DIR = tmp
+        try:
+            llamadas = []
+            resultado = Mod.rutear('factor_politico', "texto", lambda t: llamadas.append(t) or 'NO')
+            assert resultado == 'NO' and llamadas == ["texto"]
+        finally:
+            Mod.MODELOS_DIR = dir_original
+
+if __name__ == "__main__":
+    print("🧪 Test de modelos locales")
+    print("=" * 50)
+    test_datos_de_store_y_planilla()
+    test_descarta_etiquetas_locales_y_fallback()
+    test_medir_fuente()
+    test_planillas_por_defecto()
+    test_entrenar_evaluar_y_rutear()
+    test_rutear_sin_modelo_usa_llm()
+    print("✅ Todos los tests pasaron")
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Test del motor de menciones: cantidades, posiciones y fragmentos, alias, palabra completa,
+claves superpuestas y misma salida que el buscador por substring anterior
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+import Z_Utils as Z
+import Z_Utils_Texto as Texto
+import Z_Utils_Menciones as Menciones
+
+TEXTO = (
+    "La Ministra de Cultura, Gabriela Ricardes, inauguró la muestra. "
+    "Según Ricardes, el Ministerio de Cultura porteño ampliará la agenda cultural."
+)
+
+
+def test_cantidades_posiciones_y_fragmentos():
+    encontradas = Menciones.buscar(TEXTO, ["Gabriela Ricardes", "Ministerio de Cultura", "Jorge Macri"])
+    assert list(encontradas) == ["Gabriela Ricardes", "Ministerio de Cultura"]
+    ricardes = encontradas["Gabriela Ricardes"]
+    assert ricardes["cantidad"] == 1
+    inicio, fin = ricardes["posiciones"][0]
+    assert TEXTO[inicio:fin] == "Gabriela Ricardes"
+    assert "Gabriela Ricardes, inauguró" in ricardes["fragmentos"][0]
+    assert Menciones.buscar("", ["Ricardes"]) == {}
+    assert Menciones.buscar(TEXTO, []) == {}
+
+
+def test_alias_y_palabra_completa():
+    claves, alias, enteras = Menciones.claves_y_alias([
+        {"mencion": "Gabriela Ricardes", "alias": ["Ricardes"]},
+        {"mencion": "Cultura", "palabra_completa": True},
+        "agenda",
+    ])
+    assert claves == ["Gabriela Ricardes", "Cultura", "agenda"] and enteras == ["Cultura"]
+    encontradas = Menciones.buscar(TEXTO, claves, alias, enteras)
+    # El alias dentro de "Gabriela Ricardes" no suma; la segunda aparición sola sí
+    assert encontradas["Gabriela Ricardes"]["cantidad"] == 2
+    assert [TEXTO[i:f] for i, f in encontradas["Gabriela Ricardes"]["posiciones"]] == ["Gabriela Ricardes", "Ricardes"]
+    # "cultural" no cuenta como "Cultura" con palabra completa
+    assert encontradas["Cultura"]["cantidad"] == 2
+    assert Menciones.buscar(TEXTO, ["Cultura"])["Cultura"]["cantidad"] == 3
+
+
+def test_claves_superpuestas_y_tildes():
+    encontradas = Menciones.buscar(TEXTO.upper(), ["ministerio de cultura", "cultura", "ministra"])
+    assert encontradas["ministerio de cultura"]["cantidad"] == 1
+    assert encontradas["cultura"]["cantidad"] == 3
+    assert encontradas["ministra"]["cantidad"] == 1
+    # Texto descompuesto (marcas combinantes): las posiciones apuntan al texto original
+    texto = "La gestión de Ricardés"
+    encontradas = Menciones.buscar(texto, ["Ricardés", "gestión"])
+    assert [texto[i:f] for i, f in encontradas["Ricardés"]["posiciones"]] == ["Ricardés"]
+    assert [texto[i:f] for i, f in encontradas["gestión"]["posiciones"]] == ["gestión"]
+
+
+def test_buscar_menciones_igual_al_substring():
+    textos = [TEXTO, "Sin menciones relevantes", None, "GABRIELA RICARDES y la cultura"]
+    lista = ["Gabriela Ricardes", "Cultura", "Ministerio de Cultura", "Macri"]
+    df = Z.buscar_menciones(pd.DataFrame({"TEXTO_PLANO": textos}), lista)
+    esperadas = [
+        [m for m in lista if t and Z.normalizar_texto(m) in Z.normalizar_texto(t)]
+        for t in textos
+    ]
+    assert df["MENCIONES"].tolist() == esperadas
+
+
+def test_memo_y_resumen_para_prompt():
+    with Texto.cache_request():
+        primero = Menciones.buscar(TEXTO, ["Ricardes"])
+        assert Menciones.buscar(TEXTO, ["Ricardes"]) is primero
+        assert Menciones.actores_mencionados(TEXTO, [["Ricardes"]], []) is primero
+    assert Menciones.buscar(TEXTO, ["Ricardes"]) is not primero
+
+    resumen = Menciones.resumen_para_prompt(TEXTO, ["Gabriela Ricardes", "Ministerio de Cultura"])
+    lineas = resumen.splitlines()
+    assert lineas[0].startswith('- Gabriela Ricardes (1x): "')
+    assert lineas[1].startswith('- Ministerio de Cultura (1x): "')
+    assert Menciones.resumen_para_prompt(TEXTO, ["Jorge Macri"]) == ""
+    assert Menciones.aplanar([["Ricardes", " Ricardes "], "", "Cultura"]) == ["Ricardes", "Cultura"]
+
+
+if __name__ == "__main__":
+    print("🧪 Test del motor de menciones")
+    print("=" * 50)
+    test_cantidades_posiciones_y_fragmentos()
+    test_alias_y_palabra_completa()
+    test_claves_superpuestas_y_tildes()
+    test_buscar_menciones_igual_al_substring()
+    test_memo_y_resumen_para_prompt()
+    print("✅ Todos los tests pasaron")
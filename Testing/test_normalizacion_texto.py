@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Test de la normalización sin tildes: mismo resultado que NFD, memo por request
+y heurística de valoración que no distingue tildes
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import unicodedata
+
+import Z_Utils as Z
+import Z_Utils_Texto as Texto
+
+
+def _nfd(texto):
+    return ''.join(c for c in unicodedata.normalize('NFD', texto.lower()) if not unicodedata.combining(c))
+
+
+def test_igual_a_nfd():
+    textos = [
+        "La Ministra de Cultura, Gabriela Ricardes, inauguró la muestra “Año Nuevo” — ñandú, pingüino",
+        "ÁÉÍÓÚ Ü Ñ Ç à è ì ò ù â ê ô ã õ ø å æ œ ß",
+        "Texto ya descompuesto: árbol, ñandú",
+        "Caracteres raros: Ǆ ǅ ḯ ẞ ﬁ İ ﬀ 한국어 Ωμέγα ё",
+        "solo ascii, sin cambios 123",
+    ]
+    for texto in textos:
+        assert Texto.normalizar(texto) == _nfd(texto), texto
+    # Todo el alfabeto latino y los signos tipográficos, uno por uno
+    for codigo in range(0x80, 0x2070):
+        caracter = chr(codigo)
+        assert Texto.normalizar(caracter) == _nfd(caracter), hex(codigo)
+    assert Texto.sin_tildes("Córdoba, Ñandú") == "Cordoba, Nandu"
+    assert Z.normalizar_texto("Córdoba") == "cordoba"
+    assert Z.normalizar_texto(None) == ""
+
+
+def test_memo_por_request():
+    articulo = "El Ministerio de Cultura porteño presentó la programación " * 50
+    assert Texto.en_cache(articulo) is None
+    with Texto.cache_request():
+        primero = Texto.normalizar(articulo)
+        assert Texto.en_cache(articulo) is primero
+        assert Z.normalizar_texto(articulo) is primero  # Menciones, heurística y temas comparten el resultado
+    # Fuera del request no queda memo
+    assert Texto.en_cache(articulo) is None
+    assert Texto.normalizar(articulo) == primero
+
+
+def test_heuristica_sin_tildes():
+    texto = "La ministra Gabriela Ricardes habló en el Ministerio de Cultura porteño"
+    assert Z.aplicar_heuristica_valoracion("NO_NEGATIVA", texto, ["Gabriela Ricardés"], []) == "POSITIVA"
+    assert Z.aplicar_heuristica_valoracion("OTRO", texto.upper(), [], [["ministerio de cultura"]]) == "POSITIVA"
+    assert Z.aplicar_heuristica_valoracion("NO_NEGATIVA", texto, ["Jorge Macri"], "Ministerio de Educación") == "NEUTRA"
+    assert Z.aplicar_heuristica_valoracion("NEGATIVA", texto, ["Ricardes"], []) == "NEGATIVA"
+
+
+if __name__ == "__main__":
+    print("🧪 Test de normalización sin tildes")
+    print("=" * 50)
+    test_igual_a_nfd()
+    test_memo_por_request()
+    test_heuristica_sin_tildes()
+    print("✅ Todos los tests pasaron")
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Test de la extracción de pasajes relevantes: declaración con comillas y menciones,
+valoración con los pasajes del ministerio y textos cortos sin cambios
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Z_Utils_Pasajes as Pasajes
+import O_Utils_GPT as Gpt
+import O_Utils_Ollama as Ollama
+
+RELLENO = "La programación incluye talleres, visitas guiadas y espectáculos para toda la familia. " * 12
+TEXTO = (
+    "[TÍTULO]: Reabre el Teatro San Martín\n"
+    "[BODY]: El teatro reabrió sus salas después de dos años de obras. " + RELLENO +
+    "Durante el acto, la ministra Gabriela Ricardes señaló: “Es una muestra concreta de cómo cuidamos el patrimonio”. "
+    "La obra costó menos de lo previsto. " + RELLENO +
+    "El Ministerio de Cultura informó que habrá funciones gratuitas en mayo. " + RELLENO +
+    "El público colmó la sala principal."
+)
+ACTORES = ["Gabriela Ricardes", "Ministerio de Cultura"]
+
+
+def test_oraciones():
+    texto = "[TÍTULO]: Hola\n[BODY]: Primera oración. Segunda, con “cita”. ¿Tercera? Sí."
+    assert [texto[i:f] for i, f in Pasajes.oraciones(texto)] == [
+        "[TÍTULO]: Hola", "[BODY]: Primera oración.", "Segunda, con “cita”.", "¿Tercera?", "Sí."
+    ]
+
+
+def test_pasajes_para_declaracion():
+    Pasajes.reiniciar_estadisticas()
+    pasajes = Pasajes.para_declaracion(TEXTO, ACTORES)
+    assert len(pasajes) < len(TEXTO) / 3
+    assert pasajes.startswith("[TÍTULO]: Reabre el Teatro San Martín")
+    assert "“Es una muestra concreta de cómo cuidamos el patrimonio”" in pasajes
+    assert "El Ministerio de Cultura informó" in pasajes
+    assert "La obra costó menos de lo previsto." in pasajes   # contexto de la cita
+    assert "El público colmó la sala principal." not in pasajes
+    assert Pasajes.SEPARADOR in pasajes
+    # Los apóstrofos no cuentan como comillas
+    assert "d'Orsay" not in Pasajes.para_declaracion("[TÍTULO]: Muestra\n" + RELLENO + "Llega la colección del Musée d'Orsay. " + RELLENO, ACTORES)
+
+    estadisticas = Pasajes.estadisticas()["declaracion"]
+    assert estadisticas["textos"] == estadisticas["reducidos"] == 2
+    assert estadisticas["reduccion"] > 0.5
+
+
+def test_pasajes_para_valoracion():
+    comienzo, destacados = Pasajes.para_valoracion(TEXTO, ACTORES)
+    assert comienzo.startswith("[TÍTULO]: Reabre") and "reabrió sus salas" in comienzo
+    assert "Gabriela Ricardes señaló" in destacados and "El Ministerio de Cultura informó" in destacados
+    assert len(comienzo) + len(destacados) < len(TEXTO) / 2
+    # Sin menciones de los actores la nota va completa
+    assert Pasajes.para_valoracion(TEXTO, ["Jorge Macri"]) == (TEXTO, "")
+    assert Pasajes.para_valoracion(TEXTO, None) == (TEXTO, "")
+
+
+def test_textos_cortos_y_desactivado():
+    corto = "[TÍTULO]: Breve\n[BODY]: Ricardes dijo “hola”."
+    assert Pasajes.para_declaracion(corto, ACTORES) is corto
+    Pasajes.CONFIG["activo"] = False
+    try:
+        assert Pasajes.para_declaracion(TEXTO, ACTORES) is TEXTO
+        assert Pasajes.para_valoracion(TEXTO, ACTORES) == (TEXTO, "")
+    finally:
+        Pasajes.CONFIG["activo"] = True
+
+
+def test_prompts_reducidos():
+    prompt_declaracion = Gpt.armar_request_declaracion(TEXTO, ACTORES, "gpt-4o")["messages"][1]["content"]
+    assert "[...] marca lo omitido" in prompt_declaracion
+    assert "El público colmó la sala principal." not in prompt_declaracion
+
+    prompt_valoracion = Gpt.armar_request_valoracion(TEXTO, "gpt-4o", ACTORES)["messages"][1]["content"]
+    assert "PASAJES QUE MENCIONAN AL MINISTRO O AL MINISTERIO" in prompt_valoracion
+    assert "El público colmó la sala principal." not in prompt_valoracion
+    # Sin actores, el prompt de valoración lleva el texto completo como antes
+    assert "El público colmó la sala principal." in Gpt.armar_request_valoracion(TEXTO, "gpt-4o")["messages"][1]["content"]
+
+    prompts = []
+    original = Ollama._clasificar_con_esquema
+    Ollama._clasificar_con_esquema = lambda prompt, esquema, tarea=None: prompts.append(prompt) or "NO"
+    try:
+        Ollama.es_declaracion_ollama(TEXTO, ["Gabriela Ricardes"], ["Ministerio de Cultura"])
+        Ollama.valorar_noticia_con_ollama(TEXTO, ["Gabriela Ricardes"], ["Ministerio de Cultura"])
+    finally:
+        Ollama._clasificar_con_esquema = original
+    assert all("El público colmó la sala principal." not in p for p in prompts)
+
+
+if __name__ == "__main__":
+    print("🧪 Test de pasajes relevantes")
+    print("=" * 50)
+    test_oraciones()
+    test_pasajes_para_declaracion()
+    test_pasajes_para_valoracion()
+    test_textos_cortos_y_desactivado()
+    test_prompts_reducidos()
+    print("✅ Todos los tests pasaron")
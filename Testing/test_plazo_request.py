@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Test del plazo por request: timeouts recortados al tiempo restante, esperas interrumpidas
+por cancelación y artículos incompletos que vuelven como REVISAR MANUAL
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import time
+import threading
+
+import Z_Utils as Z
+import Z_Utils_Deadline as Plazos
+
+def test_timeout_recortado():
+    assert Plazos.timeout(10) == 10  # Sin plazo activo
+    with Plazos.activar(Plazos.Plazo(3)):
+        assert 2 < Plazos.timeout(10) <= 3
+        assert Plazos.timeout(1) == 1
+    with Plazos.activar(Plazos.Plazo(0.01)):
+        time.sleep(0.02)
+        assert Plazos.vencido()
+        assert Plazos.timeout(10) == Plazos.TIMEOUT_MINIMO_SEG
+
+def test_cancelacion_interrumpe_espera():
+    with Plazos.activar(Plazos.Plazo(60, request_id="req-test")) as plazo:
+        assert [a["request_id"] for a in Plazos.activos()] == ["req-test"]
+        threading.Timer(0.05, Plazos.cancelar, args=("req-test",)).start()
+        t0 = time.time()
+        assert Plazos.dormir(5) is False
+        assert time.time() - t0 < 2
+        assert plazo.cancelado() and "cancelado" in plazo.motivo()
+    assert Plazos.activos() == []
+    assert Plazos.cancelar("req-test") is False
+
+def test_plazo_vencido_revisar_manual():
+    llamadas = []
+    url = "https://culturagcba.clientes.ejes.com/noticia_completa.cfm?id=1"
+    with Plazos.activar(Plazos.Plazo(60)) as plazo:
+        assert Z.marcar_o_valorar_con_ia("texto", lambda t: llamadas.append(t) or "NEGATIVA", 1000, url) == "NEGATIVA"
+        plazo.cancelar("Request cancelado por el cliente")
+        assert Z.marcar_o_valorar_con_ia("texto", lambda t: llamadas.append(t) or "NEGATIVA", 1000, url) == "REVISAR MANUAL"
+        assert len(llamadas) == 1
+        assert plazo.incompletos == {url: "Request cancelado por el cliente"}
+        # Con el plazo vencido no se inician descargas
+        assert Z.procesar_link_robusto(url) is None
+
+def test_endpoint_cancelar():
+    """Requiere API key y solo devuelve el estado del request cancelado, no los demás en curso"""
+    import api_flask
+    cliente = api_flask.app.test_client()
+    headers = {"X-API-Key": api_flask.VALID_TOKENS[0]}
+    with Plazos.activar(Plazos.Plazo(60, request_id="req-otro")):
+        with Plazos.activar(Plazos.Plazo(60, request_id="req-propio")) as plazo:
+            assert cliente.post("/cancelar/req-propio").status_code == 401
+            assert not plazo.cancelado()
+
+            respuesta = cliente.post("/cancelar/req-propio", headers=headers)
+            assert respuesta.status_code == 200
+            datos = respuesta.get_json()
+            assert datos["procesamiento"]["request_id"] == "req-propio" and datos["procesamiento"]["cancelado"]
+            assert "req-otro" not in respuesta.get_data(as_text=True)
+            assert plazo.cancelado()
+    assert cliente.post("/cancelar/req-propio", headers=headers).status_code == 404
+
+if __name__ == "__main__":
+    print("🧪 Test de plazo por request")
+    print("=" * 50)
+    test_timeout_recortado()
+    test_cancelacion_interrumpe_espera()
+    test_plazo_vencido_revisar_manual()
+    test_endpoint_cancelar()
+    print("✅ Todos los tests pasaron")
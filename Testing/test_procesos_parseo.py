@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Test del pool de procesos de parseo: mismo resultado que en el proceso actual,
+páginas por memoria compartida y fallback si el pool no está disponible
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Z_Utils as Z
+import Z_Utils_Paralelo as Paralelo
+
+PAGINAS = [
+    (f'<html><head><title>Pagina {i}</title></head><body><span class="titulo">Título {i}</span>'
+     f'<span class="detalleFull">La Ministra de Cultura inauguró la muestra número {i} en Córdoba</span></body></html>'
+     .encode('latin-1'), 'ISO-8859-1')
+    for i in range(10)
+]
+
+
+def _con_config(procesos, minimo_items):
+    anterior = dict(Paralelo.CONFIG)
+    Paralelo.configurar(procesos, minimo_items)
+    return anterior
+
+
+def test_parseo_en_procesos_igual_al_secuencial():
+    esperados = [Z.texto_plano_desde_html(*p) for p in PAGINAS]
+    assert esperados[3].startswith("[TÍTULO]: Título 3\n[BODY]: La Ministra")
+
+    anterior = _con_config(2, 4)
+    try:
+        paginas = PAGINAS[:5] + [None] + PAGINAS[5:]
+        textos = Paralelo.extraer_textos(paginas)
+        assert textos == esperados[:5] + [None] + esperados[5:]
+        assert Paralelo.estado()["pool_activo"]
+
+        normalizados = Paralelo.normalizar_textos(esperados + [None, ""])
+        assert normalizados == [Z.normalizar_texto(t) for t in esperados] + ["", ""]
+        assert "ministra de cultura inauguro" in normalizados[0]
+    finally:
+        Paralelo.cerrar()
+        Paralelo.CONFIG.update(anterior)
+
+
+def test_lote_chico_no_usa_procesos():
+    anterior = _con_config(2, 50)
+    try:
+        assert not Paralelo.usar_procesos(len(PAGINAS))
+        assert Paralelo.extraer_textos(PAGINAS[:2]) == [Z.texto_plano_desde_html(*p) for p in PAGINAS[:2]]
+        assert not Paralelo.estado()["pool_activo"]
+    finally:
+        Paralelo.CONFIG.update(anterior)
+
+
+def test_fallback_si_el_pool_falla():
+    anterior = _con_config(2, 1)
+    original = Paralelo._obtener_pool
+
+    def pool_roto():
+        raise OSError("sin procesos")
+
+    Paralelo._obtener_pool = pool_roto
+    try:
+        assert Paralelo.extraer_textos(PAGINAS[:3]) == [Z.texto_plano_desde_html(*p) for p in PAGINAS[:3]]
+        assert Paralelo.normalizar_textos(["Córdoba"]) == ["cordoba"]
+    finally:
+        Paralelo._obtener_pool = original
+        Paralelo.CONFIG.update(anterior)
+
+
+if __name__ == "__main__":
+    print("🧪 Test del pool de procesos de parseo")
+    print("=" * 50)
+    test_parseo_en_procesos_igual_al_secuencial()
+    test_lote_chico_no_usa_procesos()
+    test_fallback_si_el_pool_falla()
+    print("✅ Todos los tests pasaron")
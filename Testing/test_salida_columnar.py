@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Test de la salida columnar (Parquet / Arrow IPC / CSV gzip) y del dataset particionado
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tempfile
+import pandas as pd
+
+import Z_Utils as Z
+import Z_Utils_Salida as Salida
+
+def _formatos_disponibles():
+    try:
+        import pyarrow  # noqa: F401
+        return ['parquet', 'arrow', 'csv']
+    except ImportError:
+        print("⚠️ pyarrow no instalado: se prueba solo CSV gzip")
+        return ['csv']
+
+def _df_de_prueba():
+    return pd.DataFrame({
+        'TITULO': ['Nota A', 'Nota B', 'Nota C'],
+        'FECHA': ['2025-06-01', '2025-06-01', '2025-06-02'],
+        'MEDIO': ['Infobae', 'Página 12', 'Infobae'],
+        'TEMA': ['Mecenazgo', 'Mecenazgo', 'BAFICI'],
+        'VALORACION': ['NEGATIVA', 'NEUTRA', 'NEGATIVA'],
+        'MENCIONES': [['Gabriela Ricardes'], [], []],
+        'HTML_OBJ': [object(), object(), object()],
+    })
+
+def test_escribir_y_leer_registros():
+    """Ida y vuelta por archivo único: se descarta HTML_OBJ y MENCIONES sigue siendo lista"""
+    with tempfile.TemporaryDirectory() as tmp:
+        for formato in _formatos_disponibles():
+            extension = Salida.FORMATOS_SALIDA[formato][0]
+            ruta = Salida.escribir_registros(_df_de_prueba(), os.path.join(tmp, f"noticias{extension}"))
+            df = Salida.leer_registros(ruta)
+            assert 'HTML_OBJ' not in df.columns
+            assert [list(m) for m in df['MENCIONES']] == [['Gabriela Ricardes'], [], []]
+            print(f"✅ {formato}: ida y vuelta OK")
+
+def test_dataset_particionado():
+    """Append por fecha y medio, con poda de particiones por rango de fechas"""
+    with tempfile.TemporaryDirectory() as tmp:
+        for formato in _formatos_disponibles():
+            base = os.path.join(tmp, formato)
+            escritos = Salida.agregar_a_dataset(_df_de_prueba(), base, formato)
+            assert len(escritos) == 3  # (06-01, Infobae), (06-01, Página 12), (06-02, Infobae)
+            Salida.agregar_a_dataset(_df_de_prueba(), base, formato)  # append, no reescribe
+
+            assert len(Salida.leer_dataset(base)) == 6
+            df_dia = Salida.leer_dataset(base, columnas=['TEMA', 'VALORACION'], desde='2025-06-02')
+            assert df_dia['TEMA'].tolist() == ['BAFICI', 'BAFICI']
+
+def test_particion_vieja_sin_columna():
+    """Una partición escrita antes de agregar una columna se lee con esa columna vacía"""
+    with tempfile.TemporaryDirectory() as tmp:
+        for formato in _formatos_disponibles():
+            base = os.path.join(tmp, formato)
+            Salida.agregar_a_dataset(_df_de_prueba().drop(columns=['VALORACION']), base, formato)
+            Salida.agregar_a_dataset(_df_de_prueba(), base, formato)
+
+            df = Salida.leer_dataset(base, columnas=['VALORACION', 'TEMA'])
+            assert list(df.columns) == ['VALORACION', 'TEMA'] and len(df) == 6
+            assert df['VALORACION'].isna().sum() == 3
+            assert sorted(df['VALORACION'].dropna()) == ['NEGATIVA', 'NEGATIVA', 'NEUTRA']
+
+def test_crisis_desde_dataset():
+    """procesar_crisis_con_historico acepta una carpeta de dataset como histórico"""
+    with tempfile.TemporaryDirectory() as tmp:
+        historico = _df_de_prueba()
+        historico['VALORACION'] = 'NEGATIVO'
+        Salida.agregar_a_dataset(pd.concat([historico] * 2, ignore_index=True), tmp, 'csv')
+
+        actual = pd.DataFrame({'TEMA': ['Mecenazgo', 'BAFICI'], 'VALORACION': ['NEGATIVO', 'NEUTRA']})
+        df = Z.procesar_crisis_con_historico(actual, tmp, ["Actividades programadas"])
+        assert df['CRISIS'].tolist() == ['SI', 'NO']
+
+if __name__ == "__main__":
+    print("🧪 Test de salida columnar")
+    print("=" * 50)
+    test_escribir_y_leer_registros()
+    test_dataset_particionado()
+    test_particion_vieja_sin_columna()
+    test_crisis_desde_dataset()
+    print("✅ Todos los tests pasaron")
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Test del store persistente de artículos procesados (id de ejes + modelo + prompts + configuración)
+y de la deduplicación de URLs dentro de un request
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tempfile
+import pandas as pd
+
+import Z_Utils_Articulos as Art
+
+URL_BASE = "https://www.ejes.com.ar/noticia_completa.cfm?id="
+
+def test_extraer_id_ejes():
+    assert Art.extraer_id_ejes(URL_BASE + "12345") == "12345"
+    assert Art.extraer_id_ejes("http://WWW.EJES.COM.AR/noticia_completa.cfm?ID=0012345&ref=mail") == "12345"
+    assert Art.extraer_id_ejes("https://www.ejes.com.ar/otra_pagina.cfm") is None
+    assert Art.extraer_id_ejes(None) is None
+
+def test_buscar_y_guardar():
+    """Un artículo se reutiliza solo con el mismo modelo, prompts y configuración, y si no venció"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = os.path.join(tmp, 'articulos.db')
+        huella = Art.huella_configuracion(temas=['Mecenazgo'], tema_default='Otros')
+        registro = {'LINK': URL_BASE + "1", 'TITULO': 'Nota', 'TEMA': 'Mecenazgo'}
+        assert Art.guardar_articulos([registro, {'LINK': 'https://otro.com/x'}], 'GPT:gpt-4o', 'v1', huella, db) == 1
+
+        assert Art.buscar_articulos(['1', '2'], 'GPT:gpt-4o', 'v1', huella, db_path=db) == {'1': registro}
+        assert Art.buscar_articulos(['1'], 'Ollama:llama3.1:8b', 'v1', huella, db_path=db) == {}
+        assert Art.buscar_articulos(['1'], 'GPT:gpt-4o', 'v2', huella, db_path=db) == {}
+        otra_huella = Art.huella_configuracion(temas=['BAFICI'], tema_default='Otros')
+        assert Art.buscar_articulos(['1'], 'GPT:gpt-4o', 'v1', otra_huella, db_path=db) == {}
+        assert Art.buscar_articulos(['1'], 'GPT:gpt-4o', 'v1', huella, max_edad_seg=-1, db_path=db) == {}
+        assert Art.purgar_vencidos(max_edad_seg=-1, db_path=db) == 1
+
+def test_pipeline_reutiliza_store():
+    """El segundo request con las mismas URLs no vuelve a procesarlas"""
+    import api_flask
+
+    llamadas = []
+    def lote_falso(urls_lote, *args):
+        llamadas.append(list(urls_lote))
+        df = pd.DataFrame({'LINK': urls_lote, 'TITULO': [f"Nota {u[-1]}" for u in urls_lote],
+                           'TEMA': ['Mecenazgo'] * len(urls_lote), 'VALORACION': ['NEUTRA'] * len(urls_lote),
+                           '_FUENTES': [{'VALORACION': 'llm'}] * len(urls_lote)})
+        return df, [], []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_original, lote_original = Art.ARTICULOS_DB_PATH, api_flask._procesar_lote_urls
+        crisis_original = api_flask.Crisis.CRISIS_DB_PATH
+        Art.ARTICULOS_DB_PATH = os.path.join(tmp, 'articulos.db')
+        api_flask.Crisis.CRISIS_DB_PATH = os.path.join(tmp, 'crisis.db')
+        api_flask._procesar_lote_urls = lote_falso
+        try:
+            urls = [URL_BASE + "1", URL_BASE + "2"]
+            resultado, codigo = api_flask.procesar_noticias_con_ia(urls, ['Mecenazgo'], 'Otros')
+            assert codigo == 200 and resultado['procesadas'] == 2
+
+            resultado, codigo = api_flask.procesar_noticias_con_ia(urls + [URL_BASE + "3"], ['Mecenazgo'], 'Otros')
+            assert codigo == 200 and resultado['procesadas'] == 3
+            assert llamadas == [urls, [URL_BASE + "3"]]
+            assert [r['LINK'] for r in resultado['data']] == urls + [URL_BASE + "3"]
+            # El origen de las etiquetas se guarda en el store pero no sale en la respuesta
+            assert all('_FUENTES' not in r for r in resultado['data'])
+            assert all(r['_FUENTES'] == {'VALORACION': 'llm'} for r in Art.listar_articulos())
+
+            # Con otra versión del extractor de contenido el texto cambia: no se reutiliza
+            version_original = api_flask.Contenido.VERSION_EXTRACTOR
+            api_flask.Contenido.VERSION_EXTRACTOR = version_original + "-nueva"
+            try:
+                api_flask.procesar_noticias_con_ia(urls, ['Mecenazgo'], 'Otros')
+            finally:
+                api_flask.Contenido.VERSION_EXTRACTOR = version_original
+            assert llamadas[-1] == urls
+        finally:
+            Art.ARTICULOS_DB_PATH, api_flask._procesar_lote_urls = db_original, lote_original
+            api_flask.Crisis.CRISIS_DB_PATH = crisis_original
+
+def test_agrupar_urls_duplicadas():
+    """http/https, host en mayúsculas y parámetros extra colapsan al mismo artículo"""
+    urls = [
+        URL_BASE + "7",
+        "http://WWW.EJES.COM.AR/noticia_completa.cfm?id=7&utm_source=excel",
+        URL_BASE + "8",
+        URL_BASE + "7",
+    ]
+    grupos = Art.agrupar_urls_duplicadas(urls)
+    assert list(grupos.values()) == [[urls[0], urls[1], urls[3]], [urls[2]]]
+
+def test_pipeline_replica_duplicados():
+    """Cada artículo se procesa una vez y el resultado vuelve a todas sus URLs originales"""
+    import api_flask
+
+    llamadas = []
+    def lote_falso(urls_lote, *args):
+        llamadas.append(list(urls_lote))
+        df = pd.DataFrame({'LINK': urls_lote[:1], 'TITULO': ['Nota'], 'TEMA': ['BAFICI'], 'VALORACION': ['NEUTRA']})
+        return df, [{"url": u, "motivo": "Error de extracción"} for u in urls_lote[1:]], []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        lote_original, store_original = api_flask._procesar_lote_urls, api_flask.RUNTIME_CONFIG['store_articulos']
+        crisis_original = api_flask.Crisis.CRISIS_DB_PATH
+        api_flask.Crisis.CRISIS_DB_PATH = os.path.join(tmp, 'crisis.db')
+        api_flask._procesar_lote_urls = lote_falso
+        api_flask.RUNTIME_CONFIG['store_articulos'] = False
+        try:
+            urls = [URL_BASE + "10", URL_BASE + "11", "http://www.EJES.com.ar/noticia_completa.cfm?id=10", URL_BASE + "11"]
+            resultado, codigo = api_flask.procesar_noticias_con_ia(urls, ['BAFICI'], 'Otros')
+            assert llamadas == [[URL_BASE + "10", URL_BASE + "11"]]
+            assert codigo == 200 and resultado['recibidas'] == 4 and resultado['procesadas'] == 2
+            assert [r['LINK'] for r in resultado['data']] == [urls[0], urls[2]]
+            assert [e['url'] for e in resultado['errores']] == [urls[1], urls[3]]
+        finally:
+            api_flask._procesar_lote_urls, api_flask.RUNTIME_CONFIG['store_articulos'] = lote_original, store_original
+            api_flask.Crisis.CRISIS_DB_PATH = crisis_original
+
+if __name__ == "__main__":
+    print("🧪 Test del store de artículos")
+    print("=" * 50)
+    test_extraer_id_ejes()
+    test_buscar_y_guardar()
+    test_pipeline_reutiliza_store()
+    test_agrupar_urls_duplicadas()
+    test_pipeline_replica_duplicados()
+    print("✅ Todos los tests pasaron")
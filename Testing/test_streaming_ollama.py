@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Test de lectura en streaming de Ollama: la clasificación se decide con el primer token
+decisivo y la conexión se cierra sin leer el resto de la generación
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+import types
+
+import O_Utils_Esquemas as Esq
+import O_Utils_Ollama as Ollama
+
+class _Stream:
+    """Respuesta en streaming simulada: un fragmento por token, registra cuántos se leyeron"""
+    status_code = 200
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.leidos = 0
+        self.cerrada = False
+    def iter_lines(self):
+        for i, token in enumerate(self.tokens):
+            self.leidos += 1
+            yield json.dumps({"response": token, "done": i == len(self.tokens) - 1}).encode('utf-8')
+    def close(self):
+        self.cerrada = True
+
+def _http(post):
+    """Reemplazo de las sesiones HTTP de Ollama"""
+    return types.SimpleNamespace(sesion=lambda nombre: types.SimpleNamespace(post=post))
+
+def _con_stream(tokens, funcion, *args):
+    original = Ollama.Http
+    stream, enviados = _Stream(tokens), []
+    Ollama.Http = _http(post=lambda url, json=None, **kw: enviados.append((json, kw)) or stream)
+    try:
+        return funcion(*args), stream, enviados[0]
+    finally:
+        Ollama.Http = original
+
+def test_decision_parcial():
+    assert Esq.decidir_parcial('{"respuesta": "S', Esq.ESQUEMA_SI_NO) == "SI"
+    assert Esq.decidir_parcial('{"respuesta": "N', Esq.ESQUEMA_VALORACION) is None  # NEGATIVA / NO_NEGATIVA
+    assert Esq.decidir_parcial('{"respuesta": "NO', Esq.ESQUEMA_VALORACION) == "NO_NEGATIVA"
+    temas = Esq.esquema_tema(["Cine", "Cine Arte"])
+    assert Esq.decidir_parcial('{"respuesta": "Cine', temas) is None
+    assert Esq.decidir_parcial('{"respuesta": "Cine"', temas) == "Cine"
+
+def test_corta_con_el_primer_token_decisivo():
+    tokens = ['{"', 'respuesta', '":', ' "', 'S', 'I', '"}', ' ', 'explicación', ' larga'] + ['.'] * 50
+    resultado, stream, (payload, kw) = _con_stream(tokens, Ollama.es_agenda_ollama, "Agenda: sábado cine")
+    assert resultado is True
+    assert stream.leidos == 5 and stream.cerrada
+    assert payload["stream"] is True and kw.get("stream") is True
+    assert payload["options"]["num_predict"] == Ollama.NUM_PREDICT_POR_TAREA['agenda']
+
+def test_valoracion_y_respuesta_incompleta():
+    resultado, stream, _ = _con_stream(['{"respuesta": "', 'N', 'E', 'GATIVA"}'], Ollama.valorar_noticia_con_ollama_base, "Denuncia")
+    assert resultado == "NEGATIVA" and stream.leidos == 3
+
+    # Si la generación termina sin una etiqueta válida se usa el valor conservador
+    resultado, stream, _ = _con_stream(['{"respuesta": ', '"X"}'], Ollama.detectar_factor_politico_con_ollama, "texto")
+    assert resultado == "NO" and stream.cerrada
+
+def test_sin_streaming():
+    originales = (Ollama.OLLAMA_STREAMING, Ollama.Http)
+    respuesta = types.SimpleNamespace(status_code=200, json=lambda: {"response": '{"respuesta": "SI"}'})
+    Ollama.OLLAMA_STREAMING = False
+    Ollama.Http = _http(post=lambda *a, **k: respuesta)
+    try:
+        assert Ollama.es_entrevista_ollama("–¿Cómo empezó? –Hace años") is True
+    finally:
+        Ollama.OLLAMA_STREAMING, Ollama.Http = originales
+
+if __name__ == "__main__":
+    print("🧪 Test de streaming de Ollama")
+    print("=" * 50)
+    test_decision_parcial()
+    test_corta_con_el_primer_token_decisivo()
+    test_valoracion_y_respuesta_incompleta()
+    test_sin_streaming()
+    print("✅ Todos los tests pasaron")
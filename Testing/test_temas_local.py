@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Test del clasificador local de temas (TF-IDF + vecino más cercano) y del fallback al LLM
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import time
+
+import O_Utils_Temas as Temas
+import O_Utils_GPT as Gpt
+
+HISTORICO_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "DataCollected", "noticias_historicas.xlsx")
+TEMAS = ["Mecenazgo", "Homenaje a Sara Facio", "Jubilaciones bailarines del Teatro Colón", "¡URGENTE!"]
+
+def test_asigna_tema_con_confianza():
+    texto = "Nuevos problemas en el régimen de mecenazgo: los proyectos culturales siguen sin fondos"
+    assert Temas.clasificar_tema_local(texto, TEMAS, "Actividades programadas", paths=[HISTORICO_PATH]) == "Mecenazgo"
+
+    texto = "La muestra homenaje a Sara Facio reúne sus fotografías más conocidas"
+    assert Temas.clasificar_tema_local(texto, TEMAS, "Actividades programadas", paths=[HISTORICO_PATH]) == "Homenaje a Sara Facio"
+
+def test_planillas_por_defecto():
+    """Las rutas por defecto existen (relativas al módulo) e incluyen los artículos históricos con texto"""
+    import logging
+    assert Temas.HISTORICO_PATH in Temas.TEMAS_EJEMPLOS_PATHS
+    assert all(os.path.exists(p) for p in Temas.TEMAS_EJEMPLOS_PATHS)
+    ejemplos = Temas.cargar_ejemplos()
+    historicos = Temas.cargar_ejemplos([HISTORICO_PATH])
+    assert historicos and all(e in ejemplos for e in historicos)
+    import pandas as pd
+    fila = pd.read_excel(HISTORICO_PATH).iloc[0]
+    assert (f"{fila['TITULO']} {fila['TEXTO_PLANO']}", fila['TEMA']) in ejemplos  # TEXTO_PLANO, no solo el título
+
+    avisos = []
+    handler = logging.Handler()
+    handler.emit = lambda registro: avisos.append(registro.getMessage())
+    logging.getLogger().addHandler(handler)
+    try:
+        assert Temas.cargar_ejemplos([os.path.join("no_existe", "planilla.xlsx")]) == []
+    finally:
+        logging.getLogger().removeHandler(handler)
+    assert any("planilla.xlsx" in aviso for aviso in avisos)
+
+def test_baja_confianza_devuelve_none():
+    texto = "El gobierno anunció cambios en el transporte público de la ciudad"
+    assert Temas.clasificar_tema_local(texto, TEMAS, "Actividades programadas", paths=[HISTORICO_PATH]) is None
+
+def test_llm_solo_con_baja_confianza():
+    """clasificar_tema_con_ia solo llama al LLM cuando el clasificador local no alcanza el margen"""
+    llamadas = []
+    import O_Utils_Ollama as Oll
+    ollama_original = Oll.clasificar_tema_ollama
+    paths_original = Temas.TEMAS_EJEMPLOS_PATHS
+    Oll.clasificar_tema_ollama = lambda texto, lista_temas, tema_default=None, tipo_publicacion=None: llamadas.append(texto) or tema_default
+    Temas.TEMAS_EJEMPLOS_PATHS = [HISTORICO_PATH]
+    try:
+        tema = Gpt.clasificar_tema_con_ia("Texto sobre problemas en mecenazgo", TEMAS, gpt_active=False, tema_default="Actividades programadas")
+        assert tema == "Mecenazgo" and llamadas == []
+
+        tema = Gpt.clasificar_tema_con_ia("Corte de luz en Palermo", TEMAS, gpt_active=False, tema_default="Actividades programadas")
+        assert tema == "Actividades programadas" and len(llamadas) == 1
+
+        Gpt.clasificar_tema_con_ia("Texto sobre problemas en mecenazgo", TEMAS, gpt_active=False, tema_default="Actividades programadas", margen_local=None)
+        assert len(llamadas) == 2
+    finally:
+        Oll.clasificar_tema_ollama = ollama_original
+        Temas.TEMAS_EJEMPLOS_PATHS = paths_original
+
+def test_latencia_local():
+    texto = "Nuevos problemas en el régimen de mecenazgo. " * 200
+    Temas.clasificar_tema_local(texto, TEMAS, "Actividades programadas", paths=[HISTORICO_PATH])
+    t0 = time.perf_counter()
+    for i in range(20):
+        Temas.clasificar_tema_local(texto + str(i), TEMAS, "Actividades programadas", paths=[HISTORICO_PATH])
+    ms = (time.perf_counter() - t0) * 1000 / 20
+    print(f"⏱️ Clasificación local: {ms:.2f} ms por noticia")
+    assert ms < 50
+
+if __name__ == "__main__":
+    print("🧪 Test del clasificador local de temas")
+    print("=" * 50)
+    test_asigna_tema_con_confianza()
+    test_planillas_por_defecto()
+    test_baja_confianza_devuelve_none()
+    test_llm_solo_con_baja_confianza()
+    test_latencia_local()
+    print("✅ Todos los tests pasaron")
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Benchmark de arranque: importar api_flask no debe cargar las dependencias pesadas
+(pandas, numpy, BeautifulSoup) y el tiempo total queda por debajo de IMPORT_MAXIMO_MS.
+Medido con 'python -X importtime' en un proceso limpio.
+
+Uso: python Testing/test_tiempo_importacion.py   (imprime los módulos más lentos)
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import subprocess
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODULOS_PESADOS = ['pandas', 'numpy', 'bs4']
+IMPORT_MAXIMO_MS = 1500  # Objetivo de regresión (hoy ~250 ms; con pandas al importar eran ~550 ms)
+
+def medir_importacion(modulo='api_flask'):
+    """
+    Importa el módulo en un proceso nuevo con -X importtime.
+
+    Returns:
+        dict: {módulo: tiempo acumulado en ms}
+    """
+    salida = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {modulo}'],
+        cwd=RAIZ, capture_output=True, text=True, check=True,
+    ).stderr
+    tiempos = {}
+    for linea in salida.splitlines():
+        if not linea.startswith('import time:') or 'cumulative' in linea:
+            continue
+        _, acumulado, nombre = linea.replace('import time:', '').split('|')
+        tiempos[nombre.strip()] = int(acumulado) / 1000
+    return tiempos
+
+def test_api_sin_dependencias_pesadas():
+    tiempos = medir_importacion('api_flask')
+    cargados = [m for m in MODULOS_PESADOS if m in tiempos]
+    assert cargados == [], f"Importar api_flask carga {cargados}"
+    assert tiempos['api_flask'] < IMPORT_MAXIMO_MS, f"api_flask tarda {tiempos['api_flask']:.0f} ms en importar"
+
+def test_modulos_ia_livianos():
+    for modulo in ('O_Utils_GPT', 'O_Utils_Ollama', 'Z_Utils'):
+        tiempos = medir_importacion(modulo)
+        cargados = [m for m in MODULOS_PESADOS if m in tiempos]
+        assert cargados == [], f"Importar {modulo} carga {cargados}"
+
+if __name__ == "__main__":
+    print("🧪 Benchmark de importación")
+    print("=" * 50)
+    tiempos = medir_importacion('api_flask')
+    print(f"⏱️ api_flask: {tiempos['api_flask']:.0f} ms (objetivo < {IMPORT_MAXIMO_MS} ms)")
+    for nombre, ms in sorted(tiempos.items(), key=lambda x: -x[1])[1:16]:
+        print(f"   {ms:8.1f} ms  {nombre}")
+    test_api_sin_dependencias_pesadas()
+    test_modulos_ia_livianos()
+    print("✅ Todos los tests pasaron")
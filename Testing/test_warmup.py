@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Test del warm-up de arranque: pasos en orden, un paso que falla no frena a los demás,
+precarga del modelo de Ollama con keep_alive y readiness solo después del warm-up
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import types
+
+import Z_Utils_Warmup as Warmup
+import Z_Utils_Breaker as Breaker
+import O_Utils_Ollama as Ollama
+
+def test_pasos_en_orden_y_fallas():
+    originales = list(Warmup._pasos)
+    orden = []
+    Warmup._pasos.clear()
+    Warmup.registrar('primero', lambda: orden.append('primero') or {"ok": 1})
+    Warmup.registrar('roto', lambda: 1 / 0)
+    Warmup.registrar('ultimo', lambda: orden.append('ultimo'))
+    try:
+        estado = Warmup.ejecutar()
+        assert orden == ['primero', 'ultimo']
+        assert estado["estado"] == "terminado" and Warmup.terminado()
+        assert estado["pasos"]["primero"]["ok"] is True
+        assert estado["pasos"]["roto"]["ok"] is False and "ZeroDivisionError" in estado["pasos"]["roto"]["detalle"]
+        assert estado["pasos"]["ultimo"]["ok"] is True
+    finally:
+        Warmup._pasos[:] = originales
+
+def test_importar_modulos():
+    resultado = Warmup.importar_modulos(['json', 'modulo_que_no_existe'])
+    assert resultado == {"importados": ['json'], "no_instalados": ['modulo_que_no_existe']}
+
+def test_precarga_ollama_con_keep_alive():
+    original = Ollama.Http
+    enviados = []
+    def post(url, json=None, **kwargs):
+        enviados.append(json)
+        return types.SimpleNamespace(status_code=200)
+    Ollama.Http = types.SimpleNamespace(sesion=lambda nombre: types.SimpleNamespace(post=post))
+    Breaker.reiniciar()
+    try:
+        assert Ollama.precargar_modelo() is True
+        assert enviados == [{"keep_alive": Ollama.OLLAMA_KEEP_ALIVE, "model": Ollama.MODELO_OLLAMA}]
+    finally:
+        Ollama.Http = original
+
+if __name__ == "__main__":
+    print("🧪 Test de warm-up")
+    print("=" * 50)
+    test_pasos_en_orden_y_fallas()
+    test_importar_modulos()
+    test_precarga_ollama_con_keep_alive()
+    print("✅ Todos los tests pasaron")
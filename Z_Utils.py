@@ -1,14 +1,24 @@
-import pandas as pd
 import requests
-from bs4 import BeautifulSoup
-import chardet
 import os
 import logging
 import re
-import unicodedata
-import time
 from datetime import datetime, timezone, timedelta
 
+import Z_Utils_Medios as Medios
+import Z_Utils_Deadline as Plazos
+import Z_Utils_Breaker as Breaker
+import Z_Utils_Http as Http
+import Z_Utils_Lazy as Lazy
+import Z_Utils_Paralelo as Paralelo
+import Z_Utils_Texto as Texto
+import Z_Utils_Menciones as Menciones
+import Z_Utils_Contenido as Contenido
+
+# Dependencias pesadas: se importan en el primer uso
+pd = Lazy.modulo('pandas')
+bs4 = Lazy.modulo('bs4')
+chardet = Lazy.modulo('chardet')
+
 # Levantar un logger
 def setup_logger(filename):
     # Configura el logger para registrar eventos en un archivo.
@@ -45,11 +55,159 @@ def setup_logger(filename):
         handler.setFormatter(BATimeFormatter('%(asctime)s %(levelname)s: %(message)s'))
 
 #Export a excel
-def exportar_df_a_excel(df, export_path):
+EXCEL_ANCHO_MAXIMO = 50  # Ancho máximo de columna (en caracteres)
+EXCEL_COLOR_ENCABEZADO = "366092"
+EXCEL_FORMATO_FECHA = "yyyy-mm-dd hh:mm:ss"
+
+def _motor_excel_disponible():
+    """
+    Devuelve el motor de escritura streaming a usar: 'xlsxwriter' (constant_memory)
+    si está instalado, si no 'openpyxl' en modo write_only.
+    """
+    try:
+        import xlsxwriter  # noqa: F401
+        return 'xlsxwriter'
+    except ImportError:
+        return 'openpyxl'
+
+def _calcular_anchos_columnas(df):
+    """
+    Calcula el ancho de cada columna a partir del DataFrame (no de las celdas ya escritas),
+    usando operaciones vectorizadas de longitud de string. Máximo EXCEL_ANCHO_MAXIMO.
+    """
+    anchos = []
+    for col in df.columns:
+        serie = df[col]
+        largo_max = len(str(col))
+        if len(serie):
+            largos = serie.where(serie.notna(), '').astype(str).str.len()
+            largo_max = max(largo_max, int(largos.max()))
+        anchos.append(min(largo_max + 2, EXCEL_ANCHO_MAXIMO))
+    return anchos
+
+def _preparar_columnas_para_excel(df):
+    """
+    Convierte cada columna a valores nativos que ambos motores pueden escribir sin estilos por celda:
+    nulos -> None, listas/dicts -> str (igual que pandas.to_excel), fechas sin timezone.
+    Devuelve (columnas_convertidas, indices_de_columnas_fecha).
+    """
+    columnas = []
+    columnas_fecha = set()
+    for i, col in enumerate(df.columns):
+        serie = df[col]
+        if pd.api.types.is_datetime64_any_dtype(serie):
+            columnas_fecha.add(i)
+            if getattr(serie.dt, 'tz', None) is not None:
+                serie = serie.dt.tz_localize(None)
+        elif serie.dtype == object:
+            serie = serie.map(lambda v: str(v) if isinstance(v, (list, tuple, dict, set)) else v)
+        columnas.append(serie.astype(object).where(serie.notna(), None))
+    return columnas, columnas_fecha
+
+def _exportar_con_xlsxwriter(df, export_path, columnas, columnas_fecha, anchos):
+    """
+    Escritura en modo constant_memory: las filas se vuelcan a disco a medida que se escriben.
+    Los formatos son objetos compartidos por columna (no se crea un estilo por celda).
+    """
+    import xlsxwriter
+
+    workbook = xlsxwriter.Workbook(export_path, {
+        'constant_memory': True,
+        'nan_inf_to_errors': True,
+        'remove_timezone': True,
+        # Los textos van tal cual: ni links (tope de 65.530 URLs por hoja) ni fórmulas ("=..." en un título)
+        'strings_to_urls': False,
+        'strings_to_formulas': False,
+    })
+    try:
+        worksheet = workbook.add_worksheet('Datos')
+
+        borde = {'border': 1}
+        formato_encabezado = workbook.add_format({
+            **borde, 'bold': True, 'font_color': '#FFFFFF', 'font_size': 12,
+            'bg_color': f'#{EXCEL_COLOR_ENCABEZADO}', 'align': 'center', 'valign': 'vcenter'
+        })
+        formato_datos = workbook.add_format({**borde, 'align': 'center', 'valign': 'vcenter'})
+        formato_fecha = workbook.add_format({**borde, 'align': 'center', 'valign': 'vcenter',
+                                             'num_format': EXCEL_FORMATO_FECHA})
+        formatos_columna = [formato_fecha if i in columnas_fecha else formato_datos
+                            for i in range(len(df.columns))]
+
+        for i, ancho in enumerate(anchos):
+            worksheet.set_column(i, i, ancho)
+
+        worksheet.write_row(0, 0, [str(c) for c in df.columns], formato_encabezado)
+        for fila_idx, fila in enumerate(zip(*columnas), start=1):
+            for col_idx, valor in enumerate(fila):
+                if valor is None:
+                    worksheet.write_blank(fila_idx, col_idx, None, formatos_columna[col_idx])
+                else:
+                    worksheet.write(fila_idx, col_idx, valor, formatos_columna[col_idx])
+    finally:
+        workbook.close()
+
+def _exportar_con_openpyxl(df, export_path, columnas, columnas_fecha, anchos):
+    """
+    Escritura en modo write_only de openpyxl (las filas no quedan en memoria).
+    Los estilos se registran una sola vez como NamedStyle y cada celda solo referencia el nombre.
+    """
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Border, Side, Font, PatternFill, Alignment, NamedStyle
+    from openpyxl.utils import get_column_letter
+
+    workbook = Workbook(write_only=True)
+    worksheet = workbook.create_sheet('Datos')
+
+    lado = Side(style='thin')
+    borde = Border(left=lado, right=lado, top=lado, bottom=lado)
+    centrado = Alignment(horizontal="center", vertical="center")
+    estilo_encabezado = NamedStyle(
+        name='prensai_encabezado', border=borde, alignment=centrado,
+        font=Font(bold=True, color="FFFFFF", size=12),
+        fill=PatternFill(start_color=EXCEL_COLOR_ENCABEZADO, end_color=EXCEL_COLOR_ENCABEZADO, fill_type="solid")
+    )
+    estilo_datos = NamedStyle(name='prensai_datos', border=borde, alignment=centrado)
+    estilo_fecha = NamedStyle(name='prensai_fecha', border=borde, alignment=centrado,
+                              number_format=EXCEL_FORMATO_FECHA)
+    for estilo in (estilo_encabezado, estilo_datos, estilo_fecha):
+        workbook.add_named_style(estilo)
+    estilos_columna = [estilo_fecha.name if i in columnas_fecha else estilo_datos.name
+                       for i in range(len(df.columns))]
+
+    # En write_only los anchos deben definirse antes de escribir filas
+    for i, ancho in enumerate(anchos, start=1):
+        worksheet.column_dimensions[get_column_letter(i)].width = ancho
+
+    def _celda(valor, estilo):
+        cell = WriteOnlyCell(worksheet, value=valor)
+        if cell.data_type == 'f':
+            cell.data_type = 's'  # Un texto que empieza con "=" se guarda como texto, no como fórmula
+        cell.style = estilo
+        return cell
+
+    worksheet.append([_celda(str(c), estilo_encabezado.name) for c in df.columns])
+    for fila in zip(*columnas):
+        worksheet.append([_celda(valor, estilos_columna[i]) for i, valor in enumerate(fila)])
+
+    workbook.save(export_path)
+
+def exportar_df_a_excel(df, export_path, motor=None):
     """
     Exporta el DataFrame a un archivo Excel en la ruta export_path.
     Crea el directorio si no existe y loguea errores.
     Aplica formato con cuadrícula (bordes) a todas las celdas.
+
+    Escribe en modo streaming (xlsxwriter constant_memory u openpyxl write_only),
+    con estilos por columna y anchos calculados desde el DataFrame.
+
+    Args:
+        df (DataFrame): Datos a exportar
+        export_path (str): Ruta del archivo .xlsx
+        motor (str, optional): 'xlsxwriter' u 'openpyxl'. Por defecto, el mejor disponible.
+
+    Returns:
+        bool: True si se exportó correctamente, False si hubo error
     """
     # Extraer el directorio del path completo
     dir_path = os.path.dirname(export_path)
@@ -57,107 +215,90 @@ def exportar_df_a_excel(df, export_path):
         os.makedirs(dir_path, exist_ok=True)
 
     try:
-        # Crear un writer de Excel para poder aplicar formato
-        with pd.ExcelWriter(export_path, engine='openpyxl') as writer:
-            df.to_excel(writer, index=False, sheet_name='Datos')
-            
-            # Obtener el workbook y worksheet
-            workbook = writer.book
-            worksheet = writer.sheets['Datos']
-            
-            # Importar estilos
-            from openpyxl.styles import Border, Side, Font, PatternFill, Alignment
-            
-            # Definir estilos
-            thin_border = Border(
-                left=Side(style='thin'),
-                right=Side(style='thin'),
-                top=Side(style='thin'),
-                bottom=Side(style='thin')
-            )
-            
-            # Estilo para el encabezado
-            header_font = Font(bold=True, color="FFFFFF", size=12)
-            header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-            header_alignment = Alignment(horizontal="center", vertical="center")
-            
-            # Aplicar formato al encabezado (fila 1)
-            for col in range(1, len(df.columns) + 1):
-                cell = worksheet.cell(row=1, column=col)
-                cell.font = header_font
-                cell.fill = header_fill
-                cell.alignment = header_alignment
-                cell.border = thin_border
-            
-            # Aplicar bordes y formato a todas las celdas de datos
-            for row in range(1, len(df) + 2):  # +2 para incluir header
-                for col in range(1, len(df.columns) + 1):
-                    cell = worksheet.cell(row=row, column=col)
-                    cell.border = thin_border
-                    
-                    # Aplicar alineación centrada a todas las celdas
-                    if row > 1:  # Solo para datos, no para el header
-                        cell.alignment = Alignment(horizontal="center", vertical="center")
-            
-            # Ajustar ancho de columnas automáticamente
-            for column in worksheet.columns:
-                max_length = 0
-                column_letter = column[0].column_letter
-                for cell in column:
-                    try:
-                        if len(str(cell.value)) > max_length:
-                            max_length = len(str(cell.value))
-                    except:
-                        pass
-                adjusted_width = min(max_length + 2, 50)  # Máximo 50 caracteres
-                worksheet.column_dimensions[column_letter].width = adjusted_width
-        
-        logging.info(f"DataFrame exportado exitosamente a {export_path} con formato de cuadrícula")
+        motor = motor or _motor_excel_disponible()
+        anchos = _calcular_anchos_columnas(df)
+        columnas, columnas_fecha = _preparar_columnas_para_excel(df)
+
+        if motor == 'xlsxwriter':
+            _exportar_con_xlsxwriter(df, export_path, columnas, columnas_fecha, anchos)
+        elif motor == 'openpyxl':
+            _exportar_con_openpyxl(df, export_path, columnas, columnas_fecha, anchos)
+        else:
+            raise ValueError(f"Motor de Excel '{motor}' no válido. Debe ser 'xlsxwriter' u 'openpyxl'")
+
+        logging.info(f"DataFrame exportado exitosamente a {export_path} con formato de cuadrícula ({motor}, {len(df)} filas)")
+        return True
     except Exception as e:
-        logging.error(f"Error al exportar DataFrame a Excel ({export_path}): {e}") 
+        logging.error(f"Error al exportar DataFrame a Excel ({export_path}): {e}")
+        return False
+
+def _descargar(link):
+    """
+    GET de un artículo (con el pool de conexiones de ejes.com) registrando el resultado en el
+    breaker (5xx, timeouts y errores de conexión cuentan como falla del backend).
+    """
+    breaker = Breaker.get('ejes')
+    try:
+        r = Http.sesion('ejes').get(link, timeout=Plazos.timeout(10))
+    except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+        breaker.registrar_falla(type(e).__name__)
+        raise
+    if r.status_code >= 500:
+        breaker.registrar_falla(f"HTTP {r.status_code}")
+    else:
+        breaker.registrar_exito()
+    return r
+
+def texto_plano_desde_html(contenido, encoding=None):
+    """
+    Decodifica (chardet, con fallback al encoding HTTP) y parsea el HTML crudo de un artículo.
+    Retorna un string con '[TÍTULO]: ... [BODY]: ...', o solo el cuerpo si no encuentra título.
+    Sin span.detalleFull, el cuerpo es el contenido principal de la página, sin menús, pie ni
+    scripts (Z_Utils_Contenido). No hace I/O: la usan tanto get_texto_plano_from_link como los procesos de Z_Utils_Paralelo.
+    """
+    enc = encoding if encoding else 'utf-8'
+    try:
+        detected_enc = chardet.detect(contenido)['encoding']
+        enc = detected_enc if detected_enc else enc
+        html = contenido.decode(enc, errors='replace')
+    except Exception as e:
+        logging.warning(f"⚠️ Problema al decodificar HTML ({enc}): {e}")
+        html = contenido.decode('utf-8', errors='replace')  # Fallback
+    soup = bs4.BeautifulSoup(html, 'html.parser')
+
+    # Título
+    titulo = None
+    span_titulo = soup.find("span", class_="titulo")
+    if span_titulo and span_titulo.get_text(strip=True):
+        titulo = span_titulo.get_text(strip=True)
+    # Si no hay título específico, buscá por <title> de la página
+    if not titulo:
+        if soup.title:
+            titulo = soup.title.get_text(strip=True)
+
+    # Body principal
+    span_detalle = soup.find("span", class_="detalleFull")
+    if span_detalle and span_detalle.get_text(strip=True):
+        body = Contenido.texto_detalle(span_detalle)
+    else:
+        body = Contenido.extraer(soup)
+
+    # Construir el texto final para IA
+    if titulo:
+        return f"[TÍTULO]: {titulo}\n[BODY]: {body}"
+    else:
+        return body
 
 # Función para obtener el texto plano de un link, manejando encoding
 def get_texto_plano_from_link(link):
     """
     Descarga el HTML del link y retorna un string con '[TÍTULO]: ... [BODY]: ...'.
-    Si no encuentra los tags, retorna el texto plano general. Loguea errores.
+    Si no encuentra los tags, retorna el contenido principal de la página. Loguea errores.
     """
     try:
-        r = requests.get(link, timeout=10)
+        r = _descargar(link)
         if r.status_code == 200:
-            enc = r.encoding if r.encoding else 'utf-8'
-            try:
-                texto_bytes = r.content
-                detected_enc = chardet.detect(texto_bytes)['encoding']
-                enc = detected_enc if detected_enc else enc
-                html = texto_bytes.decode(enc, errors='replace')
-            except Exception as e:
-                logging.warning(f"⚠️ Problema al decodificar HTML de {link}: {e}")
-                html = r.text  # Fallback
-            soup = BeautifulSoup(html, 'html.parser')
-
-            # Título
-            titulo = None
-            span_titulo = soup.find("span", class_="titulo")
-            if span_titulo and span_titulo.get_text(strip=True):
-                titulo = span_titulo.get_text(strip=True)
-            # Si no hay título específico, buscá por <title> de la página
-            if not titulo:
-                if soup.title:
-                    titulo = soup.title.get_text(strip=True)
-
-            # Body principal
-            span_detalle = soup.find("span", class_="detalleFull")
-            if span_detalle and span_detalle.get_text(strip=True):
-                body = span_detalle.get_text(separator=' ', strip=True)
-            else:
-                body = soup.get_text(separator=' ', strip=True)
-
-            # Construir el texto final para IA
-            if titulo:
-                return f"[TÍTULO]: {titulo}\n[BODY]: {body}"
-            else:
-                return body
+            return texto_plano_desde_html(r.content, r.encoding)
         else:
             logging.warning(f"⚠️ Status code {r.status_code} al acceder a {link}")
             return None
@@ -176,6 +317,27 @@ def get_texto_plano_from_link(link):
         logging.error(f"❌ Excepción al descargar/parsing {link}: {e}")
         return None
 
+def get_contenido_from_link(link):
+    """
+    Descarga el HTML crudo del link sin decodificarlo ni parsearlo (para parsear en otros procesos).
+    Retorna (bytes, encoding HTTP) o None si falla; loguea el error.
+    """
+    try:
+        r = _descargar(link)
+        if r.status_code == 200:
+            return r.content, r.encoding
+        logging.warning(f"⚠️ Status code {r.status_code} al acceder a {link}")
+        return None
+    except requests.exceptions.ConnectionError as e:
+        logging.error(f"🌐 Error de conexión: {link} - {e}")
+        return None
+    except requests.exceptions.Timeout as e:
+        logging.error(f"⏰ Timeout al acceder a {link}: {e}")
+        return None
+    except Exception as e:
+        logging.error(f"❌ Excepción al descargar {link}: {e}")
+        return None
+
 #Funcion para obtener los LINKs de un archivo Excel que va importar el usuario en la PRIMER COLUMNA, PRIMER HOJA. 
 def obtener_links_del_usuario_desde_excel(EXCEL_URL_PATH):
     """
@@ -213,16 +375,25 @@ def procesar_link_robusto(link, tipo='texto', max_reintentos=3):
     
     Args:
         link: URL a procesar
-        tipo: 'texto' o 'html'
+        tipo: 'texto', 'html' o 'crudo'
         max_reintentos: número máximo de intentos (default: 3)
     
     Returns:
         - Si tipo='texto': texto plano extraído
         - Si tipo='html': objeto BeautifulSoup parseado
+        - Si tipo='crudo': (bytes del HTML, encoding HTTP), sin parsear
         - None si falla definitivamente después de todos los intentos
     """
     
     for intento in range(max_reintentos):
+        # Con el plazo del request vencido (o cancelado) no se inician descargas nuevas
+        if Plazos.vencido():
+            logging.warning(f"⏱️ Plazo vencido, no se descarga {link} (intento {intento + 1})")
+            return None
+        # Con ejes.com marcado como caído no se intenta (ni se espera entre reintentos)
+        if not Breaker.get('ejes').permitir():
+            logging.warning(f"🔌 ejes.com no disponible (breaker abierto), no se descarga {link}")
+            return None
         try:
             
             if tipo == 'texto':
@@ -240,15 +411,22 @@ def procesar_link_robusto(link, tipo='texto', max_reintentos=3):
                     return resultado
                 else:
                     logging.warning(f"⚠️ Intento {intento + 1} falló (sin resultado) para {link}")
+            elif tipo == 'crudo':
+                resultado = get_contenido_from_link(link)
+                if resultado:
+                    logging.info(f"✅ Descargado (intento {intento + 1}): {link}")
+                    return resultado
+                else:
+                    logging.warning(f"⚠️ Intento {intento + 1} falló (sin resultado) para {link}")
             else:
-                logging.error(f"❌ Tipo '{tipo}' no válido. Debe ser 'texto' o 'html'")
+                logging.error(f"❌ Tipo '{tipo}' no válido. Debe ser 'texto', 'html' o 'crudo'")
                 return None
                 
         except requests.exceptions.ConnectionError as e:
             if intento < max_reintentos - 1:
                 delay = (2 ** intento) * 2  # 2, 4, 8 segundos
                 logging.warning(f"🌐 Error de conexión en intento {intento + 1} para {link}. Reintentando en {delay}s... Error: {e}")
-                time.sleep(delay)
+                Plazos.dormir(delay)
             else:
                 logging.error(f"❌ {link} falló definitivamente después de {max_reintentos} intentos por error de conexión. Error: {e}")
                 return None
@@ -257,7 +435,7 @@ def procesar_link_robusto(link, tipo='texto', max_reintentos=3):
             if intento < max_reintentos - 1:
                 delay = (2 ** intento) * 2
                 logging.warning(f"⏰ Timeout en intento {intento + 1} para {link}. Reintentando en {delay}s... Error: {e}")
-                time.sleep(delay)
+                Plazos.dormir(delay)
             else:
                 logging.error(f"❌ {link} falló definitivamente después de {max_reintentos} intentos por timeout. Error: {e}")
                 return None
@@ -266,7 +444,7 @@ def procesar_link_robusto(link, tipo='texto', max_reintentos=3):
             if intento < max_reintentos - 1:
                 delay = (2 ** intento) * 2
                 logging.warning(f"⚠️ Error general en intento {intento + 1} para {link}. Reintentando en {delay}s... Error: {e}")
-                time.sleep(delay)
+                Plazos.dormir(delay)
             else:
                 logging.error(f"❌ {link} falló definitivamente después de {max_reintentos} intentos por error general. Error: {e}")
                 return None
@@ -281,9 +459,9 @@ def get_html_object_from_link(link):
     Si falla, retorna None y loguea el error.
     """
     try:
-        response = requests.get(link, timeout=10)
+        response = _descargar(link)
         response.raise_for_status()
-        soup = BeautifulSoup(response.text, "html.parser")
+        soup = bs4.BeautifulSoup(response.text, "html.parser")
         return soup
     except requests.exceptions.ConnectionError as e:
         if "Connection refused" in str(e):
@@ -335,6 +513,15 @@ def get_titulo_from_html_obj(html_obj):
         logging.error(f"Error al extraer título del HTML: {e}")
         return None
 
+# Patrones precompilados de metadatos de ejes (<span class='canal'> y <span class='medicion'>)
+_RE_FECHA_CANAL = re.compile(r"(\d{2})/(\d{2})/(\d{4})")
+_RE_MEDIO_CANAL = re.compile(r"\d{2}/\d{2}/\d{4}\s+([^-]+?)\s*-\s*")
+_RE_SECCION_CANAL = re.compile(r"Nota\s*-\s*([^-]+?)(?:\s*-\s*Pag|\s*$)")
+_RE_SECCION_URL = re.compile(r"\.com(?:\.ar)?/([^/]+)/")
+_RE_COTIZACION = re.compile(r"(\$\s*[\d.,]+)")
+_RE_ALCANCE = re.compile(r"Audiencia:\s*([^\s=]+)")
+_DOMINIOS_SECCION = ("infobae.com", "lanacion.com", "pagina12.com")
+
 #Fecha
 def get_fecha_from_html_obj(soup):
     """
@@ -351,11 +538,10 @@ def get_fecha_from_html_obj(soup):
         if canal:
             texto = canal.get_text(strip=True)
             # Buscar patrón de fecha: 2 dígitos / 2 dígitos / 4 dígitos
-            match = re.search(r"(\d{2}/\d{2}/\d{4})", texto)
+            match = _RE_FECHA_CANAL.search(texto)
             if match:
-                fecha_str = match.group(1)  # '04/04/2025'
-                # Convertir a formato ISO
-                d, m, y = fecha_str.split("/")
+                # '04/04/2025' -> formato ISO
+                d, m, y = match.groups()
                 return f"{y}-{m}-{d}"
             else:
                 logging.warning("No se encontró fecha en <span class='canal'>.")
@@ -383,7 +569,7 @@ def get_medio_from_html_obj(soup):
         if canal:
             texto = canal.get_text(strip=True)
             # Más flexible: captura lo que está entre la fecha y el primer guion
-            match = re.search(r"\d{2}/\d{2}/\d{4}\s+([^-]+?)\s*-\s*", texto)
+            match = _RE_MEDIO_CANAL.search(texto)
             if match:
                 return match.group(1).strip()
             else:
@@ -399,18 +585,15 @@ def get_medio_from_html_obj(soup):
 #Soporte 
 def get_soporte_from_html_obj(soup):
     """
-    Determina el soporte a partir del medio extraído del HTML.
-    Si contiene '.com' es 'WEB', si no, es 'GRÁFICA'.
+    Determina el soporte ('WEB' o 'GRÁFICA') a partir del medio extraído del HTML,
+    según el índice de alias de medios (Z_Utils_Medios).
     """
     try:
         medio = get_medio_from_html_obj(soup)
         if medio is None:
             logging.warning("No se pudo determinar el soporte porque no se encontró el medio.")
             return None
-        if ".com" in medio.lower():
-            return "WEB"
-        else:
-            return "GRÁFICA"
+        return Medios.resolver_medio(medio)[1]
     except Exception as e:
         logging.error(f"Error al determinar soporte del HTML: {e}")
         return None
@@ -432,20 +615,14 @@ def get_seccion_from_html_obj(soup):
         if canal:
             texto = canal.get_text(" ", strip=True)
             # ¡IMPORTANTE! Solo una barra:
-            match = re.search(r"Nota\s*-\s*([^-]+?)(?:\s*-\s*Pag|\s*$)", texto)
+            match = _RE_SECCION_CANAL.search(texto)
             if match:
                 return match.group(1).strip()
 
         # 2. Si no hay sección en <span class='canal'>, buscá en el primer <a href>
-        a_tags = soup.find_all("a", href=True)
-        for a in a_tags:
-            url = a["href"]
-            if any(x in url for x in ["infobae.com", "lanacion.com", "pagina12.com"]):
-                m = re.search(r"\.com(?:\.ar)?/([^/]+)/", url)
-                if m:
-                    seccion = m.group(1)
-                    seccion = seccion.replace("-", " ").capitalize()
-                    return seccion
+        seccion = _seccion_desde_links(soup)
+        if seccion:
+            return seccion
         # Si no se encontró nada, devuelve valor por defecto
         logging.warning("No se encontró sección en <span class='canal'> ni en los links <a href>. Asignando 'Sitio'.")
         return "Sitio"
@@ -453,6 +630,18 @@ def get_seccion_from_html_obj(soup):
         logging.error(f"Error al extraer sección del HTML: {e}")
         return "Sitio"
 
+def _seccion_desde_links(soup):
+    """
+    Sección a partir del primer <a href> de un medio conocido (ej: infobae.com/cultura/...).
+    """
+    for a in soup.find_all("a", href=True):
+        url = a["href"]
+        if any(x in url for x in _DOMINIOS_SECCION):
+            m = _RE_SECCION_URL.search(url)
+            if m:
+                return m.group(1).replace("-", " ").capitalize()
+    return None
+
 #Cotización
 def get_cotizacion_from_html_obj(soup):
     """
@@ -469,9 +658,9 @@ def get_cotizacion_from_html_obj(soup):
             # Buscar línea con 'Cotización' o 'Cotizaci' (acentos pueden variar)
             if "Cotizaci" in texto:
                 # Buscar monto en formato $XXX.XXX
-                match = re.search(r"\$\s*([\d.,]+)", texto)
+                match = _RE_COTIZACION.search(texto)
                 if match:
-                    return match.group(0)  # Incluye el signo $
+                    return match.group(1)  # Incluye el signo $
         logging.warning("No se encontró cotización en <span class='medicion'>.")
         return None
     except Exception as e:
@@ -494,7 +683,7 @@ def get_alcance_from_html_obj(soup):
             # Buscar línea con 'Audiencia'
             if "Audiencia:" in texto:
                 # Buscar el valor después de "Audiencia:"
-                match = re.search(r"Audiencia:\s*([^\s=]+)", texto)
+                match = _RE_ALCANCE.search(texto)
                 if match:
                     return match.group(1).strip()
         
@@ -504,6 +693,89 @@ def get_alcance_from_html_obj(soup):
         logging.error(f"Error al extraer alcance del HTML: {e}")
         return None
 
+def _textos_metadatos(soup):
+    """
+    Recorre la página una sola vez y devuelve los textos de los que salen los metadatos:
+    (canal con get_text(strip=True), canal con separador ' ', [textos de cada span medicion]).
+    """
+    if soup is None:
+        return None, None, []
+    canal = soup.find("span", class_="canal")
+    mediciones = [span.get_text(strip=True) for span in soup.find_all("span", class_="medicion")]
+    if canal is None:
+        return None, None, mediciones
+    return canal.get_text(strip=True), canal.get_text(" ", strip=True), mediciones
+
+def _primer_valor_por_fila(textos, filtro, patron, index):
+    """
+    Primer match de `patron` entre los textos de cada fila que contienen `filtro`.
+    `textos` es una Serie de listas; se explota a una fila por texto y se resuelve en bloque.
+    """
+    explotado = textos.explode().dropna().astype(str)
+    explotado = explotado[explotado.str.contains(filtro, regex=False)]
+    valores = explotado.str.extract(patron, expand=False).dropna()
+    return valores.groupby(level=0).first().reindex(index)
+
+def _a_objeto(serie):
+    """Serie de tipo object con None (no NaN) en los faltantes, como devuelven los getters individuales"""
+    serie = serie.astype(object)
+    return serie.where(serie.notna(), None)
+
+def extraer_metadatos_html(html_objs):
+    """
+    Extrae FECHA, MEDIO, SOPORTE, SECCION, COTIZACION y ALCANCE de un lote de páginas.
+    Equivalente a aplicar los get_*_from_html_obj (y normalizar_medio) fila por fila, pero cada
+    página se recorre una vez y los campos se derivan con .str.extract sobre todo el lote.
+
+    Args:
+        html_objs (Series): Objetos BeautifulSoup (o None)
+
+    Returns:
+        DataFrame: Una columna por campo, con el mismo índice que html_objs
+    """
+    index = html_objs.index
+    textos = pd.DataFrame(
+        [_textos_metadatos(soup) for soup in html_objs],
+        columns=['CANAL', 'CANAL_ESPACIADO', 'MEDICIONES'], index=index
+    )
+    canal = textos['CANAL'].astype(object)
+    canal_espaciado = textos['CANAL_ESPACIADO'].astype(object)
+
+    # Fecha y medio: del texto del canal ('04/04/2025 Clarín - Nota - Cultura - Pag. 12')
+    fecha = canal.str.extract(_RE_FECHA_CANAL)
+    fecha = fecha[2] + "-" + fecha[1] + "-" + fecha[0]
+    medio_crudo = canal.str.extract(_RE_MEDIO_CANAL, expand=False).str.strip()
+
+    # Medio canónico y soporte: un lookup en el índice de alias por cada medio distinto del lote
+    resueltos = {crudo: Medios.resolver_medio(crudo) for crudo in medio_crudo.dropna().unique()}
+    medio = medio_crudo.map(lambda crudo: resueltos[crudo][0] if crudo in resueltos else Medios.MEDIO_DESCONOCIDO)
+    soporte = medio_crudo.map(lambda crudo: resueltos[crudo][1] if crudo in resueltos else None)
+
+    # Sección: del canal y, si no está, del primer link de un medio conocido; por defecto 'Sitio'
+    seccion = canal_espaciado.str.extract(_RE_SECCION_CANAL, expand=False).str.strip()
+    sin_seccion = seccion.isna() & html_objs.notna()
+    if sin_seccion.any():
+        seccion[sin_seccion] = html_objs[sin_seccion].map(_seccion_desde_links)
+    seccion = seccion.fillna("Sitio")
+
+    # Cotización y alcance: primer span medicion que los contenga
+    cotizacion = _primer_valor_por_fila(textos['MEDICIONES'], "Cotizaci", _RE_COTIZACION, index)
+    alcance = _primer_valor_por_fila(textos['MEDICIONES'], "Audiencia:", _RE_ALCANCE, index).str.strip()
+
+    for campo, serie in (("fecha", fecha), ("medio", medio_crudo), ("cotización", cotizacion), ("alcance", alcance)):
+        faltantes = int(serie.isna().sum())
+        if faltantes:
+            logging.warning(f"No se encontró {campo} en {faltantes} de {len(index)} páginas.")
+
+    return pd.DataFrame({
+        'FECHA': _a_objeto(fecha),
+        'MEDIO': medio.astype(object),
+        'SOPORTE': _a_objeto(soporte),
+        'SECCION': _a_objeto(seccion),
+        'COTIZACION': _a_objeto(cotizacion),
+        'ALCANCE': _a_objeto(alcance),
+    }, index=index)
+
 def limpiar_autor(autor):
     """
     Limpia el autor removiendo prefijos comunes como "Por", "Por:", etc.
@@ -585,16 +857,13 @@ def get_autor_from_html_obj(html_obj):
 def normalizar_texto(texto):
     """
     Normaliza el texto removiendo acentos y convirtiendo a minúsculas.
+    Dentro de un request el resultado se memoiza por texto (Z_Utils_Texto).
     """
     try:
         if not texto or pd.isnull(texto):
             return ""
         
-        # Normalizar unicode (NFD) y remover diacríticos
-        texto_normalizado = unicodedata.normalize('NFD', texto.lower())
-        # Remover caracteres diacríticos (acentos, diéresis, etc.)
-        texto_sin_acentos = ''.join(c for c in texto_normalizado if not unicodedata.combining(c))
-        return texto_sin_acentos
+        return Texto.normalizar(texto)
         
     except Exception as e:
         logging.error(f"Error al normalizar texto: {e}")
@@ -615,11 +884,8 @@ def detectar_mencion(texto, palabra_clave):
         if not texto or pd.isnull(texto) or not palabra_clave or pd.isnull(palabra_clave):
             return ""
         
-        texto_normalizado = normalizar_texto(texto)
-        palabra_normalizada = normalizar_texto(palabra_clave.strip())
-        
-        # Buscar la palabra clave en el texto normalizado
-        if palabra_normalizada in texto_normalizado:
+        # Buscar la palabra clave en el texto normalizado (motor de menciones, memoizado por request)
+        if Menciones.buscar(texto, [palabra_clave]):
             logging.debug(f"Mención detectada: {palabra_clave}")
             return palabra_clave.strip()
         else:
@@ -632,34 +898,27 @@ def detectar_mencion(texto, palabra_clave):
 def buscar_menciones(df, lista_menciones, max_menciones=5):
     """
     Busca menciones en el DataFrame y asigna los resultados a un solo campo 'MENCIONES' como lista.
+    Cada texto se recorre una sola vez con todas las menciones y sus alias (Z_Utils_Menciones).
     
     Args:
         df (DataFrame): DataFrame con la columna 'TEXTO_PLANO'
-        lista_menciones (list): Lista de palabras/entidades a buscar
+        lista_menciones (list): Menciones a buscar: strings o
+            {"mencion": "Gabriela Ricardes", "alias": ["Ricardes"], "palabra_completa": true}
         max_menciones (int): Número máximo de menciones a procesar (por compatibilidad, no se usa)
     
     Returns:
-        DataFrame: DataFrame con la columna 'MENCIONES' agregada
+        DataFrame: DataFrame con la columna 'MENCIONES' agregada (menciones canónicas encontradas)
     """
     try:
-        def encontrar_menciones_en_texto(texto):
-            """
-            Encuentra todas las menciones de la lista en un texto específico
-            """
-            if not texto or pd.isnull(texto):
-                return []
-            
-            menciones_encontradas = []
-            for palabra_clave in lista_menciones:
-                if palabra_clave and not pd.isnull(palabra_clave):
-                    resultado = detectar_mencion(texto, palabra_clave)
-                    if resultado:  # Si se encontró la mención
-                        menciones_encontradas.append(palabra_clave.strip())
-            
-            return menciones_encontradas
-        
-        # Aplicar la función a cada texto y crear la columna 'MENCIONES'
-        df['MENCIONES'] = df['TEXTO_PLANO'].apply(encontrar_menciones_en_texto)
+        claves, alias, enteras = Menciones.claves_y_alias(lista_menciones)
+        textos = df['TEXTO_PLANO'].tolist()
+
+        # Con el pool de procesos activo, los textos se normalizan ahí y quedan en el memo del request
+        if Paralelo.usar_procesos(len(textos)) and Texto.memo_request('normalizados') is not None:
+            Paralelo.normalizar_textos(textos)
+
+        # Aplicar el motor a cada texto y crear la columna 'MENCIONES'
+        df['MENCIONES'] = [list(Menciones.buscar(texto, claves, alias, enteras)) for texto in textos]
         
         # Si no hay menciones configuradas, asignar lista vacía a todas las filas
         if not lista_menciones:
@@ -740,17 +999,25 @@ def procesar_crisis_con_historico(df, historico_path, temas_fijos):
     
     Args:
         df (DataFrame): DataFrame con las noticias actuales
-        historico_path (str): Ruta al archivo Excel con datos históricos
+        historico_path (str): Ruta al histórico: Excel, archivo columnar (.parquet/.arrow/.csv.gz)
+            o carpeta de dataset particionado (ver Z_Utils_Salida)
         temas_fijos (list): Lista de temas fijos a excluir
     
     Returns:
         DataFrame: DataFrame con columna 'CRISIS' procesada
     """
     try:
-        # Cargar datos históricos si existe el archivo
+        # Cargar datos históricos si existe el archivo (solo las columnas que usa la detección)
         df_historico = None
         if os.path.exists(historico_path):
-            df_historico = pd.read_excel(historico_path)
+            import Z_Utils_Salida as Salida
+            columnas_crisis = ['TEMA', 'VALORACION']
+            if os.path.isdir(historico_path):
+                df_historico = Salida.leer_dataset(historico_path, columnas=columnas_crisis)
+            elif Salida.formato_desde_ruta(historico_path):
+                df_historico = Salida.leer_registros(historico_path, columnas=columnas_crisis)
+            else:
+                df_historico = pd.read_excel(historico_path, usecols=lambda c: c in columnas_crisis)
             logging.info(f"Datos históricos cargados: {len(df_historico)} noticias")
         else:
             logging.info("No se encontró archivo histórico. Procesando solo datos actuales.")
@@ -782,47 +1049,11 @@ def aplicar_heuristica_valoracion(valoracion_ia, texto, ministro_key_words, mini
     if valoracion_ia == "NEGATIVA":
         return "NEGATIVA"
     
-    # Si NO es negativa, verificar menciones
+    # Si NO es negativa, verificar menciones (sin distinguir mayúsculas ni tildes; el resultado
+    # del motor de menciones se comparte con los prompts de declaración del mismo request)
     if valoracion_ia in ["NO_NEGATIVA", "OTRO"]:
-        texto_lower = texto.lower()
-        
-        # Verificar si menciona a alguno de los ministros
-        if ministro_key_words:
-            if isinstance(ministro_key_words, list):
-                # Si es una lista, buscar cualquiera de ellos (aplanar listas anidadas)
-                for item in ministro_key_words:
-                    if isinstance(item, list):
-                        # Si es una lista anidada, procesar cada elemento
-                        for ministro in item:
-                            if ministro and ministro.lower() in texto_lower:
-                                return "POSITIVA"
-                    else:
-                        # Si es un string directo
-                        if item and item.lower() in texto_lower:
-                            return "POSITIVA"
-            else:
-                # Si es un string, buscar directamente
-                if ministro_key_words.lower() in texto_lower:
-                    return "POSITIVA"
-        
-        # Verificar si menciona a alguno de los ministerios
-        if ministerios_key_words:
-            if isinstance(ministerios_key_words, list):
-                # Si es una lista, buscar cualquiera de ellos (aplanar listas anidadas)
-                for item in ministerios_key_words:
-                    if isinstance(item, list):
-                        # Si es una lista anidada, procesar cada elemento
-                        for ministerio in item:
-                            if ministerio and ministerio.lower() in texto_lower:
-                                return "POSITIVA"
-                    else:
-                        # Si es un string directo
-                        if item and item.lower() in texto_lower:
-                            return "POSITIVA"
-            else:
-                # Si es un string, buscar directamente
-                if ministerios_key_words.lower() in texto_lower:
-                    return "POSITIVA"
+        if Menciones.actores_mencionados(texto, ministro_key_words, ministerios_key_words):
+            return "POSITIVA"
         
         # Si no menciona a ninguno, es NEUTRA
         return "NEUTRA"
@@ -883,7 +1114,7 @@ def get_gestion_from_html_obj(html_obj):
     
     return "REBOTE"
 
-def marcar_o_valorar_con_ia(texto, funcion_ia, limite, url_id=None):
+def marcar_o_valorar_con_ia(texto, funcion_ia, limite, url_id=None, backends=None):
     """
     Función unificada para manejar el límite de texto en funciones de IA.
     Si el texto es muy largo o nulo, devuelve 'REVISAR MANUAL'.
@@ -894,9 +1125,12 @@ def marcar_o_valorar_con_ia(texto, funcion_ia, limite, url_id=None):
         funcion_ia (function): Función de IA a aplicar (puede ser GPT u Ollama)
         limite (int): Límite de caracteres permitidos
         url_id (str, optional): ID o URL para logging
+        backends (list, optional): Breakers de los que depende funcion_ia (ej: ['openai', 'ollama']);
+            si están todos abiertos no se llama y se devuelve "REVISAR MANUAL"
         
     Returns:
-        str: Resultado de la función IA o "REVISAR MANUAL"
+        str: Resultado de la función IA o "REVISAR MANUAL" (también si el plazo del request venció
+             o si funcion_ia lanzó Breaker.CircuitoAbierto; en esos casos el artículo queda incompleto)
     """
     import logging
     
@@ -908,11 +1142,36 @@ def marcar_o_valorar_con_ia(texto, funcion_ia, limite, url_id=None):
         logging.warning(f"⚠️ Texto excede límite: {len(texto):,} chars > {limite:,} (URL: {url_id}) -> REVISAR MANUAL")
         return "REVISAR MANUAL"
     
-    return funcion_ia(texto)
+    if Plazos.vencido():
+        Plazos.marcar_incompleto(url_id)
+        return "REVISAR MANUAL"
+    
+    # Sin ningún backend disponible no se espera a que cada llamada falle
+    if backends and all(Breaker.get(b).abierto() for b in backends):
+        motivo = f"Backends de IA no disponibles ({', '.join(backends)}): circuit breaker abierto"
+        logging.warning(f"🔌 {motivo} (URL: {url_id}) -> REVISAR MANUAL")
+        Plazos.marcar_incompleto(url_id, motivo)
+        return "REVISAR MANUAL"
+    
+    try:
+        resultado = funcion_ia(texto)
+    except Breaker.CircuitoAbierto as e:
+        # Backend caído durante la clasificación: no se guarda una etiqueta por defecto
+        logging.warning(f"🔌 {e} (URL: {url_id}) -> REVISAR MANUAL")
+        Plazos.marcar_incompleto(url_id, str(e))
+        return "REVISAR MANUAL"
+    
+    # Si el plazo venció durante la llamada, la respuesta pudo salir de un corte (no es confiable)
+    if Plazos.vencido():
+        logging.warning(f"⏱️ Plazo vencido durante la clasificación (URL: {url_id}) -> REVISAR MANUAL")
+        Plazos.marcar_incompleto(url_id)
+        return "REVISAR MANUAL"
+    return resultado
 
 def normalizar_medio(medio):
     """
-    Normaliza el nombre del medio aplicando reglas automáticas.
+    Normaliza el nombre del medio usando el índice de alias (Z_Utils_Medios);
+    los medios sin alias se normalizan por reglas (memoizado por string crudo).
     
     Args:
         medio (str): Nombre del medio a normalizar
@@ -920,42 +1179,11 @@ def normalizar_medio(medio):
     Returns:
         str: Nombre del medio normalizado
     """
-    if not medio or pd.isnull(medio):
-        return "Medio Desconocido"
-    
-    # 1. Convertir a string y limpiar espacios
-    medio = str(medio).strip()
-    
-    # 2. Remover tildes y caracteres especiales
-    medio = unicodedata.normalize('NFD', medio)
-    medio = ''.join(c for c in medio if not unicodedata.combining(c))
-    
-    # 3. Remover extensiones de dominio
-    if '.com' in medio.lower():
-        medio = medio.split('.com')[0]
-    if '.ar' in medio.lower():
-        medio = medio.split('.ar')[0]
-    if '.net' in medio.lower():
-        medio = medio.split('.net')[0]
-    
-    # 4. Remover paréntesis y su contenido
-    if '(' in medio:
-        medio = medio.split('(')[0].strip()
-    
-    # 5. Separar camelCase automáticamente
-    import re
-    # Detectar camelCase y separar palabras
-    medio = re.sub(r'([a-z])([A-Z])', r'\1 \2', medio)
-    # Detectar números y separar
-    medio = re.sub(r'([a-zA-Z])(\d)', r'\1 \2', medio)
-    
-    # 6. Capitalizar primera letra de cada palabra
-    medio = medio.title()
-    
-    # 7. Limpiar espacios múltiples
-    medio = ' '.join(medio.split())
-    
-    return medio
+    return Medios.resolver_medio(medio)[0]
+
+_RE_SEPARADOR_FECHA = re.compile(r"[\-.]")
+_RE_FECHA_DMY = re.compile(r"(\d{1,2})/(\d{1,2})/(\d{2}|\d{4})")
+_RE_TEMA_CON_FECHA = re.compile(r"^(?P<tema>.+?)[\s;:|\t\-—–]*?(?P<fecha>\d{1,2}[\/.\-]\d{1,2}[\/.\-]\d{2,4})?\s*$")
 
 def _normalizar_fecha_ddmmyyyy(fecha_raw: str) -> str | None:
     """
@@ -965,10 +1193,9 @@ def _normalizar_fecha_ddmmyyyy(fecha_raw: str) -> str | None:
     if not fecha_raw:
         return None
     try:
-        import re
         txt = fecha_raw.strip().replace(" ", "")
-        txt = re.sub(r"[\-.]", "/", txt)
-        m = re.fullmatch(r"(\d{1,2})/(\d{1,2})/(\d{2}|\d{4})", txt)
+        txt = _RE_SEPARADOR_FECHA.sub("/", txt)
+        m = _RE_FECHA_DMY.fullmatch(txt)
         if not m:
             # Intento ISO directo
             try:
@@ -995,19 +1222,16 @@ def cargar_temas_desde_txt(path_txt: str) -> tuple[list, dict]:
     tema_a_fecha: dict[str, str] = {}
     try:
         import os
-        import re
         if not os.path.exists(path_txt):
             logging.warning(f"No se encontró {path_txt}. Usando lista mínima.")
             return ["Actividades programadas"], {}
 
-        pat = re.compile(r"^(?P<tema>.+?)[\s;:|\t\-—–]*?(?P<fecha>\d{1,2}[\/.\-]\d{1,2}[\/.\-]\d{2,4})?\s*$")
-
         with open(path_txt, "r", encoding="utf-8") as f:
             for raw in f:
                 line = raw.strip()
                 if not line:
                     continue
-                m = pat.match(line)
+                m = _RE_TEMA_CON_FECHA.match(line)
                 if not m:
                     continue
                 nombre = m.group("tema").strip()
@@ -0,0 +1,224 @@
+import os
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from urllib.parse import urlsplit, parse_qs
+
+# =============================================================================
+# STORE PERSISTENTE DE ARTÍCULOS PROCESADOS
+# =============================================================================
+# Guarda en SQLite cada noticia ya procesada, indexada por el id de ejes.com
+# (noticia_completa.cfm?id=XXXX). Un artículo se reutiliza solo si se procesó con el mismo
+# modelo, la misma versión de prompts y la misma configuración del request (temas,
+# key words, menciones, límite de texto), y no está vencido (ARTICULOS_TTL_SEG).
+
+ARTICULOS_DB_PATH = "Data_Results/prensai_articulos.db"
+ARTICULOS_TTL_SEG = 7 * 24 * 60 * 60
+
+_PATRON_ID_EJES = re.compile(r"[?&]id=(\d+)", re.IGNORECASE)
+
+_lock_escritura = threading.Lock()
+_esquema_creado = set()
+
+
+def extraer_id_ejes(url):
+    """
+    Extrae el id de artículo de una URL de ejes.com (parámetro 'id' de noticia_completa.cfm).
+
+    Returns:
+        str: Id normalizado (solo dígitos, sin ceros a la izquierda) o None si no tiene
+    """
+    if not url or not isinstance(url, str):
+        return None
+    try:
+        valores = {k.lower(): v for k, v in parse_qs(urlsplit(url.strip()).query).items()}.get('id')
+        valor = valores[0].strip() if valores else None
+    except Exception:
+        valor = None
+    if not valor or not valor.isdigit():
+        m = _PATRON_ID_EJES.search(url)
+        valor = m.group(1) if m else None
+    return (valor.lstrip('0') or '0') if valor else None
+
+
+def clave_articulo(url):
+    """
+    Clave canónica de un artículo para detectar duplicados dentro de un request.
+    Si la URL tiene id de ejes, la clave es ese id (ignora http/https, host, mayúsculas y
+    parámetros extra). Si no, se usa host en minúsculas sin 'www.', path y query ordenada.
+    """
+    ejes_id = extraer_id_ejes(url)
+    if ejes_id:
+        return f"ejes:{ejes_id}"
+    try:
+        partes = urlsplit(url.strip())
+        host = partes.netloc.lower()
+        host = host[4:] if host.startswith('www.') else host
+        query = '&'.join(sorted(p for p in partes.query.split('&') if p))
+        return f"{host}{partes.path.rstrip('/')}?{query}"
+    except Exception:
+        return str(url).strip()
+
+
+def agrupar_urls_duplicadas(urls):
+    """
+    Agrupa las URLs que apuntan al mismo artículo, preservando el orden de aparición.
+
+    Returns:
+        dict: {clave: [urls originales]}; la primera URL de cada grupo es la que se procesa
+    """
+    grupos = {}
+    for url in urls:
+        grupos.setdefault(clave_articulo(url), []).append(url)
+    return grupos
+
+
+def huella_configuracion(**config):
+    """
+    Hash estable de la configuración que afecta la clasificación (temas, key words, etc.).
+    Dos requests con la misma huella producen el mismo resultado para un artículo.
+    """
+    normalizado = json.dumps(config, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(normalizado.encode('utf-8')).hexdigest()
+
+
+def _conectar(db_path=None):
+    db_path = db_path or ARTICULOS_DB_PATH
+    dir_path = os.path.dirname(db_path)
+    if dir_path:
+        os.makedirs(dir_path, exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=30)
+    if db_path not in _esquema_creado:
+        conn.executescript("""
+            PRAGMA journal_mode=WAL;
+            CREATE TABLE IF NOT EXISTS articulos (
+                ejes_id TEXT PRIMARY KEY,
+                link TEXT NOT NULL,
+                registro TEXT NOT NULL,        -- JSON con los campos extraídos y clasificaciones
+                modelo TEXT NOT NULL,          -- ej: 'GPT:gpt-4o' u 'Ollama:llama3.1:8b'
+                version_prompts TEXT NOT NULL,
+                huella_config TEXT NOT NULL,
+                actualizado REAL NOT NULL
+            );
+        """)
+        _esquema_creado.add(db_path)
+    return conn
+
+
+def buscar_articulos(ids, modelo, version_prompts, huella_config, max_edad_seg=None, db_path=None):
+    """
+    Busca en bloque los artículos ya procesados y vigentes.
+
+    Args:
+        ids (iterable): Ids de ejes a buscar
+        modelo (str): Modelo con el que se clasificaría ahora
+        version_prompts (str): Versión actual de los prompts
+        huella_config (str): Huella de la configuración del request
+        max_edad_seg (int, optional): Antigüedad máxima (default ARTICULOS_TTL_SEG)
+
+    Returns:
+        dict: {ejes_id: registro (dict)} solo para artículos vigentes
+    """
+    ids = [i for i in dict.fromkeys(ids) if i]
+    if not ids:
+        return {}
+    max_edad_seg = ARTICULOS_TTL_SEG if max_edad_seg is None else max_edad_seg
+    limite = time.time() - max_edad_seg
+
+    encontrados = {}
+    conn = _conectar(db_path)
+    try:
+        for i in range(0, len(ids), 500):
+            bloque = ids[i:i + 500]
+            filas = conn.execute(
+                f"SELECT ejes_id, registro FROM articulos WHERE ejes_id IN ({','.join('?' * len(bloque))}) "
+                "AND modelo = ? AND version_prompts = ? AND huella_config = ? AND actualizado >= ?",
+                [*bloque, modelo, version_prompts, huella_config, limite],
+            ).fetchall()
+            for ejes_id, registro in filas:
+                try:
+                    encontrados[ejes_id] = json.loads(registro)
+                except ValueError:
+                    logging.warning(f"⚠️ Registro corrupto en store de artículos (id={ejes_id}), se reprocesa")
+    finally:
+        conn.close()
+    return encontrados
+
+
+def guardar_articulos(registros, modelo, version_prompts, huella_config, db_path=None):
+    """
+    Guarda (o reemplaza) artículos procesados.
+
+    Args:
+        registros (list): Registros (dicts) con al menos 'LINK'; los que no tienen id de ejes se ignoran
+
+    Returns:
+        int: Cantidad de artículos guardados
+    """
+    ahora = time.time()
+    filas = []
+    for registro in registros:
+        ejes_id = extraer_id_ejes(registro.get('LINK'))
+        if not ejes_id:
+            continue
+        filas.append((ejes_id, registro['LINK'], json.dumps(registro, ensure_ascii=False, default=str),
+                      modelo, version_prompts, huella_config, ahora))
+    if not filas:
+        return 0
+
+    with _lock_escritura:
+        conn = _conectar(db_path)
+        try:
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO articulos "
+                    "(ejes_id, link, registro, modelo, version_prompts, huella_config, actualizado) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    filas,
+                )
+        finally:
+            conn.close()
+
+    logging.info(f"💾 Store de artículos: {len(filas)} artículos guardados ({modelo}, prompts {version_prompts})")
+    return len(filas)
+
+
+def purgar_vencidos(max_edad_seg=None, db_path=None):
+    """
+    Elimina artículos más viejos que max_edad_seg. Devuelve la cantidad eliminada.
+    """
+    max_edad_seg = ARTICULOS_TTL_SEG if max_edad_seg is None else max_edad_seg
+    with _lock_escritura:
+        conn = _conectar(db_path)
+        try:
+            with conn:
+                cursor = conn.execute("DELETE FROM articulos WHERE actualizado < ?", (time.time() - max_edad_seg,))
+                return cursor.rowcount
+        finally:
+            conn.close()
+
+
+def listar_articulos(db_path=None):
+    """
+    Todos los artículos del store (sin filtrar por modelo ni vigencia), para entrenar clasificadores locales.
+
+    Returns:
+        list: Registros (dicts) con sus clasificaciones, el modelo que las produjo en '_MODELO'
+              y la huella de configuración en '_HUELLA'
+    """
+    conn = _conectar(db_path)
+    try:
+        filas = conn.execute("SELECT registro, modelo, huella_config FROM articulos").fetchall()
+    finally:
+        conn.close()
+    registros = []
+    for registro, modelo, huella in filas:
+        try:
+            registros.append({**json.loads(registro), '_MODELO': modelo, '_HUELLA': huella})
+        except ValueError:
+            continue
+    return registros
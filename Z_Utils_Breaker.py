@@ -0,0 +1,144 @@
+import time
+import logging
+import threading
+from collections import deque
+from typing import Optional
+
+# =============================================================================
+# CIRCUIT BREAKERS POR BACKEND (ejes.com, OpenAI, Ollama)
+# =============================================================================
+# Cada backend tiene un breaker con una ventana de las últimas llamadas:
+#   - cerrado: las llamadas pasan; si la tasa de fallas de la ventana supera el umbral
+#     (con un mínimo de llamadas) se abre
+#   - abierto: las llamadas fallan al instante (sin timeouts ni reintentos) durante
+#     espera_seg; los llamadores van directo a su fallback (Ollama o "REVISAR MANUAL")
+#   - semiabierto: pasada la espera se deja pasar UNA llamada de prueba; si funciona se
+#     cierra, si falla se vuelve a abrir
+# El estado de todos los breakers se expone en /health.
+
+CERRADO = "cerrado"
+ABIERTO = "abierto"
+SEMIABIERTO = "semiabierto"
+
+VENTANA_LLAMADAS = 20       # Llamadas recientes consideradas para la tasa de fallas
+MINIMO_LLAMADAS = 5         # No se abre con menos llamadas en la ventana
+TASA_FALLAS_APERTURA = 0.5  # Se abre con el 50% o más de fallas
+ESPERA_APERTURA_SEG = 30    # Tiempo abierto antes de la llamada de prueba
+
+
+class CircuitoAbierto(Exception):
+    """El backend está marcado como caído: la llamada no se intenta"""
+
+
+class Breaker:
+    """Circuit breaker de un backend"""
+
+    def __init__(self, nombre: str, ventana: int = VENTANA_LLAMADAS, minimo_llamadas: int = MINIMO_LLAMADAS,
+                 tasa_fallas: float = TASA_FALLAS_APERTURA, espera_seg: float = ESPERA_APERTURA_SEG):
+        self.nombre = nombre
+        self.minimo_llamadas = minimo_llamadas
+        self.tasa_fallas = tasa_fallas
+        self.espera_seg = espera_seg
+        self._resultados = deque(maxlen=ventana)  # True = éxito, False = falla
+        self._estado = CERRADO
+        self._abierto_desde = None
+        self._prueba_desde = None
+        self._ultima_falla = None
+        self._rechazadas = 0
+        self._lock = threading.Lock()
+
+    def permitir(self) -> bool:
+        """True si la llamada puede intentarse (en semiabierto, solo la llamada de prueba)"""
+        with self._lock:
+            ahora = time.monotonic()
+            if self._estado == ABIERTO and ahora - self._abierto_desde >= self.espera_seg:
+                self._estado = SEMIABIERTO
+                self._prueba_desde = None
+                logging.info(f"🔌 Breaker {self.nombre}: semiabierto, se prueba una llamada")
+            if self._estado == CERRADO:
+                return True
+            # Semiabierto: una sola prueba en vuelo (si no reporta resultado, se libera tras espera_seg)
+            if self._estado == SEMIABIERTO and (self._prueba_desde is None or ahora - self._prueba_desde >= self.espera_seg):
+                self._prueba_desde = ahora
+                return True
+            self._rechazadas += 1
+            return False
+
+    def verificar(self):
+        """Lanza CircuitoAbierto si la llamada no puede intentarse"""
+        if not self.permitir():
+            raise CircuitoAbierto(f"Backend {self.nombre} no disponible (circuit breaker abierto)")
+
+    def registrar_exito(self):
+        with self._lock:
+            self._resultados.append(True)
+            if self._estado != CERRADO:
+                logging.info(f"✅ Breaker {self.nombre}: cerrado, el backend volvió a responder")
+                self._estado = CERRADO
+                self._resultados.clear()
+                self._resultados.append(True)
+
+    def registrar_falla(self, motivo: Optional[str] = None):
+        with self._lock:
+            self._resultados.append(False)
+            self._ultima_falla = motivo
+            if self._estado == SEMIABIERTO:
+                self._abrir(f"falló la llamada de prueba ({motivo})")
+                return
+            if self._estado == CERRADO and len(self._resultados) >= self.minimo_llamadas:
+                fallas = self._resultados.count(False)
+                if fallas / len(self._resultados) >= self.tasa_fallas:
+                    self._abrir(f"{fallas}/{len(self._resultados)} llamadas fallidas ({motivo})")
+
+    def _abrir(self, razon: str):
+        self._estado = ABIERTO
+        self._abierto_desde = time.monotonic()
+        logging.error(f"🔌 Breaker {self.nombre}: abierto por {self.espera_seg:g}s - {razon}")
+
+    def abierto(self) -> bool:
+        """True si las llamadas se rechazan ahora (no consume la llamada de prueba)"""
+        with self._lock:
+            return self._estado == ABIERTO and time.monotonic() - self._abierto_desde < self.espera_seg
+
+    def reiniciar(self):
+        with self._lock:
+            self._estado = CERRADO
+            self._resultados.clear()
+            self._abierto_desde = self._prueba_desde = self._ultima_falla = None
+            self._rechazadas = 0
+
+    def estado(self) -> dict:
+        with self._lock:
+            llamadas = len(self._resultados)
+            resumen = {
+                "estado": self._estado,
+                "llamadas_ventana": llamadas,
+                "tasa_fallas": round(self._resultados.count(False) / llamadas, 2) if llamadas else 0.0,
+                "rechazadas": self._rechazadas,
+                "ultima_falla": self._ultima_falla,
+            }
+            if self._estado == ABIERTO:
+                resumen["reintento_en_seg"] = round(max(0.0, self.espera_seg - (time.monotonic() - self._abierto_desde)), 1)
+            return resumen
+
+
+BREAKERS = {
+    'ejes': Breaker('ejes'),
+    'openai': Breaker('openai'),
+    'ollama': Breaker('ollama'),
+}
+
+
+def get(nombre: str) -> Breaker:
+    return BREAKERS[nombre]
+
+
+def estado() -> dict:
+    """Estado de todos los breakers (para /health)"""
+    return {nombre: breaker.estado() for nombre, breaker in BREAKERS.items()}
+
+
+def reiniciar(nombre: Optional[str] = None):
+    """Cierra un breaker (o todos) y limpia su ventana"""
+    for breaker in ([BREAKERS[nombre]] if nombre else BREAKERS.values()):
+        breaker.reiniciar()
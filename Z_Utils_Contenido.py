@@ -0,0 +1,209 @@
+import re
+import logging
+import threading
+
+import Z_Utils_Texto as Texto
+
+# =============================================================================
+# EXTRACCIÓN DEL CONTENIDO PRINCIPAL (páginas sin span.detalleFull)
+# =============================================================================
+# Cuando la página no trae el cuerpo de la nota en span.detalleFull, el texto de toda la
+# página (menús, pie, scripts, CSS, "compartir", relacionadas...) empuja el artículo por
+# encima de limite_texto (-> REVISAR MANUAL) y suma tokens en cada llamada al LLM.
+# Extracción al estilo readability:
+#   1. Se descartan scripts, estilos, nav/header/footer/aside, formularios y los elementos
+#      cuyo class/id/role indica navegación o publicidad (salvo que también indiquen contenido).
+#   2. Si hay un contenedor semántico con texto suficiente (articleBody, <article>, <main>) se usa.
+#      Si no, cada párrafo suma puntaje (largo y comas) a su padre y la mitad a su abuelo; gana
+#      el contenedor con más puntaje, penalizado por la proporción de texto en links.
+#   3. El texto se arma por bloques (párrafos, títulos, ítems), sin bloques repetidos y con
+#      los espacios compactados.
+# Si lo extraído es muy poco se usa el texto de toda la página ya limpia (o, en último caso,
+# el texto completo como antes). Cada extracción registra cuánto redujo el texto.
+
+# Versión de la extracción: incrementarla al cambiar cómo se arma TEXTO_PLANO (es parte de la
+# clave del store de artículos, así no se sirven clasificaciones hechas sobre el texto anterior)
+VERSION_EXTRACTOR = "contenido-2025.1"
+
+MINIMO_CHARS = 250            # Texto mínimo para aceptar un contenedor como cuerpo de la nota
+MINIMO_CHARS_PARRAFO = 25     # Párrafos más cortos no suman puntaje
+
+ETIQUETAS_DESCARTADAS = [
+    'script', 'style', 'noscript', 'template', 'svg', 'canvas', 'iframe', 'object', 'embed',
+    'form', 'button', 'select', 'input', 'textarea', 'nav', 'header', 'footer', 'aside', 'dialog',
+]
+ETIQUETAS_BLOQUE = ['p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'li', 'blockquote', 'pre', 'figcaption', 'td', 'dd', 'dt']
+ROLES_DESCARTADOS = {'navigation', 'banner', 'contentinfo', 'complementary', 'search', 'menu', 'menubar', 'dialog'}
+
+_RE_IMPROBABLE = re.compile(
+    r"menu|nav|footer|pie|header|cabecera|sidebar|lateral|share|compart|social|redes|cookie|banner|"
+    r"publicidad|advert|sponsor|\bads?\b|comment|comentario|related|relacionad|recomendad|newsletter|"
+    r"suscri|subscri|breadcrumb|login|popup|modal|widget|\btags?\b|etiquetas",
+    re.I,
+)
+_RE_PROBABLE = re.compile(r"article|articulo|body|content|contenido|entry|main|post|text|nota|detalle|cuerpo|story", re.I)
+_RE_ESPACIOS = re.compile(r"\s+")
+
+_lock = threading.Lock()
+_estadisticas = {}
+
+
+def compactar(texto: str) -> str:
+    """Espacios, tabs y saltos de línea seguidos -> un espacio"""
+    return _RE_ESPACIOS.sub(' ', texto).strip()
+
+
+def _descripcion(elemento) -> str:
+    atributos = elemento.attrs or {}
+    clases = atributos.get('class') or []
+    return ' '.join([*(clases if isinstance(clases, list) else [clases]), atributos.get('id') or ''])
+
+
+def _limpiar(soup):
+    """Descarta del árbol lo que no puede ser el cuerpo de la nota"""
+    for elemento in soup.find_all(ETIQUETAS_DESCARTADAS):
+        elemento.decompose()
+    for elemento in soup.find_all(True):
+        if elemento.decomposed or elemento.name in ('html', 'body'):
+            continue
+        if (elemento.get('role') or '').lower() in ROLES_DESCARTADOS:
+            elemento.decompose()
+            continue
+        descripcion = _descripcion(elemento)
+        if descripcion and _RE_IMPROBABLE.search(descripcion) and not _RE_PROBABLE.search(descripcion):
+            elemento.decompose()
+
+
+def _densidad_links(elemento, largo: int) -> float:
+    en_links = sum(len(a.get_text(' ', strip=True)) for a in elemento.find_all('a'))
+    return min(1.0, en_links / largo) if largo else 1.0
+
+
+def _candidato(soup):
+    """Contenedor con el cuerpo de la nota (None si no hay párrafos con texto)"""
+    for selector in ('[itemprop=articleBody]', 'article', 'main', '[role=main]'):
+        elementos = soup.select(selector)
+        if elementos:
+            mejor = max(elementos, key=lambda e: len(e.get_text(' ', strip=True)))
+            if len(mejor.get_text(' ', strip=True)) >= MINIMO_CHARS:
+                return mejor
+
+    puntajes, elementos = {}, {}
+    for parrafo in soup.find_all(['p', 'pre', 'td', 'blockquote']):
+        texto = parrafo.get_text(' ', strip=True)
+        if len(texto) < MINIMO_CHARS_PARRAFO:
+            continue
+        puntaje = 1 + texto.count(',') + min(len(texto) // 100, 3)
+        padre = parrafo.parent
+        abuelo = padre.parent if padre is not None else None
+        for contenedor, peso in ((padre, 1.0), (abuelo, 0.5)):
+            if contenedor is not None and contenedor.name not in (None, '[document]'):
+                elementos[id(contenedor)] = contenedor
+                puntajes[id(contenedor)] = puntajes.get(id(contenedor), 0) + puntaje * peso
+    if not puntajes:
+        return None
+
+    def puntaje_final(clave):
+        contenedor = elementos[clave]
+        return puntajes[clave] * (1 - _densidad_links(contenedor, len(contenedor.get_text(' ', strip=True))))
+
+    return elementos[max(puntajes, key=puntaje_final)]
+
+
+def _bloques(contenedor) -> list:
+    """Texto del contenedor por bloques (solo los bloques sin otros bloques adentro)"""
+    texto_total = compactar(contenedor.get_text(' ', strip=True))
+    bloques = []
+    for elemento in contenedor.find_all(ETIQUETAS_BLOQUE):
+        if elemento.find(ETIQUETAS_BLOQUE):
+            continue
+        texto = compactar(elemento.get_text(' ', strip=True))
+        if texto:
+            bloques.append(texto)
+    # Texto suelto en divs (fuera de párrafos): si los bloques dejan afuera la mitad, va el texto entero
+    if sum(len(b) for b in bloques) < len(texto_total) / 2:
+        return [texto_total] if texto_total else []
+    return bloques
+
+
+def _sin_repetidos(bloques: list) -> list:
+    """Descarta los bloques repetidos (sin distinguir mayúsculas ni tildes), manteniendo el primero"""
+    vistos, unicos = set(), []
+    for bloque in bloques:
+        clave = Texto.normalizar(bloque)
+        if clave not in vistos:
+            vistos.add(clave)
+            unicos.append(bloque)
+    return unicos
+
+
+def _registrar(fuente: str, original: int, final: int):
+    with _lock:
+        estadistica = _estadisticas.setdefault(fuente, {"textos": 0, "chars_originales": 0, "chars_finales": 0})
+        estadistica["textos"] += 1
+        estadistica["chars_originales"] += original
+        estadistica["chars_finales"] += final
+
+
+def texto_detalle(span_detalle) -> str:
+    """Cuerpo de la nota desde span.detalleFull, con los espacios compactados"""
+    original = span_detalle.get_text(separator=' ', strip=True)
+    texto = compactar(original)
+    _registrar("detalle", len(original), len(texto))
+    return texto
+
+
+def extraer(soup) -> str:
+    """
+    Cuerpo principal de una página sin span.detalleFull (modifica el soup: descarta el boilerplate).
+    Loguea cuánto se redujo el texto respecto de soup.get_text().
+    """
+    original = soup.get_text(separator=' ', strip=True)
+    try:
+        _limpiar(soup)
+        contenedor = _candidato(soup)
+        bloques = _bloques(contenedor) if contenedor is not None else []
+        if sum(len(b) for b in bloques) < MINIMO_CHARS:
+            raiz = soup.body or soup
+            bloques = _bloques(raiz)
+        texto = '\n'.join(_sin_repetidos(bloques))
+    except Exception as e:
+        logging.warning(f"⚠️ No se pudo extraer el contenido principal, se usa el texto completo: {e}")
+        texto = ""
+    if not texto:
+        texto = compactar(original)
+    _registrar("extractor", len(original), len(texto))
+    if original:
+        logging.info(f"🧹 Contenido principal: {len(original):,} → {len(texto):,} caracteres (-{1 - len(texto) / len(original):.0%})")
+    return texto
+
+
+def tomar_estadisticas() -> dict:
+    """Cuentas acumuladas en este proceso, y las reinicia (los workers de parseo las devuelven al proceso de la API)"""
+    with _lock:
+        copia = {fuente: dict(valores) for fuente, valores in _estadisticas.items()}
+        _estadisticas.clear()
+    return copia
+
+
+def sumar(estadisticas: dict):
+    """Suma las cuentas de otro proceso (ver tomar_estadisticas)"""
+    for fuente, valores in (estadisticas or {}).items():
+        with _lock:
+            estadistica = _estadisticas.setdefault(fuente, {"textos": 0, "chars_originales": 0, "chars_finales": 0})
+            for campo in estadistica:
+                estadistica[campo] += valores.get(campo, 0)
+
+
+def estadisticas() -> dict:
+    """Textos y caracteres antes/después por fuente ('detalle' o 'extractor'), desde que arrancó la API"""
+    with _lock:
+        copia = {fuente: dict(valores) for fuente, valores in _estadisticas.items()}
+    for valores in copia.values():
+        valores["reduccion"] = round(1 - valores["chars_finales"] / valores["chars_originales"], 4) if valores["chars_originales"] else None
+    return copia
+
+
+def reiniciar_estadisticas():
+    with _lock:
+        _estadisticas.clear()
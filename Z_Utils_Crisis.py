@@ -0,0 +1,232 @@
+import os
+import sqlite3
+import logging
+import threading
+from datetime import date, datetime, timedelta
+
+import Z_Utils_Articulos as Art
+import Z_Utils_Lazy as Lazy
+
+pd = Lazy.modulo('pandas')
+
+# =============================================================================
+# DETECCIÓN DE CRISIS INCREMENTAL
+# =============================================================================
+# En lugar de releer el histórico completo y recontar NEGATIVOS por tema en cada corrida,
+# se mantiene en SQLite un contador de noticias negativas por (tema, día), actualizado
+# a medida que se clasifican los lotes. El estado de crisis es una consulta por ventana:
+# tema en crisis = al menos CRISIS_UMBRAL negativas en los últimos CRISIS_VENTANA_DIAS días.
+
+CRISIS_DB_PATH = "Data_Results/prensai_crisis.db"
+CRISIS_UMBRAL = 5
+CRISIS_VENTANA_DIAS = 7
+TEMAS_FIJOS_DEFAULT = ["Actividades programadas"]
+
+VALORACIONES_NEGATIVAS = {"NEGATIVA", "NEGATIVO"}
+
+_lock_escritura = threading.Lock()
+_esquema_creado = set()
+
+
+def _conectar(db_path=None):
+    db_path = db_path or CRISIS_DB_PATH
+    dir_path = os.path.dirname(db_path)
+    if dir_path:
+        os.makedirs(dir_path, exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=30)
+    if db_path not in _esquema_creado:
+        conn.executescript("""
+            PRAGMA journal_mode=WAL;
+            -- Una fila por noticia: permite que reenviar o reclasificar una noticia no duplique conteos
+            CREATE TABLE IF NOT EXISTS crisis_noticias (
+                clave TEXT PRIMARY KEY,
+                tema TEXT NOT NULL,
+                fecha TEXT NOT NULL,
+                negativa INTEGER NOT NULL
+            );
+            -- Contadores agregados por tema y día (lo único que lee la consulta de crisis)
+            CREATE TABLE IF NOT EXISTS crisis_contadores (
+                tema TEXT NOT NULL,
+                fecha TEXT NOT NULL,
+                negativas INTEGER NOT NULL,
+                PRIMARY KEY (tema, fecha)
+            );
+            CREATE INDEX IF NOT EXISTS idx_crisis_contadores_fecha ON crisis_contadores (fecha);
+        """)
+        _esquema_creado.add(db_path)
+    return conn
+
+
+def _fecha_iso(valor, fecha_default):
+    """
+    Normaliza la fecha de la noticia a 'YYYY-MM-DD'. Si falta o es inválida, usa fecha_default.
+    """
+    if valor is None or (not isinstance(valor, (list, dict)) and pd.isnull(valor)):
+        return fecha_default
+    try:
+        return pd.Timestamp(valor).strftime('%Y-%m-%d')
+    except Exception:
+        return fecha_default
+
+
+def _clave_noticia(link):
+    """
+    Clave de la noticia: misma clave canónica que el store de artículos (id de ejes si lo hay),
+    para que variantes de la misma URL no cuenten dos veces.
+    """
+    if link is None or (not isinstance(link, str) and pd.isnull(link)):
+        return None
+    return Art.clave_articulo(str(link).strip()) if str(link).strip() else None
+
+
+def registrar_lote(df, db_path=None):
+    """
+    Actualiza incrementalmente los contadores con un lote de noticias clasificadas.
+    Usa las columnas LINK, TEMA, FECHA y VALORACION. Es idempotente por noticia:
+    si una noticia ya registrada llega de nuevo, solo se aplica la diferencia (ej: cambió su tema).
+
+    Args:
+        df (DataFrame): Noticias clasificadas
+        db_path (str, optional): Ruta de la base SQLite
+
+    Returns:
+        int: Cantidad de noticias nuevas o modificadas
+    """
+    if df is None or len(df) == 0 or 'TEMA' not in df.columns or 'VALORACION' not in df.columns:
+        return 0
+
+    hoy = date.today().isoformat()
+    nuevas = {}
+    for link, tema, fecha, valoracion in zip(
+        df['LINK'] if 'LINK' in df.columns else [None] * len(df),
+        df['TEMA'],
+        df['FECHA'] if 'FECHA' in df.columns else [None] * len(df),
+        df['VALORACION'],
+    ):
+        clave = _clave_noticia(link)
+        if not clave or tema is None or pd.isnull(tema) or tema == "REVISAR MANUAL":
+            continue
+        nuevas[clave] = (str(tema), _fecha_iso(fecha, hoy), int(str(valoracion).upper() in VALORACIONES_NEGATIVAS))
+
+    if not nuevas:
+        return 0
+
+    with _lock_escritura:
+        conn = _conectar(db_path)
+        try:
+            with conn:
+                existentes = {}
+                claves = list(nuevas)
+                for i in range(0, len(claves), 500):
+                    bloque = claves[i:i + 500]
+                    filas = conn.execute(
+                        f"SELECT clave, tema, fecha, negativa FROM crisis_noticias WHERE clave IN ({','.join('?' * len(bloque))})",
+                        bloque,
+                    ).fetchall()
+                    existentes.update({c: (t, f, n) for c, t, f, n in filas})
+
+                deltas = {}
+                cambios = []
+                for clave, nueva in nuevas.items():
+                    anterior = existentes.get(clave)
+                    if anterior == nueva:
+                        continue
+                    if anterior and anterior[2]:
+                        deltas[(anterior[0], anterior[1])] = deltas.get((anterior[0], anterior[1]), 0) - 1
+                    if nueva[2]:
+                        deltas[(nueva[0], nueva[1])] = deltas.get((nueva[0], nueva[1]), 0) + 1
+                    cambios.append((clave, *nueva))
+
+                conn.executemany(
+                    "INSERT INTO crisis_noticias (clave, tema, fecha, negativa) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT(clave) DO UPDATE SET tema=excluded.tema, fecha=excluded.fecha, negativa=excluded.negativa",
+                    cambios,
+                )
+                conn.executemany(
+                    "INSERT INTO crisis_contadores (tema, fecha, negativas) VALUES (?, ?, ?) "
+                    "ON CONFLICT(tema, fecha) DO UPDATE SET negativas = negativas + excluded.negativas",
+                    [(tema, fecha, delta) for (tema, fecha), delta in deltas.items() if delta],
+                )
+        finally:
+            conn.close()
+
+    logging.info(f"📈 Crisis: {len(cambios)} noticias registradas/actualizadas ({len(nuevas) - len(cambios)} sin cambios)")
+    return len(cambios)
+
+
+def conteo_negativas_por_tema(dias=None, fecha_ref=None, temas_fijos=None, db_path=None):
+    """
+    Devuelve {tema: negativas} dentro de la ventana [fecha_ref - dias + 1, fecha_ref].
+
+    Args:
+        dias (int, optional): Tamaño de la ventana en días (default CRISIS_VENTANA_DIAS)
+        fecha_ref (str, optional): Último día de la ventana 'YYYY-MM-DD' (default hoy)
+        temas_fijos (list, optional): Temas excluidos del análisis
+    """
+    dias = dias or CRISIS_VENTANA_DIAS
+    fecha_hasta = _fecha_iso(fecha_ref, date.today().isoformat())
+    fecha_desde = (datetime.fromisoformat(fecha_hasta) - timedelta(days=dias - 1)).strftime('%Y-%m-%d')
+    temas_fijos = set(TEMAS_FIJOS_DEFAULT if temas_fijos is None else temas_fijos)
+
+    conn = _conectar(db_path)
+    try:
+        filas = conn.execute(
+            "SELECT tema, SUM(negativas) FROM crisis_contadores WHERE fecha BETWEEN ? AND ? "
+            "GROUP BY tema HAVING SUM(negativas) > 0",
+            (fecha_desde, fecha_hasta),
+        ).fetchall()
+    finally:
+        conn.close()
+
+    return {tema: int(total) for tema, total in filas if tema not in temas_fijos}
+
+
+def temas_en_crisis(dias=None, umbral=None, fecha_ref=None, temas_fijos=None, db_path=None):
+    """
+    Lista de temas con al menos `umbral` noticias negativas en los últimos `dias` días.
+    """
+    umbral = umbral or CRISIS_UMBRAL
+    conteos = conteo_negativas_por_tema(dias, fecha_ref, temas_fijos, db_path)
+    return sorted(tema for tema, total in conteos.items() if total >= umbral)
+
+
+def marcar_crisis(df, dias=None, umbral=None, temas_fijos=None, db_path=None, registrar=True):
+    """
+    Registra el lote en el store y agrega la columna 'CRISIS' ('SI'/'NO') según la ventana actual.
+    Reemplazo incremental de procesar_crisis_con_historico: no relee ni reconcatena el histórico.
+    Con registrar=False solo marca (el lote ya se registró, ej: en el procesamiento del request).
+    """
+    try:
+        if registrar:
+            registrar_lote(df, db_path)
+        crisis = set(temas_en_crisis(dias, umbral, None, temas_fijos, db_path))
+        df['CRISIS'] = df['TEMA'].map(lambda t: 'SI' if t in crisis else 'NO') if 'TEMA' in df.columns else 'NO'
+        logging.info(f"Detectados {len(crisis)} temas en crisis: {sorted(crisis)}")
+        return df
+    except Exception as e:
+        logging.error(f"Error al detectar crisis incremental: {e}")
+        df['CRISIS'] = 'NO'
+        return df
+
+
+def importar_historico(historico_path, db_path=None):
+    """
+    Carga inicial del store desde un histórico (Excel, archivo columnar o dataset particionado).
+    Se corre una sola vez; las corridas siguientes actualizan los contadores incrementalmente.
+
+    Returns:
+        int: Noticias registradas
+    """
+    import Z_Utils_Salida as Salida
+
+    columnas = ['LINK', 'TEMA', 'FECHA', 'VALORACION']
+    if os.path.isdir(historico_path):
+        df = Salida.leer_dataset(historico_path)
+    elif Salida.formato_desde_ruta(historico_path):
+        df = Salida.leer_registros(historico_path)
+    else:
+        df = pd.read_excel(historico_path, usecols=lambda c: c in columnas)
+
+    registradas = registrar_lote(df, db_path)
+    logging.info(f"📥 Histórico {historico_path} importado al store de crisis: {registradas} noticias")
+    return registradas
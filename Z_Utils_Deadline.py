@@ -0,0 +1,168 @@
+import time
+import uuid
+import logging
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+# =============================================================================
+# PLAZO (DEADLINE) Y CANCELACIÓN POR REQUEST
+# =============================================================================
+# Cada request de procesamiento corre con un Plazo: un vencimiento (segundos desde el
+# inicio) y un token de cancelación. El plazo activo viaja en una ContextVar, así la
+# extracción (procesar_link_robusto), los reintentos de GPT (_gpt_request_with_retry) y
+# las llamadas a Ollama lo respetan sin pasar parámetros por toda la cadena:
+#   - los timeouts HTTP se recortan al tiempo restante (timeout())
+#   - las esperas entre reintentos se interrumpen si se cancela (dormir())
+#   - con el plazo vencido no se inician requests nuevos (vencido())
+# Los artículos que no terminaron a tiempo se registran con su motivo (marcar_incompleto)
+# y vuelven como "REVISAR MANUAL".
+
+PLAZO_DEFAULT_SEG = 900
+TIMEOUT_MINIMO_SEG = 0.5   # Timeout mínimo de un request HTTP cuando queda poco plazo
+
+
+class PlazoVencido(Exception):
+    """El plazo del request venció o el request fue cancelado"""
+
+
+class Plazo:
+    """Vencimiento y token de cancelación de un request"""
+
+    def __init__(self, segundos: Optional[float] = None, request_id: Optional[str] = None):
+        self.request_id = request_id or uuid.uuid4().hex[:12]
+        self.segundos = segundos
+        self.inicio = time.monotonic()
+        self.vence = self.inicio + segundos if segundos else None
+        self.incompletos = {}           # url -> motivo
+        self._cancelado = threading.Event()
+        self._motivo_cancelacion = None
+        self._lock = threading.Lock()
+
+    def cancelar(self, motivo: str = "Request cancelado por el cliente"):
+        self._motivo_cancelacion = motivo
+        self._cancelado.set()
+
+    def cancelado(self) -> bool:
+        return self._cancelado.is_set()
+
+    def restante(self) -> Optional[float]:
+        """Segundos que quedan (None = sin vencimiento)"""
+        if self.vence is None:
+            return None
+        return max(0.0, self.vence - time.monotonic())
+
+    def vencido(self) -> bool:
+        return self.cancelado() or (self.vence is not None and time.monotonic() >= self.vence)
+
+    def motivo(self) -> str:
+        if self.cancelado():
+            return self._motivo_cancelacion
+        return f"Plazo del request vencido ({self.segundos:g}s) antes de terminar el procesamiento"
+
+    def timeout(self, maximo: float) -> float:
+        """Timeout para un request HTTP: el menor entre maximo y el plazo restante"""
+        restante = self.restante()
+        if restante is None:
+            return maximo
+        return max(TIMEOUT_MINIMO_SEG, min(maximo, restante))
+
+    def dormir(self, segundos: float) -> bool:
+        """Espera entre reintentos; se interrumpe al cancelar o vencer. Devuelve False si el plazo venció."""
+        restante = self.restante()
+        espera = segundos if restante is None else min(segundos, restante)
+        self._cancelado.wait(espera)
+        return not self.vencido()
+
+    def marcar_incompleto(self, url: Optional[str], motivo: Optional[str] = None):
+        if url:
+            with self._lock:
+                self.incompletos.setdefault(url, motivo or self.motivo())
+
+    def resumen(self) -> dict:
+        return {
+            "request_id": self.request_id,
+            "plazo_seg": self.segundos,
+            "transcurrido_seg": round(time.monotonic() - self.inicio, 1),
+            "cancelado": self.cancelado(),
+            "vencido": self.vencido(),
+        }
+
+
+_plazo_actual = ContextVar('plazo_actual', default=None)
+_activos = {}
+_lock_activos = threading.Lock()
+
+
+@contextmanager
+def activar(plazo: Plazo):
+    """Activa el plazo para el contexto actual y lo registra para poder cancelarlo por request_id"""
+    token = _plazo_actual.set(plazo)
+    with _lock_activos:
+        _activos[plazo.request_id] = plazo
+    try:
+        yield plazo
+    finally:
+        _plazo_actual.reset(token)
+        with _lock_activos:
+            if _activos.get(plazo.request_id) is plazo:
+                del _activos[plazo.request_id]
+
+
+def actual() -> Optional[Plazo]:
+    return _plazo_actual.get()
+
+
+def vencido() -> bool:
+    """True si hay un plazo activo y venció (o se canceló)"""
+    plazo = actual()
+    return plazo is not None and plazo.vencido()
+
+
+def verificar(contexto: str = ""):
+    """Lanza PlazoVencido si el plazo activo venció"""
+    plazo = actual()
+    if plazo is not None and plazo.vencido():
+        raise PlazoVencido(f"{plazo.motivo()}{f' ({contexto})' if contexto else ''}")
+
+
+def timeout(maximo: float) -> float:
+    plazo = actual()
+    return plazo.timeout(maximo) if plazo else maximo
+
+
+def dormir(segundos: float) -> bool:
+    plazo = actual()
+    if plazo is None:
+        time.sleep(segundos)
+        return True
+    return plazo.dormir(segundos)
+
+
+def marcar_incompleto(url: Optional[str], motivo: Optional[str] = None):
+    plazo = actual()
+    if plazo is not None:
+        plazo.marcar_incompleto(url, motivo)
+
+
+def cancelar(request_id: str, motivo: str = "Request cancelado por el cliente") -> bool:
+    """Cancela un request en curso. Devuelve False si no hay ninguno activo con ese id."""
+    with _lock_activos:
+        plazo = _activos.get(request_id)
+    if plazo is None:
+        return False
+    plazo.cancelar(motivo)
+    logging.warning(f"🛑 Request {request_id} cancelado: {motivo}")
+    return True
+
+
+def obtener(request_id: str) -> Optional[Plazo]:
+    """Plazo activo con ese request_id (None si no hay ninguno en curso)"""
+    with _lock_activos:
+        return _activos.get(request_id)
+
+
+def activos() -> list:
+    with _lock_activos:
+        return [plazo.resumen() for plazo in _activos.values()]
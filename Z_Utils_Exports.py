@@ -0,0 +1,207 @@
+import os
+import re
+import time
+import uuid
+import logging
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+import Z_Utils as Z
+
+# Cada export se escribe en un archivo propio (no se pisan entre requests concurrentes)
+EXPORTS_DIR = "Data_Results/exports"
+
+# Política de retención: se borran los archivos más viejos que EXPORTS_MAX_EDAD_SEG
+# y, si aún quedan más de EXPORTS_MAX_ARCHIVOS, los más antiguos.
+EXPORTS_MAX_EDAD_SEG = 24 * 60 * 60
+EXPORTS_MAX_ARCHIVOS = 200
+
+ESTADO_PENDIENTE = "pendiente"
+ESTADO_LISTO = "listo"
+ESTADO_ERROR = "error"
+
+_PATRON_EXPORT_ID = re.compile(r"^[0-9a-f]{32}$")
+
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="export-excel")
+_registro = {}  # export_id -> {estado, ruta, nombre, creado, error, future}
+_lock = threading.Lock()
+
+
+def _ruta_export(export_id: str) -> str:
+    return os.path.join(EXPORTS_DIR, f"{export_id}.xlsx")
+
+
+def programar_export_excel(df, prefijo_nombre: str = "Noticias_Procesadas") -> dict:
+    """
+    Registra un export nuevo y genera el Excel en segundo plano.
+    Devuelve inmediatamente la info del export (id, estado, nombre de descarga).
+
+    Args:
+        df (DataFrame): Datos a exportar (se escriben tal cual, sin copiar)
+        prefijo_nombre (str): Prefijo del nombre de archivo que verá el usuario al descargar
+
+    Returns:
+        dict: {"export_id", "estado", "archivo_excel", "ruta_completa"}
+    """
+    export_id = uuid.uuid4().hex
+    nombre = f"{prefijo_nombre}_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{export_id[:8]}.xlsx"
+    ruta = _ruta_export(export_id)
+
+    with _lock:
+        _registro[export_id] = {
+            "estado": ESTADO_PENDIENTE,
+            "ruta": ruta,
+            "nombre": nombre,
+            "creado": time.time(),
+            "error": None,
+            "future": None,
+        }
+        _registro[export_id]["future"] = _executor.submit(_generar_export, export_id, df, ruta)
+
+    logging.info(f"📤 Export {export_id} programado ({len(df)} registros) -> {ruta}")
+    return {
+        "export_id": export_id,
+        "estado": ESTADO_PENDIENTE,
+        "archivo_excel": nombre,
+        "ruta_completa": ruta,
+    }
+
+
+def _generar_export(export_id: str, df, ruta: str) -> None:
+    """
+    Tarea de fondo: escribe el Excel y actualiza el estado del export.
+    """
+    t0 = time.time()
+    ok = Z.exportar_df_a_excel(df, ruta)
+    with _lock:
+        info = _registro.get(export_id)
+        if info is not None:
+            info["estado"] = ESTADO_LISTO if ok else ESTADO_ERROR
+            info["error"] = None if ok else "No se pudo generar el archivo Excel"
+    if ok:
+        logging.info(f"✅ Export {export_id} generado en {time.time() - t0:.2f}s")
+    else:
+        logging.error(f"❌ Export {export_id} falló")
+    aplicar_politica_retencion()
+
+
+def obtener_export(export_id: str):
+    """
+    Devuelve el estado de un export o None si no existe (o el id no es válido).
+    Si el proceso se reinició, los archivos que siguen en disco se informan como listos.
+
+    Returns:
+        dict: {"export_id", "estado", "ruta", "nombre", "error"} o None
+    """
+    if not export_id or not _PATRON_EXPORT_ID.match(export_id):
+        return None
+
+    with _lock:
+        info = _registro.get(export_id)
+        if info is not None:
+            return {
+                "export_id": export_id,
+                "estado": info["estado"],
+                "ruta": info["ruta"],
+                "nombre": info["nombre"],
+                "error": info["error"],
+            }
+
+    ruta = _ruta_export(export_id)
+    if os.path.exists(ruta):
+        return {
+            "export_id": export_id,
+            "estado": ESTADO_LISTO,
+            "ruta": ruta,
+            "nombre": os.path.basename(ruta),
+            "error": None,
+        }
+    return None
+
+
+def esperar_export(export_id: str, timeout: float = None) -> dict:
+    """
+    Bloquea hasta que termine la generación de un export (útil para scripts y tests).
+    """
+    with _lock:
+        info = _registro.get(export_id)
+        future = info["future"] if info else None
+    if future is not None:
+        future.result(timeout=timeout)
+    return obtener_export(export_id)
+
+
+def _purgar_registro(max_edad_seg: int, max_archivos: int) -> int:
+    """
+    Quita del registro los exports terminados (listos o con error) creados hace más de
+    max_edad_seg, o más allá de los max_archivos más nuevos. Los pendientes no se tocan.
+
+    Returns:
+        int: Cantidad de entradas quitadas
+    """
+    ahora = time.time()
+    with _lock:
+        terminados = sorted(
+            ((info["creado"], eid) for eid, info in _registro.items() if info["estado"] != ESTADO_PENDIENTE),
+            reverse=True,  # Más nuevos primero
+        )
+        a_quitar = [eid for i, (creado, eid) in enumerate(terminados)
+                    if ahora - creado > max_edad_seg or i >= max_archivos]
+        for eid in a_quitar:
+            _registro.pop(eid, None)
+    if a_quitar:
+        logging.info(f"🧹 Retención de exports: {len(a_quitar)} entradas quitadas del registro")
+    return len(a_quitar)
+
+
+def aplicar_politica_retencion(max_edad_seg: int = None, max_archivos: int = None) -> int:
+    """
+    Elimina exports viejos del disco y del registro según la política de retención.
+    Nunca borra exports que todavía se están generando.
+
+    Returns:
+        int: Cantidad de archivos eliminados
+    """
+    max_edad_seg = EXPORTS_MAX_EDAD_SEG if max_edad_seg is None else max_edad_seg
+    max_archivos = EXPORTS_MAX_ARCHIVOS if max_archivos is None else max_archivos
+
+    # Las entradas terminadas (listas o con error, que no tienen archivo) también vencen por antigüedad
+    _purgar_registro(max_edad_seg, max_archivos)
+
+    if not os.path.isdir(EXPORTS_DIR):
+        return 0
+
+    with _lock:
+        pendientes = {_ruta_export(eid) for eid, info in _registro.items() if info["estado"] == ESTADO_PENDIENTE}
+
+    archivos = []
+    for nombre in os.listdir(EXPORTS_DIR):
+        ruta = os.path.join(EXPORTS_DIR, nombre)
+        if not nombre.endswith(".xlsx") or ruta in pendientes:
+            continue
+        try:
+            archivos.append((os.path.getmtime(ruta), ruta))
+        except OSError:
+            continue
+
+    archivos.sort(reverse=True)  # Más nuevos primero
+    ahora = time.time()
+    a_borrar = [ruta for i, (mtime, ruta) in enumerate(archivos)
+                if ahora - mtime > max_edad_seg or i >= max_archivos]
+
+    eliminados = 0
+    for ruta in a_borrar:
+        try:
+            os.remove(ruta)
+            eliminados += 1
+        except OSError as e:
+            logging.warning(f"⚠️ No se pudo eliminar export viejo {ruta}: {e}")
+            continue
+        export_id = os.path.splitext(os.path.basename(ruta))[0]
+        with _lock:
+            _registro.pop(export_id, None)
+
+    if eliminados:
+        logging.info(f"🧹 Retención de exports: {eliminados} archivos eliminados")
+    return eliminados
@@ -0,0 +1,174 @@
+import os
+import time
+import sqlite3
+import logging
+import threading
+from datetime import datetime
+from typing import Callable, Optional
+
+import requests
+
+# =============================================================================
+# SONDEOS DE SALUD DE LOS BACKENDS (readiness)
+# =============================================================================
+# Los backends (Ollama, OpenAI, ejes.com, stores SQLite) se sondean en un hilo de fondo
+# cada INTERVALO_SONDEO_SEG y el resultado queda cacheado: /health/ready solo lee el
+# último estado, sin hacer requests en el camino del request.
+# Cada sondeo devuelve un dict con al menos {"ok": bool, "detalle": str}; se le agregan
+# la latencia y la hora de verificación.
+
+INTERVALO_SONDEO_SEG = 30
+TIMEOUT_SONDEO_SEG = 3
+
+OPENAI_MODELS_URL = "https://api.openai.com/v1/models"
+EJES_URL_SONDEO = "https://culturagcba.clientes.ejes.com/"
+
+_sondas = {}            # nombre -> función sin argumentos que devuelve el dict del sondeo
+_estado = {}            # nombre -> último resultado
+_lock = threading.Lock()
+_hilo = None
+_detener = threading.Event()
+
+
+# -----------------------------------------------------------------------------
+# Sondeos
+# -----------------------------------------------------------------------------
+
+def sondear_ollama(ollama_url: str, modelo: str, timeout: float = TIMEOUT_SONDEO_SEG) -> dict:
+    """
+    Ollama: /api/tags responde y el modelo está descargado; /api/ps informa si ya está cargado en memoria.
+    """
+    base = ollama_url.split("/api/")[0]
+    resp = requests.get(f"{base}/api/tags", timeout=timeout)
+    if resp.status_code != 200:
+        return {"ok": False, "detalle": f"/api/tags respondió HTTP {resp.status_code}", "modelo": modelo}
+    disponibles = [m.get("name") for m in resp.json().get("models", [])]
+    if modelo not in disponibles:
+        return {"ok": False, "detalle": f"Modelo {modelo} no descargado", "modelo": modelo}
+    cargado = None
+    try:
+        ps = requests.get(f"{base}/api/ps", timeout=timeout)
+        if ps.status_code == 200:
+            cargado = modelo in [m.get("name") for m in ps.json().get("models", [])]
+    except requests.RequestException:
+        pass  # /api/ps es informativo (versiones viejas de Ollama no lo tienen)
+    return {"ok": True, "detalle": "Servicio activo", "modelo": modelo, "modelo_cargado": cargado}
+
+
+def sondear_openai(api_key: Optional[str], timeout: float = TIMEOUT_SONDEO_SEG) -> dict:
+    """
+    OpenAI: hay API key configurada y la API la acepta (GET /v1/models).
+    """
+    if not api_key:
+        return {"ok": False, "detalle": "OPENAI_API_KEY no configurada", "api_key": False}
+    resp = requests.get(OPENAI_MODELS_URL, headers={"Authorization": f"Bearer {api_key}"}, timeout=timeout)
+    if resp.status_code == 200:
+        return {"ok": True, "detalle": "API accesible", "api_key": True}
+    if resp.status_code == 401:
+        return {"ok": False, "detalle": "API key rechazada (HTTP 401)", "api_key": True}
+    return {"ok": False, "detalle": f"API respondió HTTP {resp.status_code}", "api_key": True}
+
+
+def sondear_url(url: str, timeout: float = TIMEOUT_SONDEO_SEG) -> dict:
+    """
+    Sitio accesible: cualquier respuesta que no sea 5xx cuenta como disponible.
+    """
+    resp = requests.get(url, timeout=timeout)
+    if resp.status_code >= 500:
+        return {"ok": False, "detalle": f"HTTP {resp.status_code}"}
+    return {"ok": True, "detalle": f"HTTP {resp.status_code}"}
+
+
+def sondear_sqlite(paths: list) -> dict:
+    """
+    Stores SQLite: la base abre y responde, o (si todavía no existe) su carpeta es escribible.
+    """
+    detalles = {}
+    for path in paths:
+        if os.path.exists(path):
+            conn = sqlite3.connect(path, timeout=TIMEOUT_SONDEO_SEG)
+            try:
+                conn.execute("SELECT 1").fetchone()
+                detalles[path] = "ok"
+            finally:
+                conn.close()
+        else:
+            carpeta = os.path.dirname(path) or "."
+            escribible = os.access(carpeta if os.path.isdir(carpeta) else ".", os.W_OK)
+            detalles[path] = "sin crear" if escribible else "carpeta no escribible"
+    ok = all(d in ("ok", "sin crear") for d in detalles.values())
+    return {"ok": ok, "detalle": "Stores accesibles" if ok else "Store no accesible", "stores": detalles}
+
+
+# -----------------------------------------------------------------------------
+# Registro, ciclo de fondo y lectura del estado cacheado
+# -----------------------------------------------------------------------------
+
+def registrar(nombre: str, sonda: Callable[[], dict]):
+    """Registra un sondeo (función sin argumentos) bajo un nombre"""
+    _sondas[nombre] = sonda
+
+
+def sondear_todo() -> dict:
+    """Corre todos los sondeos registrados y actualiza el estado cacheado"""
+    for nombre, sonda in list(_sondas.items()):
+        t0 = time.time()
+        try:
+            resultado = dict(sonda())
+        except Exception as e:
+            resultado = {"ok": False, "detalle": f"Error: {type(e).__name__}: {e}"}
+        resultado["latencia_ms"] = round((time.time() - t0) * 1000)
+        resultado["verificado"] = datetime.now().isoformat(timespec='seconds')
+        with _lock:
+            anterior = _estado.get(nombre)
+            _estado[nombre] = resultado
+        if anterior is None or anterior["ok"] != resultado["ok"]:
+            nivel = logging.info if resultado["ok"] else logging.warning
+            nivel(f"{'🟢' if resultado['ok'] else '🔴'} Sondeo {nombre}: {resultado['detalle']}")
+    return estado()
+
+
+def _ciclo(intervalo: float):
+    while not _detener.is_set():
+        sondear_todo()
+        _detener.wait(intervalo)
+
+
+def iniciar(intervalo: Optional[float] = None) -> bool:
+    """
+    Arranca el hilo de sondeos en segundo plano (idempotente).
+    Devuelve True si lo arrancó en esta llamada.
+    """
+    global _hilo
+    with _lock:
+        if _hilo is not None and _hilo.is_alive():
+            return False
+        _detener.clear()
+        _hilo = threading.Thread(target=_ciclo, args=(intervalo or INTERVALO_SONDEO_SEG,), name="sondeos-salud", daemon=True)
+        _hilo.start()
+    logging.info(f"🩺 Sondeos de salud cada {intervalo or INTERVALO_SONDEO_SEG}s: {', '.join(_sondas)}")
+    return True
+
+
+def detener():
+    _detener.set()
+
+
+def estado() -> dict:
+    """Último resultado de cada sondeo (copia)"""
+    with _lock:
+        return {nombre: dict(resultado) for nombre, resultado in _estado.items()}
+
+
+def listo(requeridos: list, alguno_de: Optional[list] = None) -> bool:
+    """
+    True si ya se sondeó todo, los requeridos están ok y (si se indica) al menos uno de 'alguno_de' está ok.
+    """
+    actual = estado()
+    if any(nombre not in actual for nombre in _sondas):
+        return False
+    if not all(actual.get(nombre, {}).get("ok") for nombre in requeridos):
+        return False
+    if alguno_de and not any(actual.get(nombre, {}).get("ok") for nombre in alguno_de):
+        return False
+    return True
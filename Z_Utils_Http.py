@@ -0,0 +1,51 @@
+import logging
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# =============================================================================
+# SESIONES HTTP CON POOL DE CONEXIONES POR BACKEND
+# =============================================================================
+# Una requests.Session por backend ('ejes', 'openai', 'ollama'): las conexiones TCP/TLS
+# quedan abiertas (keep-alive) y se reutilizan entre artículos en lugar de abrir una por
+# request. El warm-up de arranque abre la primera conexión de cada pool (abrir_conexion).
+
+POOL_CONEXIONES = 10   # Conexiones que se mantienen abiertas por host
+
+_sesiones = {}
+_lock = threading.Lock()
+
+
+def sesion(nombre: str) -> requests.Session:
+    """Sesión con pool de conexiones del backend (se crea la primera vez)"""
+    with _lock:
+        s = _sesiones.get(nombre)
+        if s is None:
+            s = requests.Session()
+            adapter = HTTPAdapter(pool_connections=POOL_CONEXIONES, pool_maxsize=POOL_CONEXIONES)
+            s.mount("http://", adapter)
+            s.mount("https://", adapter)
+            _sesiones[nombre] = s
+        return s
+
+
+def abrir_conexion(nombre: str, url: str, timeout: float = 5, **kwargs) -> int:
+    """
+    Abre (y deja en el pool) una conexión al backend con un GET liviano.
+
+    Returns:
+        int: Status code de la respuesta
+    """
+    respuesta = sesion(nombre).get(url, timeout=timeout, **kwargs)
+    respuesta.close()
+    logging.info(f"🔗 Conexión abierta con {nombre} ({url}): HTTP {respuesta.status_code}")
+    return respuesta.status_code
+
+
+def cerrar():
+    """Cierra todas las sesiones (y sus conexiones)"""
+    with _lock:
+        for s in _sesiones.values():
+            s.close()
+        _sesiones.clear()
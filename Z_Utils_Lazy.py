@@ -0,0 +1,40 @@
+import sys
+import importlib
+
+# =============================================================================
+# IMPORTS DIFERIDOS DE DEPENDENCIAS PESADAS
+# =============================================================================
+# pandas, numpy, BeautifulSoup y chardet se importan recién cuando un camino de código
+# los usa: importar api_flask (o un script de Testing/) no paga su costo de carga.
+#   pd = Lazy.modulo('pandas')   # se importa en el primer pd.<atributo>
+# El warm-up de arranque (Z_Utils_Warmup.MODULOS_DIFERIDOS) los importa antes de recibir tráfico.
+
+
+class ModuloDiferido:
+    """Proxy de un módulo que se importa en el primer acceso a un atributo"""
+
+    def __init__(self, nombre: str):
+        self.__dict__['_nombre'] = nombre
+        self.__dict__['_modulo'] = None
+
+    def _cargar(self):
+        if self._modulo is None:
+            self.__dict__['_modulo'] = importlib.import_module(self._nombre)
+        return self._modulo
+
+    def __getattr__(self, atributo):
+        return getattr(self._cargar(), atributo)
+
+    def __repr__(self):
+        estado = "cargado" if self._modulo is not None else "diferido"
+        return f"<módulo {self._nombre} ({estado})>"
+
+
+def modulo(nombre: str) -> ModuloDiferido:
+    """Módulo que se importa en el primer uso"""
+    return ModuloDiferido(nombre)
+
+
+def cargado(nombre: str) -> bool:
+    """True si el módulo ya se importó en este proceso"""
+    return nombre in sys.modules
@@ -0,0 +1,286 @@
+import os
+import json
+import time
+import logging
+import argparse
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Optional, List, Callable
+
+import Z_Utils as Z
+import Z_Utils_Articulos as Art
+import Z_Utils_Deadline as Plazos
+import Z_Utils_Lazy as Lazy
+
+pd = Lazy.modulo('pandas')
+
+# =============================================================================
+# CORRIDAS POR LOTES DESDE LÍNEA DE COMANDOS (con checkpoints)
+# =============================================================================
+# Procesa una lista de links (xlsx, csv o txt) con el mismo pipeline que /procesar-noticias,
+# en lotes de TAMANO_LOTE links y con CONCURRENCIA lotes en paralelo. Cada lote terminado se
+# agrega a los JSONL de la carpeta de la corrida, que hacen de checkpoint:
+#   resultados.jsonl   un registro por link procesado
+#   errores.jsonl      {"url", "motivo"} por link descartado (URL inválida, extracción, contenido)
+#   estado.json        resumen de avance y huella de la configuración
+# Al relanzar con la misma carpeta se saltean los links ya escritos: una corrida cortada
+# sigue donde quedó. Los links incompletos (plazo vencido, cancelación, backend caído) no se
+# escriben y se reintentan en la próxima corrida.
+#
+# Uso: python Z_Utils_Lotes.py links.xlsx --config config.json --salida Data_Results/corridas/mayo
+# config.json: {"temas": [...], "tema_default": "...", "menciones": [...],
+#               "ministro_key_words": [...], "ministerios_key_words": [...]}
+
+TAMANO_LOTE = 50
+CONCURRENCIA = 2
+CORRIDAS_DIR = "Data_Results/corridas"
+
+ARCHIVO_RESULTADOS = "resultados.jsonl"
+ARCHIVO_ERRORES = "errores.jsonl"
+ARCHIVO_ESTADO = "estado.json"
+
+
+def leer_links(path: str) -> List[str]:
+    """
+    Links de un archivo: Excel (primera columna de la primera hoja, solo ejes.com),
+    CSV (primera columna) o texto (uno por línea; se ignoran vacías y las que empiezan con #).
+    Los duplicados exactos se descartan manteniendo el orden.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension in ('.xlsx', '.xls'):
+        links = Z.obtener_links_del_usuario_desde_excel(path)
+        links = [] if links is None else links.tolist()
+    elif extension == '.csv':
+        df = pd.read_csv(path, header=None, dtype=str)
+        links = df.iloc[:, 0].dropna().tolist() if df.shape[1] else []
+    else:
+        with open(path, encoding='utf-8') as f:
+            links = [linea for linea in f.read().splitlines() if not linea.strip().startswith('#')]
+    links = [str(link).strip() for link in links if str(link).strip().lower().startswith('http')]
+    return list(dict.fromkeys(links))
+
+
+def _leer_jsonl(path: str) -> list:
+    """Registros de un JSONL; una última línea cortada (corrida interrumpida) se descarta"""
+    if not os.path.exists(path):
+        return []
+    registros = []
+    with open(path, encoding='utf-8') as f:
+        for linea in f:
+            try:
+                registros.append(json.loads(linea))
+            except ValueError:
+                logging.warning(f"⚠️ Línea inválida en {path} (corrida interrumpida), se ignora")
+    return registros
+
+
+def links_terminados(carpeta: str) -> set:
+    """Links ya escritos en la carpeta de la corrida (resultados o errores)"""
+    terminados = {r.get('LINK') for r in _leer_jsonl(os.path.join(carpeta, ARCHIVO_RESULTADOS))}
+    terminados |= {e.get('url') for e in _leer_jsonl(os.path.join(carpeta, ARCHIVO_ERRORES))}
+    return terminados - {None}
+
+
+class Checkpoint:
+    """Escritura incremental (y thread-safe) de los resultados de una corrida"""
+
+    def __init__(self, carpeta: str, huella: str, total: int, archivo: Optional[str] = None):
+        self.carpeta = carpeta
+        self.huella = huella
+        self.total = total
+        self.archivo = archivo
+        self._lock = threading.Lock()
+        os.makedirs(carpeta, exist_ok=True)
+
+        estado_previo = self.leer_estado(carpeta)
+        if estado_previo and estado_previo.get('huella') != huella:
+            raise ValueError(
+                f"La corrida en {carpeta} se hizo con otra configuración; "
+                f"usá otra carpeta de salida o --reiniciar"
+            )
+        self.terminados = links_terminados(carpeta)
+        self.errores = len(_leer_jsonl(os.path.join(carpeta, ARCHIVO_ERRORES)))
+        self.incompletos = 0
+
+    @staticmethod
+    def leer_estado(carpeta: str) -> Optional[dict]:
+        path = os.path.join(carpeta, ARCHIVO_ESTADO)
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+
+    def _agregar(self, nombre: str, registros: list):
+        if not registros:
+            return
+        with open(os.path.join(self.carpeta, nombre), 'a', encoding='utf-8') as f:
+            for registro in registros:
+                f.write(json.dumps(registro, ensure_ascii=False, default=str) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def registrar_lote(self, resultados: list, errores: list, incompletos: int):
+        """Agrega el lote a los JSONL y actualiza estado.json (escritura atómica)"""
+        with self._lock:
+            self._agregar(ARCHIVO_RESULTADOS, resultados)
+            self._agregar(ARCHIVO_ERRORES, errores)
+            self.terminados.update(r['LINK'] for r in resultados)
+            self.terminados.update(e['url'] for e in errores)
+            self.errores += len(errores)
+            self.incompletos += incompletos
+            self._guardar_estado()
+
+    def _guardar_estado(self):
+        estado = {
+            "archivo": self.archivo,
+            "huella": self.huella,
+            "total": self.total,
+            "terminados": len(self.terminados),
+            "errores": self.errores,
+            "pendientes": self.total - len(self.terminados),
+            "actualizado": datetime.now().isoformat(timespec='seconds'),
+        }
+        path = os.path.join(self.carpeta, ARCHIVO_ESTADO)
+        tmp = path + ".tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(estado, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, path)
+
+
+def separar_resultado(links: list, resultado: dict, status_code: int) -> tuple:
+    """
+    Separa la respuesta del pipeline de un lote en (resultados, errores, pendientes).
+    Pendientes = incompletos del plazo/cancelación/backends, o el lote entero si falló sin detalle.
+    """
+    if status_code >= 500 and 'incompletas' not in resultado:
+        return [], [], list(links)
+    pendientes = {i['url'] for i in resultado.get('incompletas', [])}
+    resultados = [r for r in resultado.get('data', []) if r.get('LINK') not in pendientes]
+    errores = [e for e in resultado.get('errores', []) if e.get('url') not in pendientes]
+    return resultados, errores, [link for link in links if link in pendientes]
+
+
+def procesar_links(
+    links: List[str],
+    carpeta: str,
+    config: dict,
+    procesar: Callable,
+    tamano_lote: int = TAMANO_LOTE,
+    concurrencia: int = CONCURRENCIA,
+    plazo_lote_seg: Optional[float] = None,
+    archivo: Optional[str] = None,
+    pipeline: Optional[dict] = None,
+) -> dict:
+    """
+    Procesa los links pendientes de la corrida en lotes, con checkpoint después de cada lote.
+
+    Args:
+        links (list): Todos los links de la corrida (los ya terminados se saltean)
+        carpeta (str): Carpeta de la corrida (resultados, errores y estado)
+        config (dict): temas, tema_default, menciones, ministro_key_words, ministerios_key_words
+        procesar (callable): Pipeline con la firma de api_flask.procesar_noticias_con_ia
+        tamano_lote (int): Links por llamada al pipeline
+        concurrencia (int): Lotes procesados en paralelo
+        plazo_lote_seg (float, optional): Plazo de cada lote (None = plazo por defecto de la API)
+        pipeline (dict, optional): Modelo, versión de prompts y demás configuración de runtime
+            (api_flask.configuracion_pipeline); entra en la huella junto con config
+
+    Returns:
+        dict: Resumen de la corrida
+    """
+    # Cambiar de modelo, prompts o extractor a mitad de corrida mezclaría resultados: la carpeta no se reutiliza
+    huella = Art.huella_configuracion(**{**config, **(pipeline or {})})
+    checkpoint = Checkpoint(carpeta, huella, len(links), archivo)
+    pendientes = [link for link in links if link not in checkpoint.terminados]
+    lotes = [pendientes[i:i + tamano_lote] for i in range(0, len(pendientes), tamano_lote)]
+    corrida_id = os.path.basename(os.path.normpath(carpeta)) or "corrida"
+    logging.info(f"📦 Corrida {corrida_id}: {len(links)} links, {len(checkpoint.terminados)} ya terminados, "
+                 f"{len(pendientes)} pendientes en {len(lotes)} lotes (concurrencia {concurrencia})")
+    print(f"📦 {len(pendientes)} links pendientes de {len(links)} ({len(lotes)} lotes de hasta {tamano_lote})")
+
+    t0 = time.time()
+
+    def correr_lote(numero, lote):
+        resultado, status_code = procesar(
+            lote, config.get('temas'), config.get('tema_default'), config.get('menciones'),
+            config.get('ministro_key_words'), config.get('ministerios_key_words'),
+            plazo_seg=plazo_lote_seg, request_id=f"{corrida_id}-{numero}",
+        )
+        resultados, errores, incompletos = separar_resultado(lote, resultado, status_code)
+        checkpoint.registrar_lote(resultados, errores, len(incompletos))
+        print(f"✅ Lote {numero + 1}/{len(lotes)}: {len(resultados)} procesados, {len(errores)} errores, "
+              f"{len(incompletos)} pendientes ({len(checkpoint.terminados)}/{len(links)})")
+
+    interrumpida = False
+    with ThreadPoolExecutor(max_workers=max(1, concurrencia)) as executor:
+        futuros = [executor.submit(correr_lote, numero, lote) for numero, lote in enumerate(lotes)]
+        try:
+            for futuro in as_completed(futuros):
+                futuro.result()
+        except KeyboardInterrupt:
+            # Cortar la corrida: los lotes en curso terminan rápido como incompletos (se reintentan al reanudar)
+            interrumpida = True
+            print("🛑 Corrida interrumpida, cancelando lotes en curso...")
+            for futuro in futuros:
+                futuro.cancel()
+            for activo in Plazos.activos():
+                if activo["request_id"].startswith(f"{corrida_id}-"):
+                    Plazos.cancelar(activo["request_id"], "Corrida interrumpida")
+
+    pendientes_final = len(links) - len(checkpoint.terminados)
+    return {
+        "total": len(links),
+        "terminados": len(checkpoint.terminados),
+        "errores": checkpoint.errores,
+        "pendientes": pendientes_final,
+        "interrumpida": interrumpida,
+        "segundos": round(time.time() - t0, 1),
+    }
+
+
+def exportar_excel(carpeta: str, export_path: Optional[str] = None) -> Optional[str]:
+    """Exporta los resultados acumulados de la corrida a Excel (resultados.xlsx en la carpeta)"""
+    registros = _leer_jsonl(os.path.join(carpeta, ARCHIVO_RESULTADOS))
+    if not registros:
+        return None
+    export_path = export_path or os.path.join(carpeta, "resultados.xlsx")
+    df = pd.DataFrame(registros)
+    if 'MENCIONES' in df.columns:
+        df['MENCIONES'] = df['MENCIONES'].apply(lambda m: ', '.join(m) if isinstance(m, list) else m)
+    return export_path if Z.exportar_df_a_excel(df, export_path) else None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Procesa una lista de links con checkpoints reanudables")
+    parser.add_argument("links", help="Archivo .xlsx, .csv o .txt con los links")
+    parser.add_argument("--config", help="JSON con temas, tema_default, menciones y key words")
+    parser.add_argument("--salida", help=f"Carpeta de la corrida (default {CORRIDAS_DIR}/<nombre del archivo>)")
+    parser.add_argument("--tamano-lote", type=int, default=TAMANO_LOTE)
+    parser.add_argument("--concurrencia", type=int, default=CONCURRENCIA)
+    parser.add_argument("--plazo-lote", type=float, default=None, help="Plazo en segundos de cada lote")
+    parser.add_argument("--reiniciar", action="store_true", help="Descarta el checkpoint y empieza de cero")
+    parser.add_argument("--excel", action="store_true", help="Al terminar, exporta los resultados a Excel")
+    args = parser.parse_args()
+
+    config_corrida = {}
+    if args.config:
+        with open(args.config, encoding='utf-8') as f:
+            config_corrida = json.load(f)
+    carpeta_corrida = args.salida or os.path.join(CORRIDAS_DIR, os.path.splitext(os.path.basename(args.links))[0])
+    if args.reiniciar:
+        for nombre in (ARCHIVO_RESULTADOS, ARCHIVO_ERRORES, ARCHIVO_ESTADO):
+            if os.path.exists(os.path.join(carpeta_corrida, nombre)):
+                os.remove(os.path.join(carpeta_corrida, nombre))
+
+    import api_flask  # El pipeline completo solo se carga al correr
+
+    links_corrida = leer_links(args.links)
+    resumen = procesar_links(
+        links_corrida, carpeta_corrida, config_corrida, api_flask.procesar_noticias_con_ia,
+        tamano_lote=args.tamano_lote, concurrencia=args.concurrencia,
+        plazo_lote_seg=args.plazo_lote, archivo=args.links, pipeline=api_flask.configuracion_pipeline(),
+    )
+    if args.excel and not resumen["interrumpida"]:
+        resumen["excel"] = exportar_excel(carpeta_corrida)
+    print(f"📦 {json.dumps(resumen, ensure_ascii=False)}")
@@ -0,0 +1,218 @@
+import os
+import re
+import json
+import logging
+import threading
+from functools import lru_cache
+
+import Z_Utils_Texto as Texto
+
+# =============================================================================
+# ÍNDICE DE ALIAS DE MEDIOS (medio crudo de ejes -> medio canónico + soporte)
+# =============================================================================
+# Los medios distintos son pocos (algunos cientos) y se repiten en cada lote. El índice
+# resuelve el string crudo del <span class='canal'> ('pagina12.com.ar', 'Página 12', ...)
+# al nombre canónico y al soporte (WEB / GRÁFICA). Se carga al iniciar (alias por defecto +
+# MEDIOS_ALIAS_PATH si existe) y se extiende por archivo o por el endpoint /config/medios-alias.
+# Los medios que no están en el índice se normalizan por reglas, con un LRU por string crudo.
+
+MEDIOS_ALIAS_PATH = "Data_Results/medios_alias.json"
+SOPORTE_WEB = "WEB"
+SOPORTE_GRAFICA = "GRÁFICA"
+SOPORTES_VALIDOS = {SOPORTE_WEB, SOPORTE_GRAFICA}
+MEDIO_DESCONOCIDO = "Medio Desconocido"
+
+# Alias conocidos (tomados de los MEDIO/SOPORTE cargados a mano en DataCollected/Import_Links_Procesado_Completo.xlsx)
+MEDIOS_ALIAS_DEFAULT = {
+    "infobae.com": ("Infobae", SOPORTE_WEB),
+    "infobae": ("Infobae", SOPORTE_WEB),
+    "pagina12.com.ar": ("Página 12", SOPORTE_WEB),
+    "pagina 12": ("Página 12", SOPORTE_GRAFICA),
+    "pagina12": ("Página 12", SOPORTE_GRAFICA),
+    "lanacion.com.ar": ("La Nación", SOPORTE_WEB),
+    "la nacion": ("La Nación", SOPORTE_GRAFICA),
+    "clarin.com": ("Clarín", SOPORTE_WEB),
+    "clarin": ("Clarín", SOPORTE_GRAFICA),
+    "perfil.com": ("Perfil", SOPORTE_WEB),
+    "perfil": ("Perfil", SOPORTE_GRAFICA),
+    "noticias.perfil.com": ("Revista Noticias", SOPORTE_WEB),
+    "revista noticias": ("Revista Noticias", SOPORTE_GRAFICA),
+    "minutouno.com": ("Minuto Uno", SOPORTE_WEB),
+    "tiempoar.com.ar": ("TiempoAR", SOPORTE_WEB),
+}
+
+# Dominio web (ej: 'infobae.com', 'eldiario.net.ar', 'www.tramas.ar') para medios sin alias
+_RE_DOMINIO = re.compile(r"(^www\.|\.(com|net|org|gob|gov|info|tv|ar|io)(\.[a-z]{2})?(/|$))", re.IGNORECASE)
+_RE_EXTENSION = re.compile(r"\.(com|ar|net)", re.IGNORECASE)
+_RE_CAMEL_CASE = re.compile(r"([a-z])([A-Z])")
+_RE_LETRA_NUMERO = re.compile(r"([a-zA-Z])(\d)")
+
+_lock = threading.Lock()
+_indice = {}
+
+
+def clave_alias(medio):
+    """
+    Clave de búsqueda en el índice: minúsculas, sin tildes y con espacios colapsados.
+    """
+    return ' '.join(Texto.normalizar(str(medio)).split())
+
+
+def normalizar_por_reglas(medio):
+    """
+    Normalización automática para medios que no están en el índice
+    (quita tildes, extensiones de dominio y paréntesis, separa camelCase y capitaliza).
+    """
+    if not medio:
+        return MEDIO_DESCONOCIDO
+
+    # 1. Convertir a string, limpiar espacios y remover tildes
+    medio = Texto.sin_tildes(str(medio).strip())
+
+    # 2. Remover extensiones de dominio y paréntesis
+    medio = _RE_EXTENSION.split(medio, maxsplit=1)[0]
+    if '(' in medio:
+        medio = medio.split('(')[0].strip()
+
+    # 3. Separar camelCase y números, capitalizar y limpiar espacios múltiples
+    medio = _RE_CAMEL_CASE.sub(r'\1 \2', medio)
+    medio = _RE_LETRA_NUMERO.sub(r'\1 \2', medio)
+    return ' '.join(medio.title().split())
+
+
+def soporte_por_reglas(medio):
+    """
+    Soporte para medios sin alias: WEB si el medio crudo es un dominio, si no GRÁFICA.
+    """
+    return SOPORTE_WEB if _RE_DOMINIO.search(str(medio).strip()) else SOPORTE_GRAFICA
+
+
+@lru_cache(maxsize=2048)
+def _resolver_sin_alias(medio):
+    return normalizar_por_reglas(medio), soporte_por_reglas(medio)
+
+
+def resolver_medio(medio):
+    """
+    Resuelve el medio crudo extraído del HTML.
+
+    Args:
+        medio (str): Medio tal como aparece en el <span class='canal'>
+
+    Returns:
+        tuple: (medio canónico, soporte) o (MEDIO_DESCONOCIDO, None) si no hay medio
+    """
+    if not isinstance(medio, str) or not medio.strip():
+        return MEDIO_DESCONOCIDO, None
+    encontrado = _indice.get(clave_alias(medio))
+    if encontrado:
+        return encontrado
+    return _resolver_sin_alias(medio)
+
+
+def _validar_alias(alias):
+    """
+    Convierte {crudo: "Canónico"} o {crudo: {"medio": ..., "soporte": ...}} al formato interno.
+    Si no se indica soporte, se infiere del string crudo.
+    """
+    validados = {}
+    for crudo, valor in alias.items():
+        if not isinstance(crudo, str) or not crudo.strip():
+            raise ValueError(f"Alias inválido: {crudo!r}")
+        if isinstance(valor, str):
+            medio, soporte = valor, None
+        elif isinstance(valor, (list, tuple)) and len(valor) == 2:
+            medio, soporte = valor
+        elif isinstance(valor, dict):
+            medio, soporte = valor.get('medio'), valor.get('soporte')
+        else:
+            raise ValueError(f"Valor inválido para el alias '{crudo}'")
+        if not isinstance(medio, str) or not medio.strip():
+            raise ValueError(f"El alias '{crudo}' no tiene medio canónico")
+        soporte = str(soporte).strip().upper().replace("GRAFICA", SOPORTE_GRAFICA) if soporte else soporte_por_reglas(crudo)
+        if soporte not in SOPORTES_VALIDOS:
+            raise ValueError(f"Soporte inválido para '{crudo}': {soporte} (válidos: {', '.join(sorted(SOPORTES_VALIDOS))})")
+        validados[clave_alias(crudo)] = (medio.strip(), soporte)
+    return validados
+
+
+def agregar_alias(alias, persistir_en=None):
+    """
+    Extiende el índice con nuevos alias (reemplaza los existentes con la misma clave).
+
+    Args:
+        alias (dict): {crudo: "Canónico"} o {crudo: {"medio": "Canónico", "soporte": "WEB"|"GRÁFICA"}}
+        persistir_en (str, optional): Archivo JSON donde acumular los alias agregados
+
+    Returns:
+        int: Total de alias en el índice
+    """
+    global _indice
+    validados = _validar_alias(alias)
+    with _lock:
+        # Copia y reemplazo: los lectores nunca ven el índice a medio actualizar
+        _indice = {**_indice, **validados}
+        if persistir_en:
+            existentes = {}
+            if os.path.exists(persistir_en):
+                with open(persistir_en, encoding='utf-8') as f:
+                    existentes = json.load(f)
+            existentes.update({clave: {"medio": m, "soporte": s} for clave, (m, s) in validados.items()})
+            dir_path = os.path.dirname(persistir_en)
+            if dir_path:
+                os.makedirs(dir_path, exist_ok=True)
+            tmp = persistir_en + ".tmp"
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(existentes, f, ensure_ascii=False, indent=2, sort_keys=True)
+            os.replace(tmp, persistir_en)
+        total = len(_indice)
+    logging.info(f"📰 Índice de medios: {len(validados)} alias agregados ({total} en total)")
+    return total
+
+
+def cargar_alias_desde_archivo(path):
+    """
+    Carga alias desde un JSON ({crudo: ...}) o una planilla CSV/Excel con columnas ALIAS, MEDIO y SOPORTE.
+
+    Returns:
+        int: Total de alias en el índice
+    """
+    if path.lower().endswith('.json'):
+        with open(path, encoding='utf-8') as f:
+            return agregar_alias(json.load(f))
+
+    import pandas as pd
+    df = pd.read_csv(path) if path.lower().endswith('.csv') else pd.read_excel(path)
+    df.columns = [str(c).strip().upper() for c in df.columns]
+    if 'ALIAS' not in df.columns or 'MEDIO' not in df.columns:
+        raise ValueError("La planilla de alias necesita las columnas ALIAS y MEDIO (SOPORTE opcional)")
+    df = df.dropna(subset=['ALIAS', 'MEDIO'])
+    soportes = df['SOPORTE'] if 'SOPORTE' in df.columns else [None] * len(df)
+    return agregar_alias({
+        str(crudo): {"medio": str(medio), "soporte": None if soporte is None or soporte != soporte else str(soporte)}
+        for crudo, medio, soporte in zip(df['ALIAS'], df['MEDIO'], soportes)
+    })
+
+
+def listar_alias():
+    """Copia del índice actual: {clave: {"medio", "soporte"}}"""
+    return {clave: {"medio": m, "soporte": s} for clave, (m, s) in _indice.items()}
+
+
+def reiniciar_indice():
+    """
+    Vuelve el índice a los alias por defecto más los de MEDIOS_ALIAS_PATH (si existe).
+    Se ejecuta al importar el módulo.
+    """
+    global _indice
+    with _lock:
+        _indice = _validar_alias(MEDIOS_ALIAS_DEFAULT)
+    if os.path.exists(MEDIOS_ALIAS_PATH):
+        try:
+            cargar_alias_desde_archivo(MEDIOS_ALIAS_PATH)
+        except Exception as e:
+            logging.error(f"❌ Error cargando alias de medios desde {MEDIOS_ALIAS_PATH}: {e}")
+    return len(_indice)
+
+
+reiniciar_indice()
@@ -0,0 +1,209 @@
+import re
+import logging
+from functools import lru_cache
+from typing import Optional
+
+import Z_Utils_Texto as Texto
+
+# =============================================================================
+# MOTOR DE MENCIONES (una pasada por artículo)
+# =============================================================================
+# Todas las palabras clave (y sus alias) se compilan en una sola regex y el artículo
+# normalizado (minúsculas, sin tildes) se recorre una vez. Por cada mención encontrada
+# se devuelve la cantidad de apariciones, sus posiciones en el texto original y un
+# fragmento alrededor de cada una:
+#   {"Gabriela Ricardes": {"mencion": "Gabriela Ricardes", "cantidad": 2,
+#                          "posiciones": [[120, 137], [480, 488]], "fragmentos": ["...", "..."]}}
+# Los alias cuentan para su mención canónica ("Ricardes" -> "Gabriela Ricardes").
+# Por defecto una clave se encuentra también dentro de otra palabra (como el buscador
+# anterior); las menciones con palabra_completa solo como palabra entera.
+# Dentro de un request (Z_Utils_Texto.cache_request) el resultado de cada artículo se
+# memoiza: menciones, heurística de valoración y prompts de declaración lo comparten.
+
+CONTEXTO_CHARS = 60          # Caracteres a cada lado de la mención en el fragmento
+MAXIMO_FRAGMENTOS = 3        # Fragmentos por mención
+
+_RE_CARACTER_PALABRA = re.compile(r"\w")
+
+
+def aplanar(key_words) -> list:
+    """
+    Lista plana de palabras clave: acepta un string, una lista o listas anidadas (como ministro_key_words).
+    Descarta vacíos y duplicados, manteniendo el orden.
+    """
+    if not key_words:
+        return []
+    if isinstance(key_words, str):
+        key_words = [key_words]
+    planas = []
+    for item in key_words:
+        for palabra in (item if isinstance(item, (list, tuple)) else [item]):
+            if isinstance(palabra, str) and palabra.strip():
+                planas.append(palabra.strip())
+    return list(dict.fromkeys(planas))
+
+
+def claves_y_alias(menciones) -> tuple:
+    """
+    Separa la configuración de menciones en (claves, alias, claves de palabra completa).
+    Cada entrada es un string o
+    {"mencion": "Gabriela Ricardes", "alias": ["Ricardes", ...], "palabra_completa": true}.
+    """
+    claves, alias, enteras = [], {}, []
+    for entrada in menciones or []:
+        if isinstance(entrada, dict):
+            nombre = str(entrada.get('mencion') or '').strip()
+            if not nombre:
+                continue
+            claves.append(nombre)
+            for otro in aplanar(entrada.get('alias')):
+                alias[otro] = nombre
+            if entrada.get('palabra_completa'):
+                enteras.append(nombre)
+        else:
+            claves.extend(aplanar(entrada))
+    return list(dict.fromkeys(claves)), alias, enteras
+
+
+class MotorMenciones:
+    """Regex compilada para un conjunto de claves y alias"""
+
+    def __init__(self, claves: tuple, alias: tuple = (), enteras: tuple = ()):
+        self.claves = list(claves)
+        # Forma normalizada -> mención canónica (las claves tienen prioridad sobre los alias)
+        self._canonica = {}
+        for nombre_alias, canonica in alias:
+            if Texto.normalizar(nombre_alias):
+                self._canonica[Texto.normalizar(nombre_alias)] = canonica
+        for clave in self.claves:
+            if Texto.normalizar(clave):
+                self._canonica[Texto.normalizar(clave)] = clave
+        patrones = sorted(self._canonica, key=len, reverse=True)
+        # Patrones que solo valen como palabra entera (los de las menciones con palabra_completa)
+        self._entera = {p: self._canonica[p] in enteras for p in patrones}
+        # Claves más cortas que empiezan igual que otra ("cultura" / "cultura porteña"): en la
+        # misma posición la regex devuelve solo la más larga, las otras se agregan a mano
+        self._prefijos = {p: [q for q in patrones if q != p and p.startswith(q)] for p in patrones}
+        alternativas = '|'.join(
+            rf"(?<!\w){re.escape(p)}(?!\w)" if self._entera[p] else re.escape(p) for p in patrones
+        )
+        self._regex = re.compile(f"({alternativas})") if patrones else None
+
+    def buscar(self, texto: str, contexto: int = CONTEXTO_CHARS, maximo_fragmentos: int = MAXIMO_FRAGMENTOS) -> dict:
+        """
+        Menciones del texto: {canónica: {"mencion", "cantidad", "posiciones", "fragmentos"}},
+        en el orden de las claves configuradas.
+        """
+        if not texto or self._regex is None:
+            return {}
+        normalizado = Texto.normalizar(texto)
+        mapa = None if Texto.preserva_largo(texto) else Texto.mapa_posiciones(texto)
+
+        # Se busca desde la posición siguiente a cada inicio (no al final del match), así
+        # también aparecen las claves que se superponen con otra ("cultura" en "ministerio de cultura")
+        tramos = {}   # canónica -> [(inicio, fin)] en el texto normalizado
+        posicion = 0
+        while True:
+            match = self._regex.search(normalizado, posicion)
+            if match is None:
+                break
+            inicio, patron = match.start(1), match.group(1)
+            tramos.setdefault(self._canonica[patron], []).append((inicio, match.end(1)))
+            for prefijo in self._prefijos[patron]:
+                fin = inicio + len(prefijo)
+                if self._entera[prefijo] and (_RE_CARACTER_PALABRA.match(normalizado, fin)
+                                              or (inicio and _RE_CARACTER_PALABRA.match(normalizado, inicio - 1))):
+                    continue
+                tramos.setdefault(self._canonica[prefijo], []).append((inicio, fin))
+            posicion = inicio + 1
+
+        resultado = {}
+        for canonica in self.claves:
+            if canonica not in tramos:
+                continue
+            # Un alias dentro de otra aparición de la misma mención ("Ricardes" en "Gabriela Ricardes") no suma
+            ordenados = sorted(tramos[canonica], key=lambda t: (t[0], -t[1]))
+            posiciones = []
+            for inicio, fin in ordenados:
+                if posiciones and fin <= posiciones[-1][1]:
+                    continue
+                posiciones.append((inicio, fin))
+            if mapa is not None:
+                # El fin incluye las marcas combinantes que siguen al último carácter
+                posiciones = [(mapa[inicio], max(mapa[fin - 1] + 1, mapa[fin])) for inicio, fin in posiciones]
+            resultado[canonica] = {
+                "mencion": canonica,
+                "cantidad": len(posiciones),
+                "posiciones": [list(p) for p in posiciones],
+                "fragmentos": [_fragmento(texto, inicio, fin, contexto) for inicio, fin in posiciones[:maximo_fragmentos]],
+            }
+        return resultado
+
+
+def _fragmento(texto: str, inicio: int, fin: int, contexto: int) -> str:
+    desde, hasta = max(0, inicio - contexto), min(len(texto), fin + contexto)
+    fragmento = ' '.join(texto[desde:hasta].split())
+    return f"{'...' if desde > 0 else ''}{fragmento}{'...' if hasta < len(texto) else ''}"
+
+
+@lru_cache(maxsize=64)
+def _motor(claves: tuple, alias: tuple, enteras: tuple) -> MotorMenciones:
+    return MotorMenciones(claves, alias, enteras)
+
+
+def _configuracion(claves, alias: Optional[dict], palabra_completa) -> tuple:
+    claves = tuple(aplanar(claves))
+    if palabra_completa is True:
+        enteras = claves
+    else:
+        enteras = tuple(sorted(aplanar(palabra_completa or [])))
+    return claves, tuple(sorted((alias or {}).items())), enteras
+
+
+def motor(claves, alias: Optional[dict] = None, palabra_completa=False) -> MotorMenciones:
+    """Motor para las claves (compilado una vez por configuración)"""
+    return _motor(*_configuracion(claves, alias, palabra_completa))
+
+
+def buscar(texto: str, claves, alias: Optional[dict] = None, palabra_completa=False) -> dict:
+    """
+    Menciones de las claves en el texto (ver MotorMenciones.buscar).
+    palabra_completa: True (todas las claves), False o la lista de claves que solo valen como palabra entera.
+    Dentro de un request el resultado se memoiza por (texto, configuración).
+    """
+    if not texto or not isinstance(texto, str):
+        return {}
+    configuracion = _configuracion(claves, alias, palabra_completa)
+    motor_claves = _motor(*configuracion)
+    memo = Texto.memo_request('menciones')
+    if memo is None:
+        return motor_claves.buscar(texto)
+    clave_memo = (configuracion, texto)
+    resultado = memo.get(clave_memo)
+    if resultado is None:
+        resultado = motor_claves.buscar(texto)
+        if len(memo) < Texto.MAXIMO_CACHE_REQUEST:
+            memo[clave_memo] = resultado
+    return resultado
+
+
+def actores_mencionados(texto: str, ministro_key_words, ministerios_key_words=None) -> dict:
+    """Menciones del ministro y los ministerios en el texto (compartido por heurística y prompts)"""
+    return buscar(texto, aplanar(ministro_key_words) + aplanar(ministerios_key_words))
+
+
+def resumen_para_prompt(texto: str, actores: list, maximo: int = 6) -> str:
+    """
+    Líneas con los fragmentos donde aparece cada actor, para orientar al LLM; vacío si no hay menciones directas.
+    """
+    try:
+        encontradas = buscar(texto, actores)
+    except Exception as e:
+        logging.warning(f"⚠️ No se pudieron buscar menciones de actores: {e}")
+        return ""
+    lineas = [
+        f"- {m['mencion']} ({m['cantidad']}x): \"{fragmento}\""
+        for m in encontradas.values()
+        for fragmento in m['fragmentos']
+    ]
+    return "\n".join(lineas[:maximo])
@@ -0,0 +1,259 @@
+import os
+import atexit
+import logging
+import threading
+import multiprocessing
+from multiprocessing import shared_memory
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+
+import Z_Utils_Texto as Texto
+import Z_Utils_Contenido as Contenido
+
+# =============================================================================
+# POOL DE PROCESOS PARA PARSEO Y NORMALIZACIÓN (CPU-bound)
+# =============================================================================
+# Decodificar (chardet), parsear el HTML y normalizar textos es trabajo de CPU que en un
+# solo proceso queda serializado por el GIL. Con CONFIG['procesos'] > 0 los lotes de al
+# menos CONFIG['minimo_items'] elementos se reparten entre procesos worker:
+#   - Los bytes de todas las páginas se copian una vez a un bloque de memoria compartida
+#     (multiprocessing.shared_memory); a cada worker solo viaja (nombre, offset, largo).
+#   - Cada worker lee su página directamente del bloque y devuelve el resultado (str).
+# Con 0 procesos (default), lotes chicos o si el pool falla, se procesa en el proceso actual.
+# Los workers arrancan con 'spawn' (seguro con los hilos de Flask) y se reutilizan entre requests.
+
+CONFIG = {
+    "procesos": int(os.getenv("PRENSAI_PROCESOS_PARSEO", "0")),  # 0 = desactivado
+    "minimo_items": 8,   # Por debajo, el costo de repartir supera al de procesar en el proceso actual
+}
+PROCESOS_MAXIMO = os.cpu_count() or 1
+
+_pool = None
+_pool_procesos = 0
+_lock = threading.Lock()
+
+
+# -----------------------------------------------------------------------------
+# Pool
+# -----------------------------------------------------------------------------
+
+def configurar(procesos: Optional[int] = None, minimo_items: Optional[int] = None):
+    """Actualiza la configuración; el pool se recrea en el próximo uso si cambia la cantidad de procesos"""
+    if procesos is not None:
+        CONFIG["procesos"] = max(0, min(int(procesos), PROCESOS_MAXIMO))
+    if minimo_items is not None:
+        CONFIG["minimo_items"] = max(1, int(minimo_items))
+
+
+def usar_procesos(cantidad: int) -> bool:
+    """True si un lote de `cantidad` elementos se reparte entre procesos"""
+    return CONFIG["procesos"] > 0 and cantidad >= CONFIG["minimo_items"]
+
+
+def _obtener_pool() -> ProcessPoolExecutor:
+    global _pool, _pool_procesos
+    with _lock:
+        if _pool is not None and _pool_procesos != CONFIG["procesos"]:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=CONFIG["procesos"], mp_context=multiprocessing.get_context('spawn'))
+            _pool_procesos = CONFIG["procesos"]
+            logging.info(f"🧮 Pool de parseo: {_pool_procesos} procesos")
+        return _pool
+
+
+def _descartar_pool():
+    """Descarta un pool roto (un worker murió); el próximo uso crea uno nuevo"""
+    global _pool
+    with _lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def _precalentar_worker(_indice):
+    import Z_Utils as Z
+    Z.bs4.BeautifulSoup, Z.chardet.detect  # Fuerza los imports diferidos antes del primer lote
+    return os.getpid()
+
+
+def iniciar():
+    """
+    Arranca los procesos del pool (para el warm-up): cada worker importa Z_Utils, bs4 y chardet antes del primer lote.
+    """
+    if CONFIG["procesos"] <= 0:
+        return "desactivado"
+    pool = _obtener_pool()
+    pids = set(pool.map(_precalentar_worker, range(CONFIG["procesos"])))
+    return {"procesos": CONFIG["procesos"], "pids": len(pids)}
+
+
+def cerrar():
+    """Termina los procesos del pool"""
+    global _pool
+    with _lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True, cancel_futures=True)
+            _pool = None
+
+
+atexit.register(cerrar)
+
+
+# -----------------------------------------------------------------------------
+# Memoria compartida
+# -----------------------------------------------------------------------------
+
+def _copiar_a_memoria(bloques: List[Optional[bytes]]) -> Tuple[shared_memory.SharedMemory, list]:
+    """
+    Copia los bloques a un segmento de memoria compartida.
+    Retorna (segmento, [(offset, largo) o None por bloque]).
+    """
+    total = sum(len(b) for b in bloques if b is not None)
+    memoria = shared_memory.SharedMemory(create=True, size=max(total, 1))
+    posiciones, offset = [], 0
+    for bloque in bloques:
+        if bloque is None:
+            posiciones.append(None)
+            continue
+        memoria.buf[offset:offset + len(bloque)] = bloque
+        posiciones.append((offset, len(bloque)))
+        offset += len(bloque)
+    return memoria, posiciones
+
+
+def _leer_de_memoria(nombre: str, offset: int, largo: int) -> bytes:
+    """Lee un bloque del segmento (desde un worker, sin registrarlo en el resource tracker)"""
+    try:
+        memoria = shared_memory.SharedMemory(name=nombre, track=False)
+    except TypeError:  # Python < 3.13
+        memoria = shared_memory.SharedMemory(name=nombre)
+    try:
+        return bytes(memoria.buf[offset:offset + largo])
+    finally:
+        memoria.close()
+
+
+def _repartir(funcion, bloques: List[Optional[bytes]], extras: list) -> list:
+    """
+    Aplica funcion(nombre_segmento, offset, largo, extra) a cada bloque en el pool.
+    Los bloques None devuelven None sin viajar al pool.
+    """
+    memoria, posiciones = _copiar_a_memoria(bloques)
+    try:
+        indices = [i for i, pos in enumerate(posiciones) if pos is not None]
+        pool = _obtener_pool()
+        mapeados = pool.map(
+            funcion,
+            [memoria.name] * len(indices),
+            [posiciones[i][0] for i in indices],
+            [posiciones[i][1] for i in indices],
+            [extras[i] for i in indices],
+            chunksize=max(1, len(indices) // (CONFIG["procesos"] * 4)),
+        )
+        resultados = [None] * len(bloques)
+        for i, resultado in zip(indices, mapeados):
+            resultados[i] = resultado
+        return resultados
+    finally:
+        memoria.close()
+        memoria.unlink()
+
+
+# -----------------------------------------------------------------------------
+# Tareas (se ejecutan en los workers; funciones de módulo para poder serializarlas)
+# -----------------------------------------------------------------------------
+
+def _texto_plano_worker(nombre: str, offset: int, largo: int, encoding: Optional[str]) -> Tuple[Optional[str], dict]:
+    """(texto, cuentas de reducción de Z_Utils_Contenido) para sumarlas en el proceso de la API"""
+    import Z_Utils as Z
+    try:
+        texto = Z.texto_plano_desde_html(_leer_de_memoria(nombre, offset, largo), encoding)
+    except Exception as e:
+        logging.error(f"❌ Error al parsear HTML en el worker {os.getpid()}: {e}")
+        texto = None
+    return texto, Contenido.tomar_estadisticas()
+
+
+def _normalizar_worker(nombre: str, offset: int, largo: int, _extra=None) -> str:
+    import Z_Utils as Z
+    return Z.normalizar_texto(_leer_de_memoria(nombre, offset, largo).decode('utf-8'))
+
+
+# -----------------------------------------------------------------------------
+# API
+# -----------------------------------------------------------------------------
+
+def extraer_textos(paginas: list) -> list:
+    """
+    Texto plano de cada página ('[TÍTULO]: ... [BODY]: ...', como get_texto_plano_from_link).
+
+    Args:
+        paginas (list): (bytes del HTML, encoding HTTP) por página, o None si no se descargó
+
+    Returns:
+        list: Texto de cada página (None si no se descargó o no se pudo parsear)
+    """
+    import Z_Utils as Z
+
+    def en_proceso_actual():
+        textos = []
+        for pagina in paginas:
+            try:
+                textos.append(Z.texto_plano_desde_html(*pagina) if pagina else None)
+            except Exception as e:
+                logging.error(f"❌ Error al parsear HTML: {e}")
+                textos.append(None)
+        return textos
+
+    if not usar_procesos(sum(1 for p in paginas if p)):
+        return en_proceso_actual()
+    try:
+        resultados = _repartir(
+            _texto_plano_worker,
+            [p[0] if p else None for p in paginas],
+            [p[1] if p else None for p in paginas],
+        )
+        textos = []
+        for resultado in resultados:
+            texto, cuentas = resultado if resultado is not None else (None, None)
+            Contenido.sumar(cuentas)
+            textos.append(texto)
+        return textos
+    except Exception as e:
+        logging.warning(f"⚠️ Pool de parseo no disponible ({type(e).__name__}: {e}), se parsea en el proceso actual")
+        _descartar_pool()
+        return en_proceso_actual()
+
+
+def normalizar_textos(textos: list) -> list:
+    """
+    Z_Utils.normalizar_texto de cada texto (minúsculas, sin acentos), repartido en el pool si corresponde.
+    Los textos ya normalizados en el request (memo de Z_Utils_Texto) no se recalculan.
+    """
+    import Z_Utils as Z
+
+    validos = [t if isinstance(t, str) and t else None for t in textos]
+    pendientes = [t if t and Texto.en_cache(t) is None else None for t in validos]
+    if not usar_procesos(sum(1 for t in pendientes if t)):
+        return [Z.normalizar_texto(t) if t else "" for t in validos]
+    try:
+        normalizados = _repartir(
+            _normalizar_worker,
+            [t.encode('utf-8') if t else None for t in pendientes],
+            [None] * len(pendientes),
+        )
+        for texto, normalizado in zip(pendientes, normalizados):
+            if texto and normalizado is not None:
+                Texto.memorizar(texto, normalizado)
+        return [(Texto.en_cache(t) or n or "") if t else "" for t, n in zip(validos, normalizados)]
+    except Exception as e:
+        logging.warning(f"⚠️ Pool de parseo no disponible ({type(e).__name__}: {e}), se normaliza en el proceso actual")
+        _descartar_pool()
+        return [Z.normalizar_texto(t) if t else "" for t in validos]
+
+
+def estado() -> dict:
+    with _lock:
+        return {**CONFIG, "pool_activo": _pool is not None, "procesos_maximo": PROCESOS_MAXIMO}
@@ -0,0 +1,157 @@
+import re
+import bisect
+import logging
+import threading
+from typing import List, Optional
+
+import Z_Utils_Menciones as Menciones
+
+# =============================================================================
+# PASAJES RELEVANTES (prompts más cortos para declaración y valoración)
+# =============================================================================
+# Para decidir si hay una declaración alcanza con las oraciones que tienen comillas o
+# mencionan a un actor (y sus vecinas, para la atribución): el resto del artículo solo
+# suma tokens y, con Ollama en CPU, latencia. Antes de armar el prompt se divide el texto
+# en oraciones y se envían solo esos pasajes, con el título como encabezado:
+#   [TÍTULO]: ...
+#   [...]
+#   Según explicó la ministra: "la plataforma ya está lista".
+#   [...]
+# Para valoración se envía el comienzo de la nota (título y primeras oraciones) más los
+# pasajes que mencionan al ministro o al ministerio, en una sección aparte que el prompt
+# pide priorizar. Si la nota no menciona a ningún actor se envía completa (el tono general
+# es lo único que decide entre NEGATIVA y NO_NEGATIVA).
+# Los textos cortos (menos de CONFIG['minimo_chars']) se envían siempre completos.
+
+CONFIG = {
+    "activo": True,
+    "minimo_chars": 1500,        # Por debajo, el texto va completo
+    "contexto_oraciones": 1,     # Oraciones vecinas que acompañan a cada pasaje
+    "oraciones_inicio": 3,       # Oraciones del comienzo de la nota para valoración (además del título)
+}
+
+SEPARADOR = "\n[...]\n"
+
+# Fin de oración: salto de línea, o puntuación final seguida de espacio y de algo que abre una oración
+_RE_CORTE = re.compile(r"\n+|(?<=[.!?…])\s+(?=[¿¡\"“«'‘(\-—A-ZÁÉÍÓÚÑ0-9])")
+# Comillas (la simple solo si no está entre letras, para no confundirla con un apóstrofo)
+_RE_COMILLAS = re.compile(r"[\"“”«»‘’]|(?<!\w)'|'(?!\w)")
+
+_lock = threading.Lock()
+_estadisticas = {}
+
+
+def oraciones(texto: str) -> list:
+    """Tramos (inicio, fin) de cada oración del texto"""
+    tramos, inicio = [], 0
+    for corte in _RE_CORTE.finditer(texto):
+        if corte.start() > inicio:
+            tramos.append((inicio, corte.start()))
+        inicio = corte.end()
+    if inicio < len(texto):
+        tramos.append((inicio, len(texto)))
+    return tramos
+
+
+def _oraciones_con_menciones(texto: str, tramos: list, actores: List[str]) -> set:
+    """Índices de las oraciones donde el motor de menciones encontró a algún actor"""
+    inicios = [inicio for inicio, _ in tramos]
+    indices = set()
+    for mencion in Menciones.buscar(texto, actores).values():
+        for inicio, _ in mencion["posiciones"]:
+            indices.add(max(0, bisect.bisect_right(inicios, inicio) - 1))
+    return indices
+
+
+def _unir(texto: str, tramos: list, indices: set) -> str:
+    """Oraciones elegidas en orden; los saltos entre bloques no consecutivos se marcan con [...]"""
+    partes, anterior = [], None
+    for i in sorted(indices):
+        if anterior is not None:
+            partes.append(texto[tramos[anterior][1]:tramos[i][0]] if i == anterior + 1 else SEPARADOR)
+        partes.append(texto[tramos[i][0]:tramos[i][1]])
+        anterior = i
+    if anterior is not None and anterior < len(tramos) - 1:
+        partes.append(SEPARADOR.rstrip("\n"))
+    return "".join(partes)
+
+
+def _con_contexto(indices: set, total: int) -> set:
+    contexto = CONFIG["contexto_oraciones"]
+    return {j for i in indices for j in range(max(0, i - contexto), min(total, i + contexto + 1))}
+
+
+def _registrar(tarea: str, original: int, enviado: int):
+    with _lock:
+        estadistica = _estadisticas.setdefault(tarea, {"textos": 0, "reducidos": 0, "chars_originales": 0, "chars_enviados": 0})
+        estadistica["textos"] += 1
+        estadistica["reducidos"] += enviado < original
+        estadistica["chars_originales"] += original
+        estadistica["chars_enviados"] += enviado
+
+
+def _aplica(texto) -> bool:
+    return CONFIG["activo"] and isinstance(texto, str) and len(texto) >= CONFIG["minimo_chars"]
+
+
+def para_declaracion(texto: str, actores: List[str]) -> str:
+    """
+    Pasajes para detectar una declaración: título más las oraciones con comillas o con menciones
+    de los actores, cada una con sus vecinas. El texto completo si es corto o no se pudo reducir.
+    """
+    if not _aplica(texto):
+        return texto
+    try:
+        tramos = oraciones(texto)
+        elegidas = {i for i, (inicio, fin) in enumerate(tramos) if _RE_COMILLAS.search(texto, inicio, fin)}
+        elegidas |= _oraciones_con_menciones(texto, tramos, actores)
+        pasajes = _unir(texto, tramos, {0} | _con_contexto(elegidas, len(tramos)))
+    except Exception as e:
+        logging.warning(f"⚠️ No se pudieron extraer pasajes para declaración, se envía el texto completo: {e}")
+        return texto
+    if len(pasajes) >= len(texto):
+        pasajes = texto
+    _registrar("declaracion", len(texto), len(pasajes))
+    logging.debug(f"✂️ Pasajes para declaración: {len(texto)} → {len(pasajes)} caracteres")
+    return pasajes
+
+
+def para_valoracion(texto: str, actores: Optional[List[str]]) -> tuple:
+    """
+    (comienzo de la nota, pasajes que mencionan a los actores) para valorar.
+    Sin menciones de los actores (o con el texto corto) retorna (texto completo, "").
+    """
+    if not _aplica(texto) or not actores:
+        return texto, ""
+    try:
+        tramos = oraciones(texto)
+        con_menciones = _oraciones_con_menciones(texto, tramos, actores)
+        if not con_menciones:
+            _registrar("valoracion", len(texto), len(texto))
+            return texto, ""
+        inicio = set(range(min(len(tramos), CONFIG["oraciones_inicio"] + 1)))
+        pasajes = _con_contexto(con_menciones, len(tramos)) - inicio
+        comienzo = _unir(texto, tramos, inicio)
+        destacados = _unir(texto, tramos, pasajes) if pasajes else ""
+    except Exception as e:
+        logging.warning(f"⚠️ No se pudieron extraer pasajes para valoración, se envía el texto completo: {e}")
+        return texto, ""
+    if len(comienzo) + len(destacados) >= len(texto):
+        comienzo, destacados = texto, ""
+    _registrar("valoracion", len(texto), len(comienzo) + len(destacados))
+    logging.debug(f"✂️ Pasajes para valoración: {len(texto)} → {len(comienzo) + len(destacados)} caracteres")
+    return comienzo, destacados
+
+
+def estadisticas() -> dict:
+    """Textos procesados, reducidos y caracteres enviados vs originales por tarea (desde que arrancó la API)"""
+    with _lock:
+        copia = {tarea: dict(valores) for tarea, valores in _estadisticas.items()}
+    for valores in copia.values():
+        valores["reduccion"] = round(1 - valores["chars_enviados"] / valores["chars_originales"], 4) if valores["chars_originales"] else None
+    return copia
+
+
+def reiniciar_estadisticas():
+    with _lock:
+        _estadisticas.clear()
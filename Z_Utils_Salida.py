@@ -0,0 +1,261 @@
+import os
+import re
+import json
+import uuid
+import logging
+from datetime import datetime
+from urllib.parse import quote
+
+import Z_Utils_Lazy as Lazy
+
+pd = Lazy.modulo('pandas')
+
+# =============================================================================
+# SALIDA COLUMNAR (Parquet / Arrow IPC / CSV gzip)
+# =============================================================================
+# Capa de salida enchufable para los registros procesados (CAMPOS_FIJOS + MENCIONES).
+# Parquet y Arrow requieren pyarrow (opcional); CSV gzip funciona solo con pandas.
+#
+# Dataset particionado (estilo Hive):
+#   <base_dir>/fecha=2025-06-01/medio=Infobae/part-20250601T120000-<uuid>.parquet
+
+COLUMNAS_EXCLUIDAS = ['HTML_OBJ']  # Objetos BeautifulSoup, no serializables
+COLUMNAS_LISTA = ['MENCIONES']     # Columnas con listas de strings
+PARTICION_SIN_VALOR = "sin_dato"
+
+_PATRON_PARTICION = re.compile(r"^(?P<clave>[^=]+)=(?P<valor>.*)$")
+
+
+def _requerir_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+        return pyarrow
+    except ImportError:
+        raise ImportError("pyarrow no está instalado: necesario para formatos 'parquet' y 'arrow' (pip install pyarrow)")
+
+
+def _a_tabla_arrow(df):
+    """
+    Convierte el DataFrame a tabla Arrow fijando list<string> en las columnas de listas
+    (si todas las listas vienen vacías, pyarrow infiere list<null>).
+    """
+    pa = _requerir_pyarrow()
+    tabla = pa.Table.from_pandas(df, preserve_index=False)
+    for col in COLUMNAS_LISTA:
+        if col in tabla.column_names:
+            idx = tabla.column_names.index(col)
+            if tabla.schema.field(idx).type != pa.list_(pa.string()):
+                tabla = tabla.set_column(idx, col, tabla.column(col).cast(pa.list_(pa.string())))
+    return tabla
+
+
+def _escribir_parquet(df, ruta):
+    tabla = _a_tabla_arrow(df)
+    import pyarrow.parquet as pq
+    pq.write_table(tabla, ruta, compression='zstd')
+
+
+def _reindexar(df, columnas):
+    """Columnas pedidas en ese orden; las que no existen en el archivo (particiones viejas) quedan vacías"""
+    return df.reindex(columns=columnas) if columnas else df
+
+
+def _leer_parquet(ruta, columnas=None):
+    _requerir_pyarrow()
+    import pyarrow.parquet as pq
+    existentes = [c for c in columnas if c in pq.read_schema(ruta).names] if columnas else None
+    return _reindexar(pq.read_table(ruta, columns=existentes).to_pandas(), columnas)
+
+
+def _escribir_arrow(df, ruta):
+    tabla = _a_tabla_arrow(df)
+    import pyarrow.feather as feather
+    feather.write_feather(tabla, ruta)
+
+
+def _leer_arrow(ruta, columnas=None):
+    _requerir_pyarrow()
+    import pyarrow.feather as feather
+    tabla = feather.read_table(ruta, memory_map=True)
+    if columnas:
+        tabla = tabla.select([c for c in columnas if c in tabla.column_names])
+    return _reindexar(tabla.to_pandas(), columnas)
+
+
+def _escribir_csv(df, ruta):
+    df = df.copy()
+    for col in COLUMNAS_LISTA:
+        if col in df.columns:
+            df[col] = df[col].map(lambda v: json.dumps(list(v), ensure_ascii=False) if isinstance(v, (list, tuple)) else "[]")
+    df.to_csv(ruta, index=False, compression='gzip')
+
+
+def _leer_csv(ruta, columnas=None):
+    df = pd.read_csv(ruta, usecols=lambda c: not columnas or c in columnas, compression='gzip')
+    for col in COLUMNAS_LISTA:
+        if col in df.columns:
+            df[col] = df[col].map(lambda v: json.loads(v) if isinstance(v, str) and v.startswith('[') else [])
+    return _reindexar(df, columnas)
+
+
+# Registro de formatos: nombre -> (extensión, escritor, lector)
+FORMATOS_SALIDA = {
+    'parquet': ('.parquet', _escribir_parquet, _leer_parquet),
+    'arrow': ('.arrow', _escribir_arrow, _leer_arrow),
+    'csv': ('.csv.gz', _escribir_csv, _leer_csv),
+}
+
+
+def _validar_formato(formato):
+    if formato not in FORMATOS_SALIDA:
+        raise ValueError(f"Formato '{formato}' no válido. Opciones: {', '.join(FORMATOS_SALIDA)}")
+    return FORMATOS_SALIDA[formato]
+
+
+def formato_desde_ruta(ruta):
+    """
+    Infiere el formato a partir de la extensión del archivo. None si no es un formato columnar.
+    """
+    ruta_lower = str(ruta).lower()
+    for formato, (extension, _, _) in FORMATOS_SALIDA.items():
+        if ruta_lower.endswith(extension):
+            return formato
+    return None
+
+
+def preparar_registros(df, columnas=None):
+    """
+    Deja el DataFrame listo para persistir: quita columnas no serializables,
+    garantiza listas de strings en MENCIONES y FECHA como string ISO.
+
+    Args:
+        df (DataFrame): Registros procesados
+        columnas (list, optional): Columnas a conservar (por defecto todas menos las excluidas)
+    """
+    columnas = columnas or [c for c in df.columns if c not in COLUMNAS_EXCLUIDAS]
+    df_out = df[[c for c in columnas if c in df.columns]].copy()
+
+    for col in COLUMNAS_LISTA:
+        if col in df_out.columns:
+            df_out[col] = df_out[col].map(lambda v: [str(x) for x in v] if isinstance(v, (list, tuple)) else [])
+
+    if 'FECHA' in df_out.columns:
+        fechas = pd.to_datetime(df_out['FECHA'], errors='coerce')
+        df_out['FECHA'] = fechas.dt.strftime('%Y-%m-%d').where(fechas.notna(), None)
+
+    return df_out
+
+
+def escribir_registros(df, ruta, formato=None):
+    """
+    Escribe los registros procesados en un único archivo columnar.
+
+    Args:
+        df (DataFrame): Registros procesados
+        ruta (str): Ruta destino
+        formato (str, optional): 'parquet', 'arrow' o 'csv'. Por defecto se infiere de la extensión.
+    """
+    formato = formato or formato_desde_ruta(ruta)
+    _, escritor, _ = _validar_formato(formato)
+
+    dir_path = os.path.dirname(ruta)
+    if dir_path:
+        os.makedirs(dir_path, exist_ok=True)
+
+    escritor(preparar_registros(df), ruta)
+    logging.info(f"💾 {len(df)} registros escritos en {ruta} ({formato})")
+    return ruta
+
+
+def leer_registros(ruta, formato=None, columnas=None):
+    """
+    Lee un archivo columnar escrito con escribir_registros.
+    """
+    formato = formato or formato_desde_ruta(ruta)
+    _, _, lector = _validar_formato(formato)
+    return lector(ruta, columnas)
+
+
+def _valor_particion(valor):
+    if valor is None or pd.isnull(valor) or str(valor).strip() == "":
+        return PARTICION_SIN_VALOR
+    # Escapar separadores y caracteres no válidos en nombres de carpeta
+    return quote(str(valor).strip(), safe=" ")
+
+
+def agregar_a_dataset(df, base_dir, formato='parquet', particiones=('FECHA', 'MEDIO')):
+    """
+    Agrega los registros a un dataset particionado por fecha y medio.
+    Cada llamada escribe archivos nuevos (append): nunca reescribe particiones existentes.
+
+    Args:
+        df (DataFrame): Registros procesados
+        base_dir (str): Carpeta raíz del dataset
+        formato (str): 'parquet', 'arrow' o 'csv'
+        particiones (tuple): Columnas de partición, en orden de carpeta
+
+    Returns:
+        list: Rutas de los archivos escritos
+    """
+    extension, escritor, _ = _validar_formato(formato)
+    if df is None or len(df) == 0:
+        return []
+
+    df_out = preparar_registros(df)
+    claves = [c for c in particiones if c in df_out.columns]
+    sello = datetime.now().strftime('%Y%m%dT%H%M%S')
+    escritos = []
+
+    grupos = df_out.groupby([df_out[c].map(_valor_particion) for c in claves], sort=False) if claves else [((), df_out)]
+    for valores, df_grupo in grupos:
+        valores = valores if isinstance(valores, tuple) else (valores,)
+        carpeta = os.path.join(base_dir, *[f"{c.lower()}={v}" for c, v in zip(claves, valores)])
+        os.makedirs(carpeta, exist_ok=True)
+        ruta = os.path.join(carpeta, f"part-{sello}-{uuid.uuid4().hex[:8]}{extension}")
+        escritor(df_grupo, ruta)
+        escritos.append(ruta)
+
+    logging.info(f"💾 Dataset {base_dir}: {len(df_out)} registros agregados en {len(escritos)} particiones ({formato})")
+    return escritos
+
+
+def listar_archivos_dataset(base_dir, desde=None, hasta=None):
+    """
+    Lista los archivos del dataset, podando particiones de fecha fuera de [desde, hasta] (strings ISO).
+    """
+    archivos = []
+    if not os.path.isdir(base_dir):
+        return archivos
+
+    for raiz, carpetas, nombres in os.walk(base_dir):
+        # Poda por fecha sin abrir los archivos
+        m = _PATRON_PARTICION.match(os.path.basename(raiz))
+        if m and m.group('clave') == 'fecha' and m.group('valor') != PARTICION_SIN_VALOR:
+            fecha = m.group('valor')
+            if (desde and fecha < desde) or (hasta and fecha > hasta):
+                carpetas[:] = []
+                continue
+        carpetas.sort()
+        for nombre in sorted(nombres):
+            if formato_desde_ruta(nombre):
+                archivos.append(os.path.join(raiz, nombre))
+    return archivos
+
+
+def leer_dataset(base_dir, columnas=None, desde=None, hasta=None):
+    """
+    Carga el dataset particionado completo (o el rango de fechas pedido) como DataFrame.
+
+    Args:
+        base_dir (str): Carpeta raíz del dataset
+        columnas (list, optional): Subconjunto de columnas a leer
+        desde, hasta (str, optional): Rango de fechas ISO 'YYYY-MM-DD' (inclusive)
+    """
+    archivos = listar_archivos_dataset(base_dir, desde, hasta)
+    if not archivos:
+        return pd.DataFrame(columns=columnas) if columnas else pd.DataFrame()
+
+    partes = [leer_registros(ruta, columnas=columnas) for ruta in archivos]
+    df = pd.concat(partes, ignore_index=True)
+    logging.info(f"📂 Dataset {base_dir}: {len(df)} registros leídos de {len(archivos)} archivos")
+    return df
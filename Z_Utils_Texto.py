@@ -0,0 +1,145 @@
+import re
+import unicodedata
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+# =============================================================================
+# NORMALIZACIÓN DE TEXTO SIN TILDES (tabla precalculada + memo por request)
+# =============================================================================
+# Quitar tildes con unicodedata.normalize('NFD') y filtrar carácter por carácter en Python
+# cuesta lo mismo que recorrer el artículo entero en un generador. Acá solo se tocan los
+# caracteres no ASCII (una regex compilada los ubica) y cada uno se resuelve con una tabla
+# precalculada para el alfabeto latino (á, é, ñ, ü, ç, ...) y las marcas combinantes sueltas.
+# Un carácter fuera de la tabla se resuelve una vez con NFD y queda en la tabla, así el
+# resultado es siempre el mismo que con NFD. (str.translate sobre texto no ASCII busca cada
+# carácter en la tabla, incluso los ASCII, y no resultó más rápido que NFD.)
+#
+# Dentro de un request (cache_request()) el texto normalizado de cada artículo se memoiza:
+# menciones, heurística de valoración y temas lo comparten en lugar de recalcularlo.
+
+MAXIMO_CACHE_REQUEST = 4096   # Textos distintos memoizados por request
+
+_RE_NO_ASCII = re.compile(r"[^\x00-\x7f]")
+
+
+def _quitar_marcas(texto: str) -> str:
+    """Versión NFD (referencia): descompone y descarta las marcas combinantes"""
+    return ''.join(c for c in unicodedata.normalize('NFD', texto) if not unicodedata.combining(c))
+
+
+def _construir_tabla() -> dict:
+    tabla = {}
+    for codigo in [*range(0x0080, 0x0250), *range(0x0300, 0x0370), *range(0x1E00, 0x1F00), *range(0x2000, 0x2070)]:
+        caracter = chr(codigo)
+        tabla[caracter] = _quitar_marcas(caracter)
+    return tabla
+
+
+_TABLA = _construir_tabla()   # carácter -> carácter sin marcas (o '' para una marca combinante suelta)
+
+_cache_request = ContextVar('cache_normalizados', default=None)
+
+
+def _reemplazo(match) -> str:
+    caracter = match.group()
+    resultado = _TABLA.get(caracter)
+    if resultado is None:
+        # Carácter raro (fuera de la tabla): NFD una sola vez
+        resultado = _TABLA[caracter] = _quitar_marcas(caracter)
+    return resultado
+
+
+def sin_tildes(texto: str) -> str:
+    """
+    Quita tildes y diacríticos conservando mayúsculas ('Córdoba' -> 'Cordoba', 'ñandú' -> 'nandu').
+    Mismo resultado que descomponer con NFD y descartar las marcas combinantes.
+    """
+    if texto.isascii():
+        return texto
+    return _RE_NO_ASCII.sub(_reemplazo, texto)
+
+
+def normalizar(texto: str) -> str:
+    """
+    Minúsculas y sin tildes. Dentro de cache_request() el resultado se memoiza por texto.
+    """
+    cache = memo_request('normalizados')
+    if cache is not None:
+        normalizado = cache.get(texto)
+        if normalizado is None:
+            normalizado = sin_tildes(texto.lower())
+            if len(cache) < MAXIMO_CACHE_REQUEST:
+                cache[texto] = normalizado
+        return normalizado
+    return sin_tildes(texto.lower())
+
+
+def memorizar(texto: str, normalizado: str):
+    """Agrega al memo del request un texto normalizado en otro lado (p. ej. en el pool de procesos)"""
+    cache = memo_request('normalizados')
+    if cache is not None and len(cache) < MAXIMO_CACHE_REQUEST:
+        cache[texto] = normalizado
+
+
+def en_cache(texto: str) -> Optional[str]:
+    """Texto normalizado memoizado en el request actual (None si no está o no hay memo activo)"""
+    cache = memo_request('normalizados')
+    return cache.get(texto) if cache is not None else None
+
+
+def memo_request(nombre: str) -> Optional[dict]:
+    """
+    Dict de memo del request actual para un uso (textos normalizados, menciones, ...);
+    None fuera de cache_request().
+    """
+    memos = _cache_request.get()
+    if memos is None:
+        return None
+    memo = memos.get(nombre)
+    if memo is None:
+        memo = memos[nombre] = {}
+    return memo
+
+
+@contextmanager
+def cache_request():
+    """Activa el memo de textos normalizados (y demás memos por request) para el contexto actual"""
+    token = _cache_request.set({})
+    try:
+        yield
+    finally:
+        _cache_request.reset(token)
+
+
+# -----------------------------------------------------------------------------
+# Posiciones: del texto normalizado al original
+# -----------------------------------------------------------------------------
+
+def _construir_regex_cambia_largo():
+    # Caracteres no ASCII que normalizados siguen siendo un solo carácter (á, ñ, “, —, ...)
+    seguros = ''.join(c for c in list(_TABLA) if len(sin_tildes(c.lower())) == 1)
+    return re.compile(r"[^\x00-\x7f" + re.escape(seguros) + "]")
+
+
+_RE_CAMBIA_LARGO = _construir_regex_cambia_largo()
+
+
+def preserva_largo(texto: str) -> bool:
+    """
+    True si cada carácter normalizado ocupa exactamente un carácter: las posiciones en el
+    texto normalizado valen para el original (el caso normal en español).
+    """
+    return texto.isascii() or _RE_CAMBIA_LARGO.search(texto) is None
+
+
+def mapa_posiciones(texto: str) -> list:
+    """
+    Para cada posición del texto normalizado, la posición del carácter original del que sale
+    (más una posición final = len(texto)). Solo hace falta si no preserva_largo(texto).
+    """
+    mapa = []
+    for posicion, caracter in enumerate(texto):
+        mapa.extend([posicion] * len(sin_tildes(caracter.lower())))
+    mapa.append(len(texto))
+    return mapa
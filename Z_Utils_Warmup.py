@@ -0,0 +1,106 @@
+import time
+import logging
+import importlib
+import threading
+from typing import Callable, List, Optional
+
+# =============================================================================
+# WARM-UP DE ARRANQUE
+# =============================================================================
+# Antes de recibir tráfico se ejecutan los pasos registrados (precargar el modelo de
+# Ollama, abrir las conexiones de los pools HTTP, importar los módulos diferidos, cargar
+# los caches persistentes). Así el primer lote después de un deploy no paga esos costos
+# y la latencia de arranque es predecible. /health/ready no reporta listo hasta que
+# el warm-up termina (aunque algún paso falle: el fallo queda informado en el estado).
+
+# Módulos que el código importa en el primer uso (Z_Utils_Lazy) o dentro de funciones
+# (exportación Excel, dataset columnar)
+MODULOS_DIFERIDOS = [
+    'pandas', 'numpy', 'bs4', 'chardet',
+    'openpyxl', 'openpyxl.cell', 'openpyxl.styles', 'openpyxl.utils',
+    'xlsxwriter',
+    'pyarrow', 'pyarrow.parquet', 'pyarrow.feather',
+    'Z_Utils_Salida',
+]
+
+_pasos = []             # [(nombre, función sin argumentos)]
+_estado = {"estado": "pendiente", "pasos": {}, "duracion_seg": None}
+_terminado = threading.Event()
+_lock = threading.Lock()
+_hilo = None
+
+
+def registrar(nombre: str, paso: Callable[[], object]):
+    """Registra un paso del warm-up (se ejecutan en orden de registro)"""
+    _pasos.append((nombre, paso))
+
+
+def importar_modulos(modulos: Optional[List[str]] = None) -> dict:
+    """
+    Importa los módulos diferidos; los opcionales que no están instalados se informan sin error.
+    """
+    importados, no_instalados = [], []
+    for modulo in (MODULOS_DIFERIDOS if modulos is None else modulos):
+        try:
+            importlib.import_module(modulo)
+            importados.append(modulo)
+        except ImportError:
+            no_instalados.append(modulo)
+    return {"importados": importados, "no_instalados": no_instalados}
+
+
+def ejecutar() -> dict:
+    """
+    Ejecuta todos los pasos en orden. Un paso que falla se registra y no frena a los siguientes.
+    """
+    with _lock:
+        _estado.update({"estado": "en_curso", "pasos": {}, "duracion_seg": None})
+    t_inicio = time.time()
+    logging.info(f"🔥 Warm-up: {len(_pasos)} pasos ({', '.join(n for n, _ in _pasos)})")
+    for nombre, paso in _pasos:
+        t0 = time.time()
+        try:
+            detalle = paso()
+            resultado = {"ok": detalle is not False, "detalle": detalle}
+        except Exception as e:
+            resultado = {"ok": False, "detalle": f"{type(e).__name__}: {e}"}
+        resultado["seg"] = round(time.time() - t0, 2)
+        if resultado["ok"]:
+            logging.info(f"🔥 Warm-up {nombre}: {resultado['seg']}s")
+        else:
+            logging.warning(f"⚠️ Warm-up {nombre} falló en {resultado['seg']}s: {resultado['detalle']}")
+        with _lock:
+            _estado["pasos"][nombre] = resultado
+    with _lock:
+        _estado.update({"estado": "terminado", "duracion_seg": round(time.time() - t_inicio, 2)})
+    _terminado.set()
+    logging.info(f"✅ Warm-up terminado en {_estado['duracion_seg']}s")
+    return estado()
+
+
+def iniciar() -> bool:
+    """
+    Ejecuta el warm-up en segundo plano (una sola vez por proceso).
+    Devuelve True si lo arrancó en esta llamada.
+    """
+    global _hilo
+    with _lock:
+        if _hilo is not None:
+            return False
+        _hilo = threading.Thread(target=ejecutar, name="warmup", daemon=True)
+        _hilo.start()
+    return True
+
+
+def terminado() -> bool:
+    return _terminado.is_set()
+
+
+def esperar(timeout: Optional[float] = None) -> bool:
+    """Bloquea hasta que el warm-up termine (o venza el timeout)"""
+    return _terminado.wait(timeout)
+
+
+def estado() -> dict:
+    with _lock:
+        return {**_estado, "pasos": {nombre: dict(r) for nombre, r in _estado["pasos"].items()}}
@@ -5,17 +5,35 @@ API Flask para el módulo de IA de Prensai
 Endpoint principal: /procesar-noticias
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, send_file
 from functools import wraps
-import pandas as pd
 import Z_Utils as Z
+import Z_Utils_Exports as Exp
+import Z_Utils_Crisis as Crisis
+import Z_Utils_Articulos as Art
+import Z_Utils_Medios as Medios
+import Z_Utils_Deadline as Plazos
+import Z_Utils_Breaker as Breaker
+import Z_Utils_Health as Health
+import Z_Utils_Http as Http
+import Z_Utils_Warmup as Warmup
+import Z_Utils_Lazy as Lazy
+import Z_Utils_Paralelo as Paralelo
+import Z_Utils_Texto as Texto
+import Z_Utils_Pasajes as Pasajes
+import Z_Utils_Contenido as Contenido
 import O_Utils_Ollama as Oll
 import O_Utils_GPT as Gpt
+import O_Utils_Modelos as Mod
+import O_Utils_Cascada as Cascada
+import O_Utils_Temas as Temas
 import time
-from datetime import timedelta
+from datetime import datetime, timedelta
 import logging
 import os
 
+pd = Lazy.modulo('pandas')  # Se importa al procesar el primer request (o en el warm-up)
+
 app = Flask(__name__)
 
 # Autenticación por token para endpoints de configuración
@@ -56,9 +74,58 @@ def require_api_key(f):
 # Configuración configurable en runtime (se puede modificar via endpoints)
 RUNTIME_CONFIG = {
     'gpt_active': False,
-    'limite_texto': 14900
+    'limite_texto': 14900,
+    'dataset_salida': None,      # Carpeta del dataset columnar particionado (None = desactivado)
+    'formato_dataset': 'parquet',  # 'parquet', 'arrow' o 'csv' (ver Z_Utils_Salida)
+    'crisis_ventana_dias': Crisis.CRISIS_VENTANA_DIAS,  # Ventana para detectar crisis por tema
+    'crisis_umbral': Crisis.CRISIS_UMBRAL,              # Negativas por tema dentro de la ventana
+    'store_articulos': True,  # Reutilizar artículos ya procesados (mismo modelo, prompts y configuración)
+    'tema_margen_local': Gpt.MARGEN_TEMA_LOCAL,  # Margen del clasificador local de temas (None = siempre LLM)
+    'umbrales_modelos': Mod.UMBRALES,  # Probabilidad mínima por tarea para usar los modelos locales entrenados
+    'cascada': Cascada.POLITICAS,  # Política por tarea: 'switch' (gpt_active) o 'cascada' (Ollama → GPT-4o si hay dudas)
+    'plazo_request_seg': Plazos.PLAZO_DEFAULT_SEG,  # Plazo por defecto de cada request de procesamiento (None = sin plazo)
+    'procesos_parseo': Paralelo.CONFIG,  # Procesos para parseo/normalización (0 = en el proceso de la API)
+    'pasajes_relevantes': Pasajes.CONFIG,  # Declaración y valoración reciben solo los pasajes relevantes de las notas largas
 }
 
+# Sondeos de salud de los backends (corren en segundo plano; /health/ready lee el último resultado)
+Health.registrar('ollama', lambda: Health.sondear_ollama(Oll.OLLAMA_URL, Oll.get_modelo_ollama()))
+Health.registrar('openai', lambda: Health.sondear_openai(Gpt.leer_api_key_desde_env()))
+Health.registrar('ejes', lambda: Health.sondear_url(Health.EJES_URL_SONDEO))
+Health.registrar('store', lambda: Health.sondear_sqlite([Art.ARTICULOS_DB_PATH, Crisis.CRISIS_DB_PATH]))
+
+# Warm-up de arranque: /health/ready no reporta listo hasta que termina
+def _warmup_conexiones():
+    """Abre la primera conexión de cada pool HTTP (un backend caído no frena a los demás)"""
+    destinos = {
+        'ejes': (Health.EJES_URL_SONDEO, {}),
+        'ollama': (Oll.OLLAMA_URL.replace("/api/generate", "/api/tags"), {}),
+    }
+    api_key = Gpt.leer_api_key_desde_env()
+    if api_key:
+        destinos['openai'] = (Health.OPENAI_MODELS_URL, {"headers": {"Authorization": f"Bearer {api_key}"}})
+    conexiones = {}
+    for nombre, (url, kwargs) in destinos.items():
+        try:
+            conexiones[nombre] = Http.abrir_conexion(nombre, url, **kwargs)
+        except Exception as e:
+            conexiones[nombre] = f"{type(e).__name__}"
+    return conexiones
+
+def _warmup_caches():
+    """Carga los modelos locales y los ejemplos de temas, y abre los stores SQLite"""
+    modelos = [tarea for tarea in Mod.TAREAS if Mod.cargar_modelo(tarea) is not None]
+    ejemplos = Temas.cargar_ejemplos()
+    Art.purgar_vencidos()
+    Crisis.temas_en_crisis()
+    return {"modelos_locales": modelos, "ejemplos_temas": len(ejemplos)}
+
+Warmup.registrar('modulos', Warmup.importar_modulos)
+Warmup.registrar('conexiones', _warmup_conexiones)
+Warmup.registrar('modelo_ollama', Oll.precargar_modelo)
+Warmup.registrar('caches', _warmup_caches)
+Warmup.registrar('procesos_parseo', Paralelo.iniciar)
+
 # Campos fijos del DataFrame
 CAMPOS_FIJOS = [
     'TITULO', 'TIPO PUBLICACION', 'FECHA', 'SOPORTE', 'MEDIO','SECCION',
@@ -66,6 +133,218 @@ CAMPOS_FIJOS = [
     'FACTOR POLITICO','TEXTO_PLANO','MENCIONES'
 ]
 
+# Campos de cada registro de la respuesta (HTML_OBJ es solo de uso interno)
+CAMPOS_SALIDA = [c for c in CAMPOS_FIJOS if c != 'HTML_OBJ']
+
+def _procesar_lote_urls(
+    urls_lote: list,
+    temas: list,
+    tema_default: str,
+    lista_menciones: list,
+    ministro_key_words: list,
+    ministerios_key_words: list,
+    gpt_active: bool,
+    limite_texto: int,
+) -> tuple:
+    """
+    Extrae, valida y clasifica con IA un lote de URLs (ya validadas como ejes.com).
+    Retorna: (df_final sin HTML_OBJ y con el origen de las etiquetas en '_FUENTES', errores de extracción, errores de contenido inválido)
+    """
+    # 2. Configurar DataFrame solo con URLs del lote
+    df = pd.DataFrame(columns=CAMPOS_FIJOS)
+    df['LINK'] = urls_lote
+
+    # 3. Extraer texto plano para cada link válido (con reintentos)
+    logging.info(f"🔄 Iniciando extracción de texto plano para {len(urls_lote)} URLs válidas")
+    if Paralelo.usar_procesos(len(urls_lote)):
+        # Descarga en este proceso; decodificación y parseo repartidos en el pool de procesos
+        paginas = df['LINK'].apply(lambda x: Z.procesar_link_robusto(x, 'crudo', 3)).tolist()
+        df['TEXTO_PLANO'] = Paralelo.extraer_textos(paginas)
+    else:
+        df['TEXTO_PLANO'] = df['LINK'].apply(lambda x: Z.procesar_link_robusto(x, 'texto', 3))
+
+    # 4. Procesar HTML y rellenar campos (con reintentos)
+    logging.info(f"🔄 Iniciando extracción de HTML para {len(urls_lote)} URLs válidas")
+    df['HTML_OBJ'] = df['LINK'].apply(lambda x: Z.procesar_link_robusto(x, 'html', 3))
+
+    # 5. VERIFICAR QUÉ URLs FALLARON EN LA EXTRACCIÓN
+    logging.info("🔍 Verificando URLs que fallaron en la extracción...")
+    urls_extraccion_fallida = []
+    for idx, row in df.iterrows():
+        if row['TEXTO_PLANO'] is None or row['HTML_OBJ'] is None:
+            if Plazos.vencido():
+                motivo = Plazos.actual().motivo()
+                Plazos.marcar_incompleto(row['LINK'], motivo)
+            elif Breaker.get('ejes').abierto():
+                motivo = "ejes.com no disponible (circuit breaker abierto)"
+                Plazos.marcar_incompleto(row['LINK'], motivo)
+            else:
+                motivo = "No se pudo extraer contenido (servidor no disponible o contenido vacío)"
+            urls_extraccion_fallida.append({
+                'url': row['LINK'],
+                'motivo': motivo
+            })
+            logging.warning(f"⚠️ URL falló en extracción: {row['LINK']} - {motivo}")
+
+    # 6. FILTRAR SOLO URLs EXITOSAS para continuar procesamiento
+    df_exitosas = df[df['TEXTO_PLANO'].notna() & df['HTML_OBJ'].notna()].copy()
+    logging.info(f"✅ URLs exitosas en extracción: {len(df_exitosas)} de {len(df)}")
+
+    if len(df_exitosas) == 0:
+        logging.error("❌ No se pudo extraer contenido de ninguna URL válida")
+        return pd.DataFrame(columns=CAMPOS_SALIDA), urls_extraccion_fallida, []
+
+    # 7. Procesar solo URLs exitosas
+    logging.info(f"🔄 Procesando {len(df_exitosas)} URLs exitosas...")
+    df_exitosas['TITULO'] = df_exitosas['HTML_OBJ'].apply(Z.get_titulo_from_html_obj)
+    # FECHA, MEDIO, SOPORTE, SECCION, COTIZACION y ALCANCE en una sola pasada por página
+    metadatos = Z.extraer_metadatos_html(df_exitosas['HTML_OBJ'])
+    for campo in metadatos.columns:
+        df_exitosas[campo] = metadatos[campo]
+    df_exitosas['AUTOR'] = df_exitosas['HTML_OBJ'].apply(Z.get_autor_from_html_obj)
+
+    # 8. VERIFICAR CONTENIDO VÁLIDO POST-PROCESAMIENTO HTML
+    logging.info("🔍 Verificando contenido válido post-procesamiento HTML...")
+    urls_contenido_invalido = []
+
+    for row in df_exitosas.iterrows():
+        fecha = row[1]['FECHA']
+        cotizacion = row[1]['COTIZACION']
+
+        # Verificar si AMBAS son null (contenido inválido)
+        if fecha is None and cotizacion is None:  # AMBAS son null
+            motivo = "Contenido extraído no es una noticia válida (fecha y cotización son null)"
+            urls_contenido_invalido.append({
+                'url': row[1]['LINK'],
+                'motivo': motivo
+            })
+            logging.warning(f"⚠️ Contenido inválido: {row[1]['LINK']} - FECHA: {fecha}, COTIZACION: {cotizacion}")
+
+    # 9. FILTRAR SOLO URLs CON CONTENIDO VÁLIDO para IA
+    df_contenido_valido = df_exitosas[df_exitosas['LINK'].isin([url for url in df_exitosas['LINK'] if url not in [e['url'] for e in urls_contenido_invalido]])].copy()
+
+    logging.info(f"✅ URLs con contenido válido: {len(df_contenido_valido)} de {len(df_exitosas)}")
+
+    if len(df_contenido_valido) == 0:
+        logging.error("❌ No hay URLs con contenido válido para procesar con IA")
+        return pd.DataFrame(columns=CAMPOS_SALIDA), urls_extraccion_fallida, urls_contenido_invalido
+
+    # 10. Inferencias con IA (solo URLs con contenido válido)
+    logging.info(f"🤖 Iniciando procesamiento con IA para {len(df_contenido_valido)} URLs válidas...")
+
+    # Backends de los que dependen tipo, valoración y tema (con todos caídos van directo a REVISAR MANUAL)
+    backends_ia = ['openai', 'ollama'] if gpt_active else ['ollama']
+
+    # Origen de cada etiqueta (LLM, modelo local o fallback), se guarda en el store como '_FUENTES'
+    fuentes = {}
+
+    def clasificar(row, campo, funcion_ia, backends=None):
+        with Mod.medir_fuente() as medicion:
+            etiqueta = Z.marcar_o_valorar_con_ia(row['TEXTO_PLANO'], funcion_ia, limite_texto, row['LINK'], backends)
+        fuentes.setdefault(row['LINK'], {})[campo] = medicion['fuente']
+        return etiqueta
+
+    # Clasificación de tipo de publicación (GPT con fallback a Ollama)
+    df_contenido_valido['TIPO PUBLICACION'] = df_contenido_valido.apply(
+        lambda row: clasificar(
+            row, 'TIPO PUBLICACION',
+            lambda t: Gpt.clasificar_tipo_publicacion_con_ia(t, ministro_key_words, ministerios_key_words, gpt_active), 
+            backends_ia
+        ),
+        axis=1
+    )
+
+    # Factor político
+    df_contenido_valido['FACTOR POLITICO'] = df_contenido_valido.apply(
+        lambda row: clasificar(
+            row, 'FACTOR POLITICO',
+            lambda t: Mod.rutear('factor_politico', t, Oll.detectar_factor_politico_con_ollama),
+            ['ollama']
+        ),
+        axis=1
+    )
+
+    # Valoración
+    df_contenido_valido['VALORACION'] = df_contenido_valido.apply(
+        lambda row: clasificar(
+            row, 'VALORACION',
+            lambda t: Gpt.valorar_con_ia(t, ministro_key_words=ministro_key_words, ministerios_key_words=ministerios_key_words, gpt_active=gpt_active), 
+            backends_ia
+        ),
+        axis=1
+    )
+
+    # Clasificación de temas
+    df_contenido_valido['TEMA'] = df_contenido_valido.apply(
+        lambda row: clasificar(
+            row, 'TEMA',
+            lambda t: Gpt.clasificar_tema_con_ia(
+                texto=t,
+                lista_temas=temas,
+                tipo_publicacion=row['TIPO PUBLICACION'],
+                gpt_active=gpt_active,
+                tema_default=tema_default,
+                margen_local=RUNTIME_CONFIG['tema_margen_local']
+            ),
+            backends_ia
+        ), 
+        axis=1
+    )
+    df_contenido_valido['_FUENTES'] = df_contenido_valido['LINK'].map(lambda link: fuentes.get(link, {}))
+
+    # 11. Extraer entrevistado
+    df_contenido_valido['ENTREVISTADO'] = df_contenido_valido.apply(
+        lambda row: Z.marcar_o_valorar_con_ia(
+            row['TEXTO_PLANO'], 
+            lambda t: Oll.extraer_entrevistado_con_ollama(t) if row['TIPO PUBLICACION'] == 'Entrevista' else None, 
+            limite_texto,
+            row['LINK']
+        ) if row['TIPO PUBLICACION'] == 'Entrevista' else None,
+        axis=1
+    )
+
+    # 12. Detectar menciones solo si se especificaron (solo URLs con contenido válido)
+    if lista_menciones:
+        df_contenido_valido = Z.buscar_menciones(df_contenido_valido, lista_menciones)
+    else:
+        # Si no hay menciones, asignar lista vacía
+        df_contenido_valido['MENCIONES'] = [[] for _ in range(len(df_contenido_valido))]
+
+
+    # 13. Limpiar DataFrame para respuesta
+    df_final = df_contenido_valido.drop(columns=['HTML_OBJ'])
+
+    return df_final, urls_extraccion_fallida, urls_contenido_invalido
+
+def _expandir_errores_duplicados(errores: list, grupos_urls: dict) -> list:
+    """
+    Replica cada error ({"url", "motivo"}) a todas las URLs duplicadas de su artículo
+    """
+    duplicados = {grupo[0]: grupo for grupo in grupos_urls.values()}
+    return [
+        {**error, "url": url}
+        for error in errores
+        for url in duplicados.get(error.get('url'), [error.get('url')])
+    ]
+
+def configuracion_pipeline() -> dict:
+    """
+    Configuración de runtime que cambia la clasificación de un artículo: modelo, versión de
+    prompts y extractor, límite de texto, cascada, pasajes y modelos locales. Es parte de la
+    clave del store de artículos y de la huella de las corridas por lotes (Z_Utils_Lotes).
+    """
+    gpt_active = RUNTIME_CONFIG['gpt_active']
+    return {
+        "modelo": f"GPT:{Gpt.switch_4o(True)}" if gpt_active else f"Ollama:{Oll.get_modelo_ollama()}",
+        "version_prompts": f"{Gpt.VERSION_PROMPTS}/{Oll.VERSION_PROMPTS}/{Contenido.VERSION_EXTRACTOR}",
+        "limite_texto": RUNTIME_CONFIG['limite_texto'],
+        "tema_margen_local": RUNTIME_CONFIG['tema_margen_local'],
+        "cascada": RUNTIME_CONFIG['cascada'] if gpt_active else None,
+        "pasajes": Pasajes.CONFIG,
+        "umbrales_modelos": Mod.UMBRALES,
+        "modelos_locales": Mod.identidad_modelos(),
+    }
+
 def procesar_noticias_con_ia(
     urls: list,
     temas: list,
@@ -73,9 +352,33 @@ def procesar_noticias_con_ia(
     menciones: list = None,
     ministro_key_words: list = None,
     ministerios_key_words: list = None,
+    plazo_seg: float = None,
+    request_id: str = None,
 ) -> dict:
     """
-    Función principal que procesa las noticias usando IA
+    Función principal que procesa las noticias usando IA.
+    Corre con un plazo (plazo_seg, default RUNTIME_CONFIG['plazo_request_seg']) y un token de
+    cancelación (POST /cancelar/<request_id>); los artículos que no terminan a tiempo vuelven
+    como "REVISAR MANUAL" y se listan en 'incompletas' con su motivo.
+    """
+    plazo = Plazos.Plazo(plazo_seg if plazo_seg is not None else RUNTIME_CONFIG['plazo_request_seg'], request_id)
+    with Plazos.activar(plazo), Texto.cache_request():
+        resultado, status_code = _procesar_noticias(
+            urls, temas, tema_default, menciones, ministro_key_words, ministerios_key_words
+        )
+    resultado['request_id'] = plazo.request_id
+    return resultado, status_code
+
+def _procesar_noticias(
+    urls: list,
+    temas: list,
+    tema_default: str,
+    menciones: list = None,
+    ministro_key_words: list = None,
+    ministerios_key_words: list = None,
+) -> tuple:
+    """
+    Procesamiento de un request (corre dentro del plazo activado por procesar_noticias_con_ia)
     """
     try:
         # Usar configuración de runtime
@@ -125,90 +428,72 @@ def procesar_noticias_con_ia(
                 "tiempo_procesamiento": "0:00:00"
             }, 422
         
-        # 2. Configurar DataFrame solo con URLs válidas
-        df = pd.DataFrame(columns=CAMPOS_FIJOS)
-        df['LINK'] = urls_validas
-        
-        # 3. Extraer texto plano para cada link válido (con reintentos)
-        logging.info(f"🔄 Iniciando extracción de texto plano para {len(urls_validas)} URLs válidas")
-        df['TEXTO_PLANO'] = df['LINK'].apply(lambda x: Z.procesar_link_robusto(x, 'texto', 3))
-        
-        # 4. Procesar HTML y rellenar campos (con reintentos)
-        logging.info(f"🔄 Iniciando extracción de HTML para {len(urls_validas)} URLs válidas")
-        df['HTML_OBJ'] = df['LINK'].apply(lambda x: Z.procesar_link_robusto(x, 'html', 3))
-        
-        # 5. VERIFICAR QUÉ URLs FALLARON EN LA EXTRACCIÓN
-        logging.info("🔍 Verificando URLs que fallaron en la extracción...")
-        urls_extraccion_fallida = []
-        for idx, row in df.iterrows():
-            if row['TEXTO_PLANO'] is None or row['HTML_OBJ'] is None:
-                motivo = "No se pudo extraer contenido (servidor no disponible o contenido vacío)"
-                urls_extraccion_fallida.append({
-                    'url': row['LINK'],
-                    'motivo': motivo
-                })
-                logging.warning(f"⚠️ URL falló en extracción: {row['LINK']} - {motivo}")
-        
-        # 6. FILTRAR SOLO URLs EXITOSAS para continuar procesamiento
-        df_exitosas = df[df['TEXTO_PLANO'].notna() & df['HTML_OBJ'].notna()].copy()
-        logging.info(f"✅ URLs exitosas en extracción: {len(df_exitosas)} de {len(df)}")
-        
-        if len(df_exitosas) == 0:
-            logging.error("❌ No se pudo extraer contenido de ninguna URL válida")
-            # Convertir motivos de rechazo al formato de errores
-            errores = []
-            for url in urls_no_validas:
-                motivo = validacion_urls['motivos'].get(url, "Error desconocido")
-                errores.append({
-                    "url": url,
-                    "motivo": motivo
-                })
-            # Agregar errores de extracción fallida
-            errores.extend(urls_extraccion_fallida)
-            
-            return {
-                "recibidas": len(urls),
-                "procesadas": 0,
-                "data": [],
-                "errores": errores,
-                "tiempo_procesamiento": "0:00:00"
-            }, 500
-        
-        # 7. Procesar solo URLs exitosas
-        logging.info(f"🔄 Procesando {len(df_exitosas)} URLs exitosas...")
-        df_exitosas['TITULO'] = df_exitosas['HTML_OBJ'].apply(Z.get_titulo_from_html_obj)
-        df_exitosas['FECHA'] = df_exitosas['HTML_OBJ'].apply(Z.get_fecha_from_html_obj)
-        df_exitosas['MEDIO'] = df_exitosas['HTML_OBJ'].apply(Z.get_medio_from_html_obj).apply(Z.normalizar_medio)
-        df_exitosas['SOPORTE'] = df_exitosas['HTML_OBJ'].apply(Z.get_soporte_from_html_obj)
-        df_exitosas['SECCION'] = df_exitosas['HTML_OBJ'].apply(Z.get_seccion_from_html_obj)
-        df_exitosas['COTIZACION'] = df_exitosas['HTML_OBJ'].apply(Z.get_cotizacion_from_html_obj)
-        df_exitosas['ALCANCE'] = df_exitosas['HTML_OBJ'].apply(Z.get_alcance_from_html_obj)
-        df_exitosas['AUTOR'] = df_exitosas['HTML_OBJ'].apply(Z.get_autor_from_html_obj)
-        
-        # 8. VERIFICAR CONTENIDO VÁLIDO POST-PROCESAMIENTO HTML
-        logging.info("🔍 Verificando contenido válido post-procesamiento HTML...")
-        urls_contenido_invalido = []
-        
-        for row in df_exitosas.iterrows():
-            fecha = row[1]['FECHA']
-            cotizacion = row[1]['COTIZACION']
-            
-            # Verificar si AMBAS son null (contenido inválido)
-            if fecha is None and cotizacion is None:  # AMBAS son null
-                motivo = "Contenido extraído no es una noticia válida (fecha y cotización son null)"
-                urls_contenido_invalido.append({
-                    'url': row[1]['LINK'],
-                    'motivo': motivo
-                })
-                logging.warning(f"⚠️ Contenido inválido: {row[1]['LINK']} - FECHA: {fecha}, COTIZACION: {cotizacion}")
-        
-        # 9. FILTRAR SOLO URLs CON CONTENIDO VÁLIDO para IA
-        df_contenido_valido = df_exitosas[df_exitosas['LINK'].isin([url for url in df_exitosas['LINK'] if url not in [e['url'] for e in urls_contenido_invalido]])].copy()
-        
-        logging.info(f"✅ URLs con contenido válido: {len(df_contenido_valido)} de {len(df_exitosas)}")
+        # Colapsar duplicados (http/https, host en mayúsculas, parámetros extra): se procesa una URL por artículo
+        grupos_urls = Art.agrupar_urls_duplicadas(urls_validas)
+        urls_unicas = [grupo[0] for grupo in grupos_urls.values()]
+        if len(urls_unicas) < len(urls_validas):
+            logging.info(f"🔁 URLs duplicadas: {len(urls_validas)} válidas → {len(urls_unicas)} artículos únicos")
+        
+        # Reutilizar artículos ya procesados (store persistente por id de ejes)
+        pipeline = configuracion_pipeline()
+        modelo_store = pipeline.pop("modelo")
+        version_prompts = pipeline.pop("version_prompts")
+        huella_config = Art.huella_configuracion(
+            temas=temas, tema_default=tema_default, menciones=lista_menciones,
+            ministro_key_words=ministro_key_words, ministerios_key_words=ministerios_key_words,
+            **pipeline
+        )
+        registros_store = {}
+        if RUNTIME_CONFIG['store_articulos']:
+            try:
+                registros_store = Art.buscar_articulos(
+                    [Art.extraer_id_ejes(url) for url in urls_unicas],
+                    modelo_store, version_prompts, huella_config
+                )
+            except Exception as e:
+                logging.error(f"❌ Error consultando store de artículos: {e}")
+        
+        urls_pendientes = [url for url in urls_unicas if Art.extraer_id_ejes(url) not in registros_store]
+        logging.info(f"🗄️ Store de artículos: {len(urls_unicas) - len(urls_pendientes)} reutilizadas, {len(urls_pendientes)} a procesar")
+        
+        # 3-13. Procesar solo URLs nuevas o vencidas (ver _procesar_lote_urls)
+        if urls_pendientes:
+            df_final, urls_extraccion_fallida, urls_contenido_invalido = _procesar_lote_urls(
+                urls_pendientes, temas, tema_default, lista_menciones,
+                ministro_key_words, ministerios_key_words, gpt_active, limite_texto
+            )
+        else:
+            df_final, urls_extraccion_fallida, urls_contenido_invalido = pd.DataFrame(columns=CAMPOS_SALIDA), [], []
+        
+        # Replicar errores de cada artículo a todas sus URLs originales
+        urls_extraccion_fallida = _expandir_errores_duplicados(urls_extraccion_fallida, grupos_urls)
+        urls_contenido_invalido = _expandir_errores_duplicados(urls_contenido_invalido, grupos_urls)
+        
+        # Combinar resultados nuevos y reutilizados respetando el orden (y repeticiones) de las URLs recibidas
+        registros_nuevos = {registro['LINK']: registro for registro in df_final.to_dict('records')}
+        registros_por_clave = {}
+        for clave, grupo in grupos_urls.items():
+            if grupo[0] in registros_nuevos:
+                registros_por_clave[clave] = registros_nuevos[grupo[0]]
+            elif Art.extraer_id_ejes(grupo[0]) in registros_store:
+                registros_por_clave[clave] = registros_store[Art.extraer_id_ejes(grupo[0])]
+        resultado_json = []
+        for url in urls_validas:
+            clave = Art.clave_articulo(url)
+            if clave in registros_por_clave:
+                registro = {k: v for k, v in registros_por_clave[clave].items() if not k.startswith('_')}
+                resultado_json.append({**registro, 'LINK': url})
+        
+        # Artículos que no terminaron (plazo vencido, cancelación o backend caído): vuelven como REVISAR MANUAL y no se persisten
+        plazo = Plazos.actual()
+        incompletos = dict(plazo.incompletos) if plazo else {}
+        if incompletos:
+            logging.warning(f"⏱️ {len(incompletos)} artículos incompletos: {'; '.join(sorted(set(incompletos.values())))}")
+        urls_incompletas = _expandir_errores_duplicados(
+            [{"url": url, "motivo": motivo} for url, motivo in incompletos.items()], grupos_urls
+        )
         
-        if len(df_contenido_valido) == 0:
-            logging.error("❌ No hay URLs con contenido válido para procesar con IA")
+        if not resultado_json:
             # Combinar todos los errores
             errores = []
             for url in urls_no_validas:
@@ -222,83 +507,11 @@ def procesar_noticias_con_ia(
                 "procesadas": 0,
                 "data": [],
                 "errores": errores,
+                "incompletas": urls_incompletas,
                 "tiempo_procesamiento": "0:00:00"
             }, 500
         
-        # 10. Inferencias con IA (solo URLs con contenido válido)
-        logging.info(f"🤖 Iniciando procesamiento con IA para {len(df_contenido_valido)} URLs válidas...")
-        
-        # Clasificación de tipo de publicación (GPT con fallback a Ollama)
-        df_contenido_valido['TIPO PUBLICACION'] = df_contenido_valido.apply(
-            lambda row: Z.marcar_o_valorar_con_ia(
-                row['TEXTO_PLANO'], 
-                lambda t: Gpt.clasificar_tipo_publicacion_con_ia(t, ministro_key_words, ministerios_key_words, gpt_active), 
-                limite_texto,
-                row['LINK']
-            ),
-            axis=1
-        )
-        
-        # Factor político
-        df_contenido_valido['FACTOR POLITICO'] = df_contenido_valido.apply(
-            lambda row: Z.marcar_o_valorar_con_ia(
-                row['TEXTO_PLANO'], 
-                Oll.detectar_factor_politico_con_ollama, 
-                limite_texto,
-                row['LINK']
-            ),
-            axis=1
-        )
-        
-        # Valoración
-        df_contenido_valido['VALORACION'] = df_contenido_valido.apply(
-            lambda row: Z.marcar_o_valorar_con_ia(
-                row['TEXTO_PLANO'], 
-                lambda t: Gpt.valorar_con_ia(t, ministro_key_words=ministro_key_words, ministerios_key_words=ministerios_key_words, gpt_active=gpt_active), 
-                limite_texto,
-                row['LINK']
-            ),
-            axis=1
-        )
-        
-        # Clasificación de temas
-        df_contenido_valido['TEMA'] = df_contenido_valido.apply(
-            lambda row: Z.marcar_o_valorar_con_ia(
-                row['TEXTO_PLANO'], 
-                lambda t: Gpt.clasificar_tema_con_ia(
-                    texto=t,
-                    lista_temas=temas,
-                    tipo_publicacion=row['TIPO PUBLICACION'],
-                    gpt_active=gpt_active,
-                    tema_default=tema_default
-                ), 
-                limite_texto,
-                row['LINK']
-            ), 
-            axis=1
-        )
-        
-        # 11. Extraer entrevistado
-        df_contenido_valido['ENTREVISTADO'] = df_contenido_valido.apply(
-            lambda row: Z.marcar_o_valorar_con_ia(
-                row['TEXTO_PLANO'], 
-                lambda t: Oll.extraer_entrevistado_con_ollama(t) if row['TIPO PUBLICACION'] == 'Entrevista' else None, 
-                limite_texto,
-                row['LINK']
-            ) if row['TIPO PUBLICACION'] == 'Entrevista' else None,
-            axis=1
-        )
-    
-        # 12. Detectar menciones solo si se especificaron (solo URLs con contenido válido)
-        if menciones:
-            df_contenido_valido = Z.buscar_menciones(df_contenido_valido, lista_menciones)
-        else:
-            # Si no hay menciones, asignar lista vacía
-            df_contenido_valido['MENCIONES'] = [[] for _ in range(len(df_contenido_valido))]
-        
-                
-        # 13. Limpiar DataFrame para respuesta
-        df_final = df_contenido_valido.drop(columns=['HTML_OBJ'])
+        df_persistible = df_final[~df_final['LINK'].isin(list(incompletos))].drop(columns=['_FUENTES'], errors='ignore')
         
         # Medición tiempo final
         t1 = time.time()
@@ -306,8 +519,29 @@ def procesar_noticias_con_ia(
         
         logging.info(f"Procesamiento completado en {tiempo_total}")
         
-        # Convertir a JSON
-        resultado_json = df_final.to_dict('records')
+        # Actualizar contadores de crisis (negativas por tema y día) con este lote
+        try:
+            Crisis.registrar_lote(df_persistible)
+        except Exception as e:
+            logging.error(f"❌ Error actualizando store de crisis: {e}")
+        
+        # Persistir en el dataset columnar (si está configurado); nunca corta el request
+        if RUNTIME_CONFIG['dataset_salida']:
+            try:
+                import Z_Utils_Salida as Salida
+                Salida.agregar_a_dataset(df_persistible, RUNTIME_CONFIG['dataset_salida'], RUNTIME_CONFIG['formato_dataset'])
+            except Exception as e:
+                logging.error(f"❌ Error escribiendo dataset de salida {RUNTIME_CONFIG['dataset_salida']}: {e}")
+        
+        # Guardar en el store los artículos recién procesados
+        if RUNTIME_CONFIG['store_articulos'] and len(df_persistible):
+            try:
+                Art.guardar_articulos(
+                    [registro for link, registro in registros_nuevos.items() if link not in incompletos],
+                    modelo_store, version_prompts, huella_config
+                )
+            except Exception as e:
+                logging.error(f"❌ Error guardando en store de artículos: {e}")
         
         # 14. Combinar errores de validación + extracción + contenido inválido
         logging.info("🔍 Preparando respuesta final con errores combinados...")
@@ -332,13 +566,14 @@ def procesar_noticias_con_ia(
             errores.append(error)
             logging.info(f"❌ Error de contenido: {error['url']} - {error['motivo']}")
         
-        logging.info(f"📊 Resumen final: {len(urls)} recibidas, {len(df_final)} procesadas, {len(errores)} errores")
+        logging.info(f"📊 Resumen final: {len(urls)} recibidas, {len(resultado_json)} procesadas ({len(registros_store)} desde store), {len(errores)} errores")
         
         return {
             "recibidas": len(urls),
-            "procesadas": len(df_final),
+            "procesadas": len(resultado_json),
             "data": resultado_json,
             "errores": errores,
+            "incompletas": urls_incompletas,
             "tiempo_procesamiento": tiempo_total
         }, 200
         
@@ -389,6 +624,8 @@ def validar_parametros_noticias(data):
         ministro_key_words = data.get('ministro_key_words', [])
         ministerios_key_words = data.get('ministerios_key_words', [])
         tema_default = data.get('tema_default', '')  # ← NUEVO CAMPO
+        plazo_seg = data.get('plazo_seg')
+        request_id = data.get('request_id')
 
         
         # Validaciones adicionales
@@ -428,6 +665,30 @@ def validar_parametros_noticias(data):
                 "error": "Campo 'tema_default' es obligatorio"
             }, None
         
+        # Menciones: strings o {"mencion": "...", "alias": [...], "palabra_completa": true}
+        if menciones is None:
+            menciones = []
+        if not isinstance(menciones, list) or not all(
+            m is None or isinstance(m, str) or (
+                isinstance(m, dict) and isinstance(m.get('mencion'), str) and m['mencion'].strip()
+                and isinstance(m.get('alias', []), list) and all(isinstance(a, str) for a in m.get('alias', []))
+            )
+            for m in menciones
+        ):
+            return False, {
+                "error": "Campo 'menciones' debe ser una lista de textos u objetos {\"mencion\", \"alias\", \"palabra_completa\"}"
+            }, None
+        
+        if plazo_seg is not None and (isinstance(plazo_seg, bool) or not isinstance(plazo_seg, (int, float)) or plazo_seg <= 0):
+            return False, {
+                "error": "Campo 'plazo_seg' debe ser un número positivo de segundos"
+            }, None
+        
+        if request_id is not None and (not isinstance(request_id, str) or not request_id.strip() or len(request_id) > 64):
+            return False, {
+                "error": "Campo 'request_id' debe ser un texto de hasta 64 caracteres"
+            }, None
+        
         # Si todo está bien, retornar datos validados
         datos_validados = {
             'urls': urls,
@@ -435,7 +696,9 @@ def validar_parametros_noticias(data):
             'menciones': menciones if menciones else None,
             'ministro_key_words': ministro_key_words if ministro_key_words else None,
             'ministerios_key_words': ministerios_key_words if ministerios_key_words else None,
-            'tema_default': tema_default
+            'tema_default': tema_default,
+            'plazo_seg': plazo_seg,
+            'request_id': request_id.strip() if request_id else None
         }
         
         return True, None, datos_validados
@@ -475,12 +738,32 @@ def health_check():
     """
     Endpoint de health check
     """
+    breakers = Breaker.estado()
     return jsonify({
-        "status": "OK",
+        "status": "OK" if all(b["estado"] == Breaker.CERRADO for b in breakers.values()) else "DEGRADADO",
         "service": "Prensai IA API",
-        "version": "1.0.0"
+        "version": "1.0.0",
+        "breakers": breakers
     }), 200
 
+@app.route('/health/ready', methods=['GET'])
+def readiness_check():
+    """
+    Readiness: estado cacheado de Ollama, OpenAI, ejes.com y los stores (sin requests en el momento).
+    Listo = warm-up terminado, stores y ejes.com ok, y al menos un backend de IA utilizable según gpt_active.
+    Responde 503 mientras no esté listo (incluye el arranque, antes del primer sondeo).
+    """
+    Warmup.iniciar()
+    Health.iniciar()
+    backends_ia = ['openai', 'ollama'] if RUNTIME_CONFIG['gpt_active'] else ['ollama']
+    listo = Warmup.terminado() and Health.listo(requeridos=['store', 'ejes'], alguno_de=backends_ia)
+    return jsonify({
+        "ready": listo,
+        "warmup": Warmup.estado(),
+        "backends": Health.estado(),
+        "breakers": Breaker.estado()
+    }), 200 if listo else 503
+
 @app.route('/config/limite-texto', methods=['POST'])
 @require_api_key
 def configurar_limite_texto():
@@ -557,6 +840,512 @@ def configurar_gpt_active():
             "error": f"Error interno del servidor: {str(e)}"
         }), 500
 
+@app.route('/config/tema-local', methods=['POST'])
+@require_api_key
+def configurar_tema_local():
+    """
+    Endpoint para configurar el margen del clasificador local de temas.
+    Body: {"tema_margen_local": 0.15} (entre 0 y 1) o null para consultar siempre al LLM
+    """
+    try:
+        if not request.is_json:
+            return jsonify({
+                "error": "Content-Type debe ser application/json"
+            }), 400
+        
+        data = request.get_json()
+        
+        if 'tema_margen_local' not in data:
+            return jsonify({
+                "error": "Campo 'tema_margen_local' es obligatorio (null para desactivar)"
+            }), 400
+        
+        nuevo_valor = data.get('tema_margen_local')
+        
+        if nuevo_valor is not None and (isinstance(nuevo_valor, bool) or not isinstance(nuevo_valor, (int, float)) or not 0 <= nuevo_valor <= 1):
+            return jsonify({
+                "error": "tema_margen_local debe ser un número entre 0 y 1, o null"
+            }), 400
+        
+        # Actualizar configuración
+        RUNTIME_CONFIG['tema_margen_local'] = nuevo_valor
+        
+        return jsonify({
+            "message": f"Margen del clasificador local de temas actualizado a {nuevo_valor}",
+            "nuevo_valor": nuevo_valor
+        }), 200
+        
+    except Exception as e:
+        return jsonify({
+            "error": f"Error interno del servidor: {str(e)}"
+        }), 500
+
+@app.route('/config/umbrales-modelos', methods=['POST'])
+@require_api_key
+def configurar_umbrales_modelos():
+    """
+    Endpoint para ajustar por tarea el umbral del router de modelos locales.
+    Body: {"tipo": 0.9, "valoracion": 0.85, "factor_politico": 0.95} (1.0 o más = siempre LLM)
+    """
+    try:
+        if not request.is_json:
+            return jsonify({
+                "error": "Content-Type debe ser application/json"
+            }), 400
+        
+        data = request.get_json()
+        
+        if not isinstance(data, dict) or not data:
+            return jsonify({
+                "error": f"Se espera un objeto {{tarea: umbral}} con tareas: {', '.join(Mod.TAREAS)}"
+            }), 400
+        
+        for tarea, umbral in data.items():
+            if tarea not in Mod.TAREAS:
+                return jsonify({
+                    "error": f"Tarea desconocida: {tarea} (válidas: {', '.join(Mod.TAREAS)})"
+                }), 400
+            if isinstance(umbral, bool) or not isinstance(umbral, (int, float)) or umbral < 0:
+                return jsonify({
+                    "error": f"El umbral de '{tarea}' debe ser un número mayor o igual a 0"
+                }), 400
+        
+        # Actualizar configuración (RUNTIME_CONFIG['umbrales_modelos'] es el mismo dict)
+        Mod.UMBRALES.update({tarea: float(umbral) for tarea, umbral in data.items()})
+        
+        return jsonify({
+            "message": "Umbrales de modelos locales actualizados",
+            "umbrales": Mod.UMBRALES
+        }), 200
+        
+    except Exception as e:
+        return jsonify({
+            "error": f"Error interno del servidor: {str(e)}"
+        }), 500
+
+@app.route('/config/cascada', methods=['POST'])
+@require_api_key
+def configurar_cascada():
+    """
+    Endpoint para configurar la cascada de modelos por tarea (solo aplica con gpt_active=true).
+    Body: {"politicas": {"valoracion": "cascada", "tipo": "switch", "tema": "cascada"}, "auditoria": 0.05}
+    """
+    try:
+        if not request.is_json:
+            return jsonify({
+                "error": "Content-Type debe ser application/json"
+            }), 400
+        
+        data = request.get_json()
+        politicas = data.get('politicas', {})
+        auditoria = data.get('auditoria')
+        
+        if not isinstance(politicas, dict) or (not politicas and auditoria is None):
+            return jsonify({
+                "error": "Campo 'politicas' ({tarea: política}) o 'auditoria' es obligatorio"
+            }), 400
+        
+        for tarea, politica in politicas.items():
+            if tarea not in Cascada.POLITICAS:
+                return jsonify({
+                    "error": f"Tarea desconocida: {tarea} (válidas: {', '.join(Cascada.POLITICAS)})"
+                }), 400
+            if politica not in Cascada.POLITICAS_VALIDAS:
+                return jsonify({
+                    "error": f"Política inválida para '{tarea}': {politica} (válidas: {', '.join(sorted(Cascada.POLITICAS_VALIDAS))})"
+                }), 400
+            if politica == Cascada.POLITICA_CASCADA and Cascada.ESCALAR_SIN_SENAL and not Cascada.senal_disponible(tarea):
+                return jsonify({
+                    "error": f"No hay modelo local entrenado para '{tarea}' que sirva de señal: la cascada consultaría siempre a Ollama y a GPT-4o (entrenarlo con python O_Utils_Modelos.py)"
+                }), 400
+        
+        if auditoria is not None and (isinstance(auditoria, bool) or not isinstance(auditoria, (int, float)) or not 0 <= auditoria <= 1):
+            return jsonify({
+                "error": "auditoria debe ser un número entre 0 y 1"
+            }), 400
+        
+        # Actualizar configuración (RUNTIME_CONFIG['cascada'] es el mismo dict)
+        Cascada.POLITICAS.update(politicas)
+        if auditoria is not None:
+            Cascada.AUDITORIA = float(auditoria)
+        
+        return jsonify({
+            "message": "Cascada de modelos actualizada",
+            "politicas": Cascada.POLITICAS,
+            "auditoria": Cascada.AUDITORIA
+        }), 200
+        
+    except Exception as e:
+        return jsonify({
+            "error": f"Error interno del servidor: {str(e)}"
+        }), 500
+
+@app.route('/cascada/estadisticas', methods=['GET'])
+def obtener_estadisticas_cascada():
+    """
+    Tasa de escalamiento a GPT-4o y acuerdo Ollama/GPT por tarea (desde que arrancó la API)
+    """
+    return jsonify({
+        "politicas": Cascada.POLITICAS,
+        "auditoria": Cascada.AUDITORIA,
+        "estadisticas": Cascada.estadisticas()
+    }), 200
+
+@app.route('/config/pasajes-relevantes', methods=['POST'])
+@require_api_key
+def configurar_pasajes_relevantes():
+    """
+    Endpoint para configurar la extracción de pasajes relevantes (prompts de declaración y valoración).
+    Body: {"activo": true} y opcionalmente {"minimo_chars": 1500, "contexto_oraciones": 1, "oraciones_inicio": 3}
+    """
+    try:
+        if not request.is_json:
+            return jsonify({
+                "error": "Content-Type debe ser application/json"
+            }), 400
+        
+        data = request.get_json()
+        
+        if 'activo' not in data:
+            return jsonify({
+                "error": "Campo 'activo' es obligatorio"
+            }), 400
+        
+        if not isinstance(data['activo'], bool):
+            return jsonify({
+                "error": "activo debe ser true o false"
+            }), 400
+        
+        for campo in ('minimo_chars', 'contexto_oraciones', 'oraciones_inicio'):
+            valor = data.get(campo)
+            if valor is not None and (isinstance(valor, bool) or not isinstance(valor, int) or valor < 0):
+                return jsonify({
+                    "error": f"{campo} debe ser un entero no negativo"
+                }), 400
+        
+        # Actualizar configuración (RUNTIME_CONFIG['pasajes_relevantes'] es el mismo dict)
+        Pasajes.CONFIG['activo'] = data['activo']
+        for campo in ('minimo_chars', 'contexto_oraciones', 'oraciones_inicio'):
+            if data.get(campo) is not None:
+                Pasajes.CONFIG[campo] = data[campo]
+        
+        return jsonify({
+            "message": f"Pasajes relevantes {'activados' if data['activo'] else 'desactivados'}",
+            "pasajes_relevantes": Pasajes.CONFIG
+        }), 200
+        
+    except Exception as e:
+        return jsonify({
+            "error": f"Error interno del servidor: {str(e)}"
+        }), 500
+
+@app.route('/pasajes/estadisticas', methods=['GET'])
+def obtener_estadisticas_pasajes():
+    """
+    Caracteres enviados vs originales por tarea con la extracción de pasajes (desde que arrancó la API)
+    """
+    return jsonify({
+        "configuracion": Pasajes.CONFIG,
+        "estadisticas": Pasajes.estadisticas()
+    }), 200
+
+@app.route('/contenido/estadisticas', methods=['GET'])
+def obtener_estadisticas_contenido():
+    """
+    Caracteres antes/después de extraer el contenido principal de las páginas (desde que arrancó la API)
+    """
+    return jsonify({
+        "estadisticas": Contenido.estadisticas()
+    }), 200
+
+@app.route('/config/plazo-request', methods=['POST'])
+@require_api_key
+def configurar_plazo_request():
+    """
+    Endpoint para configurar el plazo por defecto de cada request de procesamiento.
+    Body: {"plazo_seg": 600} (null = sin plazo)
+    """
+    try:
+        if not request.is_json:
+            return jsonify({
+                "error": "Content-Type debe ser application/json"
+            }), 400
+        
+        data = request.get_json()
+        
+        if 'plazo_seg' not in data:
+            return jsonify({
+                "error": "Campo 'plazo_seg' es obligatorio (número de segundos o null)"
+            }), 400
+        
+        nuevo_valor = data['plazo_seg']
+        
+        if nuevo_valor is not None and (isinstance(nuevo_valor, bool) or not isinstance(nuevo_valor, (int, float)) or nuevo_valor <= 0):
+            return jsonify({
+                "error": "plazo_seg debe ser un número positivo o null"
+            }), 400
+        
+        RUNTIME_CONFIG['plazo_request_seg'] = nuevo_valor
+        
+        return jsonify({
+            "message": f"Plazo por request actualizado a {nuevo_valor if nuevo_valor is not None else 'sin plazo'}",
+            "plazo_request_seg": nuevo_valor
+        }), 200
+        
+    except Exception as e:
+        return jsonify({
+            "error": f"Error interno del servidor: {str(e)}"
+        }), 500
+
+@app.route('/config/procesos-parseo', methods=['POST'])
+@require_api_key
+def configurar_procesos_parseo():
+    """
+    Endpoint para configurar el pool de procesos de parseo y normalización.
+    Body: {"procesos": 4} (0 = desactivado) y opcionalmente {"minimo_items": 8}
+    """
+    try:
+        if not request.is_json:
+            return jsonify({
+                "error": "Content-Type debe ser application/json"
+            }), 400
+        
+        data = request.get_json()
+        
+        if 'procesos' not in data:
+            return jsonify({
+                "error": "Campo 'procesos' es obligatorio (0 para desactivar)"
+            }), 400
+        
+        procesos = data['procesos']
+        minimo_items = data.get('minimo_items')
+        
+        if isinstance(procesos, bool) or not isinstance(procesos, int) or not 0 <= procesos <= Paralelo.PROCESOS_MAXIMO:
+            return jsonify({
+                "error": f"procesos debe ser un entero entre 0 y {Paralelo.PROCESOS_MAXIMO}"
+            }), 400
+        if minimo_items is not None and (isinstance(minimo_items, bool) or not isinstance(minimo_items, int) or minimo_items < 1):
+            return jsonify({
+                "error": "minimo_items debe ser un entero positivo"
+            }), 400
+        
+        # Actualizar configuración (RUNTIME_CONFIG['procesos_parseo'] es el mismo dict)
+        Paralelo.configurar(procesos, minimo_items)
+        
+        return jsonify({
+            "message": f"Procesos de parseo actualizados a {procesos if procesos else 'desactivado'}",
+            "procesos_parseo": Paralelo.estado()
+        }), 200
+        
+    except Exception as e:
+        return jsonify({
+            "error": f"Error interno del servidor: {str(e)}"
+        }), 500
+
+@app.route('/cancelar/<request_id>', methods=['POST'])
+@require_api_key
+def cancelar_request(request_id):
+    """
+    Cancela un procesamiento en curso (el request_id se envía en el body de /procesar-noticias).
+    Lo que no terminó vuelve como REVISAR MANUAL. Solo devuelve el estado del request cancelado
+    (no lista los demás procesamientos en curso).
+    """
+    plazo = Plazos.obtener(request_id)
+    if plazo is None or not Plazos.cancelar(request_id):
+        return jsonify({
+            "error": f"No hay un procesamiento en curso con request_id '{request_id}'"
+        }), 404
+    
+    return jsonify({
+        "message": f"Procesamiento {request_id} cancelado",
+        "procesamiento": plazo.resumen()
+    }), 200
+
+@app.route('/config/dataset-salida', methods=['POST'])
+@require_api_key
+def configurar_dataset_salida():
+    """
+    Endpoint para configurar el dataset columnar donde se agregan las noticias procesadas.
+    Body: {"dataset_salida": "Data_Results/dataset" | null, "formato": "parquet" | "arrow" | "csv"}
+    """
+    try:
+        if not request.is_json:
+            return jsonify({
+                "error": "Content-Type debe ser application/json"
+            }), 400
+        
+        data = request.get_json()
+        
+        if 'dataset_salida' not in data:
+            return jsonify({
+                "error": "Campo 'dataset_salida' es obligatorio (null para desactivar)"
+            }), 400
+        
+        ruta = data.get('dataset_salida')
+        formato = data.get('formato', RUNTIME_CONFIG['formato_dataset'])
+        
+        if ruta is not None and (not isinstance(ruta, str) or not ruta.strip()):
+            return jsonify({
+                "error": "dataset_salida debe ser una ruta (string) o null"
+            }), 400
+        
+        import Z_Utils_Salida as Salida
+        if formato not in Salida.FORMATOS_SALIDA:
+            return jsonify({
+                "error": f"formato debe ser uno de: {', '.join(Salida.FORMATOS_SALIDA)}"
+            }), 400
+        
+        # Actualizar configuración
+        RUNTIME_CONFIG['dataset_salida'] = ruta.strip() if ruta else None
+        RUNTIME_CONFIG['formato_dataset'] = formato
+        
+        return jsonify({
+            "message": f"Dataset de salida actualizado a {RUNTIME_CONFIG['dataset_salida']} ({formato})",
+            "dataset_salida": RUNTIME_CONFIG['dataset_salida'],
+            "formato": formato
+        }), 200
+        
+    except Exception as e:
+        return jsonify({
+            "error": f"Error interno del servidor: {str(e)}"
+        }), 500
+
+@app.route('/config/medios-alias', methods=['GET', 'POST'])
+@require_api_key
+def configurar_medios_alias():
+    """
+    Endpoint para consultar (GET) o extender (POST) el índice de alias de medios.
+    Body POST: {"alias": {"pagina12.com.ar": {"medio": "Página 12", "soporte": "WEB"}, "Clarin": "Clarín"}}
+    o {"archivo": "ruta/alias.xlsx"} (columnas ALIAS, MEDIO, SOPORTE). Los alias del body se persisten.
+    """
+    try:
+        if request.method == 'GET':
+            alias = Medios.listar_alias()
+            return jsonify({
+                "total": len(alias),
+                "alias": alias
+            }), 200
+        
+        if not request.is_json:
+            return jsonify({
+                "error": "Content-Type debe ser application/json"
+            }), 400
+        
+        data = request.get_json()
+        alias = data.get('alias')
+        archivo = data.get('archivo')
+        
+        if alias is None and archivo is None:
+            return jsonify({
+                "error": "Campo 'alias' (objeto) o 'archivo' (ruta) es obligatorio"
+            }), 400
+        
+        if alias is not None and (not isinstance(alias, dict) or not alias):
+            return jsonify({
+                "error": "alias debe ser un objeto {medio_crudo: medio_canonico | {medio, soporte}}"
+            }), 400
+        
+        if archivo is not None and not os.path.exists(str(archivo)):
+            return jsonify({
+                "error": f"Archivo no encontrado: {archivo}"
+            }), 400
+        
+        try:
+            if archivo is not None:
+                total = Medios.cargar_alias_desde_archivo(str(archivo))
+            if alias is not None:
+                total = Medios.agregar_alias(alias, persistir_en=Medios.MEDIOS_ALIAS_PATH)
+        except ValueError as e:
+            return jsonify({
+                "error": str(e)
+            }), 400
+        
+        return jsonify({
+            "message": "Índice de medios actualizado",
+            "total": total
+        }), 200
+        
+    except Exception as e:
+        return jsonify({
+            "error": f"Error interno del servidor: {str(e)}"
+        }), 500
+
+@app.route('/crisis', methods=['GET'])
+def consultar_crisis():
+    """
+    Consulta de temas en crisis sobre el store incremental.
+    Query params opcionales: dias (ventana), umbral (negativas), fecha (último día, YYYY-MM-DD)
+    """
+    try:
+        # Sin type=int: un valor inválido no debe caer en silencio al default
+        try:
+            dias = int(request.args.get('dias', RUNTIME_CONFIG['crisis_ventana_dias']))
+            umbral = int(request.args.get('umbral', RUNTIME_CONFIG['crisis_umbral']))
+        except ValueError:
+            dias = umbral = None
+        fecha = request.args.get('fecha')
+        
+        if not dias or dias <= 0 or not umbral or umbral <= 0:
+            return jsonify({
+                "error": "dias y umbral deben ser números enteros positivos"
+            }), 400
+        
+        if fecha is not None:
+            try:
+                fecha = datetime.strptime(fecha, '%Y-%m-%d').strftime('%Y-%m-%d')
+            except ValueError:
+                return jsonify({
+                    "error": "fecha debe tener el formato YYYY-MM-DD"
+                }), 400
+        
+        conteos = Crisis.conteo_negativas_por_tema(dias=dias, fecha_ref=fecha)
+        temas_crisis = sorted(tema for tema, total in conteos.items() if total >= umbral)
+        
+        return jsonify({
+            "temas_en_crisis": temas_crisis,
+            "negativas_por_tema": conteos,
+            "ventana_dias": dias,
+            "umbral": umbral,
+            "fecha_referencia": fecha
+        }), 200
+        
+    except Exception as e:
+        return jsonify({
+            "error": f"Error interno del servidor: {str(e)}"
+        }), 500
+
+@app.route('/crisis/importar-historico', methods=['POST'])
+@require_api_key
+def importar_historico_crisis():
+    """
+    Carga inicial del store de crisis desde un histórico (Excel, archivo columnar o dataset).
+    Body: {"historico_path": "Testing/DataCollected/noticias_historicas.xlsx"}
+    """
+    try:
+        if not request.is_json:
+            return jsonify({
+                "error": "Content-Type debe ser application/json"
+            }), 400
+        
+        historico_path = request.get_json().get('historico_path')
+        
+        if not historico_path or not os.path.exists(historico_path):
+            return jsonify({
+                "error": "Campo 'historico_path' es obligatorio y debe existir en el servidor"
+            }), 400
+        
+        registradas = Crisis.importar_historico(historico_path)
+        
+        return jsonify({
+            "message": f"Histórico importado: {registradas} noticias registradas",
+            "registradas": registradas
+        }), 200
+        
+    except Exception as e:
+        return jsonify({
+            "error": f"Error interno del servidor: {str(e)}"
+        }), 500
+
 @app.route('/config/estado', methods=['GET'])
 @require_api_key
 def obtener_estado_config():
@@ -597,7 +1386,10 @@ def obtener_logs():
 @app.route('/procesar-noticias-export-excel', methods=['POST'])
 def procesar_noticias_export_excel():
     """
-    Endpoint para procesar noticias y exportar directamente a Excel
+    Endpoint para procesar noticias y exportar directamente a Excel.
+    El Excel se genera en segundo plano en un archivo único por request;
+    se descarga con GET /exports/<export_id>.
+    Campo opcional 'incluir_data' (bool, default true): si es false, la respuesta no repite los datos.
     """
     try:
         data = request.get_json()
@@ -608,6 +1400,12 @@ def procesar_noticias_export_excel():
         if not validacion_ok:
             return jsonify(error_response), 400
         
+        incluir_data = data.get('incluir_data', True)
+        if not isinstance(incluir_data, bool):
+            return jsonify({
+                "error": "incluir_data debe ser un valor booleano (true/false)"
+            }), 400
+        
         # Procesar noticias usando la función existente
         resultado, status_code = procesar_noticias_con_ia(**datos_validados)
         
@@ -621,7 +1419,7 @@ def procesar_noticias_export_excel():
                 "message": "No hay noticias para exportar",
                 "recibidas": resultado['recibidas'],
                 "procesadas": 0,
-                "data": resultado['data'],
+                "data": resultado['data'] if incluir_data else None,
                 "errores": resultado['errores'],
                 "tiempo_procesamiento": resultado['tiempo_procesamiento'],
                 "archivo_excel": None
@@ -633,31 +1431,33 @@ def procesar_noticias_export_excel():
         # Agregar campos adicionales para Excel
         df_export['USR_CREADOR'] = 'SOL'
         df_export['USR_REVISOR'] = 'LUNA'
-        df_export['CRISIS'] = 'NO'
+        # El lote ya se registró en el store de crisis (sin los artículos incompletos): solo se marca
+        df_export = Crisis.marcar_crisis(
+            df_export,
+            dias=RUNTIME_CONFIG['crisis_ventana_dias'],
+            umbral=RUNTIME_CONFIG['crisis_umbral'],
+            temas_fijos=list({*Crisis.TEMAS_FIJOS_DEFAULT, datos_validados['tema_default']}),
+            registrar=False
+        )
         
-        # Generar nombre de archivo con modelo de IA (se sobrescribe cada vez)
+        # Programar el export en segundo plano (archivo único por request, con modelo de IA en el nombre)
         modelo_ia = "GPT" if RUNTIME_CONFIG['gpt_active'] else "Ollama"
-        nombre_archivo = f"Noticias_Procesadas_{modelo_ia}.xlsx"
-        ruta_archivo = f"Data_Results/{nombre_archivo}"
+        export_info = Exp.programar_export_excel(df_export, f"Noticias_Procesadas_{modelo_ia}")
         
-        # Crear directorio si no existe
-        import os
-        os.makedirs("Data_Results", exist_ok=True)
-        
-        # Exportar a Excel
-        df_export.to_excel(ruta_archivo, index=False, engine='openpyxl')
-        
-        logging.info(f"Archivo Excel exportado: {ruta_archivo}")
+        logging.info(f"Archivo Excel programado: {export_info['ruta_completa']} (export_id={export_info['export_id']})")
         
         return jsonify({
-            "message": f"Noticias procesadas y exportadas exitosamente a Excel",
+            "message": f"Noticias procesadas; exportación a Excel en curso",
             "recibidas": resultado['recibidas'],
             "procesadas": resultado['procesadas'],
-            "data": resultado['data'],
+            "data": resultado['data'] if incluir_data else None,
             "errores": resultado['errores'],
             "tiempo_procesamiento": resultado['tiempo_procesamiento'],
-            "archivo_excel": nombre_archivo,
-            "ruta_completa": ruta_archivo,
+            "archivo_excel": export_info['archivo_excel'],
+            "ruta_completa": export_info['ruta_completa'],
+            "export_id": export_info['export_id'],
+            "estado_export": export_info['estado'],
+            "url_descarga": f"/exports/{export_info['export_id']}",
             "registros_exportados": len(df_export)
         }), 200
         
@@ -681,14 +1481,63 @@ def procesar_noticias_export_excel():
             "archivo_excel": None
         }), 500  # 500 = error interno del servidor
 
+@app.route('/exports/<export_id>', methods=['GET'])
+def descargar_export(export_id):
+    """
+    Descarga (streaming) el Excel generado por /procesar-noticias-export-excel.
+    Devuelve 202 mientras se está generando y 404 si no existe o ya fue eliminado por retención.
+    """
+    try:
+        info = Exp.obtener_export(export_id)
+        
+        if info is None:
+            return jsonify({
+                "error": "Export no encontrado (id inválido o eliminado por política de retención)"
+            }), 404
+        
+        if info['estado'] == Exp.ESTADO_PENDIENTE:
+            return jsonify({
+                "export_id": export_id,
+                "estado": info['estado'],
+                "message": "El archivo Excel todavía se está generando"
+            }), 202
+        
+        if info['estado'] == Exp.ESTADO_ERROR:
+            return jsonify({
+                "export_id": export_id,
+                "estado": info['estado'],
+                "error": info['error']
+            }), 500
+        
+        return send_file(
+            os.path.abspath(info['ruta']),
+            mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+            as_attachment=True,
+            download_name=info['nombre'],
+            conditional=True
+        )
+        
+    except Exception as e:
+        return jsonify({
+            "error": f"Error interno del servidor: {str(e)}"
+        }), 500
+
 if __name__ == '__main__':
     print("🚀 Iniciando API de Prensai IA...")
     print("📡 Endpoint principal: POST /procesar-noticias")
     print("📊 Exportar a Excel: POST /procesar-noticias-export-excel")
-    print("🏥 Health check: GET /health")
-    print("⚙️  Configuración: POST /config/limite-texto, POST /config/gpt-active")
+    print("📥 Descargar Excel: GET /exports/<export_id>")
+    print("🏥 Health check: GET /health, GET /health/ready")
+    print("⚙️  Configuración: POST /config/limite-texto, POST /config/gpt-active, POST /config/dataset-salida, POST /config/tema-local, POST /config/umbrales-modelos, POST /config/cascada, POST /config/plazo-request, POST /config/procesos-parseo, POST /config/pasajes-relevantes, GET/POST /config/medios-alias")
     print("📋 Consultar logs: GET /logs")
+    print("🚨 Temas en crisis: GET /crisis, POST /crisis/importar-historico")
+    print("🪜 Cascada de modelos: GET /cascada/estadisticas")
+    print("✂️  Pasajes relevantes: GET /pasajes/estadisticas")
+    print("🧹 Contenido principal: GET /contenido/estadisticas")
+    print("🛑 Cancelar procesamiento: POST /cancelar/<request_id>")
     print("📊 Estado config: GET /config/estado")
     print("🔧 Puerto: 5000")
     
+    Warmup.iniciar()
+    Health.iniciar()
     app.run(debug=True, host='0.0.0.0', port=5000)